@@ -0,0 +1,52 @@
+"""Run the benchmark suite against the fake Wialon server.
+
+Usage::
+
+    python -m benchmarks [--quick] [-k PATTERN] [--output FILE]
+
+The results are written to ``benchmark-results/<commit>.json`` in the current
+directory by default, never into the source tree; compare two files with
+``python -m benchmarks.compare BASELINE CURRENT``.
+"""
+
+import argparse
+from pathlib import Path
+
+from . import bench_batch, bench_items, bench_messages, bench_report, bench_request
+from .harness import environment, quiet, run, save
+
+MODULES = (bench_request, bench_batch, bench_messages, bench_report, bench_items)
+RESULTS = Path("benchmark-results")
+
+
+def main() -> None:
+    """Parse the arguments, run the benchmarks and save the results."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument(
+        "--quick",
+        action="store_true",
+        help="skip the slowest sizes (1M messages, largest report and fleet)",
+    )
+    parser.add_argument(
+        "-k",
+        dest="pattern",
+        default="",
+        help="only run the cases whose name contains PATTERN",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        help=f"the result file to write, defaults to {RESULTS}/<commit>.json",
+    )
+    args = parser.parse_args()
+
+    quiet()
+    results = []
+    for module in MODULES:
+        results.extend(run(module.cases(quick=args.quick), args.pattern))
+    output = args.output or RESULTS / f"{environment()['commit'] or 'latest'}.json"
+    save(results, output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""Benchmarks of ``Extra.batch`` with growing batch sizes."""
+
+from .harness import Case, fake_client, quiet, run
+
+SIZES = (10, 100, 1000)
+
+
+def cases(*, quick: bool = False) -> list[Case]:  # noqa: ARG001
+    """Return the cases of the benchmark.
+
+    :param quick: ignored, every case is fast
+    :type quick: bool, optional
+    :return: the cases
+    :rtype: list[Case]
+    """
+    client, _ = fake_client(units=max(SIZES))
+    result = []
+    for size in SIZES:
+        calls = [
+            {"svc": "core/search_item", "params": {"id": index + 1, "flags": 0x1}}
+            for index in range(size)
+        ]
+        result.append(
+            Case(
+                f"extra.batch[{size}]",
+                lambda calls=calls: client.extra.batch(calls),
+                number=max(1, 1000 // size),
+                items=size,
+            ),
+        )
+    return result
+
+
+if __name__ == "__main__":
+    quiet()
+    run(cases())
@@ -0,0 +1,91 @@
+"""Micro-benchmark of the request parameter encoding.
+
+Compares the encoding of a 1,000-call ``core/batch`` payload with the former
+``str(params).replace`` implementation, the standard library and ``orjson``.
+
+Run it with ``python -m benchmarks.bench_encoding``.
+"""
+
+import json
+import timeit
+from typing import Any
+
+from wialon import protocol
+
+BATCH_SIZE = 1000
+REPEAT = 5
+NUMBER = 20
+
+
+def legacy_encode(params: Any) -> str:  # noqa: ANN401
+    """Encode the parameters the way ``Wialon.request`` used to."""
+    return str(params).replace("'", '"').replace('"', '"')
+
+
+def stdlib_encode(params: Any) -> str:  # noqa: ANN401
+    """Encode the parameters with the standard library only."""
+    return protocol._ENCODER.encode(params)  # noqa: SLF001
+
+
+def build_batch(size: int = BATCH_SIZE) -> list[dict[str, Any]]:
+    """Build a ``core/batch`` payload mixing the services used by the managers."""
+    batch: list[dict[str, Any]] = []
+    for index in range(size):
+        if index % 2:
+            batch.append({
+                "svc": "messages/load_interval",
+                "params": {
+                    "itemId": 10_000 + index,
+                    "timeFrom": 1_700_000_000,
+                    "timeTo": 1_700_086_400,
+                    "flags": 0x1,
+                    "flagsMask": 0xFF00,
+                    "loadCount": 0xFFFFFFFF,
+                },
+            })
+        else:
+            batch.append({
+                "svc": "report/export_result",
+                "params": {
+                    "format": 32,
+                    "compress": 1,
+                    "pageOrientation": "landscape",
+                    "headings": True,
+                    "outputFileName": None,
+                },
+            })
+    return batch
+
+
+def is_valid_json(document: str) -> bool:
+    """Check whether a document can be decoded as JSON."""
+    try:
+        json.loads(document)
+    except json.JSONDecodeError:
+        return False
+    return True
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    batch = build_batch()
+    encoders = {"legacy str().replace": legacy_encode, "json (stdlib)": stdlib_encode}
+    if protocol.orjson is not None:
+        encoders["orjson"] = protocol.dumps
+
+    print(f"Encoding a {BATCH_SIZE}-call core/batch payload")
+    baseline = None
+    for name, encoder in encoders.items():
+        best = min(
+            timeit.repeat(lambda e=encoder: e(batch), repeat=REPEAT, number=NUMBER),
+        ) / NUMBER
+        baseline = baseline or best
+        valid = "yes" if is_valid_json(encoder(batch)) else "NO"
+        print(
+            f"{name:<22} {best * 1000:8.3f} ms/call  "
+            f"x{baseline / best:5.2f}  valid JSON: {valid}",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""Benchmarks of ``Items.search`` over large fleets."""
+
+from .harness import Case, fake_client, quiet, run
+
+FLEETS = (1000, 10_000, 50_000)
+
+
+def cases(*, quick: bool = False) -> list[Case]:
+    """Return the cases of the benchmark.
+
+    :param quick: skip the largest fleet, defaults to False
+    :type quick: bool, optional
+    :return: the cases
+    :rtype: list[Case]
+    """
+    result = []
+    for units in FLEETS[:-1] if quick else FLEETS:
+        client, _ = fake_client(units=units)
+        result.append(
+            Case(
+                f"items.search[{units}]",
+                lambda client=client: client.items.search(item_type="unit"),
+                number=max(1, 10_000 // units),
+                items=units,
+            ),
+        )
+    return result
+
+
+if __name__ == "__main__":
+    quiet()
+    run(cases())
@@ -0,0 +1,49 @@
+"""Benchmarks of the parsing of ``Messages.load_interval`` responses.
+
+The fake server generates each response once, so the cases time the transfer
+of the body through the transport and its decoding by the client, loaded at
+once or streamed.
+"""
+
+from .harness import Case, fake_client, quiet, run
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1M": 1_000_000}
+QUICK_SIZES = ("10k", "100k")
+
+
+def cases(*, quick: bool = False) -> list[Case]:
+    """Return the cases of the benchmark.
+
+    :param quick: skip the 1M messages cases, defaults to False
+    :type quick: bool, optional
+    :return: the cases
+    :rtype: list[Case]
+    """
+    result = []
+    for label, size in SIZES.items():
+        if quick and label not in QUICK_SIZES:
+            continue
+        client, _ = fake_client(messages=size)
+        repeat = 3 if size >= SIZES["1M"] else 5
+        result.extend([
+            Case(
+                f"messages.load_interval[{label}]",
+                lambda client=client: client.messages.load_interval(1),
+                repeat=repeat,
+                items=size,
+            ),
+            Case(
+                f"messages.load_interval_stream[{label}]",
+                lambda client=client: sum(
+                    1 for _ in client.messages.load_interval(1, stream=True)
+                ),
+                repeat=repeat,
+                items=size,
+            ),
+        ])
+    return result
+
+
+if __name__ == "__main__":
+    quiet()
+    run(cases())
@@ -0,0 +1,36 @@
+"""Benchmarks of ``Report.get_result`` with the sub rows of every row."""
+
+from .harness import Case, fake_client, quiet, run
+
+ROWS = (100, 1000)
+
+
+def cases(*, quick: bool = False) -> list[Case]:
+    """Return the cases of the benchmark.
+
+    :param quick: only time the smallest table, defaults to False
+    :type quick: bool, optional
+    :return: the cases
+    :rtype: list[Case]
+    """
+    result = []
+    for rows in ROWS[:1] if quick else ROWS:
+        client, server = fake_client(report_rows=rows, report_subrows=5)
+        client.report.execute(1, 2, 3)
+        client.report.apply_result()
+        result.append(
+            Case(
+                f"report.get_result_multi_level[{rows}]",
+                lambda client=client, rows=rows: client.report.get_result(
+                    0, 0, rows, multi_level=True,
+                ),
+                number=max(1, 1000 // rows),
+                items=rows * server.report_subrows,
+            ),
+        )
+    return result
+
+
+if __name__ == "__main__":
+    quiet()
+    run(cases())
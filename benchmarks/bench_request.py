@@ -0,0 +1,58 @@
+"""Benchmarks of the per-call overhead of ``Wialon.request``.
+
+Covers the encoding of the parameters, the validation of the error codes of
+the response and a whole call through the client against a fake server
+without latency.
+"""
+
+from wialon import protocol
+from wialon.errors import validate_error
+
+from .bench_encoding import build_batch
+from .harness import Case, fake_client, quiet, run
+
+SID = "0123456789abcdef0123456789abcdef"
+
+
+def cases(*, quick: bool = False) -> list[Case]:  # noqa: ARG001
+    """Return the cases of the benchmark.
+
+    :param quick: ignored, every case is fast
+    :type quick: bool, optional
+    :return: the cases
+    :rtype: list[Case]
+    """
+    batch = build_batch(1000)
+    search = {"id": 10_001, "flags": 0x1}
+    results = [{"item": {"id": index, "nm": f"Unit {index}"}} for index in range(1000)]
+    client, _ = fake_client()
+    sid = client.auth.get_sid()
+    return [
+        Case(
+            "request.encode[search_item]",
+            lambda: protocol.build_query("core/search_item", search, SID),
+            number=10_000,
+        ),
+        Case(
+            "request.encode[batch-1000]",
+            lambda: protocol.build_query("core/batch", batch, SID),
+            number=20,
+            items=len(batch),
+        ),
+        Case(
+            "request.validate_error[batch-1000]",
+            lambda: validate_error(results),
+            number=200,
+            items=len(results),
+        ),
+        Case(
+            "request.call[search_item]",
+            lambda: client.request("core/search_item", search, sid),
+            number=1000,
+        ),
+    ]
+
+
+if __name__ == "__main__":
+    quiet()
+    run(cases())
@@ -0,0 +1,86 @@
+"""Compare two benchmark result files and report the regressions.
+
+Usage::
+
+    python -m benchmarks.compare BASELINE CURRENT [--threshold 0.10]
+
+The best timing of each case is compared. The command exits with status 1 when
+a case is slower than the baseline by more than the threshold, so it can gate
+a release.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from .harness import load
+
+
+def compare(
+    baseline: dict[str, dict[str, float]],
+    current: dict[str, dict[str, float]],
+    threshold: float,
+) -> list[str]:
+    """Print the change of each case and return the regressed ones.
+
+    :param baseline: the results of the baseline, keyed by case name
+    :type baseline: dict[str, dict[str, float]]
+    :param current: the results to check, keyed by case name
+    :type current: dict[str, dict[str, float]]
+    :param threshold: the slowdown above which a case regressed, e.g. 0.10
+    :type threshold: float
+    :return: the names of the regressed cases
+    :rtype: list[str]
+    """
+    regressions = []
+    for name in sorted(baseline.keys() | current.keys()):
+        if name not in current or name not in baseline:
+            side = "baseline" if name in baseline else "current"
+            print(f"{name:<48} only in {side}")
+            continue
+        before = baseline[name]["best"]
+        after = current[name]["best"]
+        change = after / before - 1 if before else 0.0
+        status = ""
+        if change > threshold:
+            status = "REGRESSION"
+            regressions.append(name)
+        elif change < -threshold:
+            status = "faster"
+        print(
+            f"{name:<48} {before * 1000:10.3f} ms -> {after * 1000:10.3f} ms "
+            f"{change:+7.1%} {status}",
+        )
+    return regressions
+
+
+def main() -> None:
+    """Parse the arguments and compare the files."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.compare")
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("current", type=Path)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="relative slowdown reported as a regression, defaults to 0.10",
+    )
+    args = parser.parse_args()
+
+    baseline = load(args.baseline)
+    current = load(args.current)
+    for key in ("python", "platform", "json"):
+        if baseline["environment"].get(key) != current["environment"].get(key):
+            print(
+                f"Warning: {key} differs "
+                f"({baseline['environment'].get(key)} -> "
+                f"{current['environment'].get(key)}), timings may not be comparable.",
+            )
+    regressions = compare(baseline["results"], current["results"], args.threshold)
+    if regressions:
+        print(f"{len(regressions)} case(s) regressed by more than {args.threshold:.0%}.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""Timing and result files shared by the benchmarks.
+
+A benchmark module exposes ``cases(quick)``, returning the :class:`Case` objects
+to time. :func:`run` times them and returns their :class:`Result`, which
+:func:`save` writes to a JSON file together with the environment, so the files
+of two releases can be compared with ``python -m benchmarks.compare``.
+"""
+
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from wialon import FakeTransport, FakeWialonServer, Wialon, protocol
+from wialon.fake import FAKE_URL
+
+FORMAT_VERSION = 1
+
+
+@dataclass
+class Case:
+    """A function to time.
+
+    :ivar str name: the unique name of the case, e.g. ``messages.load_interval[10k]``
+    :ivar Callable func: the function, called without arguments
+    :ivar int number: the calls per measurement
+    :ivar int repeat: the measurements; the best one is the reference
+    :ivar int items: the items processed per call, to report a throughput
+    """
+
+    name: str
+    func: Callable[[], Any]
+    number: int = 1
+    repeat: int = 5
+    items: int = 1
+
+
+@dataclass
+class Result:
+    """The timings of a case, in seconds per call.
+
+    :ivar str name: the name of the case
+    :ivar float best: the fastest measurement
+    :ivar float median: the median measurement
+    :ivar float stdev: the standard deviation of the measurements
+    :ivar int number: the calls per measurement
+    :ivar int repeat: the measurements
+    :ivar float items_per_second: the throughput of the fastest measurement
+    :ivar list samples: every measurement
+    """
+
+    name: str
+    best: float
+    median: float
+    stdev: float
+    number: int
+    repeat: int
+    items_per_second: float
+    samples: list[float] = field(default_factory=list)
+
+
+def quiet() -> None:
+    """Silence the logs of the SDK, which would otherwise be timed too."""
+    logger.disable("wialon")
+
+
+def fake_client(**kwargs: Any) -> tuple[Wialon, FakeWialonServer]:  # noqa: ANN401
+    """Return a client logged in to a fake server without latency.
+
+    :return: the client and the server, configured with the keyword arguments
+    :rtype: tuple[Wialon, FakeWialonServer]
+    """
+    server = FakeWialonServer(**kwargs)
+    return Wialon(FAKE_URL, "benchmark", transport=FakeTransport(server)), server
+
+
+def measure(case: Case) -> Result:
+    """Time a case.
+
+    :param case: the case
+    :type case: Case
+    :return: the timings of the case
+    :rtype: Result
+    """
+    case.func()  # warm up caches and lazily created managers
+    samples = []
+    for _ in range(case.repeat):
+        started = time.perf_counter()
+        for _ in range(case.number):
+            case.func()
+        samples.append((time.perf_counter() - started) / case.number)
+    best = min(samples)
+    return Result(
+        name=case.name,
+        best=best,
+        median=statistics.median(samples),
+        stdev=statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        number=case.number,
+        repeat=case.repeat,
+        items_per_second=case.items / best if best else 0.0,
+        samples=samples,
+    )
+
+
+def run(cases: list[Case], pattern: str = "") -> list[Result]:
+    """Time the cases whose name contains a pattern, printing each result.
+
+    :param cases: the cases
+    :type cases: list[Case]
+    :param pattern: the substring the names must contain, defaults to all cases
+    :type pattern: str, optional
+    :return: the timings of the cases
+    :rtype: list[Result]
+    """
+    results = []
+    for case in cases:
+        if pattern not in case.name:
+            continue
+        result = measure(case)
+        results.append(result)
+        print(
+            f"{result.name:<48} {result.best * 1000:10.3f} ms "
+            f"(median {result.median * 1000:.3f} ms, "
+            f"{result.items_per_second:,.0f} items/s)",
+        )
+    return results
+
+
+def environment() -> dict[str, str]:
+    """Describe the environment the benchmarks ran in.
+
+    :return: the Python version, the platform, the commit and the JSON library
+    :rtype: dict[str, str]
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],  # noqa: S607
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = ""
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "commit": commit,
+        "json": "orjson" if protocol.orjson is not None else "json",
+        "date": datetime.now(tz=UTC).isoformat(timespec="seconds"),
+    }
+
+
+def save(results: list[Result], path: Path) -> None:
+    """Write the results to a JSON file.
+
+    :param results: the results
+    :type results: list[Result]
+    :param path: the file
+    :type path: Path
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    document = {
+        "format": FORMAT_VERSION,
+        "environment": environment(),
+        "results": {result.name: asdict(result) for result in results},
+    }
+    path.write_text(json.dumps(document, indent=2) + "\n", encoding="utf-8")
+    print(f"Results saved to {path}")
+
+
+def load(path: Path) -> dict[str, Any]:
+    """Read a result file.
+
+    :param path: the file written by :func:`save`
+    :type path: Path
+    :raises ValueError: If the file was written by another format version.
+    :return: the document
+    :rtype: dict[str, Any]
+    """
+    document = json.loads(path.read_text(encoding="utf-8"))
+    if document.get("format") != FORMAT_VERSION:
+        msg = f"{path} is not a benchmark result of format {FORMAT_VERSION}."
+        raise ValueError(msg)
+    return document
@@ -0,0 +1,420 @@
+"""Fleet-scale load generator and soak test.
+
+Drives the ``Items``, ``Messages``, ``Report`` and ``Extra`` managers from many
+threads against the fake Wialon server for a fixed duration, and prints every
+``--interval`` seconds the throughput, the p50/p99 latency of each operation,
+the memory growth, the error codes and the number of loguru sinks::
+
+    python -m benchmarks.soak --units 10000 --duration 3600 --workers 32
+
+``--churn`` builds a new client every few seconds, with ``--log-level`` to show
+how sinks and memory accumulate when clients are created repeatedly. ``--http``
+serves the fake API over a local socket instead of the in-process transport.
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from wialon import FakeTransport, FakeWialonServer, Wialon
+from wialon.fake import FAKE_URL
+from wialon.instrumentation import Histogram, error_code
+
+from .harness import environment
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None  # type: ignore[assignment]
+
+DEFAULT_MIX = "items=1,messages=6,report=1,batch=2"
+
+
+@dataclass
+class Window:
+    """The measurements of a reporting interval.
+
+    :ivar dict latency: the latency histogram of each operation
+    :ivar Counter errors: the failed operations by Wialon error code or exception
+    """
+
+    latency: dict[str, Histogram] = field(default_factory=dict)
+    errors: Counter[str] = field(default_factory=Counter)
+
+    def record(self, operation: str, elapsed: float, error: str | None) -> None:
+        """Record an operation.
+
+        :param operation: the name of the operation
+        :type operation: str
+        :param elapsed: the seconds the operation took
+        :type elapsed: float
+        :param error: the error of the operation, None when it succeeded
+        :type error: str | None
+        """
+        self.latency.setdefault(operation, Histogram()).add(elapsed)
+        if error is not None:
+            self.errors[error] += 1
+
+    def merge(self, other: "Window") -> None:
+        """Add the measurements of another window.
+
+        :param other: the window to add
+        :type other: Window
+        """
+        for operation, histogram in other.latency.items():
+            self.latency.setdefault(operation, Histogram()).merge(histogram)
+        self.errors.update(other.errors)
+
+    @property
+    def operations(self) -> int:
+        """Return the number of operations recorded.
+
+        :return: the number of operations
+        :rtype: int
+        """
+        return sum(histogram.count for histogram in self.latency.values())
+
+
+def sink_count() -> int:
+    """Return the number of loguru sinks.
+
+    :return: the number of handlers of the global logger
+    :rtype: int
+    """
+    return len(logger._core.handlers)  # type: ignore[attr-defined] # noqa: SLF001
+
+
+def memory() -> dict[str, int]:
+    """Return the memory used by the process.
+
+    :return: the bytes traced by tracemalloc (0 when it is off) and the maximum
+             resident set size
+    :rtype: dict[str, int]
+    """
+    traced = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+    max_rss = 0
+    if resource is not None:
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return {"traced": traced, "max_rss": max_rss}
+
+
+class Soak:
+    """Runs the managers of a client concurrently and collects measurements."""
+
+    def __init__(self, args: argparse.Namespace) -> None:
+        """Initialize the server, the client and the operation mix.
+
+        :param args: the command line arguments
+        :type args: argparse.Namespace
+        """
+        self.args = args
+        self.server = FakeWialonServer(
+            latency=args.latency,
+            jitter=args.jitter,
+            units=args.units,
+            messages=args.messages,
+            report_rows=args.report_rows,
+            max_concurrency=args.max_concurrency,
+            error_rate=args.error_rate,
+            error_codes=tuple(int(code) for code in args.error_codes.split(",")),
+        )
+        self.httpd = None
+        self.url = FAKE_URL
+        if args.http:
+            self.httpd, self.url = self.server.serve()
+        self.client = self.new_client()
+        self.clients_built = 1
+        self.operations = self.parse_mix(args.mix)
+        self.window = Window()
+        self.total = Window()
+        self.lock = threading.Lock()
+        self.stop = threading.Event()
+
+    def new_client(self) -> Wialon:
+        """Build a client of the fake server.
+
+        :return: the client, logged in
+        :rtype: Wialon
+        """
+        kwargs: dict[str, Any] = {"max_concurrency": self.args.client_concurrency}
+        if self.args.log_level:
+            kwargs["logging"] = self.args.log_level
+        if self.args.http:
+            return Wialon(self.url, "soak", **kwargs)
+        return Wialon(self.url, "soak", transport=FakeTransport(self.server), **kwargs)
+
+    def parse_mix(self, mix: str) -> list[tuple[str, Callable[[], Any]]]:
+        """Return the operations to draw from, repeated by weight.
+
+        :param mix: e.g. ``"items=1,messages=6"``
+        :type mix: str
+        :raises ValueError: If an operation is unknown.
+        :return: the name and function of each operation
+        :rtype: list[tuple[str, Callable[[], Any]]]
+        """
+        known = {
+            "items": self.search_items,
+            "messages": self.load_messages,
+            "report": self.run_report,
+            "batch": self.batch,
+        }
+        operations = []
+        for part in mix.split(","):
+            name, _, weight = part.partition("=")
+            if name not in known:
+                msg = f"Unknown operation {name!r}, expected one of {sorted(known)}."
+                raise ValueError(msg)
+            operations.extend([(name, known[name])] * int(weight or 1))
+        return operations
+
+    def unit(self) -> int:
+        """Return the ID of a random unit of the fleet."""
+        return random.randint(1, self.args.units)  # noqa: S311
+
+    def search_items(self) -> Any:  # noqa: ANN401
+        """Search the units of the fleet."""
+        return self.client.items.search(item_type="unit")
+
+    def load_messages(self) -> Any:  # noqa: ANN401
+        """Load the messages of a random unit."""
+        return self.client.messages.load_interval(self.unit())
+
+    def run_report(self) -> Any:  # noqa: ANN401
+        """Execute a report and read its rows."""
+        report = self.client.report
+        report.execute(self.unit(), 1, 1)
+        report.apply_result()
+        return report.get_result(0, 0, self.args.report_rows)
+
+    def batch(self) -> Any:  # noqa: ANN401
+        """Read a few units in one ``core/batch`` request."""
+        calls = [
+            {"svc": "core/search_item", "params": {"id": self.unit(), "flags": 1}}
+            for _ in range(self.args.batch_size)
+        ]
+        return self.client.extra.batch(calls)
+
+    def worker(self) -> None:
+        """Run random operations until the end of the soak."""
+        while not self.stop.is_set():
+            name, operation = random.choice(self.operations)  # noqa: S311
+            started = time.perf_counter()
+            error = None
+            try:
+                operation()
+            except Exception as exc:  # noqa: BLE001
+                error = str(error_code(exc))
+            elapsed = time.perf_counter() - started
+            with self.lock:
+                self.window.record(name, elapsed, error)
+
+    def churn(self) -> None:
+        """Replace the client every ``--churn`` seconds."""
+        while not self.stop.wait(self.args.churn):
+            previous = self.client
+            self.client = self.new_client()
+            self.clients_built += 1
+            previous.close()
+
+    def expire(self) -> None:
+        """Expire every session every ``--expire`` seconds."""
+        while not self.stop.wait(self.args.expire):
+            self.server.expire()
+
+    def snapshot(self, elapsed: float, interval: float) -> dict[str, Any]:
+        """Close the current window and return its measurements.
+
+        :param elapsed: the seconds since the start of the soak
+        :type elapsed: float
+        :param interval: the seconds covered by the window
+        :type interval: float
+        :return: the measurements of the window
+        :rtype: dict[str, Any]
+        """
+        with self.lock:
+            window, self.window = self.window, Window()
+        self.total.merge(window)
+        return {
+            "elapsed": round(elapsed, 1),
+            "operations": window.operations,
+            "throughput": window.operations / interval if interval else 0.0,
+            "latency": {
+                name: {
+                    "p50": histogram.percentile(0.5),
+                    "p99": histogram.percentile(0.99),
+                }
+                for name, histogram in sorted(window.latency.items())
+            },
+            "errors": dict(window.errors),
+            "memory": memory(),
+            "sinks": sink_count(),
+            "clients": self.clients_built,
+        }
+
+    def run(self) -> list[dict[str, Any]]:
+        """Run the soak and print a line per interval.
+
+        :return: the measurements of each interval
+        :rtype: list[dict[str, Any]]
+        """
+        threads = [
+            threading.Thread(target=self.worker, daemon=True)
+            for _ in range(self.args.workers)
+        ]
+        if self.args.churn:
+            threads.append(threading.Thread(target=self.churn, daemon=True))
+        if self.args.expire:
+            threads.append(threading.Thread(target=self.expire, daemon=True))
+        baseline = memory()
+        started = last = time.monotonic()
+        for thread in threads:
+            thread.start()
+        snapshots = []
+        deadline = started + self.args.duration
+        while (now := time.monotonic()) < deadline:
+            time.sleep(min(self.args.interval, deadline - now))
+            now = time.monotonic()
+            snapshot = self.snapshot(now - started, now - last)
+            last = now
+            snapshots.append(snapshot)
+            print_snapshot(snapshot, baseline)
+        self.stop.set()
+        for thread in threads:
+            thread.join()
+        self.client.close()
+        if self.httpd is not None:
+            self.httpd.shutdown()
+        return snapshots
+
+
+def print_snapshot(snapshot: dict[str, Any], baseline: dict[str, int]) -> None:
+    """Print the measurements of an interval on one line.
+
+    :param snapshot: the measurements
+    :type snapshot: dict[str, Any]
+    :param baseline: the memory at the start of the soak
+    :type baseline: dict[str, int]
+    """
+    latency = " ".join(
+        f"{name}={values['p50'] * 1000:.1f}/{values['p99'] * 1000:.1f}ms"
+        for name, values in snapshot["latency"].items()
+    )
+    growth = snapshot["memory"]["traced"] - baseline["traced"]
+    errors = ",".join(f"{code}:{count}" for code, count in snapshot["errors"].items())
+    print(
+        f"[{snapshot['elapsed']:>7.1f}s] {snapshot['throughput']:8.1f} ops/s "
+        f"p50/p99 {latency} | mem +{growth / 2**20:.1f} MiB "
+        f"rss {snapshot['memory']['max_rss'] / 2**20:.0f} MiB | "
+        f"sinks {snapshot['sinks']} clients {snapshot['clients']} | "
+        f"errors {errors or '-'}",
+    )
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse the command line.
+
+    :return: the arguments
+    :rtype: argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.soak")
+    parser.add_argument("--duration", type=float, default=60, help="seconds to run")
+    parser.add_argument("--interval", type=float, default=10, help="report period")
+    parser.add_argument("--workers", type=int, default=16, help="client threads")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="operation weights")
+    parser.add_argument("--units", type=int, default=10_000, help="fleet size")
+    parser.add_argument("--messages", type=int, default=2000, help="per load")
+    parser.add_argument("--report-rows", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.01, help="server seconds")
+    parser.add_argument("--jitter", type=float, default=0.01, help="server seconds")
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=0,
+        help="calls in flight per session before the server answers error 10",
+    )
+    parser.add_argument(
+        "--client-concurrency",
+        type=int,
+        default=0,
+        help="max_concurrency of the client (adaptive limiter), 0 to disable",
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-codes", default="5", help="comma separated")
+    parser.add_argument(
+        "--expire",
+        type=float,
+        default=0,
+        help="expire the sessions every N seconds",
+    )
+    parser.add_argument(
+        "--churn",
+        type=float,
+        default=0,
+        help="build a new client every N seconds",
+    )
+    parser.add_argument(
+        "--log-level",
+        choices=("INFO", "DEBUG"),
+        help="the logging option of each client, its log file goes to a temp dir",
+    )
+    parser.add_argument("--http", action="store_true", help="serve over a socket")
+    parser.add_argument(
+        "--no-tracemalloc",
+        action="store_true",
+        help="only report the resident set size, tracing slows the run down",
+    )
+    parser.add_argument("--output", type=Path, help="write the snapshots as JSON")
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Run the soak test."""
+    args = parse_args()
+    logger.remove()
+    if not args.no_tracemalloc:
+        tracemalloc.start()
+    with tempfile.TemporaryDirectory() as directory:
+        cwd = Path.cwd()
+        os.chdir(directory)  # the clients write wialon.log in the working directory
+        try:
+            soak = Soak(args)
+            snapshots = soak.run()
+        finally:
+            os.chdir(cwd)
+    total = soak.total
+    print(f"Total: {total.operations} operations, errors {dict(total.errors) or '-'}")
+    for name, histogram in sorted(total.latency.items()):
+        print(
+            f"  {name:<10} {histogram.count:>8} ops  "
+            f"p50 {histogram.percentile(0.5) * 1000:8.2f} ms  "
+            f"p99 {histogram.percentile(0.99) * 1000:8.2f} ms",
+        )
+    print(f"Server errors by code: {dict(soak.server.errors) or '-'}")
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        document = {
+            "environment": environment(),
+            "arguments": {key: str(value) for key, value in vars(args).items()},
+            "finished": datetime.now().astimezone().isoformat(timespec="seconds"),
+            "snapshots": snapshots,
+        }
+        args.output.write_text(json.dumps(document, indent=2) + "\n", encoding="utf-8")
+        print(f"Snapshots saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,7 @@ from datetime import datetime
 
 from dotenv import load_dotenv
 
-from wialon import Wialon
+from wialon import SessionPool, Wialon
 
 load_dotenv("../.env")
 url = os.getenv("WIALON_URL")
@@ -19,15 +19,17 @@ if url is None or api_key is None:
 wialon = Wialon(url, api_key)
 
 items = wialon.items.search(by="property", item_type="unit")
-
-for item in items:
+names = {item["id"]: item["nm"] for item in items}
+
+# Each session loads one unit at a time, so the sessions of the pool load in parallel.
+pool = SessionPool(wialon, size=4)
+for item_id, messages in pool.messages.load_interval_many(
+    names,
+    datetime(2024, 10, 1),
+    datetime(2024, 11, 20),
+):
     print("-----------------------------------")
-    print(item["nm"].upper())
-    messages = wialon.messages.load_interval(
-        item["id"],
-        datetime(2024, 10, 1),
-        datetime(2024, 11, 20),
-    )
+    print(names[item_id].upper())
     print(messages)
     print("-----------------------------------")
 # ruff: enable
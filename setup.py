@@ -9,6 +9,10 @@ setup(
     install_requires=[
         "requests>=2.32.3",
     ],
+    extras_require={
+        "async": ["aiohttp>=3.9"],
+        "speedups": ["orjson>=3.9"],
+    },
     entry_points={
         "console_scripts": [
             "wialon-sdk=wialon_sdk.__main__:main",
@@ -25,5 +29,5 @@ setup(
         "License :: OSI Approved :: MIT License",
         "Operating System :: OS Independent",
     ],
-    python_requires=">=3.8",
+    python_requires=">=3.11",
 )
@@ -0,0 +1 @@
+"""Tests of the Wialon SDK against the in-process fake server."""
@@ -0,0 +1,54 @@
+"""Fixtures running the clients against the in-process fake server."""
+
+from collections.abc import Iterator
+
+import pytest
+
+from wialon import FakeTransport, FakeWialonServer, Wialon
+from wialon.aio import AsyncWialon
+from wialon.aio.fake import AsyncFakeTransport
+from wialon.fake import FAKE_URL
+
+TOKEN = "test-token"  # noqa: S105
+
+
+class Clock:
+    """A monotonic clock moved by hand."""
+
+    def __init__(self) -> None:
+        """Start the clock at 0."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """Return the current time."""
+        return self.now
+
+
+@pytest.fixture
+def clock() -> Clock:
+    """Return a clock moved by hand."""
+    return Clock()
+
+
+@pytest.fixture
+def server() -> FakeWialonServer:
+    """Return a fake server answering at once."""
+    return FakeWialonServer(units=20, messages=50)
+
+
+@pytest.fixture
+def client(server: FakeWialonServer) -> Iterator[Wialon]:
+    """Return a client logged in to the fake server."""
+    with Wialon(FAKE_URL, TOKEN, transport=FakeTransport(server)) as client:
+        yield client
+
+
+def async_client(server: FakeWialonServer, **kwargs: object) -> AsyncWialon:
+    """Return an asynchronous client of the fake server, to be entered.
+
+    :param server: the fake server
+    :type server: FakeWialonServer
+    :return: the client
+    :rtype: AsyncWialon
+    """
+    return AsyncWialon(FAKE_URL, TOKEN, transport=AsyncFakeTransport(server), **kwargs)
@@ -0,0 +1,84 @@
+"""Tests of the coalescing of calls into core/batch requests."""
+
+import asyncio
+import time
+
+import pytest
+
+from wialon import FakeWialonServer, Wialon
+from wialon.errors import InvalidServiceNameError
+
+from .conftest import async_client
+
+CALLS = 5
+LONG_WINDOW = 10.0
+SEARCH = "core/search_item"
+
+
+def test_calls_of_a_window_are_sent_in_one_batch(
+    server: FakeWialonServer,
+    client: Wialon,
+) -> None:
+    """The calls queued within the window share one core/batch request."""
+    with client.batching(window=0.05) as batcher:
+        futures = [
+            batcher.submit(SEARCH, {"id": item_id, "flags": 1})
+            for item_id in range(1, CALLS + 1)
+        ]
+        items = [future.result()["item"]["id"] for future in futures]
+    assert items == list(range(1, CALLS + 1))
+    assert server.calls["core/batch"] == 1
+    assert batcher.stats.batches == 1
+
+
+def test_full_batch_is_sent_before_the_window(
+    server: FakeWialonServer,
+    client: Wialon,
+) -> None:
+    """A batch reaching max_size is sent without waiting for the window."""
+    with client.batching(window=LONG_WINDOW, max_size=CALLS) as batcher:
+        started = time.monotonic()
+        futures = [
+            batcher.submit(SEARCH, {"id": item_id, "flags": 1})
+            for item_id in range(1, CALLS + 1)
+        ]
+        for future in futures:
+            future.result(timeout=LONG_WINDOW / 2)
+        assert time.monotonic() - started < LONG_WINDOW / 2
+    assert server.calls["core/batch"] == 1
+
+
+def test_each_call_gets_its_own_error(client: Wialon) -> None:
+    """A failing call of a batch raises for its caller only."""
+    with client.batching(window=0.05) as batcher:
+        found = batcher.submit(SEARCH, {"id": 1, "flags": 1})
+        failed = batcher.submit("item/unknown", {"itemId": 1})
+        assert found.result()["item"]["id"] == 1
+        with pytest.raises(InvalidServiceNameError):
+            failed.result()
+    assert batcher.stats.errors == 1
+
+
+def test_lone_call_is_sent_alone(server: FakeWialonServer, client: Wialon) -> None:
+    """A call with nothing else queued in its window is not wrapped in a batch."""
+    with client.batching(window=0.01) as batcher:
+        batcher.submit(SEARCH, {"id": 1, "flags": 1}).result()
+    assert batcher.stats.single == 1
+    assert server.calls["core/batch"] == 0
+
+
+def test_async_concurrent_calls_are_batched(server: FakeWialonServer) -> None:
+    """Calls awaited together by the asynchronous client share one batch."""
+
+    async def main() -> list[int]:
+        async with async_client(server) as client, client.batching(window=0.05):
+            items = await asyncio.gather(
+                *(
+                    client.items.search(item_id, by="id")
+                    for item_id in range(1, CALLS + 1)
+                ),
+            )
+        return [item["id"] for item in items if isinstance(item, dict)]
+
+    assert asyncio.run(main()) == list(range(1, CALLS + 1))
+    assert server.calls["core/batch"] == 1
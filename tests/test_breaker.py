@@ -0,0 +1,128 @@
+"""Tests of the circuit breakers of the services and of the API nodes."""
+
+import asyncio
+
+import pytest
+
+from wialon import CircuitBreaker, CircuitOpenError, FakeWialonServer, RetryPolicy, Wialon
+from wialon.breaker import CLOSED, HALF_OPEN, OPEN
+from wialon.errors import InvalidInputError, PerformingRequestError
+from wialon.fake import FAKE_URL
+
+from .conftest import Clock, async_client
+
+THRESHOLD = 2
+PERFORMING_REQUEST = 5
+RESET = 30.0
+SEARCH = "core/search_item"
+SERVICE = ("svc", SEARCH)
+NODE = ("endpoint", FAKE_URL)
+
+
+@pytest.fixture
+def breaker(clock: Clock) -> CircuitBreaker:
+    """Return a breaker opening after two failures."""
+    return CircuitBreaker(THRESHOLD, RESET, clock=clock)
+
+
+def fail(breaker: CircuitBreaker, error: BaseException, times: int = 1) -> None:
+    """Record failed calls of the search service.
+
+    :param breaker: the breaker
+    :type breaker: CircuitBreaker
+    :param error: the error of each call
+    :type error: BaseException
+    :param times: the number of calls, defaults to 1
+    :type times: int, optional
+    """
+    for _ in range(times):
+        breaker.allow(SEARCH, FAKE_URL)
+        breaker.record(SEARCH, FAKE_URL, error)
+
+
+def test_consecutive_failures_open_the_circuit(breaker: CircuitBreaker) -> None:
+    """Once open, the calls of the service fail fast."""
+    fail(breaker, PerformingRequestError(), THRESHOLD)
+    assert breaker.stats()[SERVICE].state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.allow(SEARCH, FAKE_URL)
+    assert breaker.stats()[SERVICE].rejected == 1
+
+
+def test_service_errors_do_not_open_the_node(breaker: CircuitBreaker) -> None:
+    """An overloaded service leaves its node closed; bad input counts as success."""
+    fail(breaker, InvalidInputError(), THRESHOLD)
+    assert breaker.stats()[SERVICE].state == CLOSED
+    fail(breaker, PerformingRequestError(), THRESHOLD)
+    assert breaker.stats()[SERVICE].state == OPEN
+    assert breaker.stats()[NODE].state == CLOSED
+    breaker.allow("core/search_items", FAKE_URL)
+
+
+def test_half_open_trial_closes_on_success(breaker: CircuitBreaker, clock: Clock) -> None:
+    """After reset_timeout one trial call is let through; its success closes."""
+    fail(breaker, PerformingRequestError(), THRESHOLD)
+    clock.now += RESET
+    breaker.allow(SEARCH, FAKE_URL)
+    assert breaker.stats()[SERVICE].state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.allow(SEARCH, FAKE_URL)
+    breaker.record(SEARCH, FAKE_URL, None)
+    assert breaker.stats()[SERVICE].state == CLOSED
+
+
+def test_half_open_trial_reopens_on_failure(
+    breaker: CircuitBreaker,
+    clock: Clock,
+) -> None:
+    """A failed trial opens the circuit again for another reset_timeout."""
+    fail(breaker, PerformingRequestError(), THRESHOLD)
+    clock.now += RESET
+    fail(breaker, PerformingRequestError())
+    stats = breaker.stats()[SERVICE]
+    assert stats.state == OPEN
+    assert stats.trips == THRESHOLD
+    assert stats.retry_in == RESET
+
+
+def test_client_fails_fast_while_open(
+    server: FakeWialonServer,
+    client: Wialon,
+    breaker: CircuitBreaker,
+    clock: Clock,
+) -> None:
+    """The client stops calling a failing service until the trial succeeds."""
+    client.circuit_breaker = breaker
+    client.retry_policy = RetryPolicy(max_attempts=1)
+    sid = client.auth.get_sid()
+    server.inject(PERFORMING_REQUEST, SEARCH, count=THRESHOLD)
+    for _ in range(THRESHOLD):
+        with pytest.raises(PerformingRequestError):
+            client.request(SEARCH, {"id": 1, "flags": 1}, sid)
+    with pytest.raises(CircuitOpenError):
+        client.request(SEARCH, {"id": 1, "flags": 1}, sid)
+    assert server.calls[SEARCH] == THRESHOLD
+    clock.now += RESET
+    client.request(SEARCH, {"id": 1, "flags": 1}, sid)
+    assert breaker.stats()[SERVICE].state == CLOSED
+
+
+def test_async_client_fails_fast_while_open(
+    server: FakeWialonServer,
+    breaker: CircuitBreaker,
+) -> None:
+    """The asynchronous client shares the breaker logic."""
+
+    async def main() -> None:
+        async with async_client(server, retries=0) as client:
+            client.circuit_breaker = breaker
+            sid = client.auth.get_sid()
+            server.inject(PERFORMING_REQUEST, SEARCH, count=THRESHOLD)
+            for _ in range(THRESHOLD):
+                with pytest.raises(PerformingRequestError):
+                    await client.request(SEARCH, {"id": 1, "flags": 1}, sid)
+            with pytest.raises(CircuitOpenError):
+                await client.request(SEARCH, {"id": 1, "flags": 1}, sid)
+
+    asyncio.run(main())
+    assert server.calls[SEARCH] == THRESHOLD
@@ -0,0 +1,108 @@
+"""Tests of the cache of the responses of read-only services."""
+
+import asyncio
+
+import pytest
+
+from wialon import FakeTransport, FakeWialonServer, ResponseCache, Wialon
+from wialon.fake import FAKE_URL
+
+from .conftest import TOKEN, Clock, async_client
+
+TTL = 60.0
+SEARCH = "core/search_item"
+USER = "user"
+# The first read, the read after the expiry and the read bypassing the cache.
+CALLS_SENT = 3
+
+
+@pytest.fixture
+def cache(clock: Clock) -> ResponseCache:
+    """Return a cache of the item lookups."""
+    return ResponseCache({SEARCH: TTL}, clock=clock)
+
+
+def test_entries_expire_after_their_ttl(cache: ResponseCache, clock: Clock) -> None:
+    """A response is served until the time-to-live of its service elapses."""
+    cache.put(SEARCH, {"id": 1}, USER, {"item": {"id": 1}})
+    assert cache.get(SEARCH, {"id": 1}, USER) == {"item": {"id": 1}}
+    clock.now += TTL
+    assert cache.get(SEARCH, {"id": 1}, USER) is None
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.expirations) == (1, 1, 1)
+
+
+def test_keys_ignore_the_order_of_the_parameters(cache: ResponseCache) -> None:
+    """Parameters are normalized, but the user is part of the key."""
+    cache.put(SEARCH, {"id": 1, "flags": 1}, USER, {"item": {"id": 1}})
+    assert cache.get(SEARCH, {"flags": 1, "id": 1}, USER) is not None
+    assert cache.get(SEARCH, {"id": 1, "flags": 1}, "other") is None
+
+
+def test_hits_return_copies(cache: ResponseCache) -> None:
+    """Changing a cached response does not change the next hit."""
+    cache.put(SEARCH, {"id": 1}, USER, {"item": {"id": 1}})
+    cache.get(SEARCH, {"id": 1}, USER)["item"]["id"] = 2
+    assert cache.get(SEARCH, {"id": 1}, USER) == {"item": {"id": 1}}
+
+
+def test_services_without_ttl_are_not_cached(cache: ResponseCache) -> None:
+    """Only the services of the time-to-live table are cached."""
+    cache.put("item/update_name", {"itemId": 1}, USER, {})
+    assert cache.stats().entries == 0
+
+
+def test_least_recently_used_entry_is_evicted(clock: Clock) -> None:
+    """Past max_entries, the entry read least recently is dropped."""
+    cache = ResponseCache({SEARCH: TTL}, max_entries=2, clock=clock)
+    cache.put(SEARCH, {"id": 1}, USER, {"item": {"id": 1}})
+    cache.put(SEARCH, {"id": 2}, USER, {"item": {"id": 2}})
+    cache.get(SEARCH, {"id": 1}, USER)
+    cache.put(SEARCH, {"id": 3}, USER, {"item": {"id": 3}})
+    assert cache.get(SEARCH, {"id": 2}, USER) is None
+    assert cache.get(SEARCH, {"id": 1}, USER) is not None
+    assert cache.stats().evictions == 1
+
+
+def test_invalidate_by_service_and_parameters(cache: ResponseCache) -> None:
+    """Invalidation drops the matching entries only."""
+    for item_id in (1, 2):
+        cache.put(SEARCH, {"id": item_id}, USER, {"item": {"id": item_id}})
+    assert cache.invalidate(SEARCH, {"id": 1}) == 1
+    assert cache.get(SEARCH, {"id": 1}, USER) is None
+    assert cache.get(SEARCH, {"id": 2}, USER) is not None
+    cache.clear()
+    assert cache.stats().entries == 0
+
+
+def test_client_answers_repeated_reads_from_the_cache(
+    server: FakeWialonServer,
+    cache: ResponseCache,
+    clock: Clock,
+) -> None:
+    """A cached read reaches the API again only once it has expired."""
+    with Wialon(FAKE_URL, TOKEN, transport=FakeTransport(server), cache=True) as client:
+        client.cache = cache
+        for _ in range(3):
+            client.items.search(1, by="id")
+        assert server.calls[SEARCH] == 1
+        clock.now += TTL
+        client.items.search(1, by="id")
+        client.request(SEARCH, {"id": 1, "flags": 1}, client.auth.get_sid(), cache=False)
+    assert server.calls[SEARCH] == CALLS_SENT
+
+
+def test_async_client_answers_repeated_reads_from_the_cache(
+    server: FakeWialonServer,
+    cache: ResponseCache,
+) -> None:
+    """The asynchronous client shares the cache logic."""
+
+    async def main() -> None:
+        async with async_client(server, cache=True) as client:
+            client.cache = cache
+            for _ in range(3):
+                await client.items.search(1, by="id")
+
+    asyncio.run(main())
+    assert server.calls[SEARCH] == 1
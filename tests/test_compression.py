@@ -0,0 +1,94 @@
+"""Tests of the negotiation of compressed responses and of the transfer counters."""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from wialon import FakeWialonServer, Wialon
+from wialon.compression import TransferStats
+from wialon.errors import EncodingError
+
+from .conftest import async_client
+
+ENCODING_REQUIRED = 1003
+SEARCH = "core/search_item"
+# The call refused without gzip and its replay with gzip.
+SENT = 2
+CALLS = 50
+THREADS = 8
+
+
+class SlowTransferStats(TransferStats):
+    """Counters whose accumulation yields to other threads half way."""
+
+    def add(self, other: TransferStats) -> None:
+        """Accumulate the counters of another transfer, slowly."""
+        calls = self.calls + other.calls
+        time.sleep(0.001)
+        super().add(other)
+        self.calls = calls
+
+
+def test_call_refused_without_gzip_is_sent_again_with_it(
+    server: FakeWialonServer,
+    client: Wialon,
+) -> None:
+    """A service answering error 1003 is called again accepting gzip."""
+    server.inject(ENCODING_REQUIRED, SEARCH)
+    response = client.request(SEARCH, {"id": 1, "flags": 1}, client.auth.get_sid())
+    assert isinstance(response, dict)
+    assert "item" in response
+    assert server.calls[SEARCH] == SENT
+    assert client.last_transfer.encoding == "gzip"
+
+
+def test_call_refused_with_gzip_raises(
+    server: FakeWialonServer,
+    client: Wialon,
+) -> None:
+    """A call that already accepted gzip is not sent again."""
+    server.inject(ENCODING_REQUIRED, SEARCH)
+    with pytest.raises(EncodingError):
+        client.request(
+            SEARCH, {"id": 1, "flags": 1}, client.auth.get_sid(), compression=True,
+        )
+    assert server.calls[SEARCH] == 1
+
+
+def test_async_call_refused_without_gzip_is_sent_again_with_it(
+    server: FakeWialonServer,
+) -> None:
+    """The asynchronous client negotiates gzip the same way."""
+
+    async def main() -> tuple[object, str]:
+        async with async_client(server) as client:
+            server.inject(ENCODING_REQUIRED, SEARCH)
+            response = await client.request(
+                SEARCH, {"id": 1, "flags": 1}, client.auth.get_sid(),
+            )
+            return response, client.last_transfer.encoding
+
+    response, encoding = asyncio.run(main())
+    assert isinstance(response, dict)
+    assert "item" in response
+    assert server.calls[SEARCH] == SENT
+    assert encoding == "gzip"
+
+
+def test_transfers_of_concurrent_calls_are_all_counted(
+    server: FakeWialonServer,
+    client: Wialon,
+) -> None:
+    """The totals of the client count every response read by parallel threads."""
+    sid = client.auth.get_sid()
+    client.total_transfer = SlowTransferStats()
+
+    def search(item_id: int) -> object:
+        return client.request(SEARCH, {"id": item_id, "flags": 1}, sid, dedup=False)
+
+    with ThreadPoolExecutor(THREADS) as executor:
+        list(executor.map(search, range(CALLS)))
+    assert server.calls[SEARCH] == CALLS
+    assert client.total_transfer.calls == CALLS
@@ -0,0 +1,93 @@
+"""Tests of the single-flight deduplication of identical calls."""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from wialon import FakeTransport, FakeWialonServer, Wialon
+from wialon.fake import FAKE_URL
+
+from .conftest import TOKEN, async_client
+
+CALLERS = 8
+LATENCY = 0.05
+SEARCH = "core/search_item"
+RENAME = "item/update_name"
+
+
+def test_identical_calls_share_one_round_trip() -> None:
+    """Identical reads made while one is in flight get its response."""
+    server = FakeWialonServer(latency=LATENCY)
+    with Wialon(FAKE_URL, TOKEN, transport=FakeTransport(server)) as client:
+        sid = client.auth.get_sid()
+        with ThreadPoolExecutor(CALLERS) as executor:
+            responses = list(
+                executor.map(
+                    lambda _: client.request(SEARCH, {"id": 1, "flags": 1}, sid),
+                    range(CALLERS),
+                ),
+            )
+        assert client.single_flight is not None
+        stats = client.single_flight.stats()
+    assert all(response == responses[0] for response in responses)
+    assert server.calls[SEARCH] == 1
+    assert stats.shared == CALLERS - 1
+
+
+def test_distinct_and_write_calls_are_not_shared() -> None:
+    """Calls with other parameters and calls that change data are all sent."""
+    server = FakeWialonServer(latency=LATENCY)
+
+    async def main() -> None:
+        async with async_client(server) as client:
+            sid = client.auth.get_sid()
+            await asyncio.gather(
+                *(
+                    client.request(SEARCH, {"id": item_id, "flags": 1}, sid)
+                    for item_id in range(1, CALLERS + 1)
+                ),
+                *(
+                    client.request(RENAME, {"itemId": 1, "name": "renamed"}, sid)
+                    for _ in range(CALLERS)
+                ),
+                return_exceptions=True,
+            )
+
+    asyncio.run(main())
+    assert server.calls[SEARCH] == CALLERS
+    assert server.calls[RENAME] == CALLERS
+
+
+def test_async_identical_calls_share_one_round_trip() -> None:
+    """Concurrent tasks making the same read share its round trip."""
+    server = FakeWialonServer(latency=LATENCY)
+
+    async def main() -> None:
+        async with async_client(server) as client:
+            sid = client.auth.get_sid()
+            await asyncio.gather(
+                *(
+                    client.request(SEARCH, {"id": 1, "flags": 1}, sid)
+                    for _ in range(CALLERS)
+                ),
+            )
+
+    asyncio.run(main())
+    assert server.calls[SEARCH] == 1
+
+
+def test_dedup_can_be_turned_off() -> None:
+    """With ``dedup=False`` every call makes its own round trip."""
+    server = FakeWialonServer(latency=LATENCY)
+
+    async def main() -> None:
+        async with async_client(server, dedup=False) as client:
+            sid = client.auth.get_sid()
+            await asyncio.gather(
+                *(
+                    client.request(SEARCH, {"id": 1, "flags": 1}, sid)
+                    for _ in range(CALLERS)
+                ),
+            )
+
+    asyncio.run(main())
+    assert server.calls[SEARCH] == CALLERS
@@ -0,0 +1,103 @@
+"""Tests of the failover between the nodes of the API."""
+
+import asyncio
+from typing import Any
+
+import pytest
+
+from wialon import FakeTransport, FakeWialonServer, Wialon
+from wialon.aio import AsyncWialon
+from wialon.aio.fake import AsyncFakeResponse, AsyncFakeTransport
+from wialon.fake import FakeResponse
+
+from .conftest import TOKEN
+
+NODE_A = "http://a.wialon.fake/wialon/ajax.html"
+NODE_B = "http://b.wialon.fake/wialon/ajax.html"
+RENAME = "item/update_name"
+
+
+class Nodes(FakeTransport):
+    """Several nodes of the API in front of the same fake server."""
+
+    def __init__(self, server: FakeWialonServer) -> None:
+        """Initialize the nodes, all of them up."""
+        super().__init__(server)
+        self.down: set[str] = set()
+
+    def post(self, url: str, **kwargs: Any) -> FakeResponse:  # noqa: ANN401
+        """Answer a request, unless its node is down."""
+        if url in self.down:
+            msg = f"{url} is down."
+            raise ConnectionError(msg)
+        return super().post(url, **kwargs)
+
+
+class AsyncNodes(AsyncFakeTransport):
+    """Several nodes of the API in front of the same fake server."""
+
+    def __init__(self, server: FakeWialonServer) -> None:
+        """Initialize the nodes, all of them up."""
+        super().__init__(server)
+        self.down: set[str] = set()
+
+    async def post(self, url: str, **kwargs: Any) -> AsyncFakeResponse:  # noqa: ANN401
+        """Answer a request, unless its node is down."""
+        if url in self.down:
+            msg = f"{url} is down."
+            raise ConnectionError(msg)
+        return await super().post(url, **kwargs)
+
+
+def test_read_call_fails_over(server: FakeWialonServer) -> None:
+    """A read call is sent to the next node when its node cannot be reached."""
+    nodes = Nodes(server)
+    with Wialon([NODE_A, NODE_B], TOKEN, transport=nodes) as client:
+        nodes.down.add(NODE_A)
+        assert client.items.search(item_type="unit")
+        node_a, node_b = client.endpoint_stats()
+    assert not node_a.healthy
+    assert node_a.failures == 1
+    assert node_b.requests == 1
+
+
+def test_write_call_does_not_fail_over(server: FakeWialonServer) -> None:
+    """A call that changes data is not sent again to another node."""
+    nodes = Nodes(server)
+    with Wialon([NODE_A, NODE_B], TOKEN, transport=nodes) as client:
+        nodes.down.add(NODE_A)
+        with pytest.raises(ConnectionError):
+            client.request(RENAME, {"itemId": 1, "name": "x"}, client.auth.get_sid())
+    assert server.calls[RENAME] == 0
+
+
+def test_read_timeout_keeps_the_node_in_rotation(server: FakeWialonServer) -> None:
+    """A node that took the request but answered late is not taken down."""
+    nodes = Nodes(server)
+    with Wialon([NODE_A, NODE_B], TOKEN, transport=nodes) as client:
+        server.latency = 0.2
+        with pytest.raises(TimeoutError):
+            client.request(
+                RENAME,
+                {"itemId": 1, "name": "x"},
+                client.auth.get_sid(),
+                timeout=0.05,
+            )
+        node_a, _ = client.endpoint_stats()
+    assert node_a.healthy
+    assert node_a.failures == 0
+    assert server.calls[RENAME] == 1
+
+
+def test_async_read_call_fails_over(server: FakeWialonServer) -> None:
+    """The asynchronous client fails over to the next node too."""
+    nodes = AsyncNodes(server)
+
+    async def main() -> bool:
+        async with AsyncWialon([NODE_A, NODE_B], TOKEN, transport=nodes) as client:
+            nodes.down.add(NODE_A)
+            await client.items.search(item_type="unit")
+            return client.endpoint_stats()[0].healthy
+
+    assert not asyncio.run(main())
+    assert server.calls["core/search_items"] == 1
@@ -0,0 +1,50 @@
+"""Tests of map() on the clients shared between threads and tasks."""
+
+import asyncio
+
+from wialon import FakeWialonServer, Wialon
+
+from .conftest import async_client
+
+UNITS = 10
+
+
+def test_map_yields_in_the_order_of_the_items(client: Wialon) -> None:
+    """The items looked up by ID come back in the order they were given."""
+
+    def unit(unit_id: int) -> int:
+        item = client.items.search(unit_id, by="id")
+        assert isinstance(item, dict)
+        return item["id"]
+
+    ids = list(client.map(unit, range(1, UNITS + 1), max_workers=4))
+    assert ids == list(range(1, UNITS + 1))
+
+
+def test_map_can_return_exceptions(client: Wialon) -> None:
+    """With return_exceptions, a failing call does not stop the others."""
+
+    def unit(unit_id: int) -> int:
+        item = client.items.search(unit_id or None, by="id")
+        assert isinstance(item, dict)
+        return item["id"]
+
+    results = list(client.map(unit, range(UNITS), return_exceptions=True))
+    assert isinstance(results[0], Exception)
+    assert results[1:] == list(range(1, UNITS))
+
+
+def test_async_map_yields_in_the_order_of_the_items(server: FakeWialonServer) -> None:
+    """The asynchronous client awaits the lookups concurrently, in order."""
+
+    async def main() -> list[int | Exception]:
+        async with async_client(server) as client:
+
+            async def unit(unit_id: int) -> int:
+                item = await client.items.search(unit_id, by="id")
+                assert isinstance(item, dict)
+                return item["id"]
+
+            return [item async for item in client.map(unit, range(1, UNITS + 1), 4)]
+
+    assert asyncio.run(main()) == list(range(1, UNITS + 1))
@@ -0,0 +1,71 @@
+"""Tests of the message store answering ``messages/load_interval``."""
+
+import asyncio
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from wialon import FakeTransport, FakeWialonServer, MessageStore, Wialon
+from wialon.errors import NoMessagesForSelectedIntervalError
+from wialon.fake import FAKE_URL
+
+from .conftest import TOKEN, async_client
+
+UNIT = 1
+JANUARY = (datetime(2024, 1, 1), datetime(2024, 1, 1, 1))
+FEBRUARY = (datetime(2024, 2, 1), datetime(2024, 2, 1, 1))
+
+
+def test_only_the_gaps_are_fetched(
+    tmp_path: Path,
+    server: FakeWialonServer,
+    client: Wialon,
+) -> None:
+    """A partly stored interval fetches the missing sub-range only."""
+    client.message_store = store = MessageStore(tmp_path / "messages.sqlite")
+    january = client.messages.load_interval(UNIT, *JANUARY)
+    february = client.messages.load_interval(UNIT, *FEBRUARY)
+    loads = server.calls["messages/load_interval"]
+    messages = client.messages.load_interval(UNIT, JANUARY[0], FEBRUARY[1])
+    assert server.calls["messages/load_interval"] == loads + 1
+    assert store.stats().partial_hits == 1
+    assert messages[: len(january)] == january
+    assert messages[-len(february) :] == february
+    assert client.messages.load_interval(UNIT, JANUARY[0], FEBRUARY[1]) == messages
+    assert server.calls["messages/load_interval"] == loads + 1
+    assert store.stats().hits == 1
+
+
+@pytest.mark.parametrize("store", [True, False])
+def test_empty_interval_raises_with_and_without_store(
+    tmp_path: Path,
+    store: bool,  # noqa: FBT001
+) -> None:
+    """Error 1001 is raised whether the store answers the interval or not."""
+    server = FakeWialonServer(messages=0)
+    with Wialon(FAKE_URL, TOKEN, transport=FakeTransport(server)) as client:
+        client.message_store = MessageStore(tmp_path / "messages.sqlite")
+        with pytest.raises(NoMessagesForSelectedIntervalError):
+            client.messages.load_interval(UNIT, *JANUARY, store=store)
+        with pytest.raises(NoMessagesForSelectedIntervalError):
+            client.messages.load_interval(UNIT, *JANUARY, store=store)
+
+
+def test_async_store_answers_stored_interval(
+    tmp_path: Path,
+    server: FakeWialonServer,
+) -> None:
+    """The asynchronous client reads a stored interval without a round trip."""
+
+    async def main() -> tuple[list, list]:
+        async with async_client(server) as client:
+            client.message_store = MessageStore(tmp_path / "messages.sqlite")
+            first = await client.messages.load_interval(UNIT, *JANUARY)
+            second = await client.messages.load_interval(UNIT, *JANUARY)
+            return first, second
+
+    first, second = asyncio.run(main())
+    assert first == second
+    assert first
+    assert server.calls["messages/load_interval"] == 1
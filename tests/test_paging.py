@@ -0,0 +1,85 @@
+"""Tests of the paginated iteration over the messages of an interval."""
+
+import asyncio
+import math
+from datetime import UTC, datetime
+from typing import Any
+
+import pytest
+
+from wialon import FakeTransport, FakeWialonServer, Wialon
+from wialon.fake import FAKE_URL
+
+from .conftest import TOKEN, async_client
+
+# The fake server sends a message every 30 seconds of the interval.
+MESSAGES = 40
+CHUNK = 7
+TIME_FROM = datetime.fromtimestamp(1_700_000_000, UTC)
+TIME_TO = datetime.fromtimestamp(1_700_000_000 + 30 * (MESSAGES - 1), UTC)
+LOAD = "messages/load_interval"
+MESSAGES_LIMIT = 1004
+
+
+def times(messages: list[dict[str, Any]]) -> list[int]:
+    """Return the times of messages.
+
+    :param messages: the messages
+    :type messages: list[dict[str, Any]]
+    :return: the time of each message
+    :rtype: list[int]
+    """
+    return [message["t"] for message in messages]
+
+
+@pytest.mark.parametrize("prefetch", [False, True])
+def test_pages_cover_the_interval_once(
+    server: FakeWialonServer,
+    client: Wialon,
+    *,
+    prefetch: bool,
+) -> None:
+    """The pages yield every message of the interval once, in order."""
+    whole = client.messages.load_interval(1, TIME_FROM, TIME_TO, stream=False)
+    calls = server.calls[LOAD]
+    paged = list(
+        client.messages.iter_interval(
+            1, TIME_FROM, TIME_TO, chunk_size=CHUNK, prefetch=prefetch,
+        ),
+    )
+    assert times(paged) == times(whole)
+    assert len(paged) == MESSAGES
+    assert server.calls[LOAD] - calls <= math.ceil(MESSAGES / CHUNK) + 1
+
+
+def test_page_refused_with_1004_is_halved() -> None:
+    """A page over the limit of messages of the server is loaded in halves."""
+    server = FakeWialonServer(units=1, max_messages=CHUNK)
+    with Wialon(FAKE_URL, TOKEN, transport=FakeTransport(server)) as client:
+        paged = list(
+            client.messages.iter_interval(1, TIME_FROM, TIME_TO, chunk_size=CHUNK * 2),
+        )
+    assert len(paged) == MESSAGES
+    assert times(paged) == sorted(set(times(paged)))
+    assert server.errors[MESSAGES_LIMIT] > 0
+
+
+def test_async_pages_cover_the_interval_once(server: FakeWialonServer) -> None:
+    """The asynchronous iterator yields the same messages."""
+
+    async def main() -> tuple[list[int], list[int]]:
+        async with async_client(server) as client:
+            whole = await client.messages.load_interval(
+                1, TIME_FROM, TIME_TO, stream=False,
+            )
+            paged = [
+                message
+                async for message in client.messages.iter_interval(
+                    1, TIME_FROM, TIME_TO, chunk_size=CHUNK,
+                )
+            ]
+        return times(whole), times(paged)
+
+    whole, paged = asyncio.run(main())
+    assert paged == whole
+    assert len(paged) == MESSAGES
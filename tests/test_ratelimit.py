@@ -0,0 +1,47 @@
+"""Tests of the adaptive rate limiters."""
+
+import asyncio
+
+import pytest
+
+from wialon.aio.ratelimit import AsyncRateLimiter
+from wialon.errors import DeadlineExceededError, ReachedLimitOfConcurrentRequestsError
+from wialon.ratelimit import RateLimiter
+from wialon.timeouts import deadline
+
+
+def test_slot_wait_is_bounded_by_the_deadline() -> None:
+    """A call waiting for a full limiter gives up once the deadline elapses."""
+    limiter = RateLimiter(max_concurrency=1)
+    with limiter.slot(), pytest.raises(DeadlineExceededError):
+        limiter.acquire(timeout=0.05)
+    with (
+        limiter.slot(),
+        deadline(0.05),
+        pytest.raises(DeadlineExceededError),
+        limiter.slot(),
+    ):
+        pass
+    assert limiter.metrics().in_flight == 0
+
+
+def test_async_slot_wait_is_bounded_by_the_deadline() -> None:
+    """The asynchronous limiter gives up waiting once the deadline elapses."""
+
+    async def main() -> int:
+        limiter = AsyncRateLimiter(max_concurrency=1)
+        async with limiter.slot():
+            with deadline(0.05), pytest.raises(DeadlineExceededError):
+                async with limiter.slot():
+                    pass
+        return limiter.metrics().in_flight
+
+    assert asyncio.run(main()) == 0
+
+
+def test_throttled_slot_lowers_the_concurrency() -> None:
+    """Error 10 halves the requests in flight allowed by the limiter."""
+    limiter = RateLimiter(max_concurrency=8)
+    with pytest.raises(ReachedLimitOfConcurrentRequestsError), limiter.slot():
+        raise ReachedLimitOfConcurrentRequestsError
+    assert limiter.metrics().concurrency == limiter.max_concurrency // 2
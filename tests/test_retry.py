@@ -0,0 +1,92 @@
+"""Tests of the retries of transient failures."""
+
+import asyncio
+
+import pytest
+
+from wialon import FakeWialonServer, RetryPolicy, Wialon
+from wialon.errors import PerformingRequestError
+
+from .conftest import async_client
+
+PERFORMING_REQUEST = 5
+SEARCH = "core/search_item"
+RENAME = "item/update_name"
+FAILURES = 2
+
+
+def test_backoff_doubles_up_to_the_max_delay() -> None:
+    """Each retry waits twice as long as the previous one, up to max_delay."""
+    policy = RetryPolicy(base_delay=0.25, max_delay=1.0, jitter=False)
+    assert [policy.backoff(attempt) for attempt in range(1, 5)] == [
+        0.25,
+        0.5,
+        1.0,
+        1.0,
+    ]
+
+
+def test_services_are_classified_by_their_action() -> None:
+    """Reads are idempotent, writes are not, and a batch is when all its calls are."""
+    policy = RetryPolicy()
+    assert policy.is_idempotent(SEARCH)
+    assert not policy.is_idempotent(RENAME)
+    assert not policy.is_idempotent("core/logout")
+    reads = [{"svc": SEARCH, "params": {}}, {"svc": "messages/load_last"}]
+    assert policy.is_idempotent("core/batch", {"params": reads})
+    assert not policy.is_idempotent(
+        "core/batch",
+        {"params": [*reads, {"svc": RENAME, "params": {}}]},
+    )
+
+
+def test_idempotent_call_is_retried(server: FakeWialonServer, client: Wialon) -> None:
+    """A read failing with a transient error is sent again until it succeeds."""
+    client.retry_policy = RetryPolicy(base_delay=0, jitter=False)
+    server.inject(PERFORMING_REQUEST, SEARCH, count=FAILURES)
+    response = client.request(SEARCH, {"id": 1, "flags": 1}, client.auth.get_sid())
+    assert isinstance(response, dict)
+    assert "item" in response
+    assert server.calls[SEARCH] == FAILURES + 1
+
+
+def test_retries_are_bounded_by_max_attempts(
+    server: FakeWialonServer,
+    client: Wialon,
+) -> None:
+    """The error of the last attempt is raised once the attempts are spent."""
+    client.retry_policy = RetryPolicy(max_attempts=FAILURES, base_delay=0, jitter=False)
+    server.inject(PERFORMING_REQUEST, SEARCH, count=FAILURES)
+    with pytest.raises(PerformingRequestError):
+        client.request(SEARCH, {"id": 1, "flags": 1}, client.auth.get_sid())
+    assert server.calls[SEARCH] == FAILURES
+
+
+def test_write_call_is_not_retried(server: FakeWialonServer, client: Wialon) -> None:
+    """A call that may have changed data is never sent twice."""
+    client.retry_policy = RetryPolicy(base_delay=0, jitter=False)
+    server.inject(PERFORMING_REQUEST, RENAME)
+    with pytest.raises(PerformingRequestError):
+        client.request(
+            RENAME, {"itemId": 1, "name": "renamed"}, client.auth.get_sid(),
+        )
+    assert server.calls[RENAME] == 1
+
+
+def test_async_idempotent_call_is_retried(server: FakeWialonServer) -> None:
+    """The asynchronous client retries reads and refuses to retry writes."""
+
+    async def main() -> None:
+        async with async_client(server) as client:
+            client.retry_policy = RetryPolicy(base_delay=0, jitter=False)
+            server.inject(PERFORMING_REQUEST, SEARCH, count=FAILURES)
+            await client.request(SEARCH, {"id": 1, "flags": 1}, client.auth.get_sid())
+            server.inject(PERFORMING_REQUEST, RENAME)
+            with pytest.raises(PerformingRequestError):
+                await client.request(
+                    RENAME, {"itemId": 1, "name": "renamed"}, client.auth.get_sid(),
+                )
+
+    asyncio.run(main())
+    assert server.calls[SEARCH] == FAILURES + 1
+    assert server.calls[RENAME] == 1
@@ -0,0 +1,48 @@
+"""Tests of the priority lanes of the clients."""
+
+import asyncio
+
+from wialon import FakeTransport, FakeWialonServer, Wialon
+from wialon.aio.scheduler import AsyncScheduler
+from wialon.fake import FAKE_URL
+from wialon.scheduler import BULK, INTERACTIVE, NORMAL, Scheduler
+
+from .conftest import TOKEN, async_client
+
+
+def test_scheduler_is_opt_in(server: FakeWialonServer) -> None:
+    """The clients only queue their calls in lanes when asked to."""
+    transport = FakeTransport(server)
+    with Wialon(FAKE_URL, TOKEN, transport=transport) as client:
+        assert client.scheduler is None
+    with Wialon(FAKE_URL, TOKEN, transport=transport, scheduler=True) as client:
+        assert isinstance(client.scheduler, Scheduler)
+        client.items.search(item_type="unit")
+        assert client.scheduler_stats()[NORMAL].calls == 1
+    assert async_client(server).scheduler is None
+    assert isinstance(async_client(server, scheduler=True).scheduler, AsyncScheduler)
+
+
+def test_lanes_share_the_slots_by_weight() -> None:
+    """Eight interactive calls are sent for each bulk one, and bulk never starves."""
+
+    async def main() -> list[str]:
+        scheduler = AsyncScheduler(capacity=1)
+        order: list[str] = []
+
+        async def call(lane: str) -> None:
+            async with scheduler.slot(lane):
+                order.append(lane)
+
+        await scheduler.acquire(NORMAL)
+        calls = [
+            asyncio.create_task(call(lane))
+            for lane in [BULK] * 3 + [INTERACTIVE] * 16
+        ]
+        await asyncio.sleep(0)
+        scheduler.release(NORMAL)
+        await asyncio.gather(*calls)
+        return order
+
+    order = asyncio.run(main())
+    assert [order[start : start + 9].count(BULK) for start in (0, 9)] == [1, 1]
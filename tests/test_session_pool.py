@@ -0,0 +1,170 @@
+"""Tests of the session pools."""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from wialon import FakeTransport, FakeWialonServer, SessionPool, Wialon
+from wialon.aio import AsyncSessionPool
+from wialon.errors import SessionExceptionError
+from wialon.fake import FAKE_URL
+
+from .conftest import TOKEN, async_client
+
+SIZE = 4
+LATENCY = 0.2
+
+
+def test_pool_sessions_are_distinct() -> None:
+    """Each session of a pool logs in on its own, even with the same token."""
+    server = FakeWialonServer(latency=0.01)
+    with (
+        Wialon(FAKE_URL, TOKEN, transport=FakeTransport(server)) as client,
+        SessionPool(client, size=SIZE) as pool,
+    ):
+        sids = {auth.get_sid() for auth in pool.sessions}
+    assert len(sids) == SIZE
+    assert server.logins == SIZE
+
+
+def test_async_pool_sessions_are_distinct() -> None:
+    """The concurrent logins of an asynchronous pool are not shared."""
+    server = FakeWialonServer(latency=0.01)
+
+    async def main() -> set[str]:
+        async with (
+            async_client(server) as client,
+            AsyncSessionPool(client, size=SIZE) as pool,
+        ):
+            return {auth.get_sid() for auth in pool.sessions}
+
+    assert len(asyncio.run(main())) == SIZE
+    assert server.logins == SIZE
+
+
+def test_async_pool_opens_once_for_concurrent_loads() -> None:
+    """Loads on a pool not opened yet log it in once and use every session."""
+    server = FakeWialonServer(latency=0.01, units=SIZE * 2, messages=10)
+
+    async def main() -> list[int]:
+        async with async_client(server) as client:
+            pool = AsyncSessionPool(client, size=SIZE)
+            results = [
+                result
+                async for _, result in pool.messages.load_interval_many(
+                    range(1, SIZE * 2 + 1),
+                )
+            ]
+            assert all(isinstance(result, list) for result in results)
+            calls = [stats.calls for stats in pool.stats()]
+            await pool.close()
+            return calls
+
+    calls = asyncio.run(main())
+    assert server.logins == SIZE
+    assert all(calls)
+
+
+def test_closed_pool_raises() -> None:
+    """Calls and leases of a closed pool raise instead of waiting for a session."""
+    with Wialon(FAKE_URL, TOKEN, transport=FakeTransport(FakeWialonServer())) as client:
+        pool = SessionPool(client, size=SIZE)
+        pool.close()
+        with pytest.raises(SessionExceptionError):
+            pool.items.search(1, by="id")
+        with pytest.raises(SessionExceptionError), pool.lease():
+            pass
+
+
+def test_close_wakes_the_calls_waiting_for_a_session() -> None:
+    """A call waiting while every session is leased raises once the pool closes."""
+    with (
+        Wialon(FAKE_URL, TOKEN, transport=FakeTransport(FakeWialonServer())) as client,
+        ThreadPoolExecutor(1) as executor,
+    ):
+        pool = SessionPool(client, size=1)
+        leased = threading.Event()
+
+        def wait_for_a_session() -> object:
+            leased.wait()
+            return pool.items.search(1, by="id")
+
+        with pool.lease():
+            waiting = executor.submit(wait_for_a_session)
+            leased.set()
+            time.sleep(LATENCY / 2)
+            pool.close()
+            with pytest.raises(SessionExceptionError):
+                waiting.result(timeout=LATENCY * 10)
+
+
+def test_call_in_flight_survives_the_close_of_its_pool() -> None:
+    """A call sent before the pool closes returns its answer."""
+    server = FakeWialonServer(latency=LATENCY)
+    with (
+        Wialon(FAKE_URL, TOKEN, transport=FakeTransport(server)) as client,
+        ThreadPoolExecutor(1) as executor,
+    ):
+        pool = SessionPool(client, size=1)
+        in_flight = executor.submit(pool.items.search, 1, by="id")
+        time.sleep(LATENCY / 2)
+        pool.close()
+        item = in_flight.result(timeout=LATENCY * 10)
+    assert isinstance(item, dict)
+    assert item["id"] == 1
+
+
+def test_closed_async_pool_raises() -> None:
+    """The asynchronous pool raises once closed, waking the waiting leases."""
+
+    async def main() -> None:
+        async with async_client(FakeWialonServer()) as client:
+            pool = AsyncSessionPool(client, size=1)
+            async with pool.lease():
+                waiting = asyncio.create_task(pool.items.search(1, by="id"))
+                await asyncio.sleep(0)
+                await pool.close()
+                with pytest.raises(SessionExceptionError):
+                    await waiting
+            with pytest.raises(SessionExceptionError):
+                await pool.items.search(1, by="id")
+
+    asyncio.run(main())
+
+
+def test_loads_of_a_pool_closed_meanwhile_raise() -> None:
+    """Loads left when the pool closes are yielded with its error, not awaited."""
+    server = FakeWialonServer(latency=LATENCY, units=SIZE * 2, messages=10)
+    with Wialon(FAKE_URL, TOKEN, transport=FakeTransport(server)) as client:
+        pool = SessionPool(client, size=2)
+        results: list[object] = []
+        for _, result in pool.messages.load_interval_many(range(1, SIZE * 2 + 1)):
+            pool.close()
+            results.append(result)
+    assert len(results) == SIZE * 2
+    assert isinstance(results[0], list)
+    assert any(isinstance(result, SessionExceptionError) for result in results)
+
+
+def test_async_loads_of_a_pool_closed_meanwhile_raise() -> None:
+    """The asynchronous loads left when the pool closes raise too."""
+    server = FakeWialonServer(latency=LATENCY, units=SIZE * 2, messages=10)
+
+    async def main() -> list[object]:
+        async with async_client(server) as client:
+            pool = AsyncSessionPool(client, size=2)
+            results: list[object] = []
+            async for _, result in pool.messages.load_interval_many(
+                range(1, SIZE * 2 + 1),
+            ):
+                await pool.close()
+                results.append(result)
+            return results
+
+    results = asyncio.run(main())
+    assert len(results) == SIZE * 2
+    assert isinstance(results[0], list)
+    assert any(isinstance(result, SessionExceptionError) for result in results)
@@ -0,0 +1,45 @@
+"""Tests of the relogin of expired sessions and of the state kept per session."""
+
+import asyncio
+
+from wialon import FakeWialonServer, Wialon
+
+from .conftest import async_client
+
+
+def test_relogin_after_expiry(server: FakeWialonServer, client: Wialon) -> None:
+    """A call rejected by an expired session logs in again and is replayed."""
+    sid = client.auth.get_sid()
+    server.expire(sid)
+    client.items.search(item_type="unit")
+    assert client.auth.get_sid() != sid
+    assert client.auth.relogins == 1
+
+
+def test_async_relogin_after_expiry(server: FakeWialonServer) -> None:
+    """The asynchronous client logs in again once for concurrent calls."""
+
+    async def main() -> tuple[str, str, int]:
+        async with async_client(server) as client:
+            sid = client.auth.get_sid()
+            server.expire(sid)
+            await asyncio.gather(
+                *(client.items.search(item_type="unit") for _ in range(5)),
+            )
+            return sid, client.auth.get_sid(), client.auth.relogins
+
+    sid, new_sid, relogins = asyncio.run(main())
+    assert new_sid != sid
+    assert relogins == 1
+
+
+def test_replaced_and_logged_out_sessions_are_forgotten(
+    server: FakeWialonServer,
+    client: Wialon,
+) -> None:
+    """The node of the API keeps no session that was replaced or logged out."""
+    server.expire(client.auth.get_sid())
+    client.items.search(item_type="unit")
+    assert [stats.sessions for stats in client.endpoint_stats()] == [1]
+    client.auth.logout()
+    assert [stats.sessions for stats in client.endpoint_stats()] == [0]
@@ -0,0 +1,179 @@
+"""Tests of the incremental parsing of large responses."""
+
+import asyncio
+import json
+from datetime import UTC, datetime
+from typing import Any
+from urllib.parse import urlparse
+
+import pytest
+
+from wialon import FakeTransport, FakeWialonServer, RetryPolicy, Wialon
+from wialon.errors import InvalidResultError, InvalidSessionError
+from wialon.fake import FAKE_URL
+from wialon.streaming import JSONArrayStream
+
+from .conftest import TOKEN, async_client
+
+MESSAGES = 40
+TIME_FROM = datetime.fromtimestamp(1_700_000_000, UTC)
+TIME_TO = datetime.fromtimestamp(1_700_000_000 + 30 * (MESSAGES - 1), UTC)
+LOAD = "messages/load_interval"
+PERFORMING_REQUEST = 5
+TOO_MANY_REQUESTS = 10
+FAILURES = 2
+# The login of the client and the one replacing its expired session.
+LOGINS = 2
+BODY = {
+    "count": 4,
+    "meta": {"messages": ["not", "this", "one"]},
+    "messages": [
+        {"t": 1, "p": {"text": 'a "},{" inside a string', "name": "Zoë ✓"}},
+        {"t": 2, "p": {"nested": [{"a": 1}, {"b": [2, 3]}]}},
+        7,
+        [8, {"c": None}],
+    ],
+    "flags": 1,
+}
+
+
+def parse(body: bytes, size: int) -> tuple[list[Any], JSONArrayStream]:
+    """Feed a body to a parser in chunks of a size.
+
+    :param body: the body
+    :type body: bytes
+    :param size: the bytes of each chunk
+    :type size: int
+    :return: the elements of the ``messages`` array and the parser
+    :rtype: tuple[list[Any], JSONArrayStream]
+    """
+    stream = JSONArrayStream("messages")
+    items: list[Any] = []
+    for start in range(0, len(body), size):
+        items.extend(stream.feed(body[start : start + size]))
+    items.extend(stream.close())
+    return items, stream
+
+
+@pytest.mark.parametrize("size", [1, 2, 5, 64, 1 << 16])
+def test_elements_are_decoded_whatever_the_chunks(size: int) -> None:
+    """Chunks split anywhere, even inside a character, give the same elements."""
+    items, stream = parse(json.dumps(BODY, ensure_ascii=False).encode(), size)
+    assert items == BODY["messages"]
+    assert stream.header == {"count": 4, "meta": BODY["meta"], "flags": 1}
+
+
+def test_elements_are_returned_as_they_complete() -> None:
+    """An element is returned by the chunk that completes it."""
+    stream = JSONArrayStream("messages")
+    assert stream.feed(b'{"messages":[{"t":1},{"t"') == [{"t": 1}]
+    assert stream.feed(b":2}]}") == [{"t": 2}]
+    assert stream.close() == []
+
+
+def test_error_response_raises_its_error() -> None:
+    """An error code answered instead of the array raises its exception."""
+    with pytest.raises(InvalidSessionError):
+        parse(b'{"error":1}', 4)
+
+
+def test_missing_array_raises() -> None:
+    """A response without the array is rejected."""
+    with pytest.raises(InvalidResultError):
+        parse(b'{"count":0}', 4)
+
+
+def test_truncated_body_raises() -> None:
+    """A body cut short is not taken for a complete response."""
+    with pytest.raises(json.JSONDecodeError):
+        parse(b'{"messages":[{"t":1},{"t":2', 4)
+
+
+def test_client_streams_the_messages_of_an_interval(client: Wialon) -> None:
+    """A streamed interval yields the messages of a regular load."""
+    whole = client.messages.load_interval(1, TIME_FROM, TIME_TO, stream=False)
+    streamed = list(client.messages.load_interval(1, TIME_FROM, TIME_TO, stream=True))
+    assert streamed == whole
+    assert len(streamed) == MESSAGES
+
+
+def test_async_client_streams_the_messages_of_an_interval(
+    server: FakeWialonServer,
+) -> None:
+    """The asynchronous client streams the same messages."""
+
+    async def main() -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+        async with async_client(server) as client:
+            whole = await client.messages.load_interval(
+                1, TIME_FROM, TIME_TO, stream=False,
+            )
+            streamed = [
+                message
+                async for message in client.messages.load_interval(
+                    1, TIME_FROM, TIME_TO, stream=True,
+                )
+            ]
+        return whole, streamed
+
+    whole, streamed = asyncio.run(main())
+    assert streamed == whole
+    assert len(streamed) == MESSAGES
+
+
+def test_stream_logs_in_again_on_an_expired_session(
+    server: FakeWialonServer,
+    client: Wialon,
+) -> None:
+    """A stream refused by an expired session is replayed on a new one."""
+    server.expire()
+    streamed = list(client.messages.load_interval(1, TIME_FROM, TIME_TO, stream=True))
+    assert len(streamed) == MESSAGES
+    assert server.logins == LOGINS
+
+
+def test_stream_retries_transient_failures(
+    server: FakeWialonServer,
+    client: Wialon,
+) -> None:
+    """A stream failing before its first element is retried."""
+    client.retry_policy = RetryPolicy(base_delay=0, jitter=False)
+    server.inject(PERFORMING_REQUEST, LOAD, count=FAILURES)
+    streamed = list(client.messages.load_interval(1, TIME_FROM, TIME_TO, stream=True))
+    assert len(streamed) == MESSAGES
+    assert server.calls[LOAD] == FAILURES + 1
+
+
+def test_stream_holds_a_limiter_slot(server: FakeWialonServer) -> None:
+    """A stream is in flight for its rate limiter until it is read, and backs off."""
+    transport = FakeTransport(server)
+    with Wialon(FAKE_URL, TOKEN, transport=transport, max_concurrency=2) as client:
+        server.inject(TOO_MANY_REQUESTS, LOAD)
+        stream = client.messages.load_interval(1, TIME_FROM, TIME_TO, stream=True)
+        next(stream)
+        limiter = (urlparse(FAKE_URL).netloc, client.auth.get_sid())
+        assert client.limiter_metrics()[limiter].in_flight == 1
+        assert len(list(stream)) == MESSAGES - 1
+        metrics = client.limiter_metrics()[limiter]
+    assert metrics.in_flight == 0
+    assert metrics.throttled == 1
+
+
+def test_async_stream_is_replayed_before_its_first_element(
+    server: FakeWialonServer,
+) -> None:
+    """The asynchronous client logs in again and retries streams too."""
+
+    async def main() -> list[dict[str, Any]]:
+        async with async_client(server) as client:
+            client.retry_policy = RetryPolicy(base_delay=0, jitter=False)
+            server.expire()
+            server.inject(PERFORMING_REQUEST, LOAD)
+            return [
+                message
+                async for message in client.messages.load_interval(
+                    1, TIME_FROM, TIME_TO, stream=True,
+                )
+            ]
+
+    assert len(asyncio.run(main())) == MESSAGES
+    assert server.logins == LOGINS
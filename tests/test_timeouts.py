@@ -0,0 +1,70 @@
+"""Tests of the timeout policy and of deadlines."""
+
+import time
+from collections.abc import Iterator, Mapping
+from typing import Any
+
+import pytest
+
+from wialon import FakeTransport, FakeWialonServer, Wialon
+from wialon.errors import DeadlineExceededError
+from wialon.fake import FAKE_URL, FakeResponse
+from wialon.timeouts import Timeout, TimeoutPolicy, deadline
+
+from .conftest import TOKEN
+
+READ_TIMEOUT = 30.0
+
+
+class SlowResponse:
+    """A response whose body trickles in."""
+
+    def __init__(self, response: FakeResponse, delay: float) -> None:
+        """Wrap a response, waiting before each chunk of its body."""
+        self._response = response
+        self._delay = delay
+        self.headers: Mapping[str, str] = response.headers
+
+    def iter_raw(self, chunk_size: int) -> Iterator[bytes]:
+        """Yield the chunks of the body, each after the delay."""
+        for chunk in self._response.iter_raw(chunk_size):
+            time.sleep(self._delay)
+            yield chunk
+
+    def close(self) -> None:
+        """Release the response."""
+        self._response.close()
+
+
+class SlowBodyTransport(FakeTransport):
+    """A fake transport whose responses are slow to read."""
+
+    def post(self, url: str, **kwargs: Any) -> SlowResponse:  # noqa: ANN401
+        """Answer a request with a slow body."""
+        return SlowResponse(super().post(url, **kwargs), 0.1)
+
+
+@pytest.mark.parametrize("svc", ["core/search_items", "messages/load_interval"])
+def test_bulk_reads_keep_the_default_timeout(svc: str) -> None:
+    """Searches and message intervals are not given longer timeouts by default."""
+    assert TimeoutPolicy().timeout(svc).read == READ_TIMEOUT
+
+
+def test_timeout_is_capped_by_the_deadline() -> None:
+    """The timeouts of an attempt never exceed the time left."""
+    assert Timeout(5.0, 30.0).within(2.0) == Timeout(2.0, 2.0)
+
+
+def test_call_after_the_deadline_raises(client: Wialon) -> None:
+    """A call started once the deadline has elapsed is not sent."""
+    with deadline(0), pytest.raises(DeadlineExceededError):
+        client.items.search(item_type="unit")
+
+
+def test_deadline_bounds_the_read_of_the_body() -> None:
+    """A body still being read when the deadline elapses raises."""
+    transport = SlowBodyTransport(FakeWialonServer(messages=10))
+    with Wialon(FAKE_URL, TOKEN, transport=transport) as client:
+        client.messages.load_interval(1)
+        with deadline(0.05), pytest.raises(DeadlineExceededError):
+            client.messages.load_interval(1)
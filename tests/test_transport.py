@@ -0,0 +1,164 @@
+"""Tests of the HTTP transport over a socket whose answers break off."""
+
+import threading
+import time
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+
+from wialon import CircuitBreaker, FakeWialonServer, RetryPolicy, Wialon
+from wialon.transport import RequestsTransport
+
+from .conftest import TOKEN
+
+SEARCH = "core/search_items"
+PARAMS = {
+    "spec": {
+        "itemsType": "avl_unit",
+        "propName": "sys_name",
+        "propValueMask": "*",
+        "sortType": "sys_name",
+    },
+    "force": 1,
+    "flags": 1,
+    "from": 0,
+    "to": 0,
+}
+STALL = 1.0
+READ_TIMEOUT = 0.1
+# The call whose body broke off and its retry.
+SENT = 2
+
+
+class BreakingHandler(BaseHTTPRequestHandler):
+    """Answer from a fake server, cutting the body of some calls short."""
+
+    protocol_version = "HTTP/1.1"
+    server_api: FakeWialonServer
+    # The number of calls of the search service left to break off.
+    broken: int
+    stall: bool
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        """Silence the access log."""
+
+    def do_POST(self) -> None:
+        """Answer a call, sending only half of the body of a broken one."""
+        query = {
+            key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()
+        }
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        api = self.server_api
+        call = api.begin(query)
+        api.end(call)
+        body, _ = api.encode(call, None)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        handler = type(self)
+        if call.svc != SEARCH or handler.broken <= 0:
+            self.wfile.write(body)
+            return
+        handler.broken -= 1
+        self.wfile.write(body[: len(body) // 2])
+        self.wfile.flush()
+        if handler.stall:
+            time.sleep(STALL)
+        self.close_connection = True
+
+
+@pytest.fixture
+def breaking(server: FakeWialonServer) -> Iterator[tuple[type[BreakingHandler], str]]:
+    """Serve the fake server over HTTP, breaking off the calls it is told to."""
+    handler = type(
+        "Breaking",
+        (BreakingHandler,),
+        {"server_api": server, "broken": 0, "stall": False},
+    )
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    try:
+        yield handler, f"http://127.0.0.1:{httpd.server_address[1]}/wialon/ajax.html"
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def read(url: str, timeout: float | tuple[float, float] = 30) -> bytes:
+    """Send an anonymous search through the transport and read its body.
+
+    :param url: the URL of the API
+    :type url: str
+    :param timeout: the timeout of the request, defaults to 30
+    :type timeout: float | tuple[float, float], optional
+    :return: the body of the response
+    :rtype: bytes
+    """
+    transport = RequestsTransport()
+    try:
+        response = transport.post(url, params={"svc": SEARCH}, timeout=timeout)
+        try:
+            return b"".join(response.iter_raw(1024))
+        finally:
+            response.close()
+    finally:
+        transport.close()
+
+
+def test_truncated_body_raises_a_connection_error(
+    breaking: tuple[type[BreakingHandler], str],
+) -> None:
+    """A connection lost in the middle of the body raises requests.ConnectionError."""
+    handler, url = breaking
+    handler.broken = 1
+    with pytest.raises(requests.ConnectionError):
+        read(url)
+
+
+def test_stalled_body_raises_a_read_timeout(
+    breaking: tuple[type[BreakingHandler], str],
+) -> None:
+    """A body stalling past the read timeout raises requests.ReadTimeout."""
+    handler, url = breaking
+    handler.broken = 1
+    handler.stall = True
+    with pytest.raises(requests.ReadTimeout):
+        read(url, (STALL, READ_TIMEOUT))
+
+
+def test_truncated_read_is_retried(
+    server: FakeWialonServer,
+    breaking: tuple[type[BreakingHandler], str],
+) -> None:
+    """An idempotent call whose body broke off is sent again."""
+    handler, url = breaking
+    with Wialon(url, TOKEN) as client:
+        client.retry_policy = RetryPolicy(base_delay=0, jitter=False)
+        sid = client.auth.get_sid()
+        handler.broken = 1
+        response = client.request(SEARCH, PARAMS, sid)
+    assert isinstance(response, dict)
+    assert "items" in response
+    assert server.calls[SEARCH] == SENT
+
+
+def test_truncated_read_is_counted_by_the_breaker(
+    breaking: tuple[type[BreakingHandler], str],
+) -> None:
+    """A body that broke off is a failure of the service and of its node."""
+    handler, url = breaking
+    breaker = CircuitBreaker()
+    with Wialon(url, TOKEN) as client:
+        client.circuit_breaker = breaker
+        sid = client.auth.get_sid()
+        handler.broken = 1
+        with pytest.raises(requests.ConnectionError):
+            client.request(SEARCH, PARAMS, sid, retry=False)
+    stats = breaker.stats()
+    assert stats["svc", SEARCH].failures == 1
+    assert stats["endpoint", url].failures == 1
@@ -1,7 +1,15 @@
 """Wialon SDK for Python."""
 
 from .auth_manager import AuthManager
+from .batching import Batcher, BatchStats
+from .breaker import BreakerStats, CircuitBreaker
+from .cache import CacheStats, ResponseCache
+from .dedup import DedupStats, SingleFlight
+from .endpoints import EndpointStats
+from .engine import Engine
 from .errors import (
+    CircuitOpenError,
+    DeadlineExceededError,
     FormatError,
     NoFileReturnedError,
     ParameterError,
@@ -10,24 +18,70 @@ from .errors import (
 )
 from .exchange import Exchange
 from .extra import Extra
+from .fake import FakeTransport, FakeWialonServer
+from .instrumentation import CallRecord, Instrumentation, ServiceStats
 from .items import Items
+from .log import configure_logging
+from .message_store import MessageStore, MessageStoreStats
 from .messages import Messages
+from .ratelimit import LimiterMetrics, RateLimiter
 from .renderer import Render
 from .report import Report
+from .retry import RetryPolicy
+from .scheduler import Lane, LaneStats, PriorityPolicy, Scheduler, priority
+from .session_pool import SessionLease, SessionPool, SessionStats
+from .timeouts import Timeout, TimeoutPolicy, deadline
+from .transport import RequestsTransport, Transport
 from .wialon import Wialon
 
 __all__ = [
     "AuthManager",
+    "BatchStats",
+    "Batcher",
+    "BreakerStats",
+    "CacheStats",
+    "CallRecord",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "DeadlineExceededError",
+    "DedupStats",
+    "EndpointStats",
+    "Engine",
     "Exchange",
     "Extra",
+    "FakeTransport",
+    "FakeWialonServer",
     "FormatError",
+    "Instrumentation",
     "Items",
+    "Lane",
+    "LaneStats",
+    "LimiterMetrics",
+    "MessageStore",
+    "MessageStoreStats",
     "Messages",
     "NoFileReturnedError",
     "ParameterError",
+    "PriorityPolicy",
+    "RateLimiter",
     "Render",
     "Report",
+    "RequestsTransport",
+    "ResponseCache",
+    "RetryPolicy",
+    "Scheduler",
+    "ServiceStats",
     "SessionExceptionError",
+    "SessionLease",
+    "SessionPool",
+    "SessionStats",
+    "SingleFlight",
+    "Timeout",
+    "TimeoutPolicy",
+    "Transport",
     "Wialon",
+    "configure_logging",
+    "deadline",
+    "priority",
     "validate_error",
 ]
@@ -0,0 +1,40 @@
+"""Asynchronous Wialon SDK for Python.
+
+Requires the optional ``aiohttp`` dependency (``pip install wialon-sdk[async]``).
+"""
+
+from .auth_manager import AsyncAuthManager
+from .batching import AsyncBatcher
+from .dedup import AsyncSingleFlight
+from .engine import AsyncEngine
+from .exchange import AsyncExchange
+from .extra import AsyncExtra
+from .fake import AsyncFakeTransport
+from .items import AsyncItems
+from .messages import AsyncMessages
+from .ratelimit import AsyncRateLimiter
+from .report import AsyncReport
+from .scheduler import AsyncScheduler
+from .session_pool import AsyncSessionLease, AsyncSessionPool
+from .transport import AiohttpTransport, AsyncTransport
+from .wialon import AsyncWialon
+
+__all__ = [
+    "AiohttpTransport",
+    "AsyncAuthManager",
+    "AsyncBatcher",
+    "AsyncEngine",
+    "AsyncExchange",
+    "AsyncExtra",
+    "AsyncFakeTransport",
+    "AsyncItems",
+    "AsyncMessages",
+    "AsyncRateLimiter",
+    "AsyncReport",
+    "AsyncScheduler",
+    "AsyncSessionLease",
+    "AsyncSessionPool",
+    "AsyncSingleFlight",
+    "AsyncTransport",
+    "AsyncWialon",
+]
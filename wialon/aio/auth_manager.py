@@ -0,0 +1,120 @@
+"""AsyncAuthManager class."""
+
+import asyncio
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+
+from wialon.auth_manager import BaseAuthManager
+from wialon.errors import SessionExceptionError
+
+if TYPE_CHECKING:
+    from .wialon import AsyncWialon
+
+
+class AsyncAuthManager(BaseAuthManager):
+    """AsyncAuthManager class."""
+
+    def __init__(self, token: str, engine: "AsyncWialon") -> None:
+        """Initialize the AsyncAuthManager class.
+
+        The session is not opened until :meth:`login` is awaited.
+
+        :param token: The authentication token.
+        :type token: str
+        :param engine: The AsyncWialon engine instance.
+        :type engine: AsyncWialon
+        """
+        super().__init__(token)
+        self._engine = engine
+        self._relogin_lock = asyncio.Lock()
+
+    async def login(self, token: str | None = None) -> None:
+        """Login to the Wialon API.
+
+        :param token: The authentication token, defaults to the current one.
+        :type token: str | None, optional
+        """
+        if token is not None:
+            self.token = token
+        svc = "token/login"
+        response = await self._engine.request(
+            svc=svc,
+            params=self._login_params(),
+        )
+        if replaced := self._apply_login(response):
+            self._engine.forget_session(replaced)
+
+    async def relogin(self, stale_sid: str) -> str:
+        """Login again after the session has expired.
+
+        However many tasks report the same expired session, only the first one
+        logs in; the others wait for it and receive the new session ID.
+
+        :param stale_sid: The session ID that was rejected by the API.
+        :type stale_sid: str
+        :return: The current session ID.
+        :rtype: str
+        """
+        async with self._relogin_lock:
+            if self._sid == stale_sid:
+                logger.info("The session has expired, logging in again.")
+                await self.login()
+                self.relogins += 1
+            return self._sid
+
+    async def account_detail(
+        self,
+        detailed: int = 0,
+    ) -> dict[str, Any] | list[dict[str, Any]] | bytes:
+        """Retrieve account details from the Wialon API.
+
+        :param detailed: Flag to indicate whether to retrieve detailed account
+        :type detailed: int, optional
+                         information. Defaults to 0.
+        :return: Account details from the Wialon API.
+        :rtype: dict
+        """
+        svc = "core/get_account_data"
+        params = self._account_detail_params(detailed)
+        return await self._engine.request(svc=svc, params=params, sid=self.get_sid())
+
+    async def check_access(
+        self,
+        items_id: list[int],
+        access_type: str,
+        service_name: str = "*",
+        flags: int = 0,
+    ) -> dict[str, Any] | list[dict[str, Any]] | bytes:
+        """Check access permissions for specified items.
+
+        :param items_id: The items ID.
+        :type items_id: list[int]
+        :param access_type: The access type.
+        :type access_type: str
+        :param service_name: The service name.
+        :type service_name: str, optional
+        :param flags: The flags.
+        :type flags: int, optional
+        :return: The access permissions for the specified items.
+        :rtype: dict
+        """
+        svc = "core/check_items_billing"
+        params = self._check_access_params(items_id, access_type, service_name, flags)
+        return await self._engine.request(svc=svc, params=params, sid=self.get_sid())
+
+    async def logout(self) -> dict[str, Any] | list[dict[str, Any]] | bytes:
+        """Logout from the Wialon API.
+
+        :raises SessionException: If there is no active session.
+        :return: The response from the API.
+        :rtype: dict[str, Any] | list[dict[str, Any]] | bytes
+        """
+        svc = "core/logout"
+        if self.get_sid():
+            response = await self._engine.request(svc=svc, sid=self.get_sid())
+            self._sid = ""
+            return response
+
+        msg = "There is no active session"
+        raise SessionExceptionError(msg)
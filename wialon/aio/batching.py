@@ -0,0 +1,155 @@
+"""Automatic coalescing of asynchronous API calls into ``core/batch`` requests."""
+
+import asyncio
+from typing import TYPE_CHECKING
+
+from loguru import logger
+
+from wialon.batching import BaseBatcher, _Call
+from wialon.protocol import Params
+
+if TYPE_CHECKING:
+    from .wialon import AsyncWialon
+
+
+class AsyncBatcher(BaseBatcher):
+    """Coalesce the calls of concurrent tasks into ``core/batch`` requests."""
+
+    def __init__(
+        self,
+        engine: "AsyncWialon",
+        window: float = 0.01,
+        max_size: int = 50,
+    ) -> None:
+        """Initialize the batcher.
+
+        :param engine: the AsyncWialon client sending the batches
+        :type engine: AsyncWialon
+        :param window: seconds a call waits for others before the batch is sent,
+                       defaults to 0.01
+        :type window: float, optional
+        :param max_size: maximum number of calls in one batch, defaults to 50
+        :type max_size: int, optional
+        """
+        super().__init__(window, max_size)
+        self._engine = engine
+        self._tasks: set[asyncio.Task] = set()
+
+    def submit(
+        self,
+        svc: str,
+        params: Params = None,
+        sid: str | None = None,
+    ) -> asyncio.Future:
+        """Queue a call and return the future of its result.
+
+        :param svc: the Wialon API service to be used
+        :type svc: str
+        :param params: the parameters to be used, defaults to None
+        :type params: Params, optional
+        :param sid: the session ID to be used, defaults to the client session
+        :type sid: str | None, optional
+        :return: the future of the result of the call
+        :rtype: asyncio.Future
+        """
+        sid = sid or self._engine.auth.get_sid()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.stats.calls += 1
+        group = self._pending.setdefault(sid, [])
+        group.append(_Call(svc, params, future))
+        if len(group) >= self._max_size:
+            del self._pending[sid]
+            self._start(sid, group)
+        elif len(group) == 1:
+            loop.call_later(self._window, self._expire, sid, group)
+        return future
+
+    def flush(self) -> None:
+        """Send every queued call without waiting for the window to expire."""
+        pending = self._pending
+        self._pending = {}
+        for sid, group in pending.items():
+            self._start(sid, group)
+
+    async def close(self) -> None:
+        """Send the queued calls and wait until every batch is answered."""
+        self.flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _expire(self, sid: str, group: list[_Call]) -> None:
+        """Send a group of calls once its window has expired.
+
+        :param sid: the session ID of the group
+        :type sid: str
+        :param group: the calls of the group
+        :type group: list[_Call]
+        """
+        if self._pending.get(sid) is group:
+            del self._pending[sid]
+            self._start(sid, group)
+
+    def _start(self, sid: str, calls: list[_Call]) -> None:
+        """Send a group of calls in a background task.
+
+        :param sid: the session ID of the calls
+        :type sid: str
+        :param calls: the calls to send
+        :type calls: list[_Call]
+        """
+        task = asyncio.get_running_loop().create_task(self._send(sid, calls))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, sid: str, calls: list[_Call]) -> None:
+        """Send a group of calls and resolve their futures.
+
+        :param sid: the session ID of the calls
+        :type sid: str
+        :param calls: the calls to send
+        :type calls: list[_Call]
+        """
+        if len(calls) == 1:
+            call = calls[0]
+            self.stats.single += 1
+            try:
+                result = await self._engine.request(
+                    call.svc, call.params, sid, batch=False, dedup=False,
+                )
+            except Exception as exc:  # noqa: BLE001
+                self.stats.errors += 1
+                if not call.future.done():
+                    call.future.set_exception(exc)
+            else:
+                if not call.future.done():
+                    call.future.set_result(result)
+            return
+
+        self.stats.batches += 1
+        logger.debug(f"Sending {len(calls)} calls in one core/batch request.")
+        try:
+            response = await self._engine.request(
+                "core/batch",
+                self._batch_params(calls),
+                sid,
+                batch=False,
+                validate=False,
+            )
+            results = self._batch_results(response, len(calls))
+        except Exception as exc:  # noqa: BLE001
+            self.stats.errors += len(calls)
+            for call in calls:
+                if not call.future.done():
+                    call.future.set_exception(exc)
+            return
+
+        for call, item in zip(calls, results, strict=True):
+            if call.future.done():
+                continue
+            error = self._item_error(item)
+            if error is None:
+                call.future.set_result(item)
+            else:
+                self.stats.errors += 1
+                call.future.set_exception(error)
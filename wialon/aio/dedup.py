@@ -0,0 +1,65 @@
+"""Single-flight deduplication of identical in-flight asynchronous API calls."""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+from wialon.dedup import BaseSingleFlight, DedupStats, FlightKey
+from wialon.protocol import Params
+
+T = TypeVar("T")
+
+
+class AsyncSingleFlight(BaseSingleFlight):
+    """Share one round trip between the identical calls of concurrent tasks.
+
+    The call is sent by a task of its own, so cancelling the task that started
+    it does not cancel the calls waiting for the same response.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the group."""
+        super().__init__()
+        self._flights: dict[FlightKey, asyncio.Task] = {}
+
+    async def do(
+        self,
+        svc: str,
+        params: Params,
+        sid: str | None,
+        send: Callable[[], Awaitable[T]],
+    ) -> T:
+        """Send a call, or wait for the identical call already in flight.
+
+        :param svc: the Wialon API service
+        :type svc: str
+        :param params: the parameters of the call
+        :type params: Params
+        :param sid: the session ID of the call
+        :type sid: str | None
+        :param send: sends the call and returns its result
+        :type send: Callable[[], Awaitable[T]]
+        :return: the result of the call, a copy of it for the calls that waited
+        :rtype: T
+        """
+        key = self.key(svc, params, sid)
+        self._calls += 1
+        task = self._flights.get(key)
+        if task is not None:
+            self._shared += 1
+            return self._copy(await asyncio.shield(task))
+        task = self._flights[key] = asyncio.ensure_future(send())
+        task.add_done_callback(lambda _: self._flights.pop(key, None))
+        return await asyncio.shield(task)
+
+    def stats(self) -> DedupStats:
+        """Return the counters of the group.
+
+        :return: the calls, the shared calls and the calls in flight
+        :rtype: DedupStats
+        """
+        return DedupStats(
+            calls=self._calls,
+            shared=self._shared,
+            in_flight=len(self._flights),
+        )
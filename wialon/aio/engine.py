@@ -0,0 +1,58 @@
+"""The interface the asynchronous managers send their calls through.
+
+See :mod:`wialon.engine`; an :class:`AsyncEngine` is an
+:class:`~wialon.aio.AsyncWialon` client, an
+:class:`~wialon.aio.AsyncSessionPool` or an
+:class:`~wialon.aio.AsyncSessionLease`.
+"""
+
+from collections.abc import AsyncIterator
+from typing import TYPE_CHECKING, Any, Protocol
+
+if TYPE_CHECKING:
+    from wialon.engine import SessionAuth
+    from wialon.message_store import MessageStore
+    from wialon.protocol import Params
+
+    from .extra import AsyncExtra
+
+
+class AsyncEngine(Protocol):
+    """Sends the calls of the managers of :mod:`wialon.aio`."""
+
+    @property
+    def auth(self) -> "SessionAuth":
+        """Return the session of the engine."""
+        ...
+
+    @property
+    def message_store(self) -> "MessageStore | None":
+        """Return the message store of the client, None when it has none."""
+        ...
+
+    @property
+    def extra(self) -> "AsyncExtra":
+        """Return the AsyncExtra manager bound to the engine."""
+        ...
+
+    async def request(
+        self,
+        svc: str,
+        params: "Params" = None,
+        sid: str | None = None,
+        send_file: dict[str, Any] | None = None,
+        **kwargs: bool | str | int,
+    ) -> dict[str, Any] | list[dict[str, Any]] | bytes:
+        """Make a request, see :meth:`AsyncWialon.request`."""
+        ...
+
+    def request_stream(
+        self,
+        svc: str,
+        params: dict[str, Any] | None = None,
+        sid: str | None = None,
+        key: str = "messages",
+        **kwargs: bool | str | int,
+    ) -> AsyncIterator[Any]:
+        """Stream an array of the response, see :meth:`AsyncWialon.request_stream`."""
+        ...
@@ -0,0 +1,131 @@
+"""This module contains the AsyncExchange class."""
+
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from wialon.exchange import BaseExchange
+
+if TYPE_CHECKING:
+    from .engine import AsyncEngine
+
+
+class AsyncExchange(BaseExchange):
+    """The AsyncExchange class.
+
+    Provides methods for importing and exporting messages from Wialon.
+    """
+
+    def __init__(self, engine: "AsyncEngine") -> None:
+        """Initialize the AsyncExchange class.
+
+        :param engine: The AsyncWialon engine.
+        :type engine: AsyncEngine
+        """
+        super().__init__()
+        self._engine = engine
+
+    async def import_messages(
+        self,
+        unit_id: int,
+        filepath: str,
+        event_hash: str | None = None,
+    ) -> dict[str, Any] | list[dict[str, Any]] | bytes:
+        """Import messages to a unit.
+
+        :param unit_id: The ID of the unit to import messages to.
+        :type unit_id: int
+        :param filepath: The path to the file containing the messages to import.
+        :type filepath: str
+        :param event_hash: Event Hash, defaults to None
+        :type event_hash: str | None, optional
+        :return: The response from the Wialon API.
+        :rtype: dict[str, Any] | list[dict[str, Any]] | bytes
+        """
+        svc = "exchange/import_messages"
+        params = self._import_params(unit_id, event_hash)
+        path: Path = Path(filepath)
+        with Path.open(path, "rb") as file:
+            files = {
+                "upload_file": file,
+            }
+            return await self._engine.request(
+                svc,
+                params,
+                sid=self._engine.auth.get_sid(),
+                send_file=files,
+            )
+
+    async def export_messages_by_layer(
+        self,
+        layer_name: str,
+        file_format: str,
+        filepath: str | None = None,
+        *,
+        compress: bool = False,
+    ) -> bytes:
+        """Export messages by layer name.
+
+        :param layer_name: The name of the layer to export messages from.
+        :type layer_name: str
+        :param file_format: The format of the exported file.
+        :type file_format: str
+        :param filepath: The path to save the exported file, defaults to None.
+        :type filepath: str | None, optional
+        :param compress: Whether to compress the exported file, defaults to False
+        :type compress: bool, optional
+        :raises FormatError: If the provided file format is not supported.
+        :return: The result of the export operation.
+        :rtype: bytes
+        """
+        svc = "exchange/export_messages"
+        params = self._export_by_layer_params(
+            layer_name, file_format, compress=compress,
+        )
+        result = await self._engine.request(
+            svc,
+            params,
+            sid=self._engine.auth.get_sid(),
+            file=True,
+        )
+        return self._save_export(result, filepath)
+
+    async def export_messages_by_id(
+        self,
+        unit_id: int,
+        date_from: datetime,
+        date_to: datetime,
+        file_format: str,
+        **kwargs: str | bool,
+    ) -> bytes:
+        """Export messages by unit ID.
+
+        :param unit_id: The ID of the unit to export messages from.
+        :type unit_id: int
+        :param date_from: The start date of the messages to export.
+        :type date_from: datetime
+        :param date_to: The end date of the messages to export.
+        :type date_to: datetime
+        :param file_format: The format of the exported file.
+        :type file_format: str
+        :keyword filepath: The path to save the exported file.
+        :keyword compress: Whether to compress the exported file.
+        :raises FormatError: If the provided file format is not supported.
+        :return: The result of the export operation.
+        :rtype: bytes
+        """
+        _filepath = kwargs.get("filepath")
+        filepath = _filepath if isinstance(_filepath, str) else None
+        compress = bool(kwargs.get("compress", False))
+
+        svc = "exchange/export_messages"
+        params = self._export_by_id_params(
+            unit_id, date_from, date_to, file_format, compress=compress,
+        )
+        result = await self._engine.request(
+            svc,
+            params,
+            sid=self._engine.auth.get_sid(),
+            file=True,
+        )
+        return self._save_export(result, filepath)
@@ -0,0 +1,58 @@
+"""Bounded fan-out of a coroutine function over many items."""
+
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+from itertools import islice
+from typing import TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+async def bounded_map(  # noqa: UP047
+    fn: Callable[[T], Awaitable[R]],
+    iterable: Iterable[T],
+    max_concurrency: int = 100,
+    *,
+    return_exceptions: bool = False,
+) -> AsyncIterator[R | Exception]:
+    """Await a coroutine function on every item, a bounded number at a time.
+
+    See :func:`wialon.executor.bounded_map`. The items are read lazily, at most
+    ``max_concurrency`` tasks run at the same time and the results are yielded in
+    the order of the items. Closing the iterator cancels the running tasks.
+
+    :param fn: the coroutine function awaited with each item
+    :type fn: Callable[[T], Awaitable[R]]
+    :param iterable: the items
+    :type iterable: Iterable[T]
+    :param max_concurrency: the tasks running at the same time, defaults to 100
+    :type max_concurrency: int, optional
+    :param return_exceptions: yield the exception raised by a call instead of
+                              raising it and cancelling the remaining calls,
+                              defaults to False
+    :type return_exceptions: bool, optional
+    :return: the result of each call, in the order of the items
+    :rtype: AsyncIterator[R | Exception]
+    """
+    max_concurrency = max_concurrency if max_concurrency > 0 else 100
+    items = iter(iterable)
+    pending: deque[asyncio.Future] = deque(
+        asyncio.ensure_future(fn(item)) for item in islice(items, max_concurrency)
+    )
+    try:
+        while pending:
+            task = pending.popleft()
+            try:
+                result = await task
+            except Exception as exc:
+                if not return_exceptions:
+                    raise
+                result = exc
+            for item in islice(items, 1):
+                pending.append(asyncio.ensure_future(fn(item)))
+            yield result
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,50 @@
+"""This module contains the AsyncExtra class."""
+
+from typing import TYPE_CHECKING, Any
+
+from wialon.errors import (
+    InvalidInputError,
+    ReachedLimitOfConcurrentRequestsError,
+    UnknownError,
+)
+from wialon.extra import BaseExtra
+
+if TYPE_CHECKING:
+    from .engine import AsyncEngine
+
+
+class AsyncExtra(BaseExtra):
+    """The AsyncExtra class is used to perform extra requests to the Wialon API."""
+
+    def __init__(self, engine: "AsyncEngine") -> None:
+        """Initialize the AsyncExtra class.
+
+        :param engine: The AsyncWialon object.
+        :type engine: AsyncEngine
+        """
+        self._engine = engine
+
+    async def batch(self,
+                    params: list[dict[str, Any]],
+                    ) -> list[dict[str, Any]]|list[list[dict[str,Any]]]:
+        """Perform a batch request.
+
+        :param params: The parameters for each request in the batch.
+        :type params: list[dict[str, Any]]
+        :return: The results of each request in the batch.
+        :rtype: list[dict[str, Any]]
+        """
+        try:
+            response = await self._engine.request(
+                "core/batch",
+                params,
+                self._engine.auth.get_sid(),
+            )
+        except (
+            UnknownError,
+            InvalidInputError,
+            ReachedLimitOfConcurrentRequestsError,
+        ) as exc:
+            raise self._batch_error(exc) from exc
+
+        return self._batch_result(response)
@@ -0,0 +1,107 @@
+"""Asynchronous transport to the in-process stand-in for the Wialon API."""
+
+import asyncio
+from collections.abc import AsyncIterator, Mapping
+from typing import Any
+
+from wialon.fake import FakeWialonServer, request_query
+
+
+class AsyncFakeResponse:
+    """An answer of the fake server, already in memory."""
+
+    def __init__(self, body: bytes, encoding: str) -> None:
+        """Initialize the response.
+
+        :param body: the body on the wire
+        :type body: bytes
+        :param encoding: the Content-Encoding of the body
+        :type encoding: str
+        """
+        self._body = body
+        self._headers = {"Content-Type": "application/json"}
+        if encoding != "identity":
+            self._headers["Content-Encoding"] = encoding
+
+    @property
+    def headers(self) -> Mapping[str, str]:
+        """Return the headers of the response.
+
+        :return: the headers
+        :rtype: Mapping[str, str]
+        """
+        return self._headers
+
+    async def iter_raw(self, chunk_size: int) -> AsyncIterator[bytes]:
+        """Yield the body in chunks, as a socket would.
+
+        :param chunk_size: the size of the chunks
+        :type chunk_size: int
+        :return: an asynchronous iterator over the chunks of the body
+        :rtype: AsyncIterator[bytes]
+        """
+        view = memoryview(self._body)
+        for offset in range(0, len(view), chunk_size):
+            yield bytes(view[offset : offset + chunk_size])
+
+    async def close(self) -> None:
+        """Release the response; there is no connection to return."""
+
+
+class AsyncFakeTransport:
+    """Transport answering the requests from a :class:`~wialon.fake.FakeWialonServer`.
+
+    See :class:`wialon.fake.FakeTransport`; the latency of each call is awaited
+    without blocking the event loop.
+    """
+
+    def __init__(self, server: FakeWialonServer | None = None) -> None:
+        """Initialize the transport.
+
+        :param server: the server answering the requests, defaults to a new one
+        :type server: FakeWialonServer | None, optional
+        """
+        self.server = server if server is not None else FakeWialonServer()
+
+    async def post(  # noqa: PLR0913
+        self,
+        url: str,  # noqa: ARG002
+        *,
+        params: dict[str, str] | None = None,
+        json: object = None,
+        files: dict[str, Any] | None = None,  # noqa: ARG002
+        headers: dict[str, str] | None = None,
+        timeout: float | tuple[float, float] = 30,  # noqa: ASYNC109
+    ) -> AsyncFakeResponse:
+        """Answer a request.
+
+        :param url: ignored, every request reaches the same server
+        :type url: str
+        :param params: the query parameters, defaults to None
+        :type params: dict[str, str] | None, optional
+        :param json: the JSON body, defaults to None
+        :type json: object, optional
+        :param files: ignored, uploaded files are not read
+        :type files: dict[str, Any] | None, optional
+        :param headers: the headers of the request, defaults to None
+        :type headers: dict[str, str] | None, optional
+        :param timeout: the timeout of the request in seconds, or its connect and
+                        read timeouts, defaults to 30
+        :type timeout: float | tuple[float, float], optional
+        :raises TimeoutError: If the latency of the call exceeds the timeout.
+        :return: the response
+        :rtype: AsyncFakeResponse
+        """
+        if isinstance(timeout, tuple):
+            timeout = timeout[1]
+        call = self.server.begin(request_query(params, json))
+        try:
+            async with asyncio.timeout(timeout):
+                await asyncio.sleep(call.delay)
+        finally:
+            self.server.end(call)
+        body, encoding = self.server.encode(call, (headers or {}).get("Accept-Encoding"))
+        return AsyncFakeResponse(body, encoding)
+
+    async def close(self) -> None:
+        """Close the transport; the server keeps its state."""
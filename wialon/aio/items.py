@@ -0,0 +1,48 @@
+"""Async items module for Wialon API."""
+
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, Any
+
+from wialon.items import BaseItems
+
+if TYPE_CHECKING:
+    from .engine import AsyncEngine
+
+
+class AsyncItems(BaseItems):
+    """Async items class for Wialon API."""
+
+    def __init__(self, engine: "AsyncEngine") -> None:
+        """__init__ method for AsyncItems class.
+
+        :param engine: AsyncWialon object
+        :type engine: AsyncEngine
+        """
+        super().__init__()
+        self._engine = engine
+
+    async def search(
+        self,
+        item_id: int | None = None,
+        item_type: str | None = None,
+        date_from: datetime = datetime(1970, 1, 1, 0, 0, tzinfo=UTC),
+        date_to: datetime = datetime(2106, 2, 7, 3, 28, 15, tzinfo=UTC),
+        by: str = "property",
+        **kwargs: int | str,
+    ) -> dict[str, Any] | list[dict[str, Any]] | bytes:
+        """Search for items based on various criteria.
+
+        See :meth:`wialon.items.Items.search` for the supported parameters.
+
+        :return: A list of dictionaries containing the search results, or the
+                 item found when `by` is "id".
+        :rtype: list[dict[str, Any]] | dict[str, Any]
+        :raises InvalidInputError: If an invalid `item_type` is provided.
+        :raises ParameterError: If required parameters are missing or invalid.
+        :raises InvalidResultError: If the search result is invalid or unexpected.
+        """
+        svc, params = self._search_request(
+            item_id, item_type, date_from, date_to, by, **kwargs,
+        )
+        result = await self._engine.request(svc, params, self._engine.auth.get_sid())
+        return self._search_result(result)
@@ -0,0 +1,418 @@
+"""AsyncMessages class which is used to interact with the Wialon messages API."""
+
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+from datetime import datetime
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Literal, overload
+
+from wialon.errors import (
+    InvalidResultError,
+    LimitOfMessagesExceededError,
+    NoMessagesForSelectedIntervalError,
+)
+from wialon.message_store import Interval, MessageStore
+from wialon.messages import BaseMessages
+
+if TYPE_CHECKING:
+    from .engine import AsyncEngine
+
+
+class AsyncMessages(BaseMessages):
+    """AsyncMessages class which is used to interact with the Wialon messages API."""
+
+    def __init__(self, engine: "AsyncEngine") -> None:
+        """Initialize the AsyncMessages class.
+
+        :param engine: The AsyncWialon engine to use.
+        :type engine: AsyncEngine
+        """
+        super().__init__()
+        self._engine = engine
+
+    @overload
+    def load_interval(
+        self,
+        item_id: int,
+        time_from: datetime = ...,
+        time_to: datetime = ...,
+        *,
+        stream: Literal[False] = ...,
+        **kwargs: int | str | bool,
+    ) -> Awaitable[list[dict[str, Any]]]: ...
+
+    @overload
+    def load_interval(
+        self,
+        item_id: int,
+        time_from: datetime = ...,
+        time_to: datetime = ...,
+        *,
+        stream: Literal[True],
+        **kwargs: int | str | bool,
+    ) -> AsyncIterator[dict[str, Any]]: ...
+
+    def load_interval(
+        self,
+        item_id: int,
+        time_from: datetime = datetime(1969, 12, 31, 20, 0),
+        time_to: datetime = datetime(2106, 2, 7, 3, 28, 15),
+        *,
+        stream: bool = False,
+        **kwargs: int | str | bool,
+    ) -> Awaitable[list[dict[str, Any]]] | AsyncIterator[dict[str, Any]]:
+        """Load messages for a given item within a specified time interval.
+
+        See :meth:`wialon.messages.Messages.load_interval` for the supported keywords.
+        The messages are awaited, while the stream is iterated with ``async for``
+        without awaiting the call first, like :meth:`AsyncWialon.request_stream`.
+
+        :param item_id: The ID of the item to load messages for.
+        :type item_id: int
+        :param time_from: The start time of the interval.
+        :type time_from: datetime, optional
+        :param time_to: The end time of the interval.
+        :type time_to: datetime, optional
+        :param stream: Return an asynchronous iterator that parses the messages
+                       while they are received, defaults to False.
+        :type stream: bool, optional
+        :keyword store: Answer the closed part of the interval from the message
+                        store of the client, when it has one, defaults to True.
+        :return: An awaitable of the loaded messages, or an asynchronous iterator
+                 over them when streaming.
+        :rtype: Awaitable[list[dict[str, Any]]] | AsyncIterator[dict[str, Any]]
+        :raises NoMessagesForSelectedIntervalError: If the interval has no messages,
+                                                    whether or not it is answered
+                                                    from the message store.
+        :raises InvalidResultError: If the request fails to fetch messages.
+        """
+        params = self._load_interval_params(item_id, time_from, time_to, **kwargs)
+        if stream:
+            return self._engine.request_stream(
+                "messages/load_interval",
+                params,
+                self._engine.auth.get_sid(),
+                key="messages",
+            )
+        return self._load_interval(params, store=kwargs.get("store", True) is True)
+
+    async def _load_interval(
+        self,
+        params: dict[str, Any],
+        *,
+        store: bool,
+    ) -> list[dict[str, Any]]:
+        """Load the messages of an interval in one response.
+
+        :param params: the parameters of ``messages/load_interval``
+        :type params: dict[str, Any]
+        :param store: answer the closed part of the interval from the message store
+        :type store: bool
+        :return: the messages of the interval
+        :rtype: list[dict[str, Any]]
+        """
+        message_store = self._engine.message_store
+        if message_store is not None and store and message_store.accepts(params):
+            return await self._load_stored(message_store, params)
+        result = await self._engine.request(
+            "messages/load_interval",
+            params,
+            self._engine.auth.get_sid(),
+        )
+        return self._interval_messages(result)
+
+    def load_interval_many(
+        self,
+        item_ids: Iterable[int],
+        time_from: datetime = datetime(1969, 12, 31, 20, 0),
+        time_to: datetime = datetime(2106, 2, 7, 3, 28, 15),
+        max_workers: int | None = None,
+        **kwargs: int | str | bool,
+    ) -> AsyncIterator[tuple[int, list[dict[str, Any]] | Exception]]:
+        """Load the messages of many items concurrently.
+
+        See :meth:`wialon.messages.Messages.load_interval_many`; when the manager
+        is bound to an :class:`~wialon.aio.AsyncSessionPool`, each load runs in a
+        task holding a lease on a session of the pool.
+
+        :param item_ids: The IDs of the items to load messages for.
+        :type item_ids: Iterable[int]
+        :param time_from: The start time of the interval.
+        :type time_from: datetime, optional
+        :param time_to: The end time of the interval.
+        :type time_to: datetime, optional
+        :param max_workers: The loads running at the same time, defaults to and
+                            capped at the number of sessions.
+        :type max_workers: int | None, optional
+        :return: An asynchronous iterator over the item IDs and their messages, or
+                 the error of their load, in the order the loads complete.
+        :rtype: AsyncIterator[tuple[int, list[dict[str, Any]] | Exception]]
+        """
+        # Only a pool can lease sessions; a client or a lease has a single one.
+        # The pool may not be open yet, so its size is read, not its sessions.
+        lease = getattr(self._engine, "lease", None)
+        sessions = getattr(self._engine, "size", 1) if lease is not None else 1
+        workers = min(max_workers or sessions, sessions)
+        kwargs = {key: value for key, value in kwargs.items() if key != "stream"}
+
+        async def load(item_id: int) -> list[dict[str, Any]]:
+            if lease is None:
+                return await self.load_interval(
+                    item_id, time_from, time_to, stream=False, **kwargs,
+                )
+            async with lease() as engine:
+                return await engine.messages.load_interval(
+                    item_id, time_from, time_to, stream=False, **kwargs,
+                )
+
+        return self._load_many(load, item_ids, max(1, workers))
+
+    @staticmethod
+    async def _load_many(
+        load: Callable[[int], Awaitable[list[dict[str, Any]]]],
+        item_ids: Iterable[int],
+        workers: int,
+    ) -> AsyncIterator[tuple[int, list[dict[str, Any]] | Exception]]:
+        """Run the loads of the items in tasks.
+
+        :param load: the coroutine function loading the messages of an item
+        :type load: Callable[[int], Awaitable[list[dict[str, Any]]]]
+        :param item_ids: the IDs of the items
+        :type item_ids: Iterable[int]
+        :param workers: the loads running at the same time
+        :type workers: int
+        :return: an asynchronous iterator over the item IDs and their messages or
+                 error
+        :rtype: AsyncIterator[tuple[int, list[dict[str, Any]] | Exception]]
+        """
+        items = iter(item_ids)
+        pending: dict[asyncio.Future, int] = {
+            asyncio.ensure_future(load(item_id)): item_id
+            for item_id in islice(items, workers)
+        }
+        try:
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    item_id = pending.pop(task)
+                    for item in islice(items, 1):
+                        pending[asyncio.ensure_future(load(item))] = item
+                    try:
+                        result: list[dict[str, Any]] | Exception = task.result()
+                    except Exception as exc:  # noqa: BLE001
+                        result = exc
+                    yield item_id, result
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def iter_interval(
+        self,
+        item_id: int,
+        time_from: datetime = datetime(1969, 12, 31, 20, 0),
+        time_to: datetime = datetime(2106, 2, 7, 3, 28, 15),
+        chunk_size: int = 1000,
+        **kwargs: int | str | bool,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Iterate over the messages of an interval, loading them page by page.
+
+        See :meth:`wialon.messages.Messages.iter_interval` for the supported
+        keywords; with ``prefetch`` the next page is loaded by a task of its own.
+
+        :param item_id: The ID of the item to load messages for.
+        :type item_id: int
+        :param time_from: The start time of the interval.
+        :type time_from: datetime, optional
+        :param time_to: The end time of the interval.
+        :type time_to: datetime, optional
+        :param chunk_size: The messages loaded by each page, defaults to 1000.
+        :type chunk_size: int, optional
+        :return: An asynchronous iterator over the messages ordered by time.
+        :rtype: AsyncIterator[dict[str, Any]]
+        :raises InvalidResultError: If a page fails to fetch messages.
+        """
+        params = self._load_interval_params(item_id, time_from, time_to, **kwargs)
+        _prefetch = kwargs.get("prefetch", False)
+        prefetch = _prefetch if isinstance(_prefetch, bool) else False
+        return self._iter_pages(
+            params,
+            chunk_size if chunk_size > 0 else 1000,
+            prefetch=prefetch,
+        )
+
+    async def _iter_pages(
+        self,
+        params: dict[str, Any],
+        chunk_size: int,
+        *,
+        prefetch: bool,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yield the messages of the pages of an interval.
+
+        :param params: the parameters of ``messages/load_interval``
+        :type params: dict[str, Any]
+        :param chunk_size: the messages loaded by each page
+        :type chunk_size: int
+        :param prefetch: load the next page while the current one is consumed
+        :type prefetch: bool
+        :return: an asynchronous iterator over the messages
+        :rtype: AsyncIterator[dict[str, Any]]
+        """
+        pending: asyncio.Future | None = None
+        start: int | None = params.get("timeFrom", 0)
+        skip = 0
+        try:
+            page, chunk_size = await self._fetch_page(
+                params, start or 0, skip, chunk_size,
+            )
+            while True:
+                fresh, start, skip = self._next_page(page, skip, chunk_size + skip)
+                if start is not None and prefetch:
+                    pending = asyncio.ensure_future(
+                        self._fetch_page(params, start, skip, chunk_size),
+                    )
+                for message in fresh:
+                    yield message
+                if start is None:
+                    return
+                if pending is not None:
+                    page, chunk_size = await pending
+                    pending = None
+                else:
+                    page, chunk_size = await self._fetch_page(
+                        params, start, skip, chunk_size,
+                    )
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    async def _fetch_page(
+        self,
+        params: dict[str, Any],
+        start: int,
+        skip: int,
+        chunk_size: int,
+    ) -> tuple[list[dict[str, Any]], int]:
+        """Fetch a page of messages, halving it while the server refuses it.
+
+        See :meth:`wialon.messages.Messages._fetch_page`.
+
+        :param params: the parameters of ``messages/load_interval``
+        :type params: dict[str, Any]
+        :param start: the time of the first message of the page
+        :type start: int
+        :param skip: the messages at the start of the page already read
+        :type skip: int
+        :param chunk_size: the new messages to load
+        :type chunk_size: int
+        :raises LimitOfMessagesExceededError: If a single message is refused.
+        :return: the messages of the page and the chunk size it was loaded with
+        :rtype: tuple[list[dict[str, Any]], int]
+        """
+        while True:
+            try:
+                result = await self._engine.request(
+                    "messages/load_interval",
+                    self._page_params(params, start, chunk_size + skip),
+                    self._engine.auth.get_sid(),
+                )
+            except NoMessagesForSelectedIntervalError:
+                return [], chunk_size
+            except LimitOfMessagesExceededError:
+                if chunk_size <= 1:
+                    raise
+                chunk_size //= 2
+                continue
+            return self._interval_messages(result), chunk_size
+
+    async def _load_stored(
+        self,
+        store: MessageStore,
+        params: dict[str, Any],
+    ) -> list[dict[str, Any]]:
+        """Load messages through the message store.
+
+        See :meth:`wialon.messages.Messages._load_stored`; the store is queried in
+        a worker thread so the event loop is not blocked by the disk.
+
+        :param store: the message store
+        :type store: MessageStore
+        :param params: the parameters of ``messages/load_interval``
+        :type params: dict[str, Any]
+        :raises NoMessagesForSelectedIntervalError: If the interval has no messages.
+        :return: the messages of the interval ordered by time
+        :rtype: list[dict[str, Any]]
+        """
+        item_id, kind, closed, open_range = self._stored_window(store, params)
+        messages: list[dict[str, Any]] = []
+        if closed[0] <= closed[1]:
+            missing = await asyncio.to_thread(store.missing, item_id, kind, *closed)
+            for interval in missing:
+                fetched = await self._fetch_range(params, interval)
+                await asyncio.to_thread(store.add, item_id, kind, interval, fetched)
+            stored = await asyncio.to_thread(store.read, item_id, kind, *closed)
+            messages = (
+                stored if stored is not None else await self._fetch_range(params, closed)
+            )
+        if open_range is not None:
+            messages.extend(await self._fetch_range(params, open_range))
+        if not messages:
+            # Like the API, which answers error 1001 for an empty interval.
+            msg = "No messages for selected interval."
+            raise NoMessagesForSelectedIntervalError(msg)
+        return messages
+
+    async def _fetch_range(
+        self,
+        params: dict[str, Any],
+        interval: Interval,
+    ) -> list[dict[str, Any]]:
+        """Fetch the messages of a sub-range from the API.
+
+        :param params: the parameters of ``messages/load_interval``
+        :type params: dict[str, Any]
+        :param interval: the first and last second of the sub-range
+        :type interval: Interval
+        :return: the messages of the sub-range
+        :rtype: list[dict[str, Any]]
+        """
+        try:
+            result = await self._engine.request(
+                "messages/load_interval",
+                self._range_params(params, interval),
+                self._engine.auth.get_sid(),
+            )
+        except NoMessagesForSelectedIntervalError:
+            return []
+        return self._interval_messages(result)
+
+    async def load_last(
+        self,
+        item_id: int,
+        last_time: int,
+        last_count: int,
+        **kwargs: dict[str, int],
+    ) -> dict[str, Any]:
+        """Load the last messages for a given item within a specified time interval.
+
+        See :meth:`wialon.messages.Messages.load_last` for the supported keywords.
+
+        :param item_id: The ID of the item to load messages for.
+        :type item_id: int
+        :param last_time: The end time of the interval to load messages for.
+        :type last_time: int
+        :param last_count: The number of messages to load.
+        :type last_count: int
+        :return: A dictionary containing the loaded messages.
+        :rtype: dict[str, Any]
+        :raises InvalidResultError: If the request fails to fetch messages.
+        """
+        svc = "messages/load_last"
+        params = self._load_last_params(item_id, last_time, last_count, **kwargs)
+        result = await self._engine.request(svc, params, self._engine.auth.get_sid())
+        if isinstance(result, dict):
+            return result
+        msg = "Failed to fetch messages for the interval."
+        raise InvalidResultError(msg)
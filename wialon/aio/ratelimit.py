@@ -0,0 +1,91 @@
+"""Client-side rate limiting for the asynchronous client."""
+
+import asyncio
+import contextlib
+import time
+from collections.abc import AsyncIterator
+
+from wialon.errors import DeadlineExceededError, ReachedLimitOfConcurrentRequestsError
+from wialon.ratelimit import BaseRateLimiter
+from wialon.timeouts import remaining
+
+
+class AsyncRateLimiter(BaseRateLimiter):
+    """Adaptive rate limiter for asyncio tasks, see :class:`BaseRateLimiter`."""
+
+    def __init__(
+        self,
+        rate: float = 0.0,
+        max_concurrency: int = 10,
+        *,
+        decrease: float = 0.5,
+        max_retries: int = 10,
+        min_rate: float = 1.0,
+    ) -> None:
+        """Initialize the limiter, see :class:`BaseRateLimiter`."""
+        super().__init__(
+            rate,
+            max_concurrency,
+            decrease=decrease,
+            max_retries=max_retries,
+            min_rate=min_rate,
+        )
+        self._condition = asyncio.Condition()
+
+    async def acquire(self) -> int:
+        """Wait until a request can be sent.
+
+        Bound the wait with :func:`asyncio.timeout`, as :meth:`slot` does.
+
+        :return: the ticket of the slot, to be given to :meth:`release`
+        :rtype: int
+        """
+        start = time.monotonic()
+        async with self._condition:
+            self._waiting += 1
+            try:
+                while (wait := self._take_slot(time.monotonic())) != 0:
+                    with contextlib.suppress(TimeoutError):
+                        await asyncio.wait_for(self._condition.wait(), wait)
+            finally:
+                self._waiting -= 1
+            self._wait_time += time.monotonic() - start
+            return self._calls
+
+    async def release(self, ticket: int, *, throttled: bool = False) -> None:
+        """Release the slot of a request once it has been answered.
+
+        :param ticket: the ticket returned by :meth:`acquire`
+        :type ticket: int
+        :param throttled: whether the server answered with error code 10,
+                          defaults to False
+        :type throttled: bool, optional
+        """
+        async with self._condition:
+            self._record(ticket, throttled=throttled)
+            self._condition.notify_all()
+
+    @contextlib.asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold a slot while the block sends a request.
+
+        See :meth:`wialon.ratelimit.RateLimiter.slot`.
+
+        :raises DeadlineExceededError: If the deadline elapsed while waiting.
+        :return: nothing, the block sends the request
+        :rtype: AsyncIterator[None]
+        """
+        try:
+            async with asyncio.timeout(remaining()):
+                ticket = await self.acquire()
+        except TimeoutError:
+            msg = "The deadline elapsed while waiting for the rate limiter."
+            raise DeadlineExceededError(msg) from None
+        throttled = False
+        try:
+            yield
+        except ReachedLimitOfConcurrentRequestsError:
+            throttled = True
+            raise
+        finally:
+            await self.release(ticket, throttled=throttled)
@@ -0,0 +1,157 @@
+"""Async reports module."""
+import asyncio
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+
+from wialon.log import payload
+from wialon.report import BaseReport
+from wialon.timeouts import capped
+
+if TYPE_CHECKING:
+    from .engine import AsyncEngine
+
+
+class AsyncReport(BaseReport):
+    """Async reports class.
+
+    :ivar AsyncWialon _engine: The AsyncWialon object.
+    """
+
+    def __init__(self, engine:"AsyncEngine") -> None:
+        """Initialize the AsyncReport class.
+
+        :param AsyncWialon engine: The AsyncWialon object.
+        """
+        super().__init__()
+        self._engine = engine
+
+    async def apply_result(self) -> dict[str,Any]:
+        """Retrieve the report result.
+
+        :raises ValueError: If the report result cannot be retrieved.
+        :return: The report result.
+        :rtype: dict[str,Any]
+        """
+        svc = "report/apply_report_result"
+        params = {}
+        response = await self._engine.request(svc=svc,
+                                              params=params,
+                                              sid=self._engine.auth.get_sid())
+        return self._apply_result_response(params, response)
+
+    async def get_result(self,
+                         table_index:int=0,
+                         index_from:int=0,
+                         index_to:int=0,
+                         **kwargs:bool) -> list[dict[str,Any]]:
+        """Obtain the report result.
+
+        See :meth:`wialon.report.Report.get_result` for the supported parameters.
+
+        :raises BufferError: If there is no report result to retrieve.
+        :raises TypeError: If the report result cannot be recovered.
+        :return: The result of the report.
+        :rtype: list[dict[str,Any]]
+        """
+        params = self._result_rows_params(table_index, index_from, index_to)
+        multi_level = kwargs.get("multi_level", False)
+
+        svc = "report/get_result_rows"
+        response = await self._engine.request(svc=svc,
+                                              params=params,
+                                              sid=self._engine.auth.get_sid())
+
+        if not isinstance(response, list):
+            logger.error("The request response is not dict")
+            logger.opt(lazy=True).debug(
+                "Request: {}, Response: {}",
+                lambda: payload(params),
+                lambda: payload(response),
+            )
+            msg = "Failed to retrieve report result."
+            raise TypeError(msg)
+
+        if multi_level:
+            batch = self._sub_rows_batch(table_index, list(range(index_from, index_to)))
+            return self._flatten_sub_rows(await self._engine.extra.batch(batch))
+
+        return response
+
+    async def execute(self,
+                      object_id:int|list[int],
+                      resource_id:int,
+                      template_id:int,
+                      **kwargs:datetime|int|str) -> str|dict[str,Any] :
+        """Execute a report.
+
+        See :meth:`wialon.report.Report.execute` for the supported parameters.
+
+        :raises ValueError: If the report generation fails.
+        :return: The dict with the report results, or a notice when ``async_wait``
+                 is True.
+        :rtype: str|dict[str,Any]
+        """
+        async_wait = kwargs.get("async_wait", True)
+        params = self._execute_params(object_id, resource_id, template_id, **kwargs)
+
+        svc = "report/exec_report"
+        response = await self._engine.request(svc=svc,
+                                              params=params,
+                                              sid=self._engine.auth.get_sid())
+
+        self._execute_started(response)
+
+        # Wait for the report to be generated
+        if not async_wait:
+            response = await self.status()
+            done = "4"
+            while response["code"] != done:
+                response = await self.status()
+                logger.opt(lazy=True).info(
+                    "Waiting status: {}",
+                    lambda status=response: payload(status),
+                )
+            response = await self.apply_result()
+            logger.opt(lazy=True).debug("Report result: {}", lambda: payload(response))
+            return response
+
+        return "Report is being generated."
+
+    async def export_result(self,file_format:str, **kwargs:bool|int|str) -> bytes:
+        """Export the report result.
+
+        See :meth:`wialon.report.Report.export_result` for the supported parameters.
+
+        :raises BufferError: If there is no report result to export.
+        :raises ValueError: If the export format is invalid.
+        :raises TypeError: If the report result cannot be exported.
+        :return: The exported report result.
+        :rtype: bytes
+        """
+        params = self._export_params(file_format, **kwargs)
+        svc = "report/export_result"
+        response = await self._engine.request(svc=svc,
+                                              params=params,
+                                              sid=self._engine.auth.get_sid(),
+                                              file=True)
+        if isinstance(response, bytes):
+            return response
+        msg = "Failed to export report result."
+        raise TypeError(msg)
+
+    async def status(self) -> dict[str,str]:
+        """Retrieve the report status.
+
+        :raises ValueError: If the report status cannot be retrieved.
+        :return: The report status.
+        :rtype: dict[str,str]
+        """
+        await asyncio.sleep(capped(2))
+        svc = "report/get_report_status"
+        params = {}
+        response = await self._engine.request(svc=svc,
+                                              params=params,
+                                              sid=self._engine.auth.get_sid())
+        return self._status_result(response)
@@ -0,0 +1,83 @@
+"""Priority lanes sharing the requests in flight of the asynchronous client."""
+
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from wialon.errors import DeadlineExceededError
+from wialon.scheduler import BaseScheduler, PriorityPolicy, Waiter
+from wialon.timeouts import remaining
+
+
+class AsyncScheduler(BaseScheduler):
+    """Priority lanes for asyncio tasks, see :class:`~wialon.scheduler.Scheduler`.
+
+    The scheduler runs in the event loop, so the queues need no lock; each queued
+    task waits on a future that is resolved when it is granted a slot.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 100,
+        policy: PriorityPolicy | None = None,
+    ) -> None:
+        """Initialize the scheduler, see :class:`BaseScheduler`."""
+        super().__init__(capacity, policy)
+
+    @staticmethod
+    def _wake(granted: list[Waiter]) -> None:
+        """Resolve the futures of the tasks granted a slot.
+
+        :param granted: the waiters granted a slot
+        :type granted: list[Waiter]
+        """
+        for waiter in granted:
+            if isinstance(waiter.wake, asyncio.Future) and not waiter.wake.done():
+                waiter.wake.set_result(None)
+
+    async def acquire(self, lane: str) -> None:
+        """Wait for a slot in a lane.
+
+        :param lane: the name of the lane, see :meth:`lane`
+        :type lane: str
+        :raises DeadlineExceededError: The deadline elapsed while queued.
+        """
+        waiter, granted = self._enqueue(lane, time.monotonic())
+        self._wake(granted)
+        if waiter.granted:
+            return
+        waiter.wake = future = asyncio.get_running_loop().create_future()
+        try:
+            await asyncio.wait_for(future, remaining())
+        except BaseException as exc:
+            # A slot granted while the task was being cancelled is handed on.
+            self._wake(self._cancel(waiter))
+            if isinstance(exc, TimeoutError):
+                msg = f"The deadline elapsed while queued in the {lane} lane."
+                raise DeadlineExceededError(msg) from None
+            raise
+
+    def release(self, lane: str) -> None:
+        """Free the slot of a call once it has been answered.
+
+        :param lane: the name of the lane given to :meth:`acquire`
+        :type lane: str
+        """
+        self._wake(self._free(lane))
+
+    @asynccontextmanager
+    async def slot(self, lane: str) -> AsyncIterator[None]:
+        """Hold a slot in a lane while the block runs.
+
+        :param lane: the name of the lane
+        :type lane: str
+        :raises DeadlineExceededError: The deadline elapsed while queued.
+        :return: nothing, the block sends the call
+        :rtype: AsyncIterator[None]
+        """
+        await self.acquire(lane)
+        try:
+            yield
+        finally:
+            self.release(lane)
@@ -0,0 +1,464 @@
+"""Pool of logged-in sessions sharing one asynchronous client."""
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from types import TracebackType
+from typing import TYPE_CHECKING, Any, Self
+
+from loguru import logger
+
+from wialon.auth_manager import NO_RELOGIN, BaseAuthManager
+from wialon.errors import (
+    InvalidSessionError,
+    IpChangedOrSessionExpiredError,
+    SessionExceptionError,
+)
+from wialon.protocol import Params
+from wialon.session_pool import BaseSessionPool
+
+from .auth_manager import AsyncAuthManager
+from .exchange import AsyncExchange
+from .extra import AsyncExtra
+from .items import AsyncItems
+from .messages import AsyncMessages
+from .report import AsyncReport
+
+if TYPE_CHECKING:
+    from wialon.message_store import MessageStore
+
+    from .wialon import AsyncWialon
+
+
+class AsyncSessionPool(BaseSessionPool):
+    """Pool of sessions of an :class:`~wialon.aio.AsyncWialon` client.
+
+    See :class:`wialon.session_pool.SessionPool`. The sessions are logged in
+    when the pool is opened, by awaiting :meth:`open` or entering it as an
+    async context manager, and logged out by :meth:`close` or on leaving it.
+    """
+
+    def __init__(
+        self,
+        engine: "AsyncWialon",
+        size: int = 4,
+        tokens: list[str] | None = None,
+    ) -> None:
+        """Initialize the pool.
+
+        :param engine: the client sending the requests
+        :type engine: AsyncWialon
+        :param size: the number of sessions, defaults to 4
+        :type size: int, optional
+        :param tokens: the tokens to log in with, used in turn. Defaults to the
+                       token of the client, whose session becomes the first one
+                       of the pool.
+        :type tokens: list[str] | None, optional
+        """
+        super().__init__()
+        self._engine = engine
+        self._size = max(1, size)
+        self._tokens = tokens
+        self._condition = asyncio.Condition()
+        self._opening = asyncio.Lock()
+        self._extra: AsyncExtra | None = None
+        self._items: AsyncItems | None = None
+        self._messages: AsyncMessages | None = None
+
+    @property
+    def size(self) -> int:
+        """Return the number of sessions the pool logs in.
+
+        :return: the number of sessions
+        :rtype: int
+        """
+        return self._size
+
+    async def open(self) -> None:
+        """Log in the sessions of the pool.
+
+        The tasks opening the pool at the same time wait for a single login.
+
+        :raises SessionExceptionError: The pool has been closed.
+        """
+        async with self._opening:
+            if self._closed:
+                msg = "The session pool is closed."
+                raise SessionExceptionError(msg)
+            if self._sessions:
+                return
+            tokens = self._tokens
+            if not tokens:
+                await self._engine.open()
+                self._add(self._engine.auth, owned=False)
+                tokens = [self._engine.auth.token]
+            sessions = [
+                AsyncAuthManager(tokens[index % len(tokens)], self._engine)
+                for index in range(len(self._sessions), self._size)
+            ]
+            await asyncio.gather(*(auth.login() for auth in sessions))
+            for auth in sessions:
+                self._add(auth)
+
+    async def close(self) -> None:
+        """Log out the sessions logged in by the pool.
+
+        See :meth:`wialon.session_pool.SessionPool.close`.
+        """
+        async with self._condition:
+            owned = self._clear()
+            # The calls and leases waiting for a session raise instead.
+            self._condition.notify_all()
+        sessions = [auth for auth in owned if isinstance(auth, AsyncAuthManager)]
+        results = await asyncio.gather(
+            *(auth.logout() for auth in sessions),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to log out a pooled session: {result!r}.")
+
+    async def __aenter__(self) -> Self:
+        """Open the pool to be used as an async context manager.
+
+        :return: the AsyncSessionPool instance
+        :rtype: AsyncSessionPool
+        """
+        await self.open()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Log out the sessions of the pool when leaving the context manager."""
+        await self.close()
+
+    @property
+    def message_store(self) -> "MessageStore | None":
+        """Return the message store of the client, used by the pooled managers.
+
+        :return: the message store, None when the client has none
+        :rtype: MessageStore | None
+        """
+        return self._engine.message_store
+
+    async def request(
+        self,
+        svc: str,
+        params: Params = None,
+        sid: str | None = None,
+        send_file: dict[str, Any] | None = None,
+        **kwargs: bool | str | int,
+    ) -> dict[str, Any] | list[dict[str, Any]] | bytes:
+        """Make a request through a pooled session.
+
+        :param svc: the Wialon API service to be used
+        :type svc: str
+        :param params: the parameters to be used, defaults to None
+        :type params: Params, optional
+        :param sid: a session ID of the pool to send the request on, defaults to
+                    the least loaded session
+        :type sid: str | None, optional
+        :param send_file: the file to be sent, defaults to None
+        :type send_file: dict[str, Any] | None, optional
+        :raises SessionExceptionError: The pool is closed or has no session.
+        :return: the response from the Wialon API
+        :rtype: dict[str, Any] | list[dict[str, Any]] | bytes
+        """
+        index = await self._select(sid)
+        auth = self._sessions[index]
+        in_flight = self._in_flight
+        in_flight[index] += 1
+        self._calls[index] += 1
+        try:
+            return await self._send(auth, svc, params, send_file, **kwargs)
+        finally:
+            # Left in the lists of the pool it was sent from if it was closed.
+            in_flight[index] -= 1
+
+    async def request_stream(
+        self,
+        svc: str,
+        params: dict[str, Any] | None = None,
+        sid: str | None = None,
+        key: str = "messages",
+        **kwargs: bool | str | int,
+    ) -> AsyncIterator[Any]:
+        """Stream the elements of an array of the response through a session.
+
+        :param svc: the Wialon API service to be used
+        :type svc: str
+        :param params: the parameters to be used, defaults to None
+        :type params: dict[str, Any] | None, optional
+        :param sid: a session ID of the pool, defaults to the least loaded session
+        :type sid: str | None, optional
+        :param key: the member of the response holding the array, defaults to
+                    "messages"
+        :type key: str, optional
+        :raises SessionExceptionError: The pool is closed or has no session.
+        :return: an asynchronous iterator over the elements of the array
+        :rtype: AsyncIterator[Any]
+        """
+        sid = self._sessions[await self._select(sid)].get_sid()
+        async for item in self._engine.request_stream(svc, params, sid, key, **kwargs):
+            yield item
+
+    async def _select(self, sid: str | None) -> int:
+        """Return the session of a call, waiting while every session is leased.
+
+        :param sid: a session ID of the pool, defaults to the least loaded session
+        :type sid: str | None
+        :raises SessionExceptionError: The pool is closed, or closes while waiting.
+        :return: the index of the session
+        :rtype: int
+        """
+        await self.open()
+        if (index := self._available(sid)) < 0:
+            async with self._condition:
+                while (index := self._available(sid)) < 0:
+                    await self._condition.wait()
+        return index
+
+    async def _send(
+        self,
+        auth: BaseAuthManager,
+        svc: str,
+        params: Params,
+        send_file: dict[str, Any] | None,
+        **kwargs: bool | str | int,
+    ) -> dict[str, Any] | list[dict[str, Any]] | bytes:
+        """Send a request on a session, logging it in again if it has expired.
+
+        :param auth: the auth manager of the session
+        :type auth: BaseAuthManager
+        :param svc: the Wialon API service to be used
+        :type svc: str
+        :param params: the parameters to be used
+        :type params: Params
+        :param send_file: the file to be sent
+        :type send_file: dict[str, Any] | None
+        :return: the response from the Wialon API
+        :rtype: dict[str, Any] | list[dict[str, Any]] | bytes
+        """
+        sid = auth.get_sid()
+        kwargs = {**kwargs, "relogin": False}
+        try:
+            return await self._engine.request(svc, params, sid, send_file, **kwargs)
+        except (InvalidSessionError, IpChangedOrSessionExpiredError):
+            if svc in NO_RELOGIN or not isinstance(auth, AsyncAuthManager):
+                raise
+        sid = await auth.relogin(sid)
+        return await self._engine.request(svc, params, sid, send_file, **kwargs)
+
+    @asynccontextmanager
+    async def lease(
+        self,
+        *,
+        exclusive: bool = True,
+    ) -> AsyncIterator["AsyncSessionLease"]:
+        """Lease a session of the pool for a job.
+
+        See :meth:`wialon.session_pool.SessionPool.lease`.
+
+        :param exclusive: keep the session from other leases and calls of the
+                          pool, defaults to True
+        :type exclusive: bool, optional
+        :raises SessionExceptionError: The pool is closed, or closes while waiting.
+        :return: the leased session
+        :rtype: AsyncIterator[AsyncSessionLease]
+        """
+        await self.open()
+        async with self._condition:
+            while (index := self._available(None)) < 0:
+                await self._condition.wait()
+            auth = self._sessions[index]
+            leased = self._leased
+            if exclusive:
+                leased.add(index)
+        try:
+            yield AsyncSessionLease(self, auth)
+        finally:
+            if exclusive:
+                async with self._condition:
+                    leased.discard(index)
+                    self._condition.notify_all()
+
+    @property
+    def extra(self) -> AsyncExtra:
+        """Return the AsyncExtra manager bound to the pool.
+
+        :return: the AsyncExtra instance
+        :rtype: AsyncExtra
+        """
+        if self._extra is None:
+            self._extra = AsyncExtra(self)
+        return self._extra
+
+    @property
+    def items(self) -> AsyncItems:
+        """Return the AsyncItems manager bound to the pool.
+
+        :return: the AsyncItems instance
+        :rtype: AsyncItems
+        """
+        if self._items is None:
+            self._items = AsyncItems(self)
+        return self._items
+
+    @property
+    def messages(self) -> AsyncMessages:
+        """Return the AsyncMessages manager bound to the pool.
+
+        :return: the AsyncMessages instance
+        :rtype: AsyncMessages
+        """
+        if self._messages is None:
+            self._messages = AsyncMessages(self)
+        return self._messages
+
+
+class AsyncSessionLease:
+    """A session leased from an :class:`AsyncSessionPool`."""
+
+    def __init__(self, pool: AsyncSessionPool, auth: BaseAuthManager) -> None:
+        """Initialize the lease.
+
+        :param pool: the pool the session belongs to
+        :type pool: AsyncSessionPool
+        :param auth: the auth manager of the leased session
+        :type auth: BaseAuthManager
+        """
+        self._pool = pool
+        self._auth = auth
+        self._exchange: AsyncExchange | None = None
+        self._extra: AsyncExtra | None = None
+        self._items: AsyncItems | None = None
+        self._messages: AsyncMessages | None = None
+        self._report: AsyncReport | None = None
+
+    @property
+    def auth(self) -> BaseAuthManager:
+        """Return the auth manager of the leased session.
+
+        :return: the auth manager
+        :rtype: BaseAuthManager
+        """
+        return self._auth
+
+    @property
+    def message_store(self) -> "MessageStore | None":
+        """Return the message store of the client, used by the leased managers.
+
+        :return: the message store, None when the client has none
+        :rtype: MessageStore | None
+        """
+        return self._pool.message_store
+
+    async def request(
+        self,
+        svc: str,
+        params: Params = None,
+        sid: str | None = None,  # noqa: ARG002
+        send_file: dict[str, Any] | None = None,
+        **kwargs: bool | str | int,
+    ) -> dict[str, Any] | list[dict[str, Any]] | bytes:
+        """Make a request on the leased session.
+
+        :param svc: the Wialon API service to be used
+        :type svc: str
+        :param params: the parameters to be used, defaults to None
+        :type params: Params, optional
+        :param sid: ignored, the leased session is always used
+        :type sid: str | None, optional
+        :param send_file: the file to be sent, defaults to None
+        :type send_file: dict[str, Any] | None, optional
+        :return: the response from the Wialon API
+        :rtype: dict[str, Any] | list[dict[str, Any]] | bytes
+        """
+        return await self._pool.request(
+            svc, params, self.auth.get_sid(), send_file, **kwargs,
+        )
+
+    def request_stream(
+        self,
+        svc: str,
+        params: dict[str, Any] | None = None,
+        sid: str | None = None,  # noqa: ARG002
+        key: str = "messages",
+        **kwargs: bool | str | int,
+    ) -> AsyncIterator[Any]:
+        """Stream the elements of an array of the response on the leased session.
+
+        :param svc: the Wialon API service to be used
+        :type svc: str
+        :param params: the parameters to be used, defaults to None
+        :type params: dict[str, Any] | None, optional
+        :param sid: ignored, the leased session is always used
+        :type sid: str | None, optional
+        :param key: the member of the response holding the array, defaults to
+                    "messages"
+        :type key: str, optional
+        :return: an asynchronous iterator over the elements of the array
+        :rtype: AsyncIterator[Any]
+        """
+        return self._pool.request_stream(
+            svc, params, self.auth.get_sid(), key, **kwargs,
+        )
+
+    @property
+    def exchange(self) -> AsyncExchange:
+        """Return the AsyncExchange manager of the leased session.
+
+        :return: the AsyncExchange instance
+        :rtype: AsyncExchange
+        """
+        if self._exchange is None:
+            self._exchange = AsyncExchange(self)
+        return self._exchange
+
+    @property
+    def extra(self) -> AsyncExtra:
+        """Return the AsyncExtra manager of the leased session.
+
+        :return: the AsyncExtra instance
+        :rtype: AsyncExtra
+        """
+        if self._extra is None:
+            self._extra = AsyncExtra(self)
+        return self._extra
+
+    @property
+    def items(self) -> AsyncItems:
+        """Return the AsyncItems manager of the leased session.
+
+        :return: the AsyncItems instance
+        :rtype: AsyncItems
+        """
+        if self._items is None:
+            self._items = AsyncItems(self)
+        return self._items
+
+    @property
+    def messages(self) -> AsyncMessages:
+        """Return the AsyncMessages manager of the leased session.
+
+        :return: the AsyncMessages instance
+        :rtype: AsyncMessages
+        """
+        if self._messages is None:
+            self._messages = AsyncMessages(self)
+        return self._messages
+
+    @property
+    def report(self) -> AsyncReport:
+        """Return the AsyncReport manager of the leased session.
+
+        :return: the AsyncReport instance
+        :rtype: AsyncReport
+        """
+        if self._report is None:
+            self._report = AsyncReport(self)
+        return self._report
@@ -0,0 +1,200 @@
+"""HTTP transports of the asynchronous Wialon client.
+
+See :mod:`wialon.transport`. :class:`AiohttpTransport` is the default one; the
+in-process stand-in is :class:`wialon.aio.fake.AsyncFakeTransport`.
+"""
+
+from collections.abc import AsyncIterator, Mapping
+from typing import Any, Protocol
+
+import aiohttp
+
+from wialon.transport import CONNECTION_ERRORS
+
+ASYNC_CONNECTION_ERRORS: tuple[type[Exception], ...] = (
+    *CONNECTION_ERRORS,
+    aiohttp.ClientConnectionError,
+)
+
+
+class AsyncResponse(Protocol):
+    """A response whose body has not been read yet."""
+
+    @property
+    def headers(self) -> Mapping[str, str]:
+        """Return the headers of the response."""
+        ...
+
+    def iter_raw(self, chunk_size: int) -> AsyncIterator[bytes]:
+        """Yield the body as received, without decoding its Content-Encoding."""
+        ...
+
+    async def close(self) -> None:
+        """Release the connection of the response."""
+        ...
+
+
+class AsyncTransport(Protocol):
+    """Sends the requests of an :class:`~wialon.aio.AsyncWialon` client."""
+
+    async def post(  # noqa: PLR0913
+        self,
+        url: str,
+        *,
+        params: dict[str, str] | None = None,
+        json: object = None,
+        files: dict[str, Any] | None = None,
+        headers: dict[str, str] | None = None,
+        timeout: float | tuple[float, float] = 30,  # noqa: ASYNC109
+    ) -> AsyncResponse:
+        """Send a POST request and return the response once its headers arrive."""
+        ...
+
+    async def close(self) -> None:
+        """Release the connections of the transport."""
+        ...
+
+
+class AiohttpResponse:
+    """An ``aiohttp`` response."""
+
+    def __init__(self, response: aiohttp.ClientResponse) -> None:
+        """Wrap a response whose body has not been read.
+
+        :param response: the response
+        :type response: aiohttp.ClientResponse
+        """
+        self._response = response
+
+    @property
+    def headers(self) -> Mapping[str, str]:
+        """Return the headers of the response.
+
+        :return: the case-insensitive headers
+        :rtype: Mapping[str, str]
+        """
+        return self._response.headers
+
+    def iter_raw(self, chunk_size: int) -> AsyncIterator[bytes]:
+        """Yield the body as it is read from the socket.
+
+        :param chunk_size: the size of the chunks to read
+        :type chunk_size: int
+        :return: an asynchronous iterator over the raw chunks of the body
+        :rtype: AsyncIterator[bytes]
+        """
+        return self._response.content.iter_chunked(chunk_size)
+
+    async def close(self) -> None:
+        """Return the connection to the pool."""
+        self._response.release()
+
+
+class AiohttpTransport:
+    """Transport over a pooled ``aiohttp`` session.
+
+    The session is created on the first request, inside the running event loop.
+    """
+
+    def __init__(
+        self,
+        pool_maxsize: int = 100,
+        limit_per_host: int = 0,
+        *,
+        keep_alive: bool = True,
+        verify: bool = True,
+    ) -> None:
+        """Initialize the transport.
+
+        :param pool_maxsize: maximum number of pooled connections, defaults to 100
+        :type pool_maxsize: int, optional
+        :param limit_per_host: maximum number of connections per host, defaults to
+                               0 (no limit besides ``pool_maxsize``)
+        :type limit_per_host: int, optional
+        :param keep_alive: reuse connections between requests, defaults to True
+        :type keep_alive: bool, optional
+        :param verify: whether to verify the TLS certificate, defaults to True
+        :type verify: bool, optional
+        """
+        self._pool_maxsize = pool_maxsize
+        self._limit_per_host = limit_per_host
+        self._keep_alive = keep_alive
+        self._verify = verify
+        self._session: aiohttp.ClientSession | None = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the HTTP session, creating it inside the running event loop.
+
+        :return: the session shared by every request of the transport
+        :rtype: aiohttp.ClientSession
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self._pool_maxsize,
+                limit_per_host=self._limit_per_host,
+                force_close=not self._keep_alive,
+                ssl=self._verify,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                auto_decompress=False,
+            )
+        return self._session
+
+    async def post(  # noqa: PLR0913
+        self,
+        url: str,
+        *,
+        params: dict[str, str] | None = None,
+        json: object = None,
+        files: dict[str, Any] | None = None,
+        headers: dict[str, str] | None = None,
+        timeout: float | tuple[float, float] = 30,  # noqa: ASYNC109
+    ) -> AiohttpResponse:
+        """Send a POST request without reading its body.
+
+        :param url: the URL of the API
+        :type url: str
+        :param params: the query parameters, defaults to None
+        :type params: dict[str, str] | None, optional
+        :param json: the JSON body, defaults to None
+        :type json: object, optional
+        :param files: the files of a multipart body, defaults to None
+        :type files: dict[str, Any] | None, optional
+        :param headers: the headers of the request, defaults to None
+        :type headers: dict[str, str] | None, optional
+        :param timeout: the timeout of the request in seconds, or its connect and
+                        read timeouts, defaults to 30
+        :type timeout: float | tuple[float, float], optional
+        :raises ConnectionError: If the node could not be reached in time.
+        :return: the response
+        :rtype: AiohttpResponse
+        """
+        data = None
+        if files:
+            data = aiohttp.FormData()
+            for name, value in files.items():
+                data.add_field(name, value)
+        try:
+            response = await self._get_session().post(
+                url,
+                params=params,
+                json=json,
+                data=data,
+                headers=headers,
+                timeout=(
+                    aiohttp.ClientTimeout(sock_connect=timeout[0], sock_read=timeout[1])
+                    if isinstance(timeout, tuple)
+                    else aiohttp.ClientTimeout(total=timeout)
+                ),
+            )
+        except aiohttp.ConnectionTimeoutError as exc:
+            # Also a TimeoutError, but the request never reached the node.
+            raise ConnectionError(str(exc)) from exc
+        return AiohttpResponse(response)
+
+    async def close(self) -> None:
+        """Close the pooled connections."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
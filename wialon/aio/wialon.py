@@ -0,0 +1,1214 @@
+"""The asynchronous client for the Wialon API."""
+
+import asyncio
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+from contextlib import AsyncExitStack, asynccontextmanager, nullcontext
+from types import TracebackType
+from typing import Any, Self, TypeVar
+
+import aiohttp
+from loguru import logger
+
+from wialon.auth_manager import NO_RELOGIN
+from wialon.batching import is_batchable
+from wialon.breaker import BreakerStats, CircuitBreaker, CircuitKey
+from wialon.cache import ResponseCache
+from wialon.compression import (
+    CHUNK_SIZE,
+    StreamDecoder,
+    TransferStats,
+    accept_encoding,
+)
+from wialon.dedup import NO_DEDUP
+from wialon.endpoints import Endpoint, EndpointSet, EndpointStats
+from wialon.errors import (
+    DeadlineExceededError,
+    EncodingError,
+    InvalidSessionError,
+    IpChangedOrSessionExpiredError,
+    ReachedLimitOfConcurrentRequestsError,
+)
+from wialon.instrumentation import CallRecord, Instrumentation, request_size
+from wialon.log import configure_logging
+from wialon.message_store import MessageStore
+from wialon.protocol import Params, build_query, parse_response
+from wialon.ratelimit import LimiterMetrics
+from wialon.retry import RETRYABLE_ERRORS, RetryPolicy
+from wialon.scheduler import LaneStats, priority
+from wialon.streaming import JSONArrayStream
+from wialon.timeouts import (
+    Timeout,
+    TimeoutPolicy,
+    capped,
+    check_deadline,
+    check_read,
+    current_deadline,
+    deadline,
+    remaining,
+)
+from wialon.transport import READ_TIMEOUTS
+
+from .auth_manager import AsyncAuthManager
+from .batching import AsyncBatcher
+from .dedup import AsyncSingleFlight
+from .exchange import AsyncExchange
+from .executor import bounded_map
+from .extra import AsyncExtra
+from .items import AsyncItems
+from .messages import AsyncMessages
+from .ratelimit import AsyncRateLimiter
+from .report import AsyncReport
+from .scheduler import AsyncScheduler
+from .transport import (
+    ASYNC_CONNECTION_ERRORS,
+    AiohttpTransport,
+    AsyncResponse,
+    AsyncTransport,
+)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class AsyncWialon:
+    """The asyncio client for the Wialon API.
+
+    The session is opened on first use of the client as an async context manager
+    (or by awaiting :meth:`open`), and every request goes through one transport,
+    by default an ``aiohttp`` connection pool.
+    """
+
+    def __init__(  # noqa: PLR0915
+        self,
+        api_url: str | list[str],
+        api_key: str,
+        *,
+        transport: AsyncTransport | None = None,
+        **kwargs: str | float | bool,
+    ) -> None:
+        """Initializes the asynchronous Wialon API client.
+
+        :param api_url: the API URL to be used, or the URLs of several nodes of the
+                        API, see :class:`wialon.wialon.Wialon`
+        :type api_url: str | list[str]
+        :param api_key: the API key to be used
+        :type api_key: str
+        :param transport: the transport sending the requests, defaults to an
+                          :class:`~wialon.aio.transport.AiohttpTransport` configured
+                          with the connection keywords below
+        :type transport: AsyncTransport | None, optional
+        :keyword verify_cert: whether to verify the TLS certificate, defaults to True
+        :keyword max_in_flight: maximum number of concurrent requests, defaults to 100
+        :keyword pool_maxsize: maximum number of pooled connections, defaults to 100
+        :keyword limit_per_host: maximum number of connections per host, defaults to 0
+                                 (no limit besides ``pool_maxsize``)
+        :keyword keep_alive: reuse connections between requests, defaults to True
+        :keyword compression: accept gzip/deflate compressed responses, defaults to
+                              False. It can also be set per call.
+        :keyword batch_window: when greater than 0, the calls of the managers are
+                               always coalesced into ``core/batch`` requests with
+                               this window in seconds (see :meth:`batching`),
+                               defaults to 0
+        :keyword batch_max_size: maximum number of calls in one batch, defaults to 50
+        :keyword rate_limit: maximum requests per second of each session, defaults
+                             to 0 (no limit), see :class:`wialon.wialon.Wialon`
+        :keyword max_concurrency: maximum requests in flight per session, defaults
+                                  to 0 (no limit), see :class:`wialon.wialon.Wialon`
+        :keyword retries: times a transient failure of an idempotent service is
+                          retried, defaults to 2
+        :keyword retry_deadline: seconds after the first attempt past which no retry
+                                 is started, defaults to 30
+        :keyword endpoint_cooldown: seconds a node of the API is skipped after a
+                                    connection error or a timeout, defaults to 30
+        :keyword connect_timeout: seconds to connect to a node of the API, defaults
+                                  to 5
+        :keyword read_timeout: seconds to wait for the response of a service without
+                               a profile in :attr:`timeout_policy`, defaults to 30
+        :keyword logging: "INFO" or "DEBUG" to write the logs of the SDK to
+                          ``wialon.log`` in the working directory. The file sink is
+                          added once per process, however many clients are built;
+                          see :func:`wialon.log.configure_logging`.
+        :keyword cache: cache the responses of read-only services such as
+                        ``core/search_items`` in memory, defaults to False. Set
+                        :attr:`cache` to a :class:`~wialon.cache.ResponseCache` to
+                        choose the services, their time-to-live and the size.
+        :keyword message_store: the path of a SQLite file keeping the messages of
+                                closed time ranges, so loading them again does not
+                                call the API (see :class:`~wialon.MessageStore`),
+                                defaults to no store
+        :keyword dedup: share one round trip between identical calls of idempotent
+                        services made while one of them is in flight, defaults to
+                        True
+        :keyword circuit_breaker: fail fast with :class:`~wialon.CircuitOpenError`
+                                  while a service or a node of the API keeps
+                                  failing (see :attr:`circuit_breaker`), defaults
+                                  to True
+        :keyword breaker_threshold: consecutive connection errors, timeouts or
+                                    overload errors that open a circuit, defaults
+                                    to 5
+        :keyword breaker_reset: seconds an open circuit fails fast before a trial
+                                call is sent, defaults to 30
+        :keyword scheduler: share the ``max_in_flight`` requests in flight between
+                            priority lanes, so interactive lookups are sent
+                            before queued reports and exports (see
+                            :attr:`scheduler`). The lanes cap the calls in
+                            flight, so it defaults to False.
+        """
+        api_urls = [api_url] if isinstance(api_url, str) else list(api_url)
+        _endpoint_cooldown = kwargs.get("endpoint_cooldown", 30)
+        endpoint_cooldown = (
+            _endpoint_cooldown if isinstance(_endpoint_cooldown, (int, float)) else 30
+        )
+        self._endpoints = EndpointSet(api_urls, endpoint_cooldown)
+        self._api_url = api_urls[0]
+        self._api_key = api_key
+        verify_cert = kwargs.get("verify_cert", True)
+        self._verify_cert: bool = verify_cert if isinstance(verify_cert, bool) else True
+
+        _max_in_flight = kwargs.get("max_in_flight", 100)
+        _pool_maxsize = kwargs.get("pool_maxsize", 100)
+        _limit_per_host = kwargs.get("limit_per_host", 0)
+        _keep_alive = kwargs.get("keep_alive", True)
+        max_in_flight = (
+            _max_in_flight if isinstance(_max_in_flight, int) and _max_in_flight > 0
+            else 100
+        )
+        pool_maxsize = (
+            _pool_maxsize if isinstance(_pool_maxsize, int) and _pool_maxsize > 0
+            else 100
+        )
+        limit_per_host = (
+            _limit_per_host if isinstance(_limit_per_host, int) and _limit_per_host > 0
+            else 0
+        )
+        keep_alive = _keep_alive if isinstance(_keep_alive, bool) else True
+        self._transport: AsyncTransport = (
+            transport
+            if transport is not None
+            else AiohttpTransport(
+                pool_maxsize,
+                limit_per_host,
+                keep_alive=keep_alive,
+                verify=self._verify_cert,
+            )
+        )
+        compression = kwargs.get("compression", False)
+        self._compression = compression if isinstance(compression, bool) else False
+        self.last_transfer: TransferStats | None = None
+        self.total_transfer = TransferStats()
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._max_in_flight = max_in_flight
+
+        _batch_window = kwargs.get("batch_window", 0)
+        _batch_max_size = kwargs.get("batch_max_size", 50)
+        batch_window = (
+            _batch_window if isinstance(_batch_window, (int, float)) else 0
+        )
+        batch_max_size = _batch_max_size if isinstance(_batch_max_size, int) else 50
+        _rate_limit = kwargs.get("rate_limit", 0)
+        _max_concurrency = kwargs.get("max_concurrency", 0)
+        self._rate_limit: float = (
+            _rate_limit if isinstance(_rate_limit, (int, float)) else 0
+        )
+        self._max_concurrency = (
+            _max_concurrency if isinstance(_max_concurrency, int) else 0
+        )
+        self._limiters: dict[tuple[str, str], AsyncRateLimiter] = {}
+        _retries = kwargs.get("retries", 2)
+        _retry_deadline = kwargs.get("retry_deadline", 30)
+        retries = _retries if isinstance(_retries, int) and _retries >= 0 else 2
+        retry_deadline = (
+            _retry_deadline if isinstance(_retry_deadline, (int, float)) else 30
+        )
+        self.retry_policy = RetryPolicy(
+            max_attempts=retries + 1,
+            deadline=retry_deadline,
+            retry_on=(*RETRYABLE_ERRORS, aiohttp.ClientConnectionError),
+        )
+        _connect_timeout = kwargs.get("connect_timeout", 5)
+        _read_timeout = kwargs.get("read_timeout", 30)
+        self.timeout_policy = TimeoutPolicy(
+            default=Timeout(
+                _connect_timeout if isinstance(_connect_timeout, (int, float)) else 5,
+                _read_timeout if isinstance(_read_timeout, (int, float)) else 30,
+            ),
+        )
+        self.instrumentation = Instrumentation()
+        _cache = kwargs.get("cache", False)
+        self.cache: ResponseCache | None = (
+            ResponseCache() if isinstance(_cache, bool) and _cache else None
+        )
+        self._session_users: dict[str, str] = {}
+        _dedup = kwargs.get("dedup", True)
+        self.single_flight: AsyncSingleFlight | None = (
+            AsyncSingleFlight() if not isinstance(_dedup, bool) or _dedup else None
+        )
+        _circuit_breaker = kwargs.get("circuit_breaker", True)
+        _breaker_threshold = kwargs.get("breaker_threshold", 5)
+        _breaker_reset = kwargs.get("breaker_reset", 30)
+        self.circuit_breaker: CircuitBreaker | None = (
+            CircuitBreaker(
+                _breaker_threshold if isinstance(_breaker_threshold, int) else 5,
+                _breaker_reset if isinstance(_breaker_reset, (int, float)) else 30,
+                trip_on=(*RETRYABLE_ERRORS, aiohttp.ClientConnectionError),
+                node_trip_on=(OSError, aiohttp.ClientConnectionError),
+            )
+            if not isinstance(_circuit_breaker, bool) or _circuit_breaker
+            else None
+        )
+        _scheduler = kwargs.get("scheduler", False)
+        self.scheduler: AsyncScheduler | None = (
+            AsyncScheduler(max_in_flight)
+            if isinstance(_scheduler, bool) and _scheduler
+            else None
+        )
+        _message_store = kwargs.get("message_store")
+        self.message_store: MessageStore | None = (
+            MessageStore(_message_store) if isinstance(_message_store, str) else None
+        )
+        # A store assigned by the caller may be shared and is left open on close.
+        self._owned_store = self.message_store
+        self._batcher: AsyncBatcher | None = None
+        if batch_window > 0:
+            self._batcher = AsyncBatcher(self, batch_window, batch_max_size)
+
+        self._auth = AsyncAuthManager(self._api_key, self)
+        self._exchange = None
+        self._extra = None
+        self._messages = None
+        self._items = None
+        self._report = None
+        self._logging = kwargs.get("logging", "")
+        if isinstance(self._logging, str):
+            configure_logging(self._logging)
+        logger.info("Async Wialon API client initialized.")
+
+    async def open(self) -> None:
+        """Login when there is no active session."""
+        if not self._auth.get_sid():
+            await self._auth.login()
+
+    async def close(self) -> None:
+        """Close the pooled connections of the client."""
+        if self._batcher is not None:
+            await self._batcher.close()
+        await self._transport.close()
+        if self._owned_store is not None:
+            self._owned_store.close()
+            self._owned_store = None
+        logger.info("Async Wialon API client closed.")
+
+    async def __aenter__(self) -> Self:
+        """Open the client to be used as an async context manager.
+
+        :return: the AsyncWialon instance
+        :rtype: AsyncWialon
+        """
+        await self.open()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the client when leaving the context manager."""
+        await self.close()
+
+    @asynccontextmanager
+    async def batching(
+        self,
+        window: float = 0.01,
+        max_size: int = 50,
+    ) -> AsyncIterator[AsyncBatcher]:
+        """Coalesce the calls made inside the block into ``core/batch`` requests.
+
+        See :meth:`wialon.wialon.Wialon.batching`. Calls awaited concurrently, e.g.
+        with :func:`asyncio.gather`, are sent together.
+
+        :param window: seconds a call waits for others before the batch is sent,
+                       defaults to 0.01
+        :type window: float, optional
+        :param max_size: maximum number of calls in one batch, defaults to 50
+        :type max_size: int, optional
+        :return: the batcher of the block
+        :rtype: AsyncIterator[AsyncBatcher]
+        """
+        batcher = AsyncBatcher(self, window, max_size)
+        previous = self._batcher
+        self._batcher = batcher
+        try:
+            yield batcher
+        finally:
+            self._batcher = previous
+            await batcher.close()
+            logger.info(f"Batching finished: {batcher.stats}.")
+
+    def map(
+        self,
+        fn: Callable[[T], Awaitable[R]],
+        iterable: Iterable[T],
+        max_concurrency: int | None = None,
+        *,
+        return_exceptions: bool = False,
+    ) -> AsyncIterator[R | Exception]:
+        """Await a coroutine function on many items, e.g. units, concurrently.
+
+        See :meth:`wialon.wialon.Wialon.map`. At most ``max_concurrency`` calls
+        run at the same time and the results are yielded in the order of the
+        items::
+
+            async def unit(unit_id):
+                return await client.items.search(unit_id, by="id")
+
+            async for item in client.map(unit, unit_ids):
+                ...
+
+        :param fn: the coroutine function awaited with each item
+        :type fn: Callable[[T], Awaitable[R]]
+        :param iterable: the items
+        :type iterable: Iterable[T]
+        :param max_concurrency: the calls running at the same time, defaults to
+                                the ``max_in_flight`` of the client
+        :type max_concurrency: int | None, optional
+        :param return_exceptions: yield the exception raised by a call instead of
+                                  raising it, defaults to False
+        :type return_exceptions: bool, optional
+        :return: the result of each call, in the order of the items
+        :rtype: AsyncIterator[R | Exception]
+        """
+        return bounded_map(
+            fn,
+            iterable,
+            max_concurrency if max_concurrency is not None else self._max_in_flight,
+            return_exceptions=return_exceptions,
+        )
+
+    async def request(
+        self,
+        svc: str,
+        params: dict[str, Any] | list[dict[str, Any]] | None = None,
+        sid: str | None = None,
+        send_file: dict[str, Any] | None = None,
+        **kwargs: bool | str | int,
+    ) -> dict[str, Any] | list[dict[str, Any]] | bytes:
+        """Make a request to the Wialon API.
+
+        At most ``max_in_flight`` requests are sent at the same time; the rest wait
+        for a free slot without blocking the event loop.
+
+        :param svc: the Wialon API service to be used
+        :type svc: str
+        :param params: the parameters to be used, defaults to None
+        :type params: dict[str, Any] | list[dict[str, Any]] | None, optional
+        :param sid: the session ID to be used, defaults to None
+        :type sid: str | None, optional
+        :param send_file: the file to be sent, defaults to None
+        :type send_file: dict[str, Any] | None, optional
+        :keyword compression: accept a gzip/deflate compressed response, defaults to
+                              the value given to the client
+        :keyword batch: allow the call to be coalesced into a ``core/batch`` request
+                        while batching is active, defaults to True
+        :keyword validate: raise the error carried by the response, defaults to True
+        :keyword retry: retry transient failures of idempotent services according
+                        to :attr:`retry_policy`, defaults to True
+        :keyword relogin: when the session has expired (error code 1 or 1011), login
+                          again and replay the call once, defaults to True
+        :keyword cache: answer read-only services from :attr:`cache` when it is
+                        set, defaults to True
+        :keyword dedup: wait for an identical call already in flight instead of
+                        sending this one, defaults to True
+        :keyword timeout: the timeouts of each attempt, a :class:`Timeout` or the
+                          seconds of the read timeout, defaults to the profile of
+                          the service in :attr:`timeout_policy`
+        :keyword deadline: seconds the call may take, retries included, defaults
+                           to the deadline of the enclosing :func:`deadline` block
+        :keyword priority: the lane of :attr:`scheduler` the call is queued in,
+                           e.g. "interactive", "normal" or "bulk", defaults to
+                           the lane of the enclosing :func:`priority` block, then
+                           of the service
+        :raises DeadlineExceededError: The deadline elapsed before an answer.
+        :raises CircuitOpenError: The circuit of the service or of its node is open.
+        :raises json.JSONDecodeError: Response is not a valid JSON.
+        :return: the response from the Wialon API
+        :rtype: dict[str, Any] | list[dict[str, Any]] | bytes
+        """
+        _deadline = kwargs.get("deadline")
+        if isinstance(_deadline, (int, float)) and not isinstance(_deadline, bool):
+            with deadline(_deadline):
+                return await self.request(
+                    svc, params, sid, send_file, **{**kwargs, "deadline": None},
+                )
+        _priority = kwargs.get("priority")
+        if isinstance(_priority, str):
+            with priority(_priority):
+                return await self.request(
+                    svc, params, sid, send_file, **{**kwargs, "priority": None},
+                )
+        _form_data = kwargs.get("form_data", False)
+        _file = kwargs.get("file", False)
+        _compression = kwargs.get("compression", self._compression)
+        timeout = self.timeout_policy.timeout(svc, kwargs.get("timeout"))
+        form_data = _form_data if isinstance(_form_data, bool) else False
+        file_upload = _file if isinstance(_file, bool) else False
+        compression = (
+            _compression if isinstance(_compression, bool) else self._compression
+        )
+        _batch = kwargs.get("batch", True)
+        _validate = kwargs.get("validate", True)
+        _retry = kwargs.get("retry", True)
+        _relogin = kwargs.get("relogin", True)
+        batch = _batch if isinstance(_batch, bool) else True
+        validate = _validate if isinstance(_validate, bool) else True
+        retry = _retry if isinstance(_retry, bool) else True
+        relogin = _relogin if isinstance(_relogin, bool) else True
+        _cache = kwargs.get("cache", True)
+        cache = self.cache if isinstance(_cache, bool) and _cache else None
+
+        if (
+            cache is not None
+            and validate
+            and not (send_file or form_data or file_upload)
+            and cache.is_cacheable(svc)
+        ):
+            user = self._session_users.get(sid or "", sid or "")
+            result = cache.get(svc, params, user)
+            if result is None:
+                result = await self.request(
+                    svc, params, sid, send_file, **{**kwargs, "cache": False},
+                )
+                cache.put(svc, params, user, result)
+            return result
+
+        _dedup = kwargs.get("dedup", True)
+        flights = self.single_flight if isinstance(_dedup, bool) and _dedup else None
+
+        async def send() -> dict[str, Any] | list[dict[str, Any]] | bytes:
+            batcher = self._batcher
+            if (
+                batcher is not None
+                and batch
+                and validate
+                and not (send_file or form_data or file_upload)
+                and is_batchable(svc, sid)
+            ):
+                future = batcher.submit(svc, params, sid)
+                done, _ = await asyncio.wait([future], timeout=remaining())
+                if not done:
+                    msg = f"The deadline elapsed while {svc} was queued in a batch."
+                    raise DeadlineExceededError(msg)
+                return future.result()
+            return await self._retrying(
+                svc,
+                params,
+                sid,
+                send_file,
+                form_data=form_data,
+                timeouts=timeout,
+                compression=compression,
+                file_upload=file_upload,
+                validate=validate,
+                retry=retry,
+            )
+
+        try:
+            if (
+                flights is not None
+                and validate
+                and not (send_file or form_data or file_upload)
+                and svc not in NO_DEDUP
+                and self.retry_policy.is_idempotent(svc, params)
+            ):
+                return await flights.do(svc, params, sid, send)
+            return await send()
+        except (InvalidSessionError, IpChangedOrSessionExpiredError):
+            if not (relogin and svc not in NO_RELOGIN and self._auth.owns_sid(sid)):
+                raise
+            stale_sid = sid or ""
+        sid = await self._auth.relogin(stale_sid)
+        logger.warning(f"{svc} was rejected by an expired session, replaying it.")
+        return await self.request(
+            svc, params, sid, send_file, **{**kwargs, "relogin": False},
+        )
+
+    async def _retrying(  # noqa: PLR0913
+        self,
+        svc: str,
+        params: Params,
+        sid: str | None,
+        send_file: dict[str, Any] | None,
+        *,
+        form_data: bool,
+        timeouts: Timeout,
+        compression: bool,
+        file_upload: bool,
+        validate: bool,
+        retry: bool,
+    ) -> dict[str, Any] | list[dict[str, Any]] | bytes:
+        """Send a request, retrying it according to :attr:`retry_policy`.
+
+        :param svc: the Wialon API service to be used
+        :type svc: str
+        :param params: the parameters to be used
+        :type params: Params
+        :param sid: the session ID to be used
+        :type sid: str | None
+        :param send_file: the file to be sent
+        :type send_file: dict[str, Any] | None
+        :param form_data: send the parameters as a JSON body
+        :type form_data: bool
+        :param timeouts: the connect and read timeouts of the request
+        :type timeouts: Timeout
+        :param compression: accept gzip and deflate encoded responses
+        :type compression: bool
+        :param file_upload: return the raw body instead of decoding it
+        :type file_upload: bool
+        :param validate: raise the error carried by the response
+        :type validate: bool
+        :param retry: retry transient failures of idempotent services
+        :type retry: bool
+        :return: the response from the Wialon API
+        :rtype: dict[str, Any] | list[dict[str, Any]] | bytes
+        """
+        policy = self.retry_policy if retry else None
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            try:
+                return await self._call(
+                    svc,
+                    params,
+                    sid,
+                    send_file,
+                    form_data=form_data,
+                    timeouts=timeouts,
+                    compression=compression,
+                    file_upload=file_upload,
+                    validate=validate,
+                )
+            except Exception as exc:
+                attempt += 1
+                delay = None
+                if policy is not None:
+                    elapsed = time.monotonic() - started
+                    delay = policy.next_delay(svc, params, exc, attempt, elapsed)
+                left = remaining()
+                if delay is None or (left is not None and delay >= left):
+                    raise
+                logger.warning(
+                    f"{svc} failed with {type(exc).__name__}, "
+                    f"retrying in {delay:.2f}s (attempt {attempt}).",
+                )
+            self.instrumentation.retried(svc)
+            await asyncio.sleep(delay)
+
+    async def _call(  # noqa: PLR0913
+        self,
+        svc: str,
+        params: Params,
+        sid: str | None,
+        send_file: dict[str, Any] | None,
+        *,
+        form_data: bool,
+        timeouts: Timeout,
+        compression: bool,
+        file_upload: bool,
+        validate: bool,
+    ) -> dict[str, Any] | list[dict[str, Any]] | bytes:
+        """Send one attempt of a request through the scheduler and the rate limiter.
+
+        :param svc: the Wialon API service to be used
+        :type svc: str
+        :param params: the parameters to be used
+        :type params: Params
+        :param sid: the session ID to be used
+        :type sid: str | None
+        :param send_file: the file to be sent
+        :type send_file: dict[str, Any] | None
+        :param form_data: send the parameters as a JSON body
+        :type form_data: bool
+        :param timeouts: the connect and read timeouts of the request
+        :type timeouts: Timeout
+        :param compression: accept gzip and deflate encoded responses
+        :type compression: bool
+        :param file_upload: return the raw body instead of decoding it
+        :type file_upload: bool
+        :param validate: raise the error carried by the response
+        :type validate: bool
+        :return: the response from the Wialon API
+        :rtype: dict[str, Any] | list[dict[str, Any]] | bytes
+        """
+        breaker = self.circuit_breaker
+        scheduler = self.scheduler
+        lane = scheduler.lane(svc) if scheduler is not None else ""
+        attempt = 0
+        failovers = 0
+        while True:
+            endpoint = self._endpoints.select(sid)
+            limiter = self._limiter(sid, endpoint)
+            try:
+                # Calls queued in the scheduler are not in flight for the limiter.
+                async with (
+                    scheduler.slot(lane) if scheduler else nullcontext(),
+                    limiter.slot() if limiter else nullcontext(),
+                ):
+                    with (
+                        breaker.guard(svc, endpoint.url) if breaker else nullcontext(),
+                        self.instrumentation.observe(
+                            svc, params, sid, endpoint.url,
+                        ) as call,
+                    ):
+                        content = await self._post(
+                            svc,
+                            params,
+                            sid,
+                            send_file,
+                            endpoint=endpoint,
+                            form_data=form_data,
+                            timeouts=timeouts,
+                            compression=compression,
+                            call=call,
+                        )
+                        if file_upload:
+                            return content
+                        result = call.result = parse_response(
+                            content, validate=validate,
+                        )
+            except READ_TIMEOUTS:
+                # Left to the retry policy: only idempotent calls are sent again.
+                raise
+            except ASYNC_CONNECTION_ERRORS:
+                # The node is already out of rotation, send the call to the next one
+                # now rather than after the backoff of the retry policy.
+                failovers += 1
+                if failovers >= len(self._endpoints) or not (
+                    self.retry_policy.is_idempotent(svc, params)
+                ):
+                    raise
+                self.instrumentation.retried(svc)
+                continue
+            except ReachedLimitOfConcurrentRequestsError:
+                if limiter is None or attempt >= limiter.max_retries:
+                    raise
+                attempt += 1
+                delay = limiter.backoff(attempt)
+            except EncodingError:
+                # The service only answers with gzip, so negotiate it for this call.
+                if compression or send_file:
+                    raise
+                logger.info(f"{svc} requires a compressed response, retrying with gzip.")
+                compression = True
+                self.instrumentation.retried(svc)
+                continue
+            else:
+                if svc == "token/login" and isinstance(result, dict):
+                    self._bind_session(result, endpoint)
+                elif svc == "core/logout" and sid:
+                    self.forget_session(sid)
+                return result
+            logger.warning(
+                f"{svc} reached the limit of concurrent requests, "
+                f"queued again in {delay:.2f}s (attempt {attempt}).",
+            )
+            self.instrumentation.retried(svc)
+            await asyncio.sleep(capped(delay))
+
+    async def _post(  # noqa: PLR0913
+        self,
+        svc: str,
+        params: Params,
+        sid: str | None,
+        send_file: dict[str, Any] | None,
+        *,
+        endpoint: Endpoint,
+        form_data: bool,
+        timeouts: Timeout,
+        compression: bool,
+        call: CallRecord | None = None,
+    ) -> bytes:
+        """Send a request and return its decoded body.
+
+        :param svc: the Wialon API service to be used
+        :type svc: str
+        :param params: the parameters to be used
+        :type params: Params
+        :param sid: the session ID to be used
+        :type sid: str | None
+        :param send_file: the file to be sent
+        :type send_file: dict[str, Any] | None
+        :param endpoint: the node of the API to send the request to
+        :type endpoint: Endpoint
+        :param form_data: send the parameters as a JSON body
+        :type form_data: bool
+        :param timeouts: the connect and read timeouts of the request
+        :type timeouts: Timeout
+        :param compression: accept gzip and deflate encoded responses
+        :type compression: bool
+        :param call: the record of the attempt to fill in with the bytes sent and
+                     received, defaults to None
+        :type call: CallRecord | None, optional
+        :return: the body of the response
+        :rtype: bytes
+        """
+        async with self._semaphore:
+            response = await self._open(
+                svc,
+                params,
+                sid,
+                send_file,
+                endpoint=endpoint,
+                form_data=form_data,
+                timeouts=timeouts,
+                compression=compression,
+                call=call,
+            )
+            decoder = StreamDecoder(svc, response.headers.get("Content-Encoding"))
+            at = current_deadline()
+            body = []
+            try:
+                async for chunk in response.iter_raw(CHUNK_SIZE):
+                    check_read(svc, at)
+                    body.append(decoder.decompress(chunk))
+                body.append(decoder.flush())
+            finally:
+                await response.close()
+        self.last_transfer = decoder.stats
+        self.total_transfer.add(decoder.stats)
+        if call is not None:
+            call.response_bytes = decoder.stats.wire_bytes
+        return b"".join(body)
+
+    async def _open(  # noqa: PLR0913
+        self,
+        svc: str,
+        params: Params,
+        sid: str | None,
+        send_file: dict[str, Any] | None,
+        *,
+        endpoint: Endpoint,
+        form_data: bool,
+        timeouts: Timeout,
+        compression: bool,
+        call: CallRecord | None = None,
+    ) -> AsyncResponse:
+        """Send a request through the transport without reading its body.
+
+        The time until the headers are received updates the latency of the node,
+        and a connection error takes it out of rotation; a read timeout does not,
+        as the node may have received the request.
+
+        :param svc: the Wialon API service to be used
+        :type svc: str
+        :param params: the parameters to be used
+        :type params: Params
+        :param sid: the session ID to be used
+        :type sid: str | None
+        :param send_file: the file to be sent
+        :type send_file: dict[str, Any] | None
+        :param endpoint: the node of the API to send the request to
+        :type endpoint: Endpoint
+        :param form_data: send the parameters as a JSON body
+        :type form_data: bool
+        :param timeouts: the connect and read timeouts of the request
+        :type timeouts: Timeout
+        :param compression: accept gzip and deflate encoded responses
+        :type compression: bool
+        :param call: the record of the attempt to fill in with the bytes sent,
+                     defaults to None
+        :type call: CallRecord | None, optional
+        :return: the response, to be closed by the caller
+        :rtype: AsyncResponse
+        """
+        left = check_deadline(svc)
+        capped_timeout = timeouts.within(left)
+        headers = {"Accept-Encoding": accept_encoding(compression)}
+        body = {"params": params} if form_data else None
+        query = None if form_data else build_query(svc, params, sid)
+        if call is not None:
+            call.request_bytes = request_size(query, body)
+        started = time.monotonic()
+        try:
+            if body is not None:
+                response = await self._transport.post(
+                    endpoint.url,
+                    json=body,
+                    headers=headers,
+                    timeout=capped_timeout.as_tuple(),
+                )
+            else:
+                response = await self._transport.post(
+                    endpoint.url,
+                    params=query,
+                    files=send_file,
+                    headers=headers,
+                    timeout=capped_timeout.as_tuple(),
+                )
+        except READ_TIMEOUTS as exc:
+            if capped_timeout is not timeouts:
+                msg = f"The deadline elapsed while waiting for {svc}."
+                raise DeadlineExceededError(msg) from exc
+            # The node took the request and may still run it: it stays in rotation.
+            logger.warning(f"{endpoint.url} did not answer {svc} in time.")
+            raise
+        except ASYNC_CONNECTION_ERRORS as exc:
+            if capped_timeout is not timeouts:
+                # The deadline cut the attempt short: the node is not to blame.
+                msg = f"The deadline elapsed while waiting for {svc}."
+                raise DeadlineExceededError(msg) from exc
+            self._endpoints.failed(endpoint)
+            logger.warning(f"{endpoint.url} did not answer {svc}, failing over.")
+            raise
+        self._endpoints.succeeded(endpoint, time.monotonic() - started)
+        return response
+
+    def _bind_session(self, response: dict[str, Any], endpoint: Endpoint) -> None:
+        """Keep a new session on the node of the API that issued it.
+
+        The user of the session is remembered too, so sessions of the same user
+        share the responses of :attr:`cache`.
+
+        :param response: the response of ``token/login``
+        :type response: dict[str, Any]
+        :param endpoint: the node that answered the login
+        :type endpoint: Endpoint
+        """
+        sid = response.get("eid")
+        if isinstance(sid, str) and sid:
+            self._endpoints.bind(sid, endpoint)
+            logger.debug(f"Session issued by {endpoint.url}.")
+            user = response.get("user")
+            if isinstance(user, dict) and "id" in user:
+                self._session_users[sid] = str(user["id"])
+
+    def forget_session(self, sid: str) -> None:
+        """Drop the state kept for a session that was replaced or logged out.
+
+        The node the session is bound to, its user and its rate limiters are
+        released, so a long-running client does not accumulate them.
+
+        :param sid: the session ID
+        :type sid: str
+        """
+        self._endpoints.forget(sid)
+        self._session_users.pop(sid, None)
+        for key in [key for key in self._limiters if key[1] == sid]:
+            del self._limiters[key]
+
+    def endpoint_stats(self) -> list[EndpointStats]:
+        """Return the health and latency of each node of the API.
+
+        :return: the state of each node, in the order the URLs were given
+        :rtype: list[EndpointStats]
+        """
+        return self._endpoints.stats()
+
+    def breaker_stats(self) -> dict[CircuitKey, BreakerStats]:
+        """Return the state of the circuit of each service and node of the API.
+
+        :return: the state of each circuit keyed by ("svc", service) or
+                 ("endpoint", URL), empty when the breaker is disabled
+        :rtype: dict[CircuitKey, BreakerStats]
+        """
+        if self.circuit_breaker is None:
+            return {}
+        return self.circuit_breaker.stats()
+
+    def scheduler_stats(self) -> dict[str, LaneStats]:
+        """Return the calls in flight and queued in each lane of the scheduler.
+
+        :return: the state of each lane keyed by its name, empty when the
+                 scheduler is disabled
+        :rtype: dict[str, LaneStats]
+        """
+        if self.scheduler is None:
+            return {}
+        return self.scheduler.stats()
+
+    def _limiter(self, sid: str | None, endpoint: Endpoint) -> AsyncRateLimiter | None:
+        """Return the rate limiter of a session on the node of the API of a call.
+
+        :param sid: the session ID of the request
+        :type sid: str | None
+        :param endpoint: the node of the API the request is sent to
+        :type endpoint: Endpoint
+        :return: the limiter, or None when rate limiting is disabled
+        :rtype: AsyncRateLimiter | None
+        """
+        if not (self._rate_limit or self._max_concurrency):
+            return None
+        key = (endpoint.host, sid or "")
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            limiter = AsyncRateLimiter(self._rate_limit, self._max_concurrency)
+            self._limiters[key] = limiter
+        return limiter
+
+    def limiter_metrics(self) -> dict[tuple[str, str], LimiterMetrics]:
+        """Return the state of the rate limiter of each session and host.
+
+        :return: the metrics of each limiter keyed by (host, session ID)
+        :rtype: dict[tuple[str, str], LimiterMetrics]
+        """
+        return {key: limiter.metrics() for key, limiter in self._limiters.items()}
+
+    async def request_stream(
+        self,
+        svc: str,
+        params: dict[str, Any] | None = None,
+        sid: str | None = None,
+        key: str = "messages",
+        **kwargs: bool | str | int,
+    ) -> AsyncIterator[Any]:
+        """Make a request and yield the elements of an array of the response.
+
+        The response is parsed while it is read from the socket, so only the
+        element being decoded is held in memory. The request holds a slot of
+        ``max_in_flight`` and of its rate limiter until the iteration ends. See
+        :meth:`wialon.wialon.Wialon.request_stream` for the replays done until
+        an element has been yielded.
+
+        :param svc: the Wialon API service to be used
+        :type svc: str
+        :param params: the parameters to be used, defaults to None
+        :type params: dict[str, Any] | None, optional
+        :param sid: the session ID to be used, defaults to None
+        :type sid: str | None, optional
+        :param key: the member of the response holding the array, defaults to
+                    "messages"
+        :type key: str, optional
+        :keyword timeout: the timeouts of the request, a :class:`Timeout` or the
+                          seconds of the read timeout, defaults to the profile of
+                          the service in :attr:`timeout_policy`
+        :keyword compression: accept a gzip/deflate compressed response, defaults to
+                              the value given to the client
+        :keyword priority: the lane of :attr:`scheduler` the request is queued in,
+                           defaults to the lane of the enclosing
+                           :func:`priority` block, then of the service
+        :keyword retry: retry transient failures of idempotent services according
+                        to :attr:`retry_policy`, defaults to True
+        :keyword relogin: when the session has expired (error code 1 or 1011), login
+                          again and replay the request once, defaults to True
+        :raises CircuitOpenError: The circuit of the service or of its node is open.
+        :raises json.JSONDecodeError: Response is not a valid JSON.
+        :raises InvalidResultError: The response has no array under the key.
+        :return: an asynchronous iterator over the elements of the array
+        :rtype: AsyncIterator[Any]
+        """
+        _compression = kwargs.get("compression", self._compression)
+        _retry = kwargs.get("retry", True)
+        _relogin = kwargs.get("relogin", True)
+        timeout = self.timeout_policy.timeout(svc, kwargs.get("timeout"))
+        compression = (
+            _compression if isinstance(_compression, bool) else self._compression
+        )
+        retry = _retry if isinstance(_retry, bool) else True
+        relogin = _relogin if isinstance(_relogin, bool) else True
+        scheduler = self.scheduler
+        lane = scheduler.lane(svc, kwargs.get("priority")) if scheduler else ""
+
+        policy = self.retry_policy if retry else None
+        started = time.monotonic()
+        attempt = 0
+        throttled = 0
+        while True:
+            endpoint = self._endpoints.select(sid)
+            limiter = self._limiter(sid, endpoint)
+            yielded = False
+            try:
+                async for item in self._stream(
+                    svc,
+                    params,
+                    sid,
+                    key,
+                    endpoint=endpoint,
+                    limiter=limiter,
+                    lane=lane,
+                    timeouts=timeout,
+                    compression=compression,
+                ):
+                    yielded = True
+                    yield item
+            except (InvalidSessionError, IpChangedOrSessionExpiredError):
+                if yielded or not (
+                    relogin and svc not in NO_RELOGIN and self._auth.owns_sid(sid)
+                ):
+                    raise
+                relogin = False
+                sid = await self._auth.relogin(sid or "")
+                logger.warning(f"{svc} was rejected by an expired session, replaying it.")
+                continue
+            except ReachedLimitOfConcurrentRequestsError:
+                if yielded or limiter is None or throttled >= limiter.max_retries:
+                    raise
+                throttled += 1
+                delay = capped(limiter.backoff(throttled))
+                logger.warning(
+                    f"{svc} reached the limit of concurrent requests, "
+                    f"queued again in {delay:.2f}s (attempt {throttled}).",
+                )
+            except Exception as exc:
+                attempt += 1
+                delay = None
+                if policy is not None and not yielded:
+                    elapsed = time.monotonic() - started
+                    delay = policy.next_delay(svc, params, exc, attempt, elapsed)
+                left = remaining()
+                if delay is None or (left is not None and delay >= left):
+                    raise
+                logger.warning(
+                    f"{svc} failed with {type(exc).__name__}, "
+                    f"retrying in {delay:.2f}s (attempt {attempt}).",
+                )
+            else:
+                return
+            self.instrumentation.retried(svc)
+            await asyncio.sleep(delay)
+
+    async def _stream(  # noqa: PLR0913
+        self,
+        svc: str,
+        params: dict[str, Any] | None,
+        sid: str | None,
+        key: str,
+        *,
+        endpoint: Endpoint,
+        limiter: AsyncRateLimiter | None,
+        lane: str,
+        timeouts: Timeout,
+        compression: bool,
+    ) -> AsyncIterator[Any]:
+        """Send one attempt of a streamed request and yield the elements of its array.
+
+        The slot of the scheduler is held until the response starts, while the
+        slots of the rate limiter and of ``max_in_flight``, taken after it, are
+        held until the body is read.
+
+        :param svc: the Wialon API service to be used
+        :type svc: str
+        :param params: the parameters to be used
+        :type params: dict[str, Any] | None
+        :param sid: the session ID to be used
+        :type sid: str | None
+        :param key: the member of the response holding the array
+        :type key: str
+        :param endpoint: the node of the API to send the request to
+        :type endpoint: Endpoint
+        :param limiter: the rate limiter of the session on the node, if any
+        :type limiter: AsyncRateLimiter | None
+        :param lane: the lane of :attr:`scheduler` the request is queued in
+        :type lane: str
+        :param timeouts: the connect and read timeouts of the request
+        :type timeouts: Timeout
+        :param compression: accept gzip and deflate encoded responses
+        :type compression: bool
+        :return: an asynchronous iterator over the elements of the array
+        :rtype: AsyncIterator[Any]
+        """
+        parser = JSONArrayStream(key)
+        breaker = self.circuit_breaker
+        scheduler = self.scheduler
+        async with AsyncExitStack() as held:
+            async with AsyncExitStack() as queued:
+                if scheduler:
+                    await queued.enter_async_context(scheduler.slot(lane))
+                if limiter:
+                    await held.enter_async_context(limiter.slot())
+                if breaker:
+                    held.enter_context(breaker.guard(svc, endpoint.url))
+                call = held.enter_context(
+                    self.instrumentation.observe(svc, params, sid, endpoint.url),
+                )
+                await held.enter_async_context(self._semaphore)
+                response = await self._open(
+                    svc,
+                    params,
+                    sid,
+                    None,
+                    endpoint=endpoint,
+                    form_data=False,
+                    timeouts=timeouts,
+                    compression=compression,
+                    call=call,
+                )
+            decoder = StreamDecoder(svc, response.headers.get("Content-Encoding"))
+            at = current_deadline()
+            try:
+                async for chunk in response.iter_raw(CHUNK_SIZE):
+                    check_read(svc, at)
+                    for item in parser.feed(decoder.decompress(chunk)):
+                        yield item
+                for item in parser.feed(decoder.flush()):
+                    yield item
+            finally:
+                await response.close()
+                self.last_transfer = decoder.stats
+                self.total_transfer.add(decoder.stats)
+                call.response_bytes = decoder.stats.wire_bytes
+            for item in parser.close():
+                yield item
+
+    @property
+    def auth(self) -> AsyncAuthManager:
+        """Return the AsyncAuthManager instance.
+
+        :return: the AsyncAuthManager instance
+        :rtype: AsyncAuthManager
+        """
+        return self._auth
+
+    @property
+    def exchange(self) -> AsyncExchange:
+        """Return the AsyncExchange instance.
+
+        :return: the AsyncExchange instance
+        :rtype: AsyncExchange
+        """
+        if self._exchange is None:
+            self._exchange = AsyncExchange(self)
+        return self._exchange
+
+    @property
+    def extra(self) -> AsyncExtra:
+        """Return the AsyncExtra instance.
+
+        :return: the AsyncExtra instance
+        :rtype: AsyncExtra
+        """
+        if self._extra is None:
+            self._extra = AsyncExtra(self)
+        return self._extra
+
+    @property
+    def items(self) -> AsyncItems:
+        """Return the AsyncItems instance.
+
+        :return: the AsyncItems instance
+        :rtype: AsyncItems
+        """
+        if self._items is None:
+            self._items = AsyncItems(self)
+        return self._items
+
+    @property
+    def messages(self) -> AsyncMessages:
+        """Return the AsyncMessages instance.
+
+        :return: the AsyncMessages instance
+        :rtype: AsyncMessages
+        """
+        if self._messages is None:
+            self._messages = AsyncMessages(self)
+        return self._messages
+
+    @property
+    def report(self) -> AsyncReport:
+        """Return the AsyncReport instance.
+
+        :return: the AsyncReport instance
+        :rtype: AsyncReport
+        """
+        if self._report is None:
+            self._report = AsyncReport(self)
+        return self._report
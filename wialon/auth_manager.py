@@ -1,26 +1,33 @@
 """AuthManager class."""
 
+import threading
+from collections import deque
 from typing import TYPE_CHECKING, Any
 
+from loguru import logger
+
 from .errors import SessionExceptionError
 
 if TYPE_CHECKING:
     from .wialon import Wialon
 
+# Services that are never replayed after logging in again.
+NO_RELOGIN = frozenset({"token/login", "core/logout"})
 
-class AuthManager:
-    """AuthManager class."""
+# Replaced session IDs still recognised when a call sent on them fails.
+STALE_SIDS = 8
 
-    def __init__(self, token: str, engine: "Wialon") -> None:
-        """Initialize the AuthManager class.
+
+class BaseAuthManager:
+    """Session state and request parameters shared by the auth managers."""
+
+    def __init__(self, token: str) -> None:
+        """Initialize the session state.
 
         :param token: The authentication token.
         :type token: str
-        :param engine: The Wialon engine instance.
-        :type engine: Wialon
         """
         self.token = token
-        self._engine = engine
         self._access_types = {
             "general": 0xFFFF,
             "units": 0xCCF7F00000,
@@ -32,43 +39,175 @@ class AuthManager:
         }
         self.host = None
         self._sid = ""
+        self._stale_sids: deque[str] = deque(maxlen=STALE_SIDS)
+        self.relogins = 0
         self.api_type = None
         self.version = None
         self.user_name = None
         self.user_id = None
+
+    def _login_params(self) -> dict[str, str]:
+        """Return the parameters of the login request.
+
+        :return: The parameters of the login request.
+        :rtype: dict[str, str]
+        """
+        return {"token": self.token, "fl": "2"}
+
+    def _apply_login(
+        self,
+        response: dict[str, Any] | list[dict[str, Any]] | bytes,
+    ) -> str:
+        """Store the session returned by the login request.
+
+        :param response: The response of the login request.
+        :type response: dict[str, Any] | list[dict[str, Any]] | bytes
+        :return: The session ID replaced by the new one, empty if there was none.
+        :rtype: str
+        """
+        if not isinstance(response, dict):
+            msg = "Invalid login response"
+            raise SessionExceptionError(msg)
+        self.host = response["host"]
+        replaced = ""
+        if isinstance(response["eid"], str):
+            if self._sid and self._sid != response["eid"]:
+                replaced = self._sid
+                self._stale_sids.append(replaced)
+            self._sid: str = response["eid"]
+        self.api_type = response["api"]
+        self.version = response[f"{self.api_type}_version"]
+        if type(response["user"]) is dict:
+            self.user_name = response["user"]["nm"]
+            self.user_id = response["user"]["id"]
+        return replaced
+
+    @staticmethod
+    def _account_detail_params(detailed: int) -> dict[str, str]:
+        """Return the parameters of the account details request.
+
+        :param detailed: Flag to indicate whether to retrieve detailed account
+        :type detailed: int
+        :return: The parameters of the request.
+        :rtype: dict[str, str]
+        """
+        detailed = 1 if detailed else 0
+        return {"type": str(detailed)}
+
+    def _check_access_params(
+        self,
+        items_id: list[int],
+        access_type: str,
+        service_name: str,
+        flags: int,
+    ) -> dict[str, list[int] | int | str]:
+        """Return the parameters of the access check request.
+
+        :param items_id: The items ID.
+        :type items_id: list[int]
+        :param access_type: The access type.
+        :type access_type: str
+        :param service_name: The service name.
+        :type service_name: str
+        :param flags: The flags.
+        :type flags: int
+        :raises ValueError: If the access type is invalid.
+        :return: The parameters of the request.
+        :rtype: dict[str, list[int] | int | str]
+        """
+        if access_type not in self._access_types:
+            msg = f"Invalid access type: {access_type}"
+            raise ValueError(msg)
+        return {
+            "itemId": items_id,
+            "accessType": flags if flags else self._access_types[access_type],
+            "serviceName": service_name,
+        }
+
+    def get_sid(self) -> str:
+        """Get the session ID.
+
+        :return: The session ID.
+        :rtype: str
+        """
+        return self._sid
+
+    def owns_sid(self, sid: str | None) -> bool:
+        """Return whether a session ID was issued to this manager.
+
+        :param sid: The session ID.
+        :type sid: str | None
+        :return: Whether the session ID is the current or a replaced one.
+        :rtype: bool
+        """
+        return bool(sid) and (sid == self._sid or sid in self._stale_sids)
+
+    def __str__(self) -> str:
+        """Return the string representation of the AuthManager object.
+
+        :return: The string representation of the AuthManager object.
+        :rtype: str
+        """
+        return f"name:{self.user_name}\nsid: {self._sid}"
+
+
+class AuthManager(BaseAuthManager):
+    """AuthManager class."""
+
+    def __init__(self, token: str, engine: "Wialon") -> None:
+        """Initialize the AuthManager class.
+
+        :param token: The authentication token.
+        :type token: str
+        :param engine: The Wialon engine instance.
+        :type engine: Wialon
+        """
+        super().__init__(token)
+        self._engine = engine
+        # Reentrant: relogin() logs in while holding it.
+        self._lock = threading.RLock()
         self._login()
 
     def login(self, token: str) -> None:
         """Login to the Wialon API.
 
+        Logins from several threads are serialized, so the session state always
+        belongs to a single login response.
+
         :param token: The authentication token.
         :type token: str
         """
-        self.token = token
-        self._login()
+        with self._lock:
+            self.token = token
+            self._login()
 
     def _login(self) -> None:
         """Login to the Wialon API."""
         svc = "token/login"
-        params = {"token": self.token, "fl": "2"}
-        response: dict[
-            str,
-            str | int | dict[str, str | int | dict[str, str | int | bool]],
-        ] = (  # type: ignore[no-untyped-call]
-            self._engine.request(
-                svc=svc,
-                params=params,
-            )
+        response = self._engine.request(
+            svc=svc,
+            params=self._login_params(),
         )
+        if replaced := self._apply_login(response):
+            self._engine.forget_session(replaced)
 
-        self.host = response["host"]
-        if isinstance(response["eid"], str):
-            self._sid: str = response["eid"]
-        self.api_type = response["api"]
-        self.version = response[f"{self.api_type}_version"]
-        if type(response["user"]) is dict:
-            self.user_name = response["user"]["nm"]
-            self.user_id = response["user"]["id"]
+    def relogin(self, stale_sid: str) -> str:
+        """Login again after the session has expired.
+
+        However many threads report the same expired session, only the first one
+        logs in; the others wait for it and receive the new session ID.
+
+        :param stale_sid: The session ID that was rejected by the API.
+        :type stale_sid: str
+        :return: The current session ID.
+        :rtype: str
+        """
+        with self._lock:
+            if self._sid == stale_sid:
+                logger.info("The session has expired, logging in again.")
+                self._login()
+                self.relogins += 1
+            return self._sid
 
     def account_detail(
         self,
@@ -83,8 +222,7 @@ class AuthManager:
         :rtype: dict
         """
         svc = "core/get_account_data"
-        detailed = 1 if detailed else 0
-        params = {"type": str(detailed)}
+        params = self._account_detail_params(detailed)
         return self._engine.request(svc=svc, params=params, sid=self.get_sid())
 
     def check_access(
@@ -108,14 +246,7 @@ class AuthManager:
         :rtype: dict
         """
         svc = "core/check_items_billing"
-        if access_type not in self._access_types:
-            msg = f"Invalid access type: {access_type}"
-            raise ValueError(msg)
-        params = {
-            "itemId": items_id,
-            "accessType": flags if flags else self._access_types[access_type],
-            "serviceName": service_name,
-        }
+        params = self._check_access_params(items_id, access_type, service_name, flags)
         return self._engine.request(svc=svc, params=params, sid=self.get_sid())
 
     def logout(self) -> dict[str, Any] | list[dict[str, Any]] | bytes:
@@ -133,19 +264,3 @@ class AuthManager:
 
         msg = "There is no active session"
         raise SessionExceptionError(msg)
-
-    def get_sid(self) -> str:
-        """Get the session ID.
-
-        :return: The session ID.
-        :rtype: str
-        """
-        return self._sid
-
-    def __str__(self) -> str:
-        """Return the string representation of the AuthManager object.
-
-        :return: The string representation of the AuthManager object.
-        :rtype: str
-        """
-        return f"name:{self.user_name}\nsid: {self._sid}"
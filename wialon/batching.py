@@ -0,0 +1,301 @@
+"""Automatic coalescing of API calls into ``core/batch`` requests.
+
+While a batcher is active, the calls the managers make are queued for a short
+window and sent together as one ``core/batch`` request per session. Each call
+receives its own result, or the exception of its own error code, as if it had
+been sent alone.
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+
+from .errors import InvalidResultError, validate_error
+from .protocol import Params
+
+if TYPE_CHECKING:
+    from .wialon import Wialon
+
+NOT_BATCHABLE = frozenset(
+    {
+        "core/batch",
+        "core/logout",
+        "core/duplicate",
+        "token/login",
+        "core/use_auth_hash",
+    },
+)
+NOT_BATCHABLE_PREFIXES = ("report/", "exchange/", "file/", "render/")
+
+
+def is_batchable(svc: str, sid: str | None) -> bool:
+    """Return whether a call can be sent inside a ``core/batch`` request.
+
+    Session handling, batches themselves, reports (which keep a single result
+    per session) and file transfers are always sent on their own.
+
+    :param svc: the Wialon API service to be used
+    :type svc: str
+    :param sid: the session ID of the call
+    :type sid: str | None
+    :return: whether the call can be batched
+    :rtype: bool
+    """
+    if not sid or svc in NOT_BATCHABLE:
+        return False
+    return not svc.startswith(NOT_BATCHABLE_PREFIXES)
+
+
+@dataclass
+class BatchStats:
+    """Counters of a batcher.
+
+    :ivar int calls: the number of calls submitted
+    :ivar int batches: the number of ``core/batch`` requests sent
+    :ivar int single: the number of calls sent alone because nothing else was queued
+    :ivar int errors: the number of calls that received an error
+    """
+
+    calls: int = 0
+    batches: int = 0
+    single: int = 0
+    errors: int = 0
+
+    @property
+    def calls_per_request(self) -> float:
+        """Return the average number of calls sent per HTTP request.
+
+        :return: the average, 0.0 when nothing was sent
+        :rtype: float
+        """
+        requests = self.batches + self.single
+        if not requests:
+            return 0.0
+        return self.calls / requests
+
+
+@dataclass
+class _Call:
+    """A queued call and the future of its result."""
+
+    svc: str
+    params: Params
+    future: Any
+
+
+class BaseBatcher:
+    """Queueing policy and result handling shared by the batchers."""
+
+    def __init__(self, window: float = 0.01, max_size: int = 50) -> None:
+        """Initialize the batcher.
+
+        :param window: seconds a call waits for others before the batch is sent,
+                       defaults to 0.01
+        :type window: float, optional
+        :param max_size: maximum number of calls in one batch, defaults to 50
+        :type max_size: int, optional
+        """
+        self._window = window if window > 0 else 0.0
+        self._max_size = max_size if max_size > 0 else 50
+        self._pending: dict[str, list[_Call]] = {}
+        self.stats = BatchStats()
+
+    @staticmethod
+    def _batch_params(calls: list[_Call]) -> list[dict[str, Any]]:
+        """Build the parameters of the ``core/batch`` request.
+
+        :param calls: the calls of the batch
+        :type calls: list[_Call]
+        :return: the parameters of the batch request
+        :rtype: list[dict[str, Any]]
+        """
+        return [
+            {"svc": call.svc, "params": {} if call.params is None else call.params}
+            for call in calls
+        ]
+
+    @staticmethod
+    def _batch_results(response: object, size: int) -> list[Any]:
+        """Validate the response of a ``core/batch`` request.
+
+        :param response: the decoded response
+        :type response: object
+        :param size: the number of calls of the batch
+        :type size: int
+        :raises InvalidResultError: The response does not hold one result per call.
+        :return: the result of each call
+        :rtype: list[Any]
+        """
+        if isinstance(response, dict):
+            validate_error(response)
+        if not isinstance(response, list) or len(response) != size:
+            msg = "The batch response does not match the batched calls."
+            raise InvalidResultError(msg)
+        return response
+
+    @staticmethod
+    def _item_error(item: object) -> Exception | None:
+        """Return the error carried by the result of one call of a batch.
+
+        :param item: the result of the call
+        :type item: object
+        :return: the exception of the error code, or None when the call succeeded
+        :rtype: Exception | None
+        """
+        if not isinstance(item, dict):
+            return None
+        try:
+            validate_error(item)
+        except Exception as exc:  # noqa: BLE001
+            return exc
+        return None
+
+
+class Batcher(BaseBatcher):
+    """Coalesce the calls of concurrent threads into ``core/batch`` requests."""
+
+    def __init__(
+        self,
+        engine: "Wialon",
+        window: float = 0.01,
+        max_size: int = 50,
+        max_workers: int = 4,
+    ) -> None:
+        """Initialize the batcher.
+
+        :param engine: the Wialon client sending the batches
+        :type engine: Wialon
+        :param window: seconds a call waits for others before the batch is sent,
+                       defaults to 0.01
+        :type window: float, optional
+        :param max_size: maximum number of calls in one batch, defaults to 50
+        :type max_size: int, optional
+        :param max_workers: number of batches sent at the same time, defaults to 4
+        :type max_workers: int, optional
+        """
+        super().__init__(window, max_size)
+        self._engine = engine
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers if max_workers > 0 else 4,
+            thread_name_prefix="wialon-batch",
+        )
+
+    def submit(
+        self,
+        svc: str,
+        params: Params = None,
+        sid: str | None = None,
+    ) -> Future:
+        """Queue a call and return the future of its result.
+
+        :param svc: the Wialon API service to be used
+        :type svc: str
+        :param params: the parameters to be used, defaults to None
+        :type params: Params, optional
+        :param sid: the session ID to be used, defaults to the client session
+        :type sid: str | None, optional
+        :return: the future of the result of the call
+        :rtype: Future
+        """
+        sid = sid or self._engine.auth.get_sid()
+        future: Future = Future()
+        call = _Call(svc, params, future)
+        with self._lock:
+            self.stats.calls += 1
+            group = self._pending.setdefault(sid, [])
+            group.append(call)
+            if len(group) >= self._max_size:
+                del self._pending[sid]
+                self._executor.submit(self._send, sid, group)
+            elif len(group) == 1:
+                timer = threading.Timer(self._window, self._expire, (sid, group))
+                timer.daemon = True
+                timer.start()
+        return future
+
+    def flush(self) -> None:
+        """Send every queued call without waiting for the window to expire."""
+        with self._lock:
+            pending = self._pending
+            self._pending = {}
+        for sid, group in pending.items():
+            self._executor.submit(self._send, sid, group)
+
+    def close(self) -> None:
+        """Send the queued calls and wait until every batch is answered."""
+        self.flush()
+        self._executor.shutdown(wait=True)
+
+    def _expire(self, sid: str, group: list[_Call]) -> None:
+        """Send a group of calls once its window has expired.
+
+        :param sid: the session ID of the group
+        :type sid: str
+        :param group: the calls of the group
+        :type group: list[_Call]
+        """
+        with self._lock:
+            if self._pending.get(sid) is not group:
+                return
+            del self._pending[sid]
+        try:
+            self._executor.submit(self._send, sid, group)
+        except RuntimeError:
+            # The batcher was closed while the timer was running.
+            self._send(sid, group)
+
+    def _send(self, sid: str, calls: list[_Call]) -> None:
+        """Send a group of calls and resolve their futures.
+
+        :param sid: the session ID of the calls
+        :type sid: str
+        :param calls: the calls to send
+        :type calls: list[_Call]
+        """
+        if len(calls) == 1:
+            call = calls[0]
+            with self._lock:
+                self.stats.single += 1
+            try:
+                call.future.set_result(
+                    self._engine.request(
+                        call.svc, call.params, sid, batch=False, dedup=False,
+                    ),
+                )
+            except Exception as exc:  # noqa: BLE001
+                with self._lock:
+                    self.stats.errors += 1
+                call.future.set_exception(exc)
+            return
+
+        with self._lock:
+            self.stats.batches += 1
+        logger.debug(f"Sending {len(calls)} calls in one core/batch request.")
+        try:
+            response = self._engine.request(
+                "core/batch",
+                self._batch_params(calls),
+                sid,
+                batch=False,
+                validate=False,
+            )
+            results = self._batch_results(response, len(calls))
+        except Exception as exc:  # noqa: BLE001
+            with self._lock:
+                self.stats.errors += len(calls)
+            for call in calls:
+                call.future.set_exception(exc)
+            return
+
+        for call, item in zip(calls, results, strict=True):
+            error = self._item_error(item)
+            if error is None:
+                call.future.set_result(item)
+            else:
+                with self._lock:
+                    self.stats.errors += 1
+                call.future.set_exception(error)
@@ -0,0 +1,249 @@
+"""Circuit breakers per service and per node of the API.
+
+When Wialon degrades, sending more calls only makes each caller wait out its
+timeout. A :class:`CircuitBreaker` keeps one circuit per service and one per
+node, and counts the consecutive failures of each. The circuit of a service
+counts connection errors, timeouts and the error codes of an overloaded server
+(5, 9 and 1005); the circuit of a node only counts connection errors and
+timeouts, so one failing service does not cut the node off. Other errors, such
+as invalid input, show that the server answers and count as successes.
+
+- closed: calls are sent; ``failure_threshold`` consecutive failures open it.
+- open: calls fail fast with :class:`~wialon.errors.CircuitOpenError` for
+  ``reset_timeout`` seconds.
+- half-open: ``half_open_calls`` trial calls are sent. A success closes the
+  circuit, a failure opens it again.
+
+A call is sent only when the circuits of its service and of its node both let
+it through. The module does no I/O, so the synchronous and asynchronous clients
+share it.
+"""
+
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from .errors import CircuitOpenError
+from .retry import RETRYABLE_ERRORS
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+CircuitKey = tuple[str, str]
+
+
+@dataclass
+class _Circuit:
+    """The state of one circuit."""
+
+    state: str = CLOSED
+    failures: int = 0
+    opened_at: float = 0.0
+    trials: int = 0
+    trips: int = 0
+    rejected: int = 0
+
+
+@dataclass(frozen=True)
+class BreakerStats:
+    """Snapshot of a circuit.
+
+    :ivar str state: "closed", "open" or "half-open"
+    :ivar int failures: the consecutive failures counted while closed
+    :ivar int trips: the times the circuit opened
+    :ivar int rejected: the calls failed fast while the circuit was open
+    :ivar float retry_in: the seconds until the circuit lets a trial call
+                          through, 0 unless open
+    """
+
+    state: str
+    failures: int
+    trips: int
+    rejected: int
+    retry_in: float
+
+
+class CircuitBreaker:
+    """Closed, open and half-open circuits per service and per node."""
+
+    def __init__(  # noqa: PLR0913
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_calls: int = 1,
+        *,
+        trip_on: tuple[type[BaseException], ...] = RETRYABLE_ERRORS,
+        node_trip_on: tuple[type[BaseException], ...] = (OSError,),
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the breaker.
+
+        :param failure_threshold: consecutive failures that open a circuit,
+                                  defaults to 5
+        :type failure_threshold: int, optional
+        :param reset_timeout: seconds an open circuit fails fast before trial
+                              calls are let through, defaults to 30.0
+        :type reset_timeout: float, optional
+        :param half_open_calls: trial calls sent at the same time while
+                                half-open, defaults to 1
+        :type half_open_calls: int, optional
+        :param trip_on: the exceptions counted as failures of a service,
+                        defaults to the transient errors retried by
+                        :class:`~wialon.retry.RetryPolicy`
+        :type trip_on: tuple[type[BaseException], ...], optional
+        :param node_trip_on: the exceptions counted as failures of a node,
+                             defaults to connection errors and timeouts
+        :type node_trip_on: tuple[type[BaseException], ...], optional
+        :param clock: the monotonic clock, defaults to time.monotonic
+        :type clock: Callable[[], float], optional
+        """
+        self.failure_threshold = failure_threshold if failure_threshold > 0 else 5
+        self.reset_timeout = reset_timeout
+        self.half_open_calls = half_open_calls if half_open_calls > 0 else 1
+        self.trip_on = trip_on
+        self.node_trip_on = node_trip_on
+        self._clock = clock
+        self._circuits: dict[CircuitKey, _Circuit] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _keys(svc: str, url: str) -> tuple[CircuitKey, CircuitKey]:
+        """Return the keys of the circuits of a call.
+
+        :param svc: the Wialon API service
+        :type svc: str
+        :param url: the node of the API
+        :type url: str
+        :return: the key of the service circuit and of the node circuit
+        :rtype: tuple[CircuitKey, CircuitKey]
+        """
+        return (("svc", svc), ("endpoint", url))
+
+    def allow(self, svc: str, url: str) -> None:
+        """Let a call through, or fail fast when one of its circuits is open.
+
+        Every call let through must be followed by :meth:`record`.
+
+        :param svc: the Wialon API service
+        :type svc: str
+        :param url: the node of the API the call is sent to
+        :type url: str
+        :raises CircuitOpenError: The circuit of the service or of the node is
+                                  open, or its trial calls are in flight.
+        """
+        now = self._clock()
+        with self._lock:
+            keys = self._keys(svc, url)
+            circuits = [self._circuits.setdefault(key, _Circuit()) for key in keys]
+            for key, circuit in zip(keys, circuits, strict=True):
+                elapsed = now - circuit.opened_at
+                if circuit.state == OPEN and elapsed >= self.reset_timeout:
+                    circuit.state = HALF_OPEN
+                    circuit.trials = 0
+                if circuit.state == OPEN or (
+                    circuit.state == HALF_OPEN and circuit.trials >= self.half_open_calls
+                ):
+                    circuit.rejected += 1
+                    retry_in = max(0.0, circuit.opened_at + self.reset_timeout - now)
+                    msg = (
+                        f"The circuit of {key[0]} {key[1]} is {circuit.state}, "
+                        f"{svc} was not sent (retry in {retry_in:.1f}s)."
+                    )
+                    raise CircuitOpenError(msg)
+            for circuit in circuits:
+                if circuit.state == HALF_OPEN:
+                    circuit.trials += 1
+
+    def record(self, svc: str, url: str, error: BaseException | None) -> None:
+        """Record the outcome of a call let through by :meth:`allow`.
+
+        :param svc: the Wialon API service
+        :type svc: str
+        :param url: the node of the API the call was sent to
+        :type url: str
+        :param error: the exception raised by the call, None on success
+        :type error: BaseException | None
+        """
+        # A cancelled call tells nothing about the server, it only frees its trial.
+        cancelled = error is not None and not isinstance(error, Exception)
+        outcomes = zip(
+            self._keys(svc, url),
+            (
+                error is not None and isinstance(error, self.trip_on),
+                error is not None and isinstance(error, self.node_trip_on),
+            ),
+            strict=True,
+        )
+        now = self._clock()
+        with self._lock:
+            for key, failed in outcomes:
+                circuit = self._circuits.setdefault(key, _Circuit())
+                if circuit.state == HALF_OPEN:
+                    circuit.trials = max(0, circuit.trials - 1)
+                if cancelled and not failed:
+                    continue
+                if not failed:
+                    if circuit.state != OPEN:
+                        circuit.state = CLOSED
+                        circuit.failures = 0
+                    continue
+                circuit.failures += 1
+                if circuit.state == HALF_OPEN or (
+                    circuit.state == CLOSED
+                    and circuit.failures >= self.failure_threshold
+                ):
+                    circuit.state = OPEN
+                    circuit.opened_at = now
+                    circuit.trips += 1
+
+    @contextmanager
+    def guard(self, svc: str, url: str) -> Iterator[None]:
+        """Let a call through and record its outcome when the block is left.
+
+        :param svc: the Wialon API service
+        :type svc: str
+        :param url: the node of the API the call is sent to
+        :type url: str
+        :raises CircuitOpenError: The circuit of the service or of the node is open.
+        :return: nothing, the block sends the call
+        :rtype: Iterator[None]
+        """
+        self.allow(svc, url)
+        try:
+            yield
+        except BaseException as exc:
+            self.record(svc, url, exc)
+            raise
+        self.record(svc, url, None)
+
+    def stats(self) -> dict[CircuitKey, BreakerStats]:
+        """Return the state of each circuit.
+
+        :return: the snapshot of each circuit keyed by ("svc", service) or
+                 ("endpoint", URL)
+        :rtype: dict[CircuitKey, BreakerStats]
+        """
+        now = self._clock()
+        with self._lock:
+            return {
+                key: BreakerStats(
+                    state=circuit.state,
+                    failures=circuit.failures,
+                    trips=circuit.trips,
+                    rejected=circuit.rejected,
+                    retry_in=(
+                        max(0.0, circuit.opened_at + self.reset_timeout - now)
+                        if circuit.state == OPEN
+                        else 0.0
+                    ),
+                )
+                for key, circuit in self._circuits.items()
+            }
+
+    def reset(self) -> None:
+        """Close every circuit and clear the counters."""
+        with self._lock:
+            self._circuits.clear()
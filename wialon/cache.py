@@ -0,0 +1,253 @@
+"""In-memory cache of the responses of read-only services.
+
+Only the services listed in the time-to-live table of a :class:`ResponseCache`
+are cached, ``core/search_items`` and ``core/get_account_data`` among them, so
+calls that change data always reach the API. Entries are keyed on the service,
+the parameters normalized to canonical JSON and the user of the session, expire
+after the time-to-live of their service and are evicted least recently used
+first once the cache holds too many entries or bytes. The module does no I/O, so
+the synchronous and asynchronous clients share it.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from .protocol import Params, dumps, loads
+
+# Seconds each read-only service is cached for. Searches return items that change
+# when they are edited, the account data and billing checks almost never.
+DEFAULT_TTLS: dict[str, float] = {
+    "core/search_items": 60.0,
+    "core/search_item": 60.0,
+    "core/get_account_data": 300.0,
+    "core/check_items_billing": 300.0,
+}
+
+CacheKey = tuple[str, str, str]
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """The counters of a response cache.
+
+    :ivar int hits: the calls answered from the cache
+    :ivar int misses: the cacheable calls sent to the API
+    :ivar int evictions: the entries dropped to respect the size bounds
+    :ivar int expirations: the entries dropped because their time-to-live elapsed
+    :ivar int invalidations: the entries dropped by :meth:`ResponseCache.invalidate`
+    :ivar int entries: the entries held
+    :ivar int size: the bytes of the responses held
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    invalidations: int
+    entries: int
+    size: int
+
+    @property
+    def hit_ratio(self) -> float:
+        """Return the share of cacheable calls answered from the cache.
+
+        :return: the ratio between 0 and 1, 0 before the first call
+        :rtype: float
+        """
+        calls = self.hits + self.misses
+        return self.hits / calls if calls else 0.0
+
+
+class ResponseCache:
+    """LRU cache of the responses of read-only services, with a TTL per service.
+
+    Responses are kept serialized, so every hit returns new objects that the
+    caller may modify, and the size bound counts the real bytes held.
+    """
+
+    def __init__(
+        self,
+        ttls: dict[str, float] | None = None,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the cache.
+
+        :param ttls: the seconds each service is cached for, defaults to
+                     :data:`DEFAULT_TTLS`. Services missing from the table are
+                     never cached.
+        :type ttls: dict[str, float] | None, optional
+        :param max_entries: the maximum number of responses held, defaults to 1024
+        :type max_entries: int, optional
+        :param max_bytes: the maximum bytes of the responses held, defaults to 64 MiB
+        :type max_bytes: int, optional
+        :param clock: the monotonic clock, defaults to time.monotonic
+        :type clock: Callable[[], float], optional
+        """
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._entries: OrderedDict[CacheKey, tuple[float, bytes]] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    def is_cacheable(self, svc: str) -> bool:
+        """Return whether the responses of a service are cached.
+
+        :param svc: the Wialon API service
+        :type svc: str
+        :return: whether the service has a positive time-to-live
+        :rtype: bool
+        """
+        return self.ttls.get(svc, 0) > 0
+
+    @staticmethod
+    def key(svc: str, params: Params, user: str) -> CacheKey:
+        """Return the key of a call.
+
+        :param svc: the Wialon API service
+        :type svc: str
+        :param params: the parameters of the call
+        :type params: Params
+        :param user: the user the session belongs to
+        :type user: str
+        :return: the service, the canonical JSON of the parameters and the user
+        :rtype: CacheKey
+        """
+        normalized = json.dumps(
+            params if params is not None else {},
+            sort_keys=True,
+            separators=(",", ":"),
+            default=str,
+        )
+        return (svc, normalized, user)
+
+    def get(self, svc: str, params: Params, user: str) -> Any:  # noqa: ANN401
+        """Return the cached response of a call.
+
+        :param svc: the Wialon API service
+        :type svc: str
+        :param params: the parameters of the call
+        :type params: Params
+        :param user: the user the session belongs to
+        :type user: str
+        :return: a new copy of the response, None on a miss
+        :rtype: Any
+        """
+        key = self.key(svc, params, user)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= self._clock():
+                self._drop(key)
+                self._expirations += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+        return loads(entry[1])
+
+    def put(self, svc: str, params: Params, user: str, response: object) -> None:
+        """Store the response of a call of a cacheable service.
+
+        :param svc: the Wialon API service
+        :type svc: str
+        :param params: the parameters of the call
+        :type params: Params
+        :param user: the user the session belongs to
+        :type user: str
+        :param response: the decoded response
+        :type response: object
+        """
+        ttl = self.ttls.get(svc, 0)
+        if ttl <= 0:
+            return
+        body = dumps(response).encode()
+        if len(body) > self.max_bytes:
+            return
+        key = self.key(svc, params, user)
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (self._clock() + ttl, body)
+            self._size += len(body)
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._size > self.max_bytes
+            ):
+                self._drop(next(iter(self._entries)))
+                self._evictions += 1
+
+    def invalidate(
+        self,
+        svc: str | None = None,
+        params: Params = None,
+        user: str | None = None,
+    ) -> int:
+        """Drop cached responses, e.g. after changing an item.
+
+        :param svc: drop only the responses of this service, defaults to all
+        :type svc: str | None, optional
+        :param params: drop only the response of these parameters of ``svc``,
+                       defaults to every parameter
+        :type params: Params, optional
+        :param user: drop only the responses of this user, defaults to all users
+        :type user: str | None, optional
+        :return: the number of responses dropped
+        :rtype: int
+        """
+        normalized = self.key("", params, "")[1] if params is not None else None
+        with self._lock:
+            keys = [
+                key
+                for key in self._entries
+                if (svc is None or key[0] == svc)
+                and (normalized is None or key[1] == normalized)
+                and (user is None or key[2] == user)
+            ]
+            for key in keys:
+                self._drop(key)
+            self._invalidations += len(keys)
+        return len(keys)
+
+    def clear(self) -> None:
+        """Drop every cached response."""
+        self.invalidate()
+
+    def stats(self) -> CacheStats:
+        """Return the counters of the cache.
+
+        :return: the hits, misses, evictions and size of the cache
+        :rtype: CacheStats
+        """
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                expirations=self._expirations,
+                invalidations=self._invalidations,
+                entries=len(self._entries),
+                size=self._size,
+            )
+
+    def _drop(self, key: CacheKey) -> None:
+        """Remove an entry, the lock being held.
+
+        :param key: the key of the entry
+        :type key: CacheKey
+        """
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry[1])
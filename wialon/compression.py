@@ -0,0 +1,116 @@
+"""Content-encoding negotiation and streaming decompression of responses."""
+
+import zlib
+from dataclasses import dataclass
+
+CHUNK_SIZE = 64 * 1024
+
+SUPPORTED_ENCODINGS = "gzip, deflate"
+
+
+def accept_encoding(compression: bool) -> str:  # noqa: FBT001
+    """Return the Accept-Encoding header to send.
+
+    :param compression: whether compressed responses are accepted
+    :type compression: bool
+    :return: the value of the header
+    :rtype: str
+    """
+    return SUPPORTED_ENCODINGS if compression else "identity"
+
+
+@dataclass
+class TransferStats:
+    """Byte counters of the responses received from the Wialon API.
+
+    :ivar str svc: the service that was called, ``*`` for accumulated counters
+    :ivar int calls: the number of responses counted
+    :ivar int wire_bytes: the bytes received from the network
+    :ivar int body_bytes: the bytes of the body after decompression
+    :ivar str encoding: the content encoding of the last response
+    """
+
+    svc: str = "*"
+    calls: int = 0
+    wire_bytes: int = 0
+    body_bytes: int = 0
+    encoding: str = "identity"
+
+    @property
+    def ratio(self) -> float:
+        """Return the compression ratio (body bytes per wire byte).
+
+        :return: the compression ratio, 1.0 when nothing was received
+        :rtype: float
+        """
+        if not self.wire_bytes:
+            return 1.0
+        return self.body_bytes / self.wire_bytes
+
+    def add(self, other: "TransferStats") -> None:
+        """Accumulate the counters of another transfer.
+
+        :param other: the transfer to add
+        :type other: TransferStats
+        """
+        self.calls += other.calls
+        self.wire_bytes += other.wire_bytes
+        self.body_bytes += other.body_bytes
+        self.encoding = other.encoding
+
+
+class StreamDecoder:
+    """Incrementally decode a response body while counting its bytes."""
+
+    def __init__(self, svc: str, encoding: str | None) -> None:
+        """Initialize the decoder for the Content-Encoding of a response.
+
+        :param svc: the service that was called
+        :type svc: str
+        :param encoding: the Content-Encoding header of the response
+        :type encoding: str | None
+        """
+        self._encoding = (encoding or "identity").strip().lower()
+        self.stats = TransferStats(svc=svc, calls=1, encoding=self._encoding)
+        self._first_chunk = True
+        self._decompressor: zlib._Decompress | None = None
+        if self._encoding in ("gzip", "x-gzip"):
+            self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif self._encoding == "deflate":
+            self._decompressor = zlib.decompressobj()
+
+    def decompress(self, chunk: bytes) -> bytes:
+        """Decode a chunk of the body received from the network.
+
+        :param chunk: the raw chunk
+        :type chunk: bytes
+        :return: the decoded bytes available so far
+        :rtype: bytes
+        """
+        self.stats.wire_bytes += len(chunk)
+        if self._decompressor is None:
+            data = chunk
+        elif self._encoding == "deflate" and self._first_chunk:
+            # Some servers send raw deflate streams without the zlib header.
+            try:
+                data = self._decompressor.decompress(chunk)
+            except zlib.error:
+                self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+                data = self._decompressor.decompress(chunk)
+        else:
+            data = self._decompressor.decompress(chunk)
+        self._first_chunk = False
+        self.stats.body_bytes += len(data)
+        return data
+
+    def flush(self) -> bytes:
+        """Return the bytes still buffered by the decompressor.
+
+        :return: the remaining decoded bytes
+        :rtype: bytes
+        """
+        if self._decompressor is None:
+            return b""
+        data = self._decompressor.flush()
+        self.stats.body_bytes += len(data)
+        return data
@@ -0,0 +1,180 @@
+"""Single-flight deduplication of identical in-flight API calls.
+
+When several threads ask for the same thing at the same moment, e.g. the last
+message of a unit with ``messages/load_last`` or an item with
+``core/search_item``, only the first call is sent. The calls made with the same
+service, parameters and session while it is in flight wait for its response and
+get the same result, or the same exception. The clients only share the calls of
+idempotent services, as told by their retry policy, so calls that change data
+are always sent. Calls that open or close a session, listed in
+:data:`NO_DEDUP`, are never shared either: each login must get a session of its
+own even when it uses the same token.
+"""
+
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+from .protocol import Params, dumps, loads
+
+T = TypeVar("T")
+
+FlightKey = tuple[str, str, str]
+
+NO_DEDUP = frozenset(
+    {
+        "token/login",
+        "core/use_auth_hash",
+        "core/duplicate",
+        "core/create_auth_hash",
+        "core/logout",
+    },
+)
+
+
+@dataclass(frozen=True)
+class DedupStats:
+    """The counters of a single-flight group.
+
+    :ivar int calls: the calls that went through the group
+    :ivar int shared: the calls answered by the round trip of an identical call
+    :ivar int in_flight: the distinct calls currently waiting for a response
+    """
+
+    calls: int
+    shared: int
+    in_flight: int
+
+    @property
+    def shared_ratio(self) -> float:
+        """Return the share of calls that did not need a round trip of their own.
+
+        :return: the ratio between 0 and 1, 0 before the first call
+        :rtype: float
+        """
+        return self.shared / self.calls if self.calls else 0.0
+
+
+class BaseSingleFlight:
+    """Keys and counters shared by the single-flight groups."""
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self._calls = 0
+        self._shared = 0
+
+    @staticmethod
+    def key(svc: str, params: Params, sid: str | None) -> FlightKey:
+        """Return the key identical calls share.
+
+        :param svc: the Wialon API service
+        :type svc: str
+        :param params: the parameters of the call
+        :type params: Params
+        :param sid: the session ID of the call
+        :type sid: str | None
+        :return: the service, the JSON of the parameters and the session
+        :rtype: FlightKey
+        """
+        # Not canonical: the same call built with its keys in another order is
+        # merely sent on its own.
+        return (svc, dumps(params), sid or "")
+
+    @staticmethod
+    def _copy(result: T) -> T:
+        """Return a copy of a shared result, so that callers may modify theirs.
+
+        :param result: the decoded response
+        :type result: T
+        :return: a new copy, or the result itself when it is immutable
+        :rtype: T
+        """
+        if isinstance(result, (bytes, str, int, float)) or result is None:
+            return result
+        return loads(dumps(result))
+
+
+class _Flight:
+    """A call in flight, and the event its waiters block on."""
+
+    __slots__ = ("done", "error", "result")
+
+    def __init__(self) -> None:
+        """Initialize the flight; the event is only created for waiters."""
+        self.done: threading.Event | None = None
+        self.error: BaseException | None = None
+        self.result: Any = None
+
+
+class SingleFlight(BaseSingleFlight):
+    """Share one round trip between the identical calls of concurrent threads."""
+
+    def __init__(self) -> None:
+        """Initialize the group."""
+        super().__init__()
+        self._lock = threading.Lock()
+        self._flights: dict[FlightKey, _Flight] = {}
+
+    def do(
+        self,
+        svc: str,
+        params: Params,
+        sid: str | None,
+        send: Callable[[], T],
+    ) -> T:
+        """Send a call, or wait for the identical call already in flight.
+
+        :param svc: the Wialon API service
+        :type svc: str
+        :param params: the parameters of the call
+        :type params: Params
+        :param sid: the session ID of the call
+        :type sid: str | None
+        :param send: sends the call and returns its result
+        :type send: Callable[[], T]
+        :return: the result of the call, a copy of it for the calls that waited
+        :rtype: T
+        """
+        key = self.key(svc, params, sid)
+        with self._lock:
+            self._calls += 1
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+                waiting = None
+            else:
+                self._shared += 1
+                if flight.done is None:
+                    flight.done = threading.Event()
+                waiting = flight.done
+        if waiting is not None:
+            waiting.wait()
+            if flight.error is not None:
+                raise flight.error
+            return self._copy(flight.result)
+        try:
+            flight.result = send()
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+                done = flight.done
+            if done is not None:
+                done.set()
+        return flight.result
+
+    def stats(self) -> DedupStats:
+        """Return the counters of the group.
+
+        :return: the calls, the shared calls and the calls in flight
+        :rtype: DedupStats
+        """
+        with self._lock:
+            return DedupStats(
+                calls=self._calls,
+                shared=self._shared,
+                in_flight=len(self._flights),
+            )
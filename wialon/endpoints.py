@@ -0,0 +1,199 @@
+"""Selection of the API endpoint of each request.
+
+A client can be given several URLs of the Wialon API. Each request is sent to
+the healthy endpoint with the lowest smoothed latency, except that a session
+keeps using the endpoint that issued it while that endpoint is healthy. An
+endpoint that fails to answer (connection error or timeout) is skipped for a
+cooldown period, after which it is tried again.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from urllib.parse import urlparse
+
+
+@dataclass
+class Endpoint:
+    """An API endpoint and its health.
+
+    :ivar str url: the URL of the API
+    :ivar float | None latency: the smoothed latency in seconds, None until measured
+    :ivar int requests: the requests answered by the endpoint
+    :ivar int failures: the requests the endpoint failed to answer
+    :ivar float down_until: the monotonic time until which the endpoint is skipped
+    """
+
+    url: str
+    latency: float | None = None
+    requests: int = 0
+    failures: int = 0
+    down_until: float = 0.0
+
+    @property
+    def host(self) -> str:
+        """Return the host and port of the endpoint.
+
+        :return: the network location of the URL
+        :rtype: str
+        """
+        return urlparse(self.url).netloc
+
+    def is_healthy(self, now: float) -> bool:
+        """Return whether the endpoint can be used.
+
+        :param now: the current monotonic time
+        :type now: float
+        :return: whether the cooldown of the last failure is over
+        :rtype: bool
+        """
+        return now >= self.down_until
+
+
+@dataclass(frozen=True)
+class EndpointStats:
+    """Snapshot of the health of an endpoint.
+
+    :ivar str url: the URL of the API
+    :ivar bool healthy: whether the endpoint is used
+    :ivar float | None latency: the smoothed latency in seconds
+    :ivar int requests: the requests answered by the endpoint
+    :ivar int failures: the requests the endpoint failed to answer
+    :ivar int sessions: the sessions bound to the endpoint
+    """
+
+    url: str
+    healthy: bool
+    latency: float | None
+    requests: int
+    failures: int
+    sessions: int
+
+
+class EndpointSet:
+    """Health tracking, latency-based selection and session affinity."""
+
+    def __init__(
+        self,
+        urls: list[str],
+        cooldown: float = 30.0,
+        alpha: float = 0.3,
+    ) -> None:
+        """Initialize the endpoints.
+
+        :param urls: the URLs of the API, the first one is preferred on ties
+        :type urls: list[str]
+        :param cooldown: seconds an endpoint is skipped after a failure, defaults
+                         to 30.0
+        :type cooldown: float, optional
+        :param alpha: weight of the last request in the smoothed latency,
+                      defaults to 0.3
+        :type alpha: float, optional
+        :raises ValueError: If no URL is given.
+        """
+        if not urls:
+            msg = "At least one API URL is required."
+            raise ValueError(msg)
+        self._endpoints = [Endpoint(url) for url in urls]
+        self._cooldown = cooldown
+        self._alpha = alpha if 0 < alpha <= 1 else 0.3
+        self._sessions: dict[str, Endpoint] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of endpoints.
+
+        :return: the number of endpoints
+        :rtype: int
+        """
+        return len(self._endpoints)
+
+    def select(self, sid: str | None = None) -> Endpoint:
+        """Return the endpoint to send a request to.
+
+        :param sid: the session ID of the request, defaults to None
+        :type sid: str | None, optional
+        :return: the endpoint bound to the session when it is healthy, otherwise
+                 the healthy endpoint with the lowest latency, or the one that
+                 recovers first when none is healthy
+        :rtype: Endpoint
+        """
+        now = time.monotonic()
+        with self._lock:
+            bound = self._sessions.get(sid) if sid else None
+            if bound is not None and bound.is_healthy(now):
+                return bound
+            healthy = [
+                endpoint for endpoint in self._endpoints if endpoint.is_healthy(now)
+            ]
+            if not healthy:
+                return min(self._endpoints, key=lambda endpoint: endpoint.down_until)
+            return min(healthy, key=lambda endpoint: endpoint.latency or 0.0)
+
+    def succeeded(self, endpoint: Endpoint, latency: float) -> None:
+        """Record a request answered by an endpoint.
+
+        :param endpoint: the endpoint
+        :type endpoint: Endpoint
+        :param latency: the seconds the request took
+        :type latency: float
+        """
+        with self._lock:
+            endpoint.requests += 1
+            endpoint.down_until = 0.0
+            if endpoint.latency is None:
+                endpoint.latency = latency
+            else:
+                endpoint.latency += self._alpha * (latency - endpoint.latency)
+
+    def failed(self, endpoint: Endpoint) -> None:
+        """Record a request an endpoint failed to answer and skip it for a while.
+
+        :param endpoint: the endpoint
+        :type endpoint: Endpoint
+        """
+        with self._lock:
+            endpoint.failures += 1
+            if len(self._endpoints) > 1:
+                endpoint.down_until = time.monotonic() + self._cooldown
+
+    def bind(self, sid: str, endpoint: Endpoint) -> None:
+        """Keep a session on the endpoint that issued it.
+
+        :param sid: the session ID
+        :type sid: str
+        :param endpoint: the endpoint that issued the session
+        :type endpoint: Endpoint
+        """
+        with self._lock:
+            self._sessions[sid] = endpoint
+
+    def forget(self, sid: str) -> None:
+        """Drop the endpoint of a session that was replaced or logged out.
+
+        :param sid: the session ID
+        :type sid: str
+        """
+        with self._lock:
+            self._sessions.pop(sid, None)
+
+    def stats(self) -> list[EndpointStats]:
+        """Return the health of each endpoint.
+
+        :return: the health of each endpoint
+        :rtype: list[EndpointStats]
+        """
+        now = time.monotonic()
+        with self._lock:
+            bound = list(self._sessions.values())
+            return [
+                EndpointStats(
+                    url=endpoint.url,
+                    healthy=endpoint.is_healthy(now),
+                    latency=endpoint.latency,
+                    requests=endpoint.requests,
+                    failures=endpoint.failures,
+                    sessions=sum(1 for other in bound if other is endpoint),
+                )
+                for endpoint in self._endpoints
+            ]
@@ -0,0 +1,65 @@
+"""The interface the managers send their calls through.
+
+The managers of :mod:`wialon` are bound to an engine: a
+:class:`~wialon.wialon.Wialon` client, a
+:class:`~wialon.session_pool.SessionPool` spreading the calls over several
+sessions, or a :class:`~wialon.session_pool.SessionLease` keeping one session
+for a job. :class:`Engine` is what they have in common.
+"""
+
+from collections.abc import Iterator
+from typing import TYPE_CHECKING, Any, Protocol
+
+if TYPE_CHECKING:
+    from .extra import Extra
+    from .message_store import MessageStore
+    from .protocol import Params
+
+
+class SessionAuth(Protocol):
+    """The session of an engine."""
+
+    def get_sid(self) -> str:
+        """Return the session ID given to the calls of the engine."""
+        ...
+
+
+class Engine(Protocol):
+    """Sends the calls of the managers of :mod:`wialon`."""
+
+    @property
+    def auth(self) -> SessionAuth:
+        """Return the session of the engine."""
+        ...
+
+    @property
+    def message_store(self) -> "MessageStore | None":
+        """Return the message store of the client, None when it has none."""
+        ...
+
+    @property
+    def extra(self) -> "Extra":
+        """Return the Extra manager bound to the engine."""
+        ...
+
+    def request(
+        self,
+        svc: str,
+        params: "Params" = None,
+        sid: str | None = None,
+        send_file: dict[str, Any] | None = None,
+        **kwargs: bool | str | int,
+    ) -> dict[str, Any] | list[dict[str, Any]] | bytes:
+        """Make a request, see :meth:`Wialon.request`."""
+        ...
+
+    def request_stream(
+        self,
+        svc: str,
+        params: dict[str, Any] | None = None,
+        sid: str | None = None,
+        key: str = "messages",
+        **kwargs: bool | str | int,
+    ) -> Iterator[Any]:
+        """Stream an array of the response, see :meth:`Wialon.request_stream`."""
+        ...
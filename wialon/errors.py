@@ -130,6 +130,14 @@ class ParameterError(Exception):
     """Parameter error."""
 
 
+class DeadlineExceededError(Exception):
+    """The deadline of the call elapsed before it was answered."""
+
+
+class CircuitOpenError(Exception):
+    """The circuit breaker of the service or node is open; the call was not sent."""
+
+
 ERROR_CODES = {
     1: InvalidSessionError,
     2: InvalidServiceNameError,
@@ -10,23 +10,141 @@ from typing import TYPE_CHECKING, Any
 from wialon.errors import FormatError, NoFileReturnedError
 
 if TYPE_CHECKING:
-    from .wialon import Wialon
+    from .engine import Engine
 
 
-class Exchange:
+class BaseExchange:
+    """Export parameters and file handling shared by the exchange managers."""
+
+    def __init__(self) -> None:
+        """Initialize the supported formats."""
+        self._formats = ["txt", "kml", "plt", "wln", "wlb"]
+
+    @staticmethod
+    def _import_params(unit_id: int, event_hash: str | None) -> dict[str, int | str]:
+        """Build the parameters to import messages to a unit.
+
+        :param unit_id: The ID of the unit to import messages to.
+        :type unit_id: int
+        :param event_hash: Event Hash.
+        :type event_hash: str | None
+        :return: The parameters of the request.
+        :rtype: dict[str, int | str]
+        """
+        if event_hash is None:
+            return {
+                "itemId": unit_id,
+            }
+        return {
+            "itemId": unit_id,
+            "eventHash": event_hash,
+        }
+
+    def _export_by_layer_params(
+        self,
+        layer_name: str,
+        file_format: str,
+        *,
+        compress: bool,
+    ) -> dict[str, str | int]:
+        """Build the parameters to export messages by layer name.
+
+        :param layer_name: The name of the layer to export messages from.
+        :type layer_name: str
+        :param file_format: The format of the exported file.
+        :type file_format: str
+        :param compress: Whether to compress the exported file.
+        :type compress: bool
+        :raises FormatError: If the provided file format is not supported.
+        :return: The parameters of the request.
+        :rtype: dict[str, str | int]
+        """
+        if file_format not in self._formats:
+            msg = "Invalid format"
+            raise FormatError(msg)
+
+        return {
+            "layerName": layer_name,
+            "format": file_format,
+            "compress": 1 * compress,
+        }
+
+    def _export_by_id_params(
+        self,
+        unit_id: int,
+        date_from: datetime,
+        date_to: datetime,
+        file_format: str,
+        *,
+        compress: bool,
+    ) -> dict[str, str | int]:
+        """Build the parameters to export messages by unit ID.
+
+        :param unit_id: The ID of the unit to export messages from.
+        :type unit_id: int
+        :param date_from: The start date of the messages to export.
+        :type date_from: datetime
+        :param date_to: The end date of the messages to export.
+        :type date_to: datetime
+        :param file_format: The format of the exported file.
+        :type file_format: str
+        :param compress: Whether to compress the exported file.
+        :type compress: bool
+        :raises FormatError: If the provided file format is not supported.
+        :return: The parameters of the request.
+        :rtype: dict[str, str | int]
+        """
+        if file_format not in self._formats:
+            msg = "Invalid file format"
+            raise FormatError(msg)
+
+        return {
+            "itemId": unit_id,
+            "timeFrom": int(datetime.timestamp(date_from)),
+            "timeTo": int(datetime.timestamp(date_to)),
+            "format": file_format,
+            "compress": 1 if compress else 0,
+        }
+
+    @staticmethod
+    def _save_export(
+        result: dict[str, Any] | list[dict[str, Any]] | bytes,
+        filepath: str | None,
+    ) -> bytes:
+        """Return the exported file and save it when a path is given.
+
+        :param result: The response of the export request.
+        :type result: dict[str, Any] | list[dict[str, Any]] | bytes
+        :param filepath: The path to save the exported file.
+        :type filepath: str | None
+        :raises NoFileReturnedError: If the response is not a file.
+        :return: The exported file.
+        :rtype: bytes
+        """
+        if not isinstance(result, bytes):
+            msg = "No file returned"
+            raise NoFileReturnedError(msg)
+        if filepath:
+            path: Path = Path(filepath)
+            with Path.open(path, "wb") as f:
+                f.write(result)
+        return result
+
+
+class Exchange(BaseExchange):
     """The Exchange class.
 
     Provides methods for importing and exporting messages from Wialon.
     """
 
-    def __init__(self, engine: "Wialon") -> None:
+    def __init__(self, engine: "Engine") -> None:
         """Initialize the Exchange class.
 
         :param engine: The Wialon engine.
-        :type engine: Wialon
+        :type engine: Engine
         """
+        super().__init__()
         self._engine = engine
-        self._formats = ["txt", "kml", "plt", "wln", "wlb"]
 
     def import_messages(
         self,
@@ -46,15 +164,7 @@ class Exchange:
         :rtype: dict[str, Any] | list[dict[str, Any]] | bytes
         """
         svc = "exchange/import_messages"
-        if event_hash is None:
-            params: dict[str, int | str] = {
-                "itemId": unit_id,
-            }
-        else:
-            params: dict[str, int | str] = {
-                "itemId": unit_id,
-                "eventHash": event_hash,
-            }
+        params = self._import_params(unit_id, event_hash)
         path: Path = Path(filepath)
         with Path.open(path, "rb") as file:
             files = {
@@ -91,31 +201,17 @@ class Exchange:
         :return: The result of the export operation.
         :rtype: str
         """
-        if file_format not in self._formats:
-            msg = "Invalid format"
-            raise FormatError(msg)
-
         svc = "exchange/export_messages"
-        params = {
-            "layerName": layer_name,
-            "format": file_format,
-            "compress": 1 * compress,
-        }
+        params = self._export_by_layer_params(
+            layer_name, file_format, compress=compress,
+        )
         result = self._engine.request(
             svc,
             params,
             sid=self._engine.auth.get_sid(),
             file=True,
         )
-        if filepath and isinstance(result,bytes):
-            path: Path = Path(filepath)
-            with Path.open(path, "wb") as f:
-                f.write(result)
-            return result
-        if isinstance(result,bytes):
-            return result
-        msg = "No file returned"
-        raise NoFileReturnedError(msg)
+        return self._save_export(result, filepath)
 
     def export_messages_by_id(
         self,
@@ -140,29 +236,18 @@ class Exchange:
         :return: The result of the export operation.
         :rtype: bytes
         """
-        filepath = kwargs.get("filepath")
-        compress = kwargs.get("compress", False)
-        if file_format not in self._formats:
-            msg = "Invalid file format"
-            raise FormatError(msg)
+        _filepath = kwargs.get("filepath")
+        filepath = _filepath if isinstance(_filepath, str) else None
+        compress = bool(kwargs.get("compress", False))
 
         svc = "exchange/export_messages"
-        params = {
-            "itemId": unit_id,
-            "timeFrom": int(datetime.timestamp(date_from)),
-            "timeTo": int(datetime.timestamp(date_to)),
-            "format": file_format,
-            "compress": 1 if compress else 0,
-        }
+        params = self._export_by_id_params(
+            unit_id, date_from, date_to, file_format, compress=compress,
+        )
         result = self._engine.request(
             svc,
             params,
             sid=self._engine.auth.get_sid(),
             file=True,
         )
-        if filepath is str and result is bytes:
-            path: Path = Path(filepath)
-            with Path.open(path) as f:
-                f.write(result)
-            return result
-        return b""
+        return self._save_export(result, filepath)
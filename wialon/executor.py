@@ -0,0 +1,68 @@
+"""Bounded fan-out of a function over many items, e.g. the units of a fleet.
+
+:func:`bounded_map` runs the calls in a pool of threads but only keeps a few
+of them queued at a time, so mapping over hundreds of thousands of units neither
+creates that many futures up front nor sends more requests at once than the
+connection pool of the client holds.
+"""
+
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import copy_context
+from itertools import islice
+from typing import TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def bounded_map(  # noqa: UP047
+    fn: Callable[[T], R],
+    iterable: Iterable[T],
+    max_workers: int = 10,
+    *,
+    return_exceptions: bool = False,
+) -> Iterator[R | Exception]:
+    """Call a function on every item in a pool of threads.
+
+    Like :meth:`concurrent.futures.Executor.map`, the results are yielded in the
+    order of the items, but the items are read lazily and at most twice
+    ``max_workers`` calls are queued at any time. Each call runs in a copy of the
+    context of the caller, so a :func:`~wialon.timeouts.deadline` applies to it.
+    Closing the iterator cancels the queued calls and waits for the running ones.
+
+    :param fn: the function called with each item
+    :type fn: Callable[[T], R]
+    :param iterable: the items
+    :type iterable: Iterable[T]
+    :param max_workers: the calls running at the same time, defaults to 10
+    :type max_workers: int, optional
+    :param return_exceptions: yield the exception raised by a call instead of
+                              raising it and cancelling the remaining calls,
+                              defaults to False
+    :type return_exceptions: bool, optional
+    :return: the result of each call, in the order of the items
+    :rtype: Iterator[R | Exception]
+    """
+    max_workers = max_workers if max_workers > 0 else 10
+    items = iter(iterable)
+    executor = ThreadPoolExecutor(max_workers, thread_name_prefix="wialon-map")
+    pending: deque[Future] = deque(
+        executor.submit(copy_context().run, fn, item)
+        for item in islice(items, 2 * max_workers)
+    )
+    try:
+        while pending:
+            future = pending.popleft()
+            for item in islice(items, 1):
+                pending.append(executor.submit(copy_context().run, fn, item))
+            try:
+                result = future.result()
+            except Exception as exc:
+                if not return_exceptions:
+                    raise
+                result = exc
+            yield result
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
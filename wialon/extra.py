@@ -1,7 +1,6 @@
 """This module contains the Extra class."""
 
 from typing import TYPE_CHECKING, Any
-from typing import Any as Wialon
 
 from wialon.errors import (
     InvalidInputError,
@@ -10,17 +9,59 @@ from wialon.errors import (
 )
 
 if TYPE_CHECKING:
-    from . import Wialon
+    from .engine import Engine
 
 
-class Extra:
+class BaseExtra:
+    """Batch error and result handling shared by the extra managers."""
+
+    @staticmethod
+    def _batch_error(exc: Exception) -> Exception:
+        """Translate the error raised by a batch request.
+
+        :param exc: The error raised by the request.
+        :type exc: Exception
+        :return: The error to raise to the caller.
+        :rtype: Exception
+        """
+        if isinstance(exc, UnknownError):
+            msg = "The returned result is too large."
+            return ValueError(msg)
+        if isinstance(exc, InvalidInputError):
+            msg = "Wrong input parameters."
+            return InvalidInputError(msg)
+        if isinstance(exc, ReachedLimitOfConcurrentRequestsError):
+            msg = "The flag is 1 and have 1 error in one of the requests."
+            return ReachedLimitOfConcurrentRequestsError(msg)
+        return exc
+
+    @staticmethod
+    def _batch_result(
+        response: dict[str, Any] | list[dict[str, Any]] | bytes,
+    ) -> list[dict[str, Any]]:
+        """Validate the response of a batch request.
+
+        :param response: The response of the batch request.
+        :type response: dict[str, Any] | list[dict[str, Any]] | bytes
+        :raises TypeError: If the response is not a list.
+        :return: The results of each request in the batch.
+        :rtype: list[dict[str, Any]]
+        """
+        if not isinstance(response, list):
+            msg = "Invalid response from the server."
+            raise TypeError(msg)
+        result: list[dict[str, Any]] = response
+        return result
+
+
+class Extra(BaseExtra):
     """The Extra class is used to perform extra requests to the Wialon API."""
 
-    def __init__(self, engine: "Wialon") -> None:
+    def __init__(self, engine: "Engine") -> None:
         """Initialize the Extra class.
 
         :param engine: The Wialon object.
-        :type engine: Wialon
+        :type engine: Engine
         """
         self._engine = engine
 
@@ -44,20 +85,12 @@ class Extra:
                 "core/batch",
                 params,
                 self._engine.auth.get_sid(),
-                timeout=60*5,
             )
-        except UnknownError as exc:
-            msg = "The returned result is too large."
-            raise ValueError(msg) from exc
-        except InvalidInputError as exc:
-            msg = "Wrong input parameters."
-            raise InvalidInputError(msg) from exc
-        except ReachedLimitOfConcurrentRequestsError as exc:
-            msg = "The flag is 1 and have 1 error in one of the requests."
-            raise ReachedLimitOfConcurrentRequestsError(msg) from exc
+        except (
+            UnknownError,
+            InvalidInputError,
+            ReachedLimitOfConcurrentRequestsError,
+        ) as exc:
+            raise self._batch_error(exc) from exc
 
-        if not isinstance(response, list):
-            msg = "Invalid response from the server."
-            raise TypeError(msg)
-        result: list[dict[str, Any]] = response
-        return result
+        return self._batch_result(response)
@@ -0,0 +1,748 @@
+"""In-process stand-in for the Wialon API.
+
+:class:`FakeWialonServer` simulates the services the SDK uses (``token/login``,
+``core/search_items``, ``messages/load_interval``, ``report/*``, ``core/batch``,
+``exchange/*``...) with generated data. Latency, payload sizes and failures
+are configurable, so the client can be exercised and benchmarked offline::
+
+    server = FakeWialonServer(latency=0.02, units=5000, messages=100_000)
+    client = Wialon(FAKE_URL, "token", transport=FakeTransport(server))
+
+Failures follow the behaviour of the real API: calls beyond ``max_concurrency``
+in flight on a session answer error 10, empty intervals answer error 1001,
+loads beyond ``max_messages`` answer error 1004, sessions dropped with
+:meth:`FakeWialonServer.expire` answer error 1, and
+:meth:`FakeWialonServer.inject` or ``error_rate`` return any other code
+(5 by default). :meth:`FakeWialonServer.serve` exposes the same server over
+HTTP for tools that need real sockets.
+"""
+
+import gzip
+import random
+import threading
+import time
+from collections import Counter, OrderedDict
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+from loguru import logger
+
+from .protocol import Params, dumps, loads
+
+FAKE_URL = "http://wialon.fake/wialon/ajax.html"
+
+# Services that answer with a file instead of a JSON document.
+FILE_SERVICES = frozenset({"exchange/export_messages", "report/export_result"})
+
+_CACHE_SIZE = 32
+
+
+@dataclass
+class _Injection:
+    """An error returned by the next calls of a service."""
+
+    code: int
+    svc: str | None
+    remaining: int
+
+
+@dataclass
+class FakeCall:
+    """A call accepted by the fake server, answered once its latency has elapsed.
+
+    :ivar str svc: the service that was called
+    :ivar str sid: the session ID of the call
+    :ivar float delay: the seconds the answer takes
+    :ivar bytes body: the encoded answer
+    """
+
+    svc: str
+    sid: str
+    delay: float
+    body: bytes
+
+
+class FakeWialonServer:
+    """Simulated Wialon API with configurable latency, payloads and errors."""
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        units: int = 100,
+        messages: int = 1000,
+        report_rows: int = 100,
+        report_subrows: int = 5,
+        file_size: int = 64 * 1024,
+        max_concurrency: int = 0,
+        max_messages: int = 0,
+        error_rate: float = 0.0,
+        error_codes: tuple[int, ...] = (5,),
+        seed: int = 0,
+    ) -> None:
+        """Initialize the server.
+
+        :param latency: seconds each call takes, defaults to 0.0
+        :type latency: float, optional
+        :param jitter: seconds added at random to the latency, defaults to 0.0
+        :type jitter: float, optional
+        :param units: the number of units of the fleet, defaults to 100
+        :type units: int, optional
+        :param messages: the messages of a unit in any interval, one every 30
+                         seconds from its start and no later than its end,
+                         defaults to 1000
+        :type messages: int, optional
+        :param report_rows: the rows of the report table, defaults to 100
+        :type report_rows: int, optional
+        :param report_subrows: the sub rows of each row, defaults to 5
+        :type report_subrows: int, optional
+        :param file_size: the bytes of an exported file, defaults to 64 KiB
+        :type file_size: int, optional
+        :param max_concurrency: calls in flight per session past which error 10 is
+                                returned, defaults to 0 (no limit)
+        :type max_concurrency: int, optional
+        :param max_messages: messages per load past which error 1004 is returned,
+                             defaults to 0 (no limit)
+        :type max_messages: int, optional
+        :param error_rate: share of the calls answered with one of ``error_codes``,
+                           defaults to 0.0
+        :type error_rate: float, optional
+        :param error_codes: the codes returned at random, defaults to (5,)
+        :type error_codes: tuple[int, ...], optional
+        :param seed: the seed of the generated data and failures, defaults to 0
+        :type seed: int, optional
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.units = units
+        self.messages = messages
+        self.report_rows = report_rows
+        self.report_subrows = report_subrows
+        self.file_size = file_size
+        self.max_concurrency = max_concurrency
+        self.max_messages = max_messages
+        self.error_rate = error_rate
+        self.error_codes = error_codes
+        self.compress = True
+        self.down = False
+        self.calls: Counter[str] = Counter()
+        self.errors: Counter[int] = Counter()
+        self.logins = 0
+        self._random = random.Random(seed)  # noqa: S311
+        self._sessions: set[str] = set()
+        self._in_flight: Counter[str] = Counter()
+        self._injections: list[_Injection] = []
+        self._cache: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def inject(self, code: int, svc: str | None = None, count: int = 1) -> None:
+        """Answer the next calls with an error.
+
+        :param code: the error code, e.g. 1, 5, 10 or 1004
+        :type code: int
+        :param svc: the service that fails, defaults to any but ``token/login``
+        :type svc: str | None, optional
+        :param count: the number of calls that fail, defaults to 1
+        :type count: int, optional
+        """
+        with self._lock:
+            self._injections.append(_Injection(code, svc, count))
+
+    def expire(self, sid: str | None = None) -> None:
+        """Drop a session, or all of them, so their calls answer error 1.
+
+        :param sid: the session ID, defaults to every session
+        :type sid: str | None, optional
+        """
+        with self._lock:
+            if sid is None:
+                self._sessions.clear()
+            else:
+                self._sessions.discard(sid)
+
+    def begin(self, query: Mapping[str, Any]) -> FakeCall:
+        """Accept a call and compute its answer.
+
+        :param query: the parameters of the request (``svc``, ``sid`` and the
+                      JSON encoded ``params``)
+        :type query: Mapping[str, Any]
+        :raises ConnectionError: If the server is down.
+        :return: the call, to be passed to :meth:`end` once answered
+        :rtype: FakeCall
+        """
+        if self.down:
+            msg = "The fake Wialon server is down."
+            raise ConnectionError(msg)
+        svc = str(query.get("svc", ""))
+        sid = str(query.get("sid", ""))
+        raw = query.get("params") or "{}"
+        params = loads(raw) if isinstance(raw, (str, bytes)) else raw
+        with self._lock:
+            self.calls[svc] += 1
+            self._in_flight[sid] += 1
+            code = self._error(svc, sid, self._in_flight[sid])
+            delay = self.latency + self._random.uniform(0, self.jitter)
+        body: object = None
+        if not code:
+            try:
+                body = self._answer(svc, params)
+            except _ServiceError as exc:
+                code = exc.code
+        if code:
+            with self._lock:
+                self.errors[code] += 1
+            body = {"error": code}
+        if not isinstance(body, bytes):
+            body = dumps(body).encode()
+        return FakeCall(svc, sid, delay, body)
+
+    def end(self, call: FakeCall) -> None:
+        """Release the slot of an answered call.
+
+        :param call: the call returned by :meth:`begin`
+        :type call: FakeCall
+        """
+        with self._lock:
+            self._in_flight[call.sid] -= 1
+
+    def encode(self, call: FakeCall, accept_encoding: str | None) -> tuple[bytes, str]:
+        """Return the body of an answer and its Content-Encoding.
+
+        :param call: the answered call
+        :type call: FakeCall
+        :param accept_encoding: the Accept-Encoding header of the request
+        :type accept_encoding: str | None
+        :return: the body on the wire and its encoding
+        :rtype: tuple[bytes, str]
+        """
+        if self.compress and "gzip" in (accept_encoding or ""):
+            return gzip.compress(call.body, compresslevel=1), "gzip"
+        return call.body, "identity"
+
+    def _error(self, svc: str, sid: str, in_flight: int) -> int:
+        """Return the error code a call is answered with, 0 for none.
+
+        :param svc: the service that was called
+        :type svc: str
+        :param sid: the session ID of the call
+        :type sid: str
+        :param in_flight: the calls in flight on the session, this one included
+        :type in_flight: int
+        :return: the error code
+        :rtype: int
+        """
+        for injection in self._injections:
+            if injection.svc == svc or (
+                injection.svc is None and svc != "token/login"
+            ):
+                injection.remaining -= 1
+                if injection.remaining <= 0:
+                    self._injections.remove(injection)
+                return injection.code
+        if svc == "token/login":
+            return 0
+        if sid not in self._sessions:
+            return 1
+        if self.max_concurrency and in_flight > self.max_concurrency:
+            return 10
+        if self.error_rate and self._random.random() < self.error_rate:
+            return self._random.choice(self.error_codes)
+        return 0
+
+    def _answer(self, svc: str, params: Params) -> Any:  # noqa: ANN401, PLR0911
+        """Return the answer of a service.
+
+        :param svc: the service that was called
+        :type svc: str
+        :param params: the decoded parameters of the call
+        :type params: Params
+        :raises _ServiceError: If the service answers with an error.
+        :return: the decoded answer, or the bytes of a file
+        :rtype: Any
+        """
+        if not isinstance(params, (dict, list)):
+            raise _ServiceError(4)
+        if svc == "token/login":
+            return self._login()
+        if svc == "core/batch":
+            return self._batch(params)
+        if svc in FILE_SERVICES:
+            return self._file()
+        if not isinstance(params, dict):
+            raise _ServiceError(4)
+        if svc == "core/search_items":
+            return self._cached(svc, params, self._search_items)
+        if svc == "core/search_item":
+            return {"item": self._unit(int(params.get("id", 1)) - 1), "flags": 1}
+        if svc in ("messages/load_interval", "messages/load_last"):
+            return self._cached(svc, params, self._load_messages)
+        if svc == "report/get_result_rows":
+            return self._cached(svc, params, self._result_rows)
+        if svc.startswith(("report/", "exchange/", "render/")) or svc in (
+            "core/logout",
+            "core/get_account_data",
+            "core/check_items_billing",
+        ):
+            return self._simple(svc, params)
+        raise _ServiceError(2)
+
+    def _cached(
+        self,
+        svc: str,
+        params: dict[str, Any],
+        build: Any,  # noqa: ANN401
+    ) -> bytes:
+        """Return the encoded answer of a read service, generating it once.
+
+        Generating large answers costs more than decoding them, so the answers of
+        the last calls are kept until the payload sizes change.
+
+        :param svc: the service that was called
+        :type svc: str
+        :param params: the parameters of the call
+        :type params: dict[str, Any]
+        :param build: the function generating the answer from the parameters
+        :type build: Callable[[dict[str, Any]], Any]
+        :return: the encoded answer
+        :rtype: bytes
+        """
+        sizes = (self.units, self.messages, self.max_messages, self.report_rows,
+                 self.report_subrows)
+        key = f"{svc}{dumps(params)}{sizes}"
+        with self._lock:
+            body = self._cache.get(key)
+            if body is not None:
+                self._cache.move_to_end(key)
+                return body
+        body = dumps(build(params)).encode()
+        with self._lock:
+            self._cache[key] = body
+            if len(self._cache) > _CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return body
+
+    def _login(self) -> dict[str, Any]:
+        """Open a session.
+
+        :return: the answer of ``token/login``
+        :rtype: dict[str, Any]
+        """
+        with self._lock:
+            self.logins += 1
+            sid = f"{self._random.getrandbits(128):032x}"
+            self._sessions.add(sid)
+        return {
+            "host": "127.0.0.1",
+            "eid": sid,
+            "gis_sid": sid[:16],
+            "au": "fake",
+            "tm": int(time.time()),
+            "api": "wialon",
+            "wialon_version": "2.0",
+            "user": {"nm": "fake", "cls": 1, "id": 1, "prp": {}},
+            "classes": {"avl_unit": 2, "avl_resource": 3},
+            "features": {"unlim": 1, "svcs": {}},
+        }
+
+    def _batch(self, params: dict[str, Any] | list[Any]) -> list[Any]:
+        """Answer each call of a batch.
+
+        :param params: the calls, alone or under ``params`` with the flags
+        :type params: dict[str, Any] | list[Any]
+        :raises _ServiceError: If the batch is malformed.
+        :return: the answer of each call
+        :rtype: list[Any]
+        """
+        calls = params.get("params") if isinstance(params, dict) else params
+        if not isinstance(calls, list):
+            raise _ServiceError(4)
+        results: list[Any] = []
+        for call in calls:
+            svc = call.get("svc", "") if isinstance(call, dict) else ""
+            if svc in ("core/batch", "token/login") or svc in FILE_SERVICES:
+                results.append({"error": 4})
+                continue
+            try:
+                result = self._answer(svc, call.get("params") or {})
+            except _ServiceError as exc:
+                results.append({"error": exc.code})
+                continue
+            results.append(loads(result) if isinstance(result, bytes) else result)
+        return results
+
+    def _unit(self, index: int) -> dict[str, Any]:
+        """Generate a unit.
+
+        :param index: the index of the unit in the fleet
+        :type index: int
+        :return: the unit
+        :rtype: dict[str, Any]
+        """
+        return {
+            "nm": f"Unit {index + 1:05d}",
+            "cls": 2,
+            "id": index + 1,
+            "mu": 0,
+            "uacl": -1,
+            "pos": {"t": 1_700_000_000 + index, "y": 53.9 + index * 1e-4,
+                    "x": 27.5 + index * 1e-4, "z": 220, "s": 40, "c": 90, "sc": 9},
+            "lmsg": None,
+        }
+
+    def _search_items(self, params: dict[str, Any]) -> dict[str, Any]:
+        """Answer ``core/search_items`` with the units of the fleet.
+
+        :param params: the parameters of the call
+        :type params: dict[str, Any]
+        :return: the page of units between ``from`` and ``to``
+        :rtype: dict[str, Any]
+        """
+        index_from = max(0, int(params.get("from", 0)))
+        index_to = int(params.get("to", 0)) or self.units
+        index_to = min(index_to, self.units)
+        return {
+            "searchSpec": params.get("spec", {}),
+            "dataFlags": params.get("flags", 1),
+            "totalItemsCount": self.units,
+            "indexFrom": index_from,
+            "indexTo": index_to,
+            "items": [self._unit(index) for index in range(index_from, index_to)],
+        }
+
+    def _load_messages(self, params: dict[str, Any]) -> dict[str, Any]:
+        """Answer ``messages/load_interval`` with generated track points.
+
+        :param params: the parameters of the call
+        :type params: dict[str, Any]
+        :raises _ServiceError: If the interval has no messages, or more than
+                               ``max_messages`` would be loaded.
+        :return: the messages
+        :rtype: dict[str, Any]
+        """
+        start = max(0, int(params.get("timeFrom", 0)))
+        end = int(params.get("timeTo", start + 30 * self.messages))
+        count = min(
+            self.messages,
+            max(0, (end - start) // 30 + 1),
+            int(params.get("loadCount", self.messages)),
+        )
+        if not count:
+            raise _ServiceError(1001)
+        if self.max_messages and count > self.max_messages:
+            raise _ServiceError(1004)
+        return {"count": count, "messages": list(_track(start, count))}
+
+    def _result_rows(self, params: dict[str, Any]) -> list[dict[str, Any]]:
+        """Answer ``report/get_result_rows`` with the rows of the report table.
+
+        :param params: the parameters of the call
+        :type params: dict[str, Any]
+        :return: the rows between ``indexFrom`` and ``indexTo``
+        :rtype: list[dict[str, Any]]
+        """
+        index_from = max(0, int(params.get("indexFrom", 0)))
+        index_to = min(int(params.get("indexTo", 0)) or self.report_rows,
+                       self.report_rows)
+        return [_row(index, self.report_subrows) for index in range(index_from, index_to)]
+
+    def _simple(self, svc: str, params: dict[str, Any]) -> Any:  # noqa: ANN401, PLR0911
+        """Answer the services that return small documents.
+
+        :param svc: the service that was called
+        :type svc: str
+        :param params: the parameters of the call
+        :type params: dict[str, Any]
+        :return: the answer
+        :rtype: Any
+        """
+        if svc == "report/exec_report":
+            return {"remoteExec": 1}
+        if svc == "report/get_report_status":
+            return {"status": "4"}
+        if svc == "report/apply_report_result":
+            return {
+                "reportResult": {
+                    "tables": [{
+                        "name": "unit_trips",
+                        "label": "Trips",
+                        "rows": self.report_rows,
+                        "level": 2 if self.report_subrows else 1,
+                        "columns": 4,
+                        "header": ["Beginning", "End", "Duration", "Mileage"],
+                        "total": ["", "", "", ""],
+                    }],
+                    "stats": [["Report", "Trips"]],
+                },
+            }
+        if svc == "report/get_result_subrows":
+            row = int(params.get("rowIndex", 0))
+            return [
+                _row(row * 1000 + index, 0, level=1)
+                for index in range(self.report_subrows)
+            ]
+        if svc == "render/create_messages_layer":
+            return {"name": params.get("layerName", "layer"), "units": []}
+        if svc == "core/check_items_billing":
+            return []
+        return {}
+
+    def _file(self) -> bytes:
+        """Return the content of an exported file.
+
+        :return: ``file_size`` bytes of text
+        :rtype: bytes
+        """
+        line = b"1700000000;53.900000;27.500000;220;40;90;9\n"
+        return (line * (self.file_size // len(line) + 1))[: self.file_size]
+
+    def serve(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> tuple[ThreadingHTTPServer, str]:
+        """Serve the fake API over HTTP from a background thread.
+
+        :param host: the address to listen on, defaults to "127.0.0.1"
+        :type host: str, optional
+        :param port: the port to listen on, defaults to a free one
+        :type port: int, optional
+        :return: the HTTP server, to be shut down by the caller, and the API URL
+        :rtype: tuple[ThreadingHTTPServer, str]
+        """
+        handler = type("FakeWialonHandler", (_Handler,), {"server_api": self})
+        httpd = _HTTPServer((host, port), handler)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        url = f"http://{host}:{httpd.server_address[1]}/wialon/ajax.html"
+        logger.info(f"Fake Wialon API listening on {url}.")
+        return httpd, url
+
+
+class _ServiceError(Exception):
+    """Error code returned by a simulated service."""
+
+    def __init__(self, code: int) -> None:
+        super().__init__(code)
+        self.code = code
+
+
+def _track(start: int, count: int) -> Iterator[dict[str, Any]]:
+    """Generate the messages of a unit driving along a line.
+
+    :param start: the time of the first message
+    :type start: int
+    :param count: the number of messages
+    :type count: int
+    :return: an iterator over the messages
+    :rtype: Iterator[dict[str, Any]]
+    """
+    for index in range(count):
+        yield {
+            "t": start + index * 30,
+            "f": 1,
+            "tp": "ud",
+            "pos": {"y": 53.9 + index * 1e-5, "x": 27.5 + index * 1e-5,
+                    "c": 90, "z": 220, "s": 40 + index % 30, "sc": 9},
+            "i": 0,
+            "o": 0,
+            "lc": 0,
+            "rt": 0,
+            "p": {"pwr_ext": 13.8, "gsm": 4, "mileage": index * 0.25},
+        }
+
+
+def _row(index: int, subrows: int, level: int = 0) -> dict[str, Any]:
+    """Generate a row of the report table.
+
+    :param index: the index of the row
+    :type index: int
+    :param subrows: the number of sub rows of the row
+    :type subrows: int
+    :param level: the nesting level of the row, defaults to 0
+    :type level: int, optional
+    :return: the row
+    :rtype: dict[str, Any]
+    """
+    begin = 1_700_000_000 + index * 3600
+    return {
+        "n": index,
+        "i1": index,
+        "i2": index + 1,
+        "t1": begin,
+        "t2": begin + 1800,
+        "d": subrows,
+        "mx": 0,
+        "l": level,
+        "c": [
+            {"t": str(begin), "v": begin, "y": 53.9, "x": 27.5},
+            {"t": str(begin + 1800), "v": begin + 1800, "y": 53.95, "x": 27.6},
+            "0:30:00",
+            f"{12.5 + index % 7:.2f} km",
+        ],
+    }
+
+
+class FakeResponse:
+    """An answer of the fake server, already in memory."""
+
+    def __init__(self, body: bytes, encoding: str) -> None:
+        """Initialize the response.
+
+        :param body: the body on the wire
+        :type body: bytes
+        :param encoding: the Content-Encoding of the body
+        :type encoding: str
+        """
+        self._body = body
+        self._headers = {"Content-Type": "application/json"}
+        if encoding != "identity":
+            self._headers["Content-Encoding"] = encoding
+
+    @property
+    def headers(self) -> Mapping[str, str]:
+        """Return the headers of the response.
+
+        :return: the headers
+        :rtype: Mapping[str, str]
+        """
+        return self._headers
+
+    def iter_raw(self, chunk_size: int) -> Iterator[bytes]:
+        """Yield the body in chunks, as a socket would.
+
+        :param chunk_size: the size of the chunks
+        :type chunk_size: int
+        :return: an iterator over the chunks of the body
+        :rtype: Iterator[bytes]
+        """
+        view = memoryview(self._body)
+        for offset in range(0, len(view), chunk_size):
+            yield bytes(view[offset : offset + chunk_size])
+
+    def close(self) -> None:
+        """Release the response; there is no connection to return."""
+
+
+class FakeTransport:
+    """Transport answering the requests from a :class:`FakeWialonServer`.
+
+    The calling thread sleeps for the latency of each call, and a call slower
+    than its timeout raises :class:`TimeoutError` once the timeout has elapsed.
+    """
+
+    def __init__(self, server: FakeWialonServer | None = None) -> None:
+        """Initialize the transport.
+
+        :param server: the server answering the requests, defaults to a new one
+        :type server: FakeWialonServer | None, optional
+        """
+        self.server = server if server is not None else FakeWialonServer()
+
+    def post(  # noqa: PLR0913
+        self,
+        url: str,  # noqa: ARG002
+        *,
+        params: dict[str, str] | None = None,
+        json: object = None,
+        files: dict[str, Any] | None = None,  # noqa: ARG002
+        headers: dict[str, str] | None = None,
+        timeout: float | tuple[float, float] = 30,
+    ) -> FakeResponse:
+        """Answer a request.
+
+        :param url: ignored, every request reaches the same server
+        :type url: str
+        :param params: the query parameters, defaults to None
+        :type params: dict[str, str] | None, optional
+        :param json: the JSON body, defaults to None
+        :type json: object, optional
+        :param files: ignored, uploaded files are not read
+        :type files: dict[str, Any] | None, optional
+        :param headers: the headers of the request, defaults to None
+        :type headers: dict[str, str] | None, optional
+        :param timeout: the timeout of the request in seconds, or its connect and
+                        read timeouts, defaults to 30
+        :type timeout: float | tuple[float, float], optional
+        :raises TimeoutError: If the latency of the call exceeds the timeout.
+        :return: the response
+        :rtype: FakeResponse
+        """
+        if isinstance(timeout, tuple):
+            timeout = timeout[1]
+        call = self.server.begin(request_query(params, json))
+        try:
+            if call.delay > timeout:
+                time.sleep(timeout)
+                msg = f"{call.svc} timed out after {timeout}s."
+                raise TimeoutError(msg)
+            time.sleep(call.delay)
+        finally:
+            self.server.end(call)
+        body, encoding = self.server.encode(call, (headers or {}).get("Accept-Encoding"))
+        return FakeResponse(body, encoding)
+
+    def close(self) -> None:
+        """Close the transport; the server keeps its state."""
+
+
+def request_query(params: Mapping[str, str] | None, json: object) -> Mapping[str, Any]:
+    """Return the parameters of a request sent to a fake transport.
+
+    :param params: the query parameters of the request
+    :type params: Mapping[str, str] | None
+    :param json: the JSON body of the request
+    :type json: object
+    :return: the query read by :meth:`FakeWialonServer.begin`
+    :rtype: Mapping[str, Any]
+    """
+    if params is not None:
+        return params
+    return {"params": json.get("params") if isinstance(json, dict) else None}
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    """HTTP server with a listen backlog sized for load tests."""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """HTTP front end of a :class:`FakeWialonServer`."""
+
+    protocol_version = "HTTP/1.1"
+    server_api: FakeWialonServer
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        """Silence the access log."""
+
+    def do_POST(self) -> None:
+        """Answer a call of the API."""
+        query: Mapping[str, Any] = {
+            key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()
+        }
+        length = int(self.headers.get("Content-Length", 0))
+        content = self.rfile.read(length) if length else b""
+        if not query and content.startswith(b"{"):
+            query = request_query(None, loads(content))
+        api = self.server_api
+        try:
+            call = api.begin(query)
+        except ConnectionError:
+            self.close_connection = True
+            return
+        try:
+            time.sleep(call.delay)
+        finally:
+            api.end(call)
+        body, encoding = api.encode(call, self.headers.get("Accept-Encoding"))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if encoding != "identity":
+            self.send_header("Content-Encoding", encoding)
+        self.end_headers()
+        self.wfile.write(body)
@@ -0,0 +1,498 @@
+"""Per-service metrics, request hooks and tracing spans.
+
+Every attempt a client sends to the API is observed by its
+:class:`Instrumentation`, which keeps for each service a latency histogram, the
+request and response bytes, the retries and the error codes, calls the hooks
+registered by the application, and opens a span when a tracer is set. The module
+does no I/O, so the synchronous and asynchronous clients share it.
+"""
+
+import bisect
+import math
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import urlparse
+
+from loguru import logger
+
+from .errors import ERROR_CODES
+from .protocol import Params, dumps
+
+ERROR_NUMBERS = {error: code for code, error in ERROR_CODES.items()}
+
+BATCH_SERVICE = "core/batch"
+
+
+def error_code(error: BaseException) -> int | str:
+    """Return the Wialon error code of an exception, or its name for other errors.
+
+    :param error: the exception raised by a call
+    :type error: BaseException
+    :return: e.g. ``10`` or ``"TimeoutError"``
+    :rtype: int | str
+    """
+    code = ERROR_NUMBERS.get(type(error))
+    return code if code is not None else type(error).__name__
+
+
+def request_size(query: dict[str, str] | None, body: object = None) -> int:
+    """Return the bytes of the parameters of a request.
+
+    :param query: the query parameters, defaults to None
+    :type query: dict[str, str] | None
+    :param body: the JSON body, defaults to None
+    :type body: object, optional
+    :return: the length of the encoded query or body, without URL escaping
+    :rtype: int
+    """
+    if body is not None:
+        return len(dumps(body))
+    if not query:
+        return 0
+    return sum(len(key) + len(value) + 2 for key, value in query.items()) - 1
+
+
+def batch_calls(params: Params) -> list[dict[str, Any]]:
+    """Return the sub-calls of the parameters of a ``core/batch`` request.
+
+    :param params: the parameters, a list of calls or ``{"params": [...]}``
+    :type params: Params
+    :return: the calls, each with a ``svc`` and ``params``
+    :rtype: list[dict[str, Any]]
+    """
+    if isinstance(params, dict):
+        params = params.get("params")
+    if not isinstance(params, list):
+        return []
+    return [call for call in params if isinstance(call, dict)]
+
+
+class Histogram:
+    """Latency histogram with logarithmic buckets about 5% wide.
+
+    Its memory does not depend on the number of samples, so it can record every
+    call of a long-running process. Percentiles are the upper bound of the bucket
+    holding them.
+    """
+
+    GROWTH = 1.05
+
+    def __init__(self, smallest: float = 1e-5, largest: float = 600.0) -> None:
+        """Initialize the buckets.
+
+        :param smallest: the upper bound of the first bucket, in seconds
+        :type smallest: float, optional
+        :param largest: the upper bound of the last bucket, in seconds
+        :type largest: float, optional
+        """
+        count = math.ceil(math.log(largest / smallest, self.GROWTH)) + 1
+        self._bounds = [smallest * self.GROWTH**index for index in range(count)]
+        self._counts = [0] * (count + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        """Record a sample.
+
+        :param value: the latency in seconds
+        :type value: float
+        """
+        self._counts[bisect.bisect_left(self._bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def merge(self, other: "Histogram") -> None:
+        """Add the samples of a histogram with the same buckets.
+
+        :param other: the histogram to add
+        :type other: Histogram
+        """
+        for index, count in enumerate(other._counts):  # noqa: SLF001
+            self._counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    @property
+    def mean(self) -> float:
+        """Return the mean of the samples.
+
+        :return: the mean in seconds, 0 without samples
+        :rtype: float
+        """
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, share: float) -> float:
+        """Return a percentile of the samples.
+
+        :param share: the percentile between 0 and 1, e.g. 0.99
+        :type share: float
+        :return: the latency in seconds, 0 without samples
+        :rtype: float
+        """
+        if not self.count:
+            return 0.0
+        rank = share * self.count
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen >= rank:
+                return min(self._bounds[min(index, len(self._bounds) - 1)], self.max)
+        return self.max
+
+
+@dataclass
+class CallRecord:
+    """One attempt of a request, passed to the hooks.
+
+    The hooks registered with ``before`` see it when the attempt starts; those
+    registered with ``after`` see it once it has been answered or has failed.
+
+    :ivar str svc: the Wialon API service
+    :ivar Any params: the parameters of the call
+    :ivar str sid: the session ID of the call, empty for logins
+    :ivar str url: the node of the API the call is sent to
+    :ivar float started: the ``time.time()`` the attempt started at
+    :ivar float elapsed: the seconds until the body was read and parsed
+    :ivar int request_bytes: the bytes of the encoded parameters
+    :ivar int response_bytes: the bytes received from the network
+    :ivar Exception error: the exception raised by the attempt, if any
+    :ivar Any result: the decoded response, if the attempt succeeded
+    """
+
+    svc: str
+    params: Params
+    sid: str = ""
+    url: str = ""
+    started: float = field(default_factory=time.time)
+    elapsed: float = 0.0
+    request_bytes: int = 0
+    response_bytes: int = 0
+    error: Exception | None = None
+    result: Any = None
+
+    @property
+    def error_code(self) -> int | str | None:
+        """Return the Wialon error code, or the exception name, of a failed attempt.
+
+        :return: the code, None when the attempt succeeded
+        :rtype: int | str | None
+        """
+        return error_code(self.error) if self.error is not None else None
+
+    @property
+    def batch_size(self) -> int:
+        """Return the number of calls of a ``core/batch`` request.
+
+        :return: the number of sub-calls, 0 for other services
+        :rtype: int
+        """
+        if self.svc != BATCH_SERVICE:
+            return 0
+        return len(batch_calls(self.params))
+
+
+@dataclass(frozen=True)
+class ServiceStats:
+    """The metrics of one service, in seconds and bytes.
+
+    Calls sent inside a ``core/batch`` request count in ``batched`` and in
+    ``errors``, but their latency is the one of the batch.
+
+    :ivar str svc: the Wialon API service
+    :ivar int calls: the attempts sent on their own
+    :ivar int batched: the calls sent inside ``core/batch`` requests
+    :ivar int retries: the attempts sent again after a failure
+    :ivar dict errors: the failed calls by error code or exception name
+    :ivar float mean: the mean latency of the attempts
+    :ivar float p50: the median latency
+    :ivar float p90: the 90th percentile of the latency
+    :ivar float p99: the 99th percentile of the latency
+    :ivar float max: the slowest attempt
+    :ivar int request_bytes: the bytes of the parameters sent
+    :ivar int response_bytes: the bytes received from the network
+    :ivar dict batch_sizes: the ``core/batch`` requests by number of sub-calls
+    """
+
+    svc: str
+    calls: int
+    batched: int
+    retries: int
+    errors: dict[int | str, int]
+    mean: float
+    p50: float
+    p90: float
+    p99: float
+    max: float
+    request_bytes: int
+    response_bytes: int
+    batch_sizes: dict[int, int]
+
+
+@dataclass
+class _ServiceMetrics:
+    """The mutable counters behind :class:`ServiceStats`."""
+
+    latency: Histogram = field(default_factory=Histogram)
+    batched: int = 0
+    retries: int = 0
+    errors: Counter[int | str] = field(default_factory=Counter)
+    request_bytes: int = 0
+    response_bytes: int = 0
+    batch_sizes: Counter[int] = field(default_factory=Counter)
+
+    def stats(self, svc: str) -> ServiceStats:
+        """Return a snapshot of the counters.
+
+        :param svc: the service of the counters
+        :type svc: str
+        :return: the snapshot
+        :rtype: ServiceStats
+        """
+        return ServiceStats(
+            svc=svc,
+            calls=self.latency.count,
+            batched=self.batched,
+            retries=self.retries,
+            errors=dict(self.errors),
+            mean=self.latency.mean,
+            p50=self.latency.percentile(0.5),
+            p90=self.latency.percentile(0.9),
+            p99=self.latency.percentile(0.99),
+            max=self.latency.max,
+            request_bytes=self.request_bytes,
+            response_bytes=self.response_bytes,
+            batch_sizes=dict(self.batch_sizes),
+        )
+
+
+Hook = Callable[[CallRecord], Any]
+
+
+class Instrumentation:
+    """Metrics, hooks and spans of the calls of a client.
+
+    ``tracer`` accepts an OpenTelemetry tracer (``trace.get_tracer("wialon")``)
+    or any object with the same ``start_as_current_span`` and ``start_span``
+    methods. Each attempt is then a span named after its service, and each call of
+    a ``core/batch`` request a child span covering the batch.
+    """
+
+    def __init__(self, tracer: Any = None) -> None:  # noqa: ANN401
+        """Initialize the instrumentation.
+
+        :param tracer: the tracer opening a span per call, defaults to None
+        :type tracer: Any, optional
+        """
+        self.tracer = tracer
+        self._before: list[Hook] = []
+        self._after: list[Hook] = []
+        self._services: dict[str, _ServiceMetrics] = {}
+        self._lock = threading.Lock()
+
+    def add_hook(self, before: Hook | None = None, after: Hook | None = None) -> None:
+        """Register functions called around each attempt.
+
+        Hooks run in the thread or task sending the call and should return
+        quickly; an exception they raise is logged and does not fail the call.
+
+        :param before: called with the :class:`CallRecord` before it is sent
+        :type before: Hook | None, optional
+        :param after: called with the :class:`CallRecord` once it has completed
+        :type after: Hook | None, optional
+        """
+        if before is not None:
+            self._before.append(before)
+        if after is not None:
+            self._after.append(after)
+
+    def remove_hook(self, hook: Hook) -> None:
+        """Unregister a hook.
+
+        :param hook: the function given to :meth:`add_hook`
+        :type hook: Hook
+        """
+        for hooks in (self._before, self._after):
+            while hook in hooks:
+                hooks.remove(hook)
+
+    @contextmanager
+    def observe(
+        self,
+        svc: str,
+        params: Params,
+        sid: str | None = None,
+        url: str = "",
+    ) -> Iterator[CallRecord]:
+        """Observe one attempt of a request.
+
+        The caller fills in the bytes and the result of the yielded record; the
+        exception leaving the block, if any, is recorded and raised again.
+
+        :param svc: the Wialon API service
+        :type svc: str
+        :param params: the parameters of the call
+        :type params: Params
+        :param sid: the session ID of the call, defaults to None
+        :type sid: str | None, optional
+        :param url: the node of the API the call is sent to, defaults to ""
+        :type url: str, optional
+        :return: the record of the attempt
+        :rtype: Iterator[CallRecord]
+        """
+        call = CallRecord(svc, params, sid or "", url)
+        self._run(self._before, call)
+        started = time.perf_counter()
+        tracer = self.tracer
+        span_context = (
+            tracer.start_as_current_span(svc, attributes=self._attributes(call))
+            if tracer is not None
+            else nullcontext()
+        )
+        with span_context as span:
+            try:
+                yield call
+            except Exception as exc:
+                call.error = exc
+                raise
+            finally:
+                call.elapsed = time.perf_counter() - started
+                self._record(call)
+                if span is not None:
+                    self._end_span(span, call)
+                self._run(self._after, call)
+
+    def retried(self, svc: str) -> None:
+        """Count an attempt sent again after a failure.
+
+        :param svc: the Wialon API service
+        :type svc: str
+        """
+        with self._lock:
+            self._metrics(svc).retries += 1
+
+    def stats(self) -> dict[str, ServiceStats]:
+        """Return the metrics of each service called.
+
+        :return: the metrics keyed by service
+        :rtype: dict[str, ServiceStats]
+        """
+        with self._lock:
+            return {
+                svc: metrics.stats(svc)
+                for svc, metrics in sorted(self._services.items())
+            }
+
+    def reset(self) -> None:
+        """Forget the metrics collected so far."""
+        with self._lock:
+            self._services.clear()
+
+    def _metrics(self, svc: str) -> _ServiceMetrics:
+        """Return the counters of a service, the lock being held.
+
+        :param svc: the Wialon API service
+        :type svc: str
+        :return: the counters
+        :rtype: _ServiceMetrics
+        """
+        metrics = self._services.get(svc)
+        if metrics is None:
+            metrics = self._services[svc] = _ServiceMetrics()
+        return metrics
+
+    def _record(self, call: CallRecord) -> None:
+        """Add a completed attempt to the metrics of its service.
+
+        :param call: the attempt
+        :type call: CallRecord
+        """
+        code = call.error_code
+        with self._lock:
+            metrics = self._metrics(call.svc)
+            metrics.latency.add(call.elapsed)
+            metrics.request_bytes += call.request_bytes
+            metrics.response_bytes += call.response_bytes
+            if code is not None:
+                metrics.errors[code] += 1
+            if call.svc != BATCH_SERVICE:
+                return
+            calls = batch_calls(call.params)
+            metrics.batch_sizes[len(calls)] += 1
+            results = call.result if isinstance(call.result, list) else []
+            for index, sub_call in enumerate(calls):
+                sub_metrics = self._metrics(str(sub_call.get("svc")))
+                sub_metrics.batched += 1
+                item = results[index] if index < len(results) else None
+                if isinstance(item, dict) and "error" in item:
+                    sub_metrics.errors[item["error"]] += 1
+
+    @staticmethod
+    def _attributes(call: CallRecord) -> dict[str, Any]:
+        """Return the attributes of the span of an attempt.
+
+        :param call: the attempt
+        :type call: CallRecord
+        :return: the attributes known before the call is sent
+        :rtype: dict[str, Any]
+        """
+        attributes: dict[str, Any] = {"rpc.system": "wialon", "rpc.method": call.svc}
+        if call.url:
+            attributes["server.address"] = urlparse(call.url).hostname or call.url
+        if call.svc == BATCH_SERVICE:
+            attributes["wialon.batch.size"] = call.batch_size
+        return attributes
+
+    def _end_span(self, span: Any, call: CallRecord) -> None:  # noqa: ANN401
+        """Complete the span of an attempt, with a child span per batched call.
+
+        :param span: the span of the attempt
+        :type span: Any
+        :param call: the completed attempt
+        :type call: CallRecord
+        """
+        span.set_attribute("wialon.request.size", call.request_bytes)
+        span.set_attribute("wialon.response.size", call.response_bytes)
+        if call.error is not None:
+            span.set_attribute("wialon.error.code", str(call.error_code))
+        if call.svc != BATCH_SERVICE or self.tracer is None:
+            return
+        results = call.result if isinstance(call.result, list) else []
+        start_time = int(call.started * 1e9)
+        for index, sub_call in enumerate(batch_calls(call.params)):
+            attributes: dict[str, Any] = {
+                "rpc.system": "wialon",
+                "rpc.method": str(sub_call.get("svc")),
+                "wialon.batch.index": index,
+            }
+            item = results[index] if index < len(results) else None
+            if isinstance(item, dict) and "error" in item:
+                attributes["wialon.error.code"] = str(item["error"])
+            child = self.tracer.start_span(
+                attributes["rpc.method"],
+                attributes=attributes,
+                start_time=start_time,
+            )
+            child.end()
+
+    @staticmethod
+    def _run(hooks: list[Hook], call: CallRecord) -> None:
+        """Call hooks, logging their exceptions.
+
+        :param hooks: the hooks
+        :type hooks: list[Hook]
+        :param call: the attempt passed to them
+        :type call: CallRecord
+        """
+        for hook in hooks:
+            try:
+                hook(call)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning(f"Instrumentation hook {hook!r} failed: {exc!r}.")
@@ -6,19 +6,14 @@ from typing import TYPE_CHECKING, Any
 from .errors import InvalidInputError, InvalidResultError, ParameterError
 
 if TYPE_CHECKING:
-    from .wialon import Wialon
+    from .engine import Engine
 
 
-class Items:
-    """Items class for Wialon API."""
-
-    def __init__(self, engine: "Wialon") -> None:
-        """__init__ method for Items class.
+class BaseItems:
+    """Search parameters and result handling shared by the items managers."""
 
-        :param engine: Wialon object
-        :type engine: Wialon
-        """
-        self._engine = engine
+    def __init__(self) -> None:
+        """__init__ method for BaseItems class."""
         self._items_type: dict[str, str] = {
             "hardware": "avl_hw",
             "resource": "avl_resource",
@@ -29,7 +24,7 @@ class Items:
             "route": "avl_route",
         }
 
-    def search(
+    def _search_request(
         self,
         item_id: int | None = None,
         item_type: str | None = None,
@@ -37,8 +32,8 @@ class Items:
         date_to: datetime = datetime(2106, 2, 7, 3, 28, 15, tzinfo=UTC),
         by: str = "property",
         **kwargs: int | str,
-    ) -> dict[str, Any] | list[dict[str, Any]] | bytes:
-        """Search for items based on various criteria.
+    ) -> tuple[str, dict[str, dict[str, str] | int]]:
+        """Build the service and parameters of an items search.
 
         :param item_id: The ID of the item to search for (used when `by` is "id").
         :type item_id: int, optional
@@ -53,11 +48,10 @@ class Items:
         :type by: str
         :param kwargs: Additional search parameters.
         :type kwargs: dict[str, int | str]
-        :return: A list of dictionaries containing the search results.
-        :rtype: list[dict[str, Any]]
+        :return: The service and the parameters of the search.
+        :rtype: tuple[str, dict[str, dict[str, str] | int]]
         :raises InvalidInputError: If an invalid `item_type` is provided.
         :raises ParameterError: If required parameters are missing or invalid.
-        :raises InvalidResultError: If the search result is invalid or unexpected.
         """
         _flags = kwargs.get("flags", 0x1)
         _force = kwargs.get("force", 0)
@@ -117,15 +111,80 @@ class Items:
         else:
             msg = "The 'by' or 'property' parameter must be"
             raise ParameterError(msg)
-        result = self._engine.request(svc, params, self._engine.auth.get_sid())
+        return svc, params
+
+    @staticmethod
+    def _search_result(
+        result: dict[str, Any] | list[dict[str, Any]] | bytes,
+    ) -> dict[str, Any] | list[dict[str, Any]] | bytes:
+        """Extract the items from a search response.
+
+        :param result: The response of the search request.
+        :type result: dict[str, Any] | list[dict[str, Any]] | bytes
+        :raises InvalidResultError: If the search result is invalid or unexpected.
+        :return: A list of dictionaries containing the search results, or the
+                 item found by its ID.
+        :rtype: list[dict[str, Any]] | dict[str, Any]
+        """
         if not result:
             msg = "No data found"
             raise InvalidResultError(msg)
 
         if isinstance(result, dict):
-            result = result["items"]
+            # core/search_item answers a single "item", core/search_items a list.
+            result = result["item"] if "item" in result else result["items"]
         elif isinstance(result, bytes):
             msg = "Unexpected bytes response"
             raise InvalidResultError(msg)
 
         return result
+
+
+class Items(BaseItems):
+    """Items class for Wialon API."""
+
+    def __init__(self, engine: "Engine") -> None:
+        """__init__ method for Items class.
+
+        :param engine: Wialon object
+        :type engine: Engine
+        """
+        super().__init__()
+        self._engine = engine
+
+    def search(
+        self,
+        item_id: int | None = None,
+        item_type: str | None = None,
+        date_from: datetime = datetime(1970, 1, 1, 0, 0, tzinfo=UTC),
+        date_to: datetime = datetime(2106, 2, 7, 3, 28, 15, tzinfo=UTC),
+        by: str = "property",
+        **kwargs: int | str,
+    ) -> dict[str, Any] | list[dict[str, Any]] | bytes:
+        """Search for items based on various criteria.
+
+        :param item_id: The ID of the item to search for (used when `by` is "id").
+        :type item_id: int, optional
+        :param item_type: The type of item to search for (used when `by` is "property").
+        :type item_type: str, optional
+        :param date_from: The start date for the search range (used when `by`
+        :type date_from: datetime
+                          is "property").
+        :param date_to: The end date for the search range (used when `by` is "property").
+        :type date_to: datetime
+        :param by: The search method, either "property" or "id".
+        :type by: str
+        :param kwargs: Additional search parameters.
+        :type kwargs: dict[str, int | str]
+        :return: A list of dictionaries containing the search results, or the
+                 item found when `by` is "id".
+        :rtype: list[dict[str, Any]] | dict[str, Any]
+        :raises InvalidInputError: If an invalid `item_type` is provided.
+        :raises ParameterError: If required parameters are missing or invalid.
+        :raises InvalidResultError: If the search result is invalid or unexpected.
+        """
+        svc, params = self._search_request(
+            item_id, item_type, date_from, date_to, by, **kwargs,
+        )
+        result = self._engine.request(svc, params, self._engine.auth.get_sid())
+        return self._search_result(result)
@@ -0,0 +1,138 @@
+"""Logging setup and cheap formatting of API payloads.
+
+The SDK logs through loguru under the ``wialon`` name. :func:`configure_logging`
+adds the file sink of the ``logging`` option of the clients once per file,
+however many clients are built, and :func:`payload` wraps a request or response
+so that it is only formatted, and then truncated, when a sink accepts the record::
+
+    logger.opt(lazy=True).debug("Response: {}", lambda: payload(response))
+"""
+
+import reprlib
+import threading
+from contextlib import suppress
+from pathlib import Path
+
+from loguru import logger
+
+LEVELS = ("DEBUG", "INFO")
+
+DEFAULT_PATH = "wialon.log"
+
+_sinks: dict[Path, tuple[int, str]] = {}
+_sinks_lock = threading.Lock()
+
+
+class PayloadRepr(reprlib.Repr):
+    """Abbreviated ``repr`` of API payloads.
+
+    Only the first elements of each container and the first characters of each
+    string are formatted, so the cost does not depend on the size of the payload.
+    """
+
+    def __init__(self, limit: int = 500) -> None:
+        """Initialize the limits.
+
+        :param limit: the maximum length of the text, defaults to 500
+        :type limit: int, optional
+        """
+        super().__init__()
+        self.limit = limit
+        self.maxlevel = 4
+        self.maxdict = 10
+        self.maxlist = 10
+        self.maxtuple = 10
+        self.maxstring = 120
+        self.maxother = 120
+
+    def repr_bytes(self, obj: bytes, level: int) -> str:  # noqa: ARG002
+        """Return the size of a binary body rather than its content.
+
+        :param obj: the body
+        :type obj: bytes
+        :param level: the remaining depth
+        :type level: int
+        :return: e.g. ``<1048576 bytes>``
+        :rtype: str
+        """
+        return f"<{len(obj)} bytes>"
+
+    def format(self, obj: object) -> str:
+        """Return the abbreviated text of a payload.
+
+        :param obj: the payload
+        :type obj: object
+        :return: at most :attr:`limit` characters
+        :rtype: str
+        """
+        text = self.repr(obj)
+        if len(text) > self.limit:
+            text = f"{text[: self.limit]}... ({len(text) - self.limit} more chars)"
+        return text
+
+
+_payload_repr = PayloadRepr()
+
+
+def payload(obj: object) -> str:
+    """Return the abbreviated text of a request or response to log.
+
+    :param obj: the payload
+    :type obj: object
+    :return: at most ``payload_limit`` characters, see :func:`configure_logging`
+    :rtype: str
+    """
+    return _payload_repr.format(obj)
+
+
+def configure_logging(
+    level: str,
+    path: str | Path | None = None,
+    *,
+    rotation: str = "100 MB",
+    payload_limit: int | None = None,
+) -> int | None:
+    """Write the logs of the SDK to a file, adding its sink only once.
+
+    Calling it again for the same file keeps the existing sink, or replaces it
+    when a more verbose level is requested, so building many clients with the
+    ``logging`` option does not duplicate every line. Call :func:`reset_logging`
+    after removing every loguru sink with ``logger.remove()``.
+
+    :param level: "DEBUG" or "INFO"; other values leave the sinks unchanged
+    :type level: str
+    :param path: the log file, defaults to ``wialon.log`` in the working directory
+    :type path: str | Path | None, optional
+    :param rotation: when the file is rotated, defaults to "100 MB"
+    :type rotation: str, optional
+    :param payload_limit: the maximum characters of a logged payload, defaults to
+                          leaving the current limit (500)
+    :type payload_limit: int | None, optional
+    :return: the loguru handler ID of the sink, None when the level is not handled
+    :rtype: int | None
+    """
+    if payload_limit is not None:
+        _payload_repr.limit = payload_limit
+    if level not in LEVELS:
+        return None
+    path = Path(path if path is not None else Path.cwd() / DEFAULT_PATH).resolve()
+    with _sinks_lock:
+        current = _sinks.get(path)
+        if current is not None:
+            handler_id, current_level = current
+            if LEVELS.index(current_level) <= LEVELS.index(level):
+                return handler_id
+            with suppress(ValueError):  # already removed with logger.remove()
+                logger.remove(handler_id)
+        handler_id = logger.add(path, rotation=rotation, level=level, filter="wialon")
+        _sinks[path] = (handler_id, level)
+        return handler_id
+
+
+def reset_logging() -> None:
+    """Remove the sinks added by :func:`configure_logging`."""
+    with _sinks_lock:
+        for handler_id, _ in _sinks.values():
+            with suppress(ValueError):
+                logger.remove(handler_id)
+        _sinks.clear()
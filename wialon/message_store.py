@@ -0,0 +1,410 @@
+"""Persistent SQLite cache of the messages of closed time ranges.
+
+Messages older than a settling delay no longer change, so once an interval of a
+unit has been loaded its messages are kept on disk and later loads of the same
+unit, message type and time window are answered locally. A load that is only
+partly covered fetches the missing sub-ranges from the API, and the part of an
+interval that is still open (newer than the settling delay) is always fetched.
+When the file outgrows its size limit, the least recently read ranges are
+evicted.
+"""
+
+import sqlite3
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from .protocol import dumps, loads
+
+SCHEMA_VERSION = 1
+
+# The largest timeTo accepted by the API (2106-02-07 06:28:15 UTC).
+MAX_TIME = 0xFFFFFFFF
+
+DEFAULT_LOAD_COUNT = 0xFFFFFFFF
+
+Interval = tuple[int, int]
+
+
+@dataclass(frozen=True)
+class MessageStoreStats:
+    """The counters of a message store.
+
+    :ivar int hits: the loads answered without calling the API
+    :ivar int partial_hits: the loads that fetched only some sub-ranges
+    :ivar int misses: the loads that fetched their whole closed range
+    :ivar int fetched_ranges: the sub-ranges requested from the API
+    :ivar int evictions: the ranges evicted to respect the size limit
+    :ivar int ranges: the covered ranges held
+    :ivar int messages: the messages held
+    :ivar int size: the bytes of the messages held
+    """
+
+    hits: int
+    partial_hits: int
+    misses: int
+    fetched_ranges: int
+    evictions: int
+    ranges: int
+    messages: int
+    size: int
+
+
+class MessageStore:
+    """SQLite cache of ``messages/load_interval`` keyed by unit, type and time.
+
+    The store can be shared by the threads of a process; several processes may
+    also open the same file.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_bytes: int = 1024 * 1024 * 1024,
+        settle: float = 3600.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Open the store, creating the file when it does not exist.
+
+        :param path: the SQLite file
+        :type path: str | Path
+        :param max_bytes: the size of the messages held past which the least
+                          recently read ranges are evicted, defaults to 1 GiB
+        :type max_bytes: int, optional
+        :param settle: the seconds after which messages are considered final and
+                       may be stored, defaults to 3600
+        :type settle: float, optional
+        :param clock: the wall clock in seconds since the epoch, defaults to
+                      time.time
+        :type clock: Callable[[], float], optional
+        """
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.settle = settle
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            self.path,
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        self._hits = 0
+        self._partial_hits = 0
+        self._misses = 0
+        self._fetched_ranges = 0
+        self._evictions = 0
+        self._create()
+
+    def _create(self) -> None:
+        """Create the tables of an empty file."""
+        with self._lock:
+            cursor = self._connection
+            cursor.execute("PRAGMA journal_mode=WAL")
+            if cursor.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION:
+                return
+            cursor.executescript(
+                f"""
+                BEGIN;
+                DROP TABLE IF EXISTS messages;
+                DROP TABLE IF EXISTS coverage;
+                CREATE TABLE messages (
+                    item_id INTEGER NOT NULL,
+                    kind TEXT NOT NULL,
+                    t INTEGER NOT NULL,
+                    body BLOB NOT NULL
+                );
+                CREATE INDEX messages_time ON messages (item_id, kind, t);
+                CREATE TABLE coverage (
+                    item_id INTEGER NOT NULL,
+                    kind TEXT NOT NULL,
+                    time_from INTEGER NOT NULL,
+                    time_to INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    accessed REAL NOT NULL
+                );
+                CREATE INDEX coverage_range ON coverage (item_id, kind, time_from);
+                CREATE INDEX coverage_accessed ON coverage (accessed);
+                PRAGMA user_version = {SCHEMA_VERSION};
+                COMMIT;
+                """,
+            )
+
+    def close(self) -> None:
+        """Close the SQLite connection."""
+        with self._lock:
+            self._connection.close()
+
+    @staticmethod
+    def accepts(params: dict[str, Any]) -> bool:
+        """Return whether a load can be answered from the store.
+
+        Loads capped with ``loadCount`` return a truncated interval and are
+        always sent to the API.
+
+        :param params: the parameters of ``messages/load_interval``
+        :type params: dict[str, Any]
+        :return: whether the load can use the store
+        :rtype: bool
+        """
+        return (
+            isinstance(params.get("itemId"), int)
+            and params.get("loadCount", DEFAULT_LOAD_COUNT) == DEFAULT_LOAD_COUNT
+        )
+
+    @staticmethod
+    def kind(params: dict[str, Any]) -> str:
+        """Return the message type and filter of a load.
+
+        :param params: the parameters of ``messages/load_interval``
+        :type params: dict[str, Any]
+        :return: e.g. ``"0/65280"`` for the flags and the flags mask
+        :rtype: str
+        """
+        return f"{params.get('flags', 0)}/{params.get('flagsMask', 0)}"
+
+    def closed_until(self, time_to: int) -> int:
+        """Return the end of the part of an interval that may be stored.
+
+        :param time_to: the end of the interval, in seconds since the epoch
+        :type time_to: int
+        :return: the last second that is old enough to be final
+        :rtype: int
+        """
+        return min(time_to, int(self._clock() - self.settle))
+
+    def missing(
+        self,
+        item_id: int,
+        kind: str,
+        time_from: int,
+        time_to: int,
+    ) -> list[Interval]:
+        """Return the sub-ranges of an interval that are not stored.
+
+        :param item_id: the ID of the unit
+        :type item_id: int
+        :param kind: the message type, see :meth:`kind`
+        :type kind: str
+        :param time_from: the first second of the interval
+        :type time_from: int
+        :param time_to: the last second of the interval
+        :type time_to: int
+        :return: the missing sub-ranges, both ends included
+        :rtype: list[Interval]
+        """
+        with self._lock:
+            covered = self._connection.execute(
+                "SELECT time_from, time_to FROM coverage "
+                "WHERE item_id = ? AND kind = ? AND time_to >= ? AND time_from <= ? "
+                "ORDER BY time_from",
+                (item_id, kind, time_from, time_to),
+            ).fetchall()
+            gaps = []
+            cursor = time_from
+            for start, end in covered:
+                if start > cursor:
+                    gaps.append((cursor, start - 1))
+                cursor = max(cursor, end + 1)
+            if cursor <= time_to:
+                gaps.append((cursor, time_to))
+            if not gaps:
+                self._hits += 1
+            elif gaps == [(time_from, time_to)]:
+                self._misses += 1
+            else:
+                self._partial_hits += 1
+            self._fetched_ranges += len(gaps)
+        return gaps
+
+    def add(
+        self,
+        item_id: int,
+        kind: str,
+        interval: Interval,
+        messages: list[dict[str, Any]],
+    ) -> None:
+        """Store the messages of a range fetched from the API.
+
+        :param item_id: the ID of the unit
+        :type item_id: int
+        :param kind: the message type, see :meth:`kind`
+        :type kind: str
+        :param interval: the first and last second of the range
+        :type interval: Interval
+        :param messages: every message of the range, in the order of the API
+        :type messages: list[dict[str, Any]]
+        """
+        time_from, time_to = interval
+        rows = [
+            (item_id, kind, message.get("t", time_from), dumps(message).encode())
+            for message in messages
+        ]
+        with self._lock:
+            cursor = self._connection
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                # Another thread may have stored the range meanwhile.
+                cursor.execute(
+                    "DELETE FROM messages "
+                    "WHERE item_id = ? AND kind = ? AND t BETWEEN ? AND ?",
+                    (item_id, kind, time_from, time_to),
+                )
+                cursor.executemany(
+                    "INSERT INTO messages (item_id, kind, t, body) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                merged = self._cover(item_id, kind, time_from, time_to)
+                self._evict(merged)
+                cursor.execute("COMMIT")
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+
+    def read(
+        self,
+        item_id: int,
+        kind: str,
+        time_from: int,
+        time_to: int,
+    ) -> list[dict[str, Any]] | None:
+        """Return the stored messages of an interval.
+
+        :param item_id: the ID of the unit
+        :type item_id: int
+        :param kind: the message type, see :meth:`kind`
+        :type kind: str
+        :param time_from: the first second of the interval
+        :type time_from: int
+        :param time_to: the last second of the interval
+        :type time_to: int
+        :return: the messages ordered by time, None when part of the interval is
+                 not stored (e.g. it was evicted meanwhile)
+        :rtype: list[dict[str, Any]] | None
+        """
+        with self._lock:
+            cursor = self._connection
+            (covered,) = cursor.execute(
+                "SELECT COUNT(*) FROM coverage "
+                "WHERE item_id = ? AND kind = ? AND time_from <= ? AND time_to >= ?",
+                (item_id, kind, time_from, time_to),
+            ).fetchone()
+            if not covered:
+                return None
+            rows = cursor.execute(
+                "SELECT body FROM messages "
+                "WHERE item_id = ? AND kind = ? AND t BETWEEN ? AND ? "
+                "ORDER BY t, rowid",
+                (item_id, kind, time_from, time_to),
+            ).fetchall()
+            cursor.execute(
+                "UPDATE coverage SET accessed = ? "
+                "WHERE item_id = ? AND kind = ? AND time_to >= ? AND time_from <= ?",
+                (self._clock(), item_id, kind, time_from, time_to),
+            )
+        return [loads(body) for (body,) in rows]
+
+    def invalidate(self, item_id: int | None = None) -> None:
+        """Drop the stored messages of a unit, or of every unit.
+
+        :param item_id: the ID of the unit, defaults to every unit
+        :type item_id: int | None, optional
+        """
+        where, args = ("WHERE item_id = ?", (item_id,)) if item_id is not None else (
+            "",
+            (),
+        )
+        with self._lock:
+            cursor = self._connection
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute(f"DELETE FROM messages {where}", args)  # noqa: S608
+            cursor.execute(f"DELETE FROM coverage {where}", args)  # noqa: S608
+            cursor.execute("COMMIT")
+
+    def stats(self) -> MessageStoreStats:
+        """Return the counters of the store.
+
+        :return: the hits, misses and size of the store
+        :rtype: MessageStoreStats
+        """
+        with self._lock:
+            ranges, size = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM coverage",
+            ).fetchone()
+            (messages,) = self._connection.execute(
+                "SELECT COUNT(*) FROM messages",
+            ).fetchone()
+            return MessageStoreStats(
+                hits=self._hits,
+                partial_hits=self._partial_hits,
+                misses=self._misses,
+                fetched_ranges=self._fetched_ranges,
+                evictions=self._evictions,
+                ranges=ranges,
+                messages=messages,
+                size=size,
+            )
+
+    def _cover(self, item_id: int, kind: str, time_from: int, time_to: int) -> int:
+        """Merge a stored range with the covered ranges it touches.
+
+        :param item_id: the ID of the unit
+        :type item_id: int
+        :param kind: the message type
+        :type kind: str
+        :param time_from: the first second of the range
+        :type time_from: int
+        :param time_to: the last second of the range
+        :type time_to: int
+        :return: the rowid of the merged range
+        :rtype: int
+        """
+        cursor = self._connection
+        touching = "item_id = ? AND kind = ? AND time_to >= ? AND time_from <= ?"
+        args = (item_id, kind, time_from - 1, time_to + 1)
+        low, high = cursor.execute(
+            f"SELECT MIN(time_from), MAX(time_to) FROM coverage WHERE {touching}",  # noqa: S608
+            args,
+        ).fetchone()
+        if low is not None:
+            time_from, time_to = min(time_from, low), max(time_to, high)
+        cursor.execute(f"DELETE FROM coverage WHERE {touching}", args)  # noqa: S608
+        (size,) = cursor.execute(
+            "SELECT COALESCE(SUM(LENGTH(body)), 0) FROM messages "
+            "WHERE item_id = ? AND kind = ? AND t BETWEEN ? AND ?",
+            (item_id, kind, time_from, time_to),
+        ).fetchone()
+        return cursor.execute(
+            "INSERT INTO coverage VALUES (?, ?, ?, ?, ?, ?)",
+            (item_id, kind, time_from, time_to, size, self._clock()),
+        ).lastrowid or 0
+
+    def _evict(self, keep: int) -> None:
+        """Drop the least recently read ranges while the store is too large.
+
+        :param keep: the rowid of the range just stored, which is never evicted
+        :type keep: int
+        """
+        cursor = self._connection
+        (size,) = cursor.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM coverage",
+        ).fetchone()
+        while size > self.max_bytes:
+            row = cursor.execute(
+                "SELECT rowid, item_id, kind, time_from, time_to, size FROM coverage "
+                "WHERE rowid != ? ORDER BY accessed LIMIT 1",
+                (keep,),
+            ).fetchone()
+            if row is None:
+                return
+            rowid, item_id, kind, time_from, time_to, range_size = row
+            cursor.execute(
+                "DELETE FROM messages "
+                "WHERE item_id = ? AND kind = ? AND t BETWEEN ? AND ?",
+                (item_id, kind, time_from, time_to),
+            )
+            cursor.execute("DELETE FROM coverage WHERE rowid = ?", (rowid,))
+            size -= range_size
+            self._evictions += 1
@@ -1,24 +1,29 @@
 """Messages class which is used to interact with the Wialon messages API."""
 
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextvars import copy_context
 from datetime import datetime
-from typing import TYPE_CHECKING, Any
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Literal, overload
 
-from wialon.errors import InvalidResultError
+from wialon.errors import (
+    InvalidResultError,
+    LimitOfMessagesExceededError,
+    NoMessagesForSelectedIntervalError,
+)
 
-if TYPE_CHECKING:
-    from .wialon import Wialon
+from .message_store import MAX_TIME, Interval, MessageStore
 
+if TYPE_CHECKING:
+    from .engine import Engine
 
-class Messages:
-    """Messages class which is used to interact with the Wialon messages API."""
 
-    def __init__(self, engine: "Wialon") -> None:
-        """Initialize the Messages class.
+class BaseMessages:
+    """Message flags and request parameters shared by the messages managers."""
 
-        :param engine: The Wialon engine to use.
-        :type engine: Wialon
-        """
-        self._engine = engine
+    def __init__(self) -> None:
+        """Initialize the message flags."""
         self._unit_messages = {
             "data": 0x0,
             "SMS": 0x100,
@@ -52,14 +57,14 @@ class Messages:
 
         self._logs = 0x1000
 
-    def load_interval(
+    def _load_interval_params(
         self,
         item_id: int,
         time_from: datetime = datetime(1969, 12, 31, 20, 0),
         time_to: datetime = datetime(2106, 2, 7, 3, 28, 15),
         **kwargs: int | str | bool,
     ) -> dict[str, Any]:
-        """Load messages for a given item within a specified time interval.
+        """Build the parameters to load messages within a time interval.
 
         :param item_id: The ID of the item to load messages for.
         :type item_id: int
@@ -79,9 +84,8 @@ class Messages:
         :keyword mask_filter: Filter mask, defaults to 0.
         :keyword flags_mask: Mask for flags, defaults to 0xFF00.
         :keyword load_count: Number of messages to load, defaults to 0xFFFFFFFF.
-        :return: A dictionary containing the loaded messages.
+        :return: The parameters of the request.
         :rtype: dict[str, Any]
-        :raises InvalidResultError: If the request fails to fetch messages.
         """
         _mtype = kwargs.get("message_type", "data")
         _resourte = kwargs.get("resource", "default")
@@ -106,7 +110,6 @@ class Messages:
             event,
             mask,
         )
-        svc = "messages/load_interval"
         params = {
             "itemId": item_id,
             "timeFrom": int(datetime.timestamp(time_from)),
@@ -119,25 +122,122 @@ class Messages:
             if not params[key]:
                 del params[key]
 
-        result = self._engine.request(
-            svc,
-            dict(params.items()),
-            self._engine.auth.get_sid(),
+        return params
+
+    @staticmethod
+    def _stored_window(
+        store: MessageStore,
+        params: dict[str, Any],
+    ) -> tuple[int, str, Interval, Interval | None]:
+        """Split a load into the part the store may answer and the open part.
+
+        :param store: the message store
+        :type store: MessageStore
+        :param params: the parameters of ``messages/load_interval``
+        :type params: dict[str, Any]
+        :return: the item ID, the message type, the closed range (empty when its
+                 start is after its end) and the open range still to be fetched
+        :rtype: tuple[int, str, Interval, Interval | None]
+        """
+        time_from = params.get("timeFrom", 0)
+        time_to = params.get("timeTo", MAX_TIME)
+        closed_to = store.closed_until(time_to)
+        open_range = (max(time_from, closed_to + 1), time_to)
+        return (
+            params["itemId"],
+            store.kind(params),
+            (time_from, closed_to),
+            open_range if closed_to < time_to else None,
         )
 
+    @staticmethod
+    def _range_params(params: dict[str, Any], interval: Interval) -> dict[str, Any]:
+        """Return the parameters of a load restricted to a sub-range.
+
+        :param params: the parameters of ``messages/load_interval``
+        :type params: dict[str, Any]
+        :param interval: the first and last second of the sub-range
+        :type interval: Interval
+        :return: the parameters of the sub-range
+        :rtype: dict[str, Any]
+        """
+        return {**params, "timeFrom": interval[0], "timeTo": interval[1]}
+
+    @staticmethod
+    def _interval_messages(result: object) -> list[dict[str, Any]]:
+        """Return the messages of a ``messages/load_interval`` response.
+
+        :param result: the response
+        :type result: object
+        :raises InvalidResultError: If the response holds no messages.
+        :return: the messages
+        :rtype: list[dict[str, Any]]
+        """
         if isinstance(result, dict) and "messages" in result:
             return result["messages"]
         msg = "Failed to fetch messages for the interval."
         raise InvalidResultError(msg)
 
-    def load_last(
+    @staticmethod
+    def _page_params(
+        params: dict[str, Any],
+        start: int,
+        load_count: int,
+    ) -> dict[str, Any]:
+        """Return the parameters of a page of messages starting at a second.
+
+        :param params: the parameters of ``messages/load_interval``
+        :type params: dict[str, Any]
+        :param start: the time of the first message of the page
+        :type start: int
+        :param load_count: the messages to load
+        :type load_count: int
+        :return: the parameters of the page
+        :rtype: dict[str, Any]
+        """
+        return {**params, "timeFrom": start, "loadCount": load_count}
+
+    @staticmethod
+    def _next_page(
+        page: list[dict[str, Any]],
+        skip: int,
+        load_count: int,
+    ) -> tuple[list[dict[str, Any]], int | None, int]:
+        """Split a page into its new messages and the start of the next page.
+
+        A page holds the first ``load_count`` messages from its start. The next
+        page starts at the time of the last message, so that messages of the same
+        second are not lost, and skips the messages of that second already read.
+
+        :param page: the messages of the page, ordered by time
+        :type page: list[dict[str, Any]]
+        :param skip: the messages at the start of the page already read
+        :type skip: int
+        :param load_count: the messages the page was loaded with
+        :type load_count: int
+        :return: the new messages, the start of the next page or None after the
+                 last page, and the messages the next page skips
+        :rtype: tuple[list[dict[str, Any]], int | None, int]
+        """
+        fresh = page[skip:]
+        last = page[-1].get("t") if page else None
+        if len(page) < load_count or not fresh or not isinstance(last, int):
+            return fresh, None, 0
+        same = 0
+        for message in reversed(page):
+            if message.get("t") != last:
+                break
+            same += 1
+        return fresh, last, same
+
+    def _load_last_params(
         self,
         item_id: int,
         last_time: int,
         last_count: int,
         **kwargs: dict[str, int],
     ) -> dict[str, Any]:
-        """Load the last messages for a given item within a specified time interval.
+        """Build the parameters to load the last messages of an item.
 
         :param item_id: The ID of the item to load messages for.
         :type item_id: int
@@ -150,15 +250,13 @@ class Messages:
         :keyword flags: Optional flags for the request.
         :keyword flags_mask: Optional mask for the flags.
         :keyword load_count: Optional count of messages to load.
-        :return: A dictionary containing the loaded messages.
+        :return: The parameters of the request.
         :rtype: dict[str, Any]
-        :raises InvalidResultError: If the request fails to fetch messages.
         """
         flags = kwargs.get("flags", 0)
         flags_mask = kwargs.get("flags_mask", 0)
         load_count = kwargs.get("load_count", 0)
 
-        svc = "messages/load_last"
         params = {
             "itemId": item_id,
             "lastTime": last_time,
@@ -171,11 +269,7 @@ class Messages:
             if not params[key]:
                 del params[key]
 
-        result = self._engine.request(svc, params, self._engine.auth.get_sid())
-        if isinstance(result, dict):
-            return result
-        msg = "Failed to fetch messages for the interval."
-        raise InvalidResultError(msg)
+        return params
 
     def _process_filter(self, message: str, event: str, mask: int | None) -> int:
         # TODO(tetotille): create mask filter  # noqa: FIX002, TD003
@@ -197,3 +291,422 @@ class Messages:
         mask_filter = mask if mask is not None else 0
 
         return message_filter | event_filter | mask_filter
+
+
+class Messages(BaseMessages):
+    """Messages class which is used to interact with the Wialon messages API."""
+
+    def __init__(self, engine: "Engine") -> None:
+        """Initialize the Messages class.
+
+        :param engine: The Wialon engine to use.
+        :type engine: Engine
+        """
+        super().__init__()
+        self._engine = engine
+
+    @overload
+    def load_interval(
+        self,
+        item_id: int,
+        time_from: datetime = ...,
+        time_to: datetime = ...,
+        *,
+        stream: Literal[False] = ...,
+        **kwargs: int | str | bool,
+    ) -> list[dict[str, Any]]: ...
+
+    @overload
+    def load_interval(
+        self,
+        item_id: int,
+        time_from: datetime = ...,
+        time_to: datetime = ...,
+        *,
+        stream: Literal[True],
+        **kwargs: int | str | bool,
+    ) -> Iterator[dict[str, Any]]: ...
+
+    def load_interval(
+        self,
+        item_id: int,
+        time_from: datetime = datetime(1969, 12, 31, 20, 0),
+        time_to: datetime = datetime(2106, 2, 7, 3, 28, 15),
+        *,
+        stream: bool = False,
+        **kwargs: int | str | bool,
+    ) -> list[dict[str, Any]] | Iterator[dict[str, Any]]:
+        """Load messages for a given item within a specified time interval.
+
+        :param item_id: The ID of the item to load messages for.
+        :type item_id: int
+        :param time_from: The start time of the interval,
+        :type time_from: datetime, optional
+                          defaults to datetime(1969, 12, 31, 20, 0).
+        :param time_to: The end time of the interval, defaults to
+        :type time_to: datetime, optional
+                        datetime(2106, 2, 7, 3, 28, 15).
+        :param kwargs: Additional parameters for message loading.
+        :type kwargs: dict[str, int | str | bool]
+        :keyword message_type: The type of messages to load, defaults to "data".
+        :keyword resource: The resource to use, defaults to "default".
+        :keyword log: Whether to include logs, defaults to False.
+        :keyword message_filter: Filter for messages, defaults to "".
+        :keyword event_filter: Filter for events, defaults to "".
+        :keyword mask_filter: Filter mask, defaults to 0.
+        :keyword flags_mask: Mask for flags, defaults to 0xFF00.
+        :keyword load_count: Number of messages to load, defaults to 0xFFFFFFFF.
+        :param stream: Return an iterator that parses the messages while they are
+                       received instead of loading the whole response, defaults
+                       to False.
+        :type stream: bool, optional
+        :keyword store: Answer the closed part of the interval from the message
+                        store of the client, when it has one, defaults to True.
+        :return: The loaded messages, or an iterator over them when streaming.
+        :rtype: list[dict[str, Any]] | Iterator[dict[str, Any]]
+        :raises NoMessagesForSelectedIntervalError: If the interval has no messages,
+                                                    whether or not it is answered
+                                                    from the message store.
+        :raises InvalidResultError: If the request fails to fetch messages.
+        """
+        svc = "messages/load_interval"
+        params = self._load_interval_params(item_id, time_from, time_to, **kwargs)
+        _store = kwargs.get("store", True)
+        if stream:
+            return self._engine.request_stream(
+                svc,
+                params,
+                self._engine.auth.get_sid(),
+                key="messages",
+            )
+        store = self._engine.message_store
+        if store is not None and _store is True and store.accepts(params):
+            return self._load_stored(store, params)
+        result = self._engine.request(
+            svc,
+            params,
+            self._engine.auth.get_sid(),
+        )
+        return self._interval_messages(result)
+
+    def load_interval_many(
+        self,
+        item_ids: Iterable[int],
+        time_from: datetime = datetime(1969, 12, 31, 20, 0),
+        time_to: datetime = datetime(2106, 2, 7, 3, 28, 15),
+        max_workers: int | None = None,
+        **kwargs: int | str | bool,
+    ) -> Iterator[tuple[int, list[dict[str, Any]] | Exception]]:
+        """Load the messages of many items concurrently.
+
+        A session keeps the messages of its last load in a single buffer, so two
+        loads never run on the same session at once. When the manager is bound to
+        a :class:`~wialon.session_pool.SessionPool`, each load leases a session of
+        the pool for itself and as many loads run as there are sessions; a client
+        or a leased session loads the items one after the other.
+
+        The results are yielded as the loads complete. An item whose load fails,
+        e.g. with :class:`~wialon.errors.NoMessagesForSelectedIntervalError` when
+        the interval has no messages, is yielded with the exception instead of its
+        messages and the other loads go on. Once the pool is closed, the loads
+        that have not leased a session yet are yielded with
+        :class:`~wialon.errors.SessionExceptionError`.
+
+        :param item_ids: The IDs of the items to load messages for.
+        :type item_ids: Iterable[int]
+        :param time_from: The start time of the interval,
+        :type time_from: datetime, optional
+                          defaults to datetime(1969, 12, 31, 20, 0).
+        :param time_to: The end time of the interval, defaults to
+        :type time_to: datetime, optional
+                        datetime(2106, 2, 7, 3, 28, 15).
+        :param max_workers: The loads running at the same time, defaults to and
+                            capped at the number of sessions.
+        :type max_workers: int | None, optional
+        :param kwargs: Additional parameters for message loading, see
+                       :meth:`load_interval`.
+        :type kwargs: dict[str, int | str | bool]
+        :return: An iterator over the item IDs and their messages, or the error of
+                 their load, in the order the loads complete.
+        :rtype: Iterator[tuple[int, list[dict[str, Any]] | Exception]]
+        """
+        # Only a pool can lease sessions; a client or a lease has a single one.
+        lease = getattr(self._engine, "lease", None)
+        sessions = getattr(self._engine, "size", 1) if lease is not None else 1
+        workers = min(max_workers or sessions, sessions)
+        kwargs = {key: value for key, value in kwargs.items() if key != "stream"}
+
+        def load(item_id: int) -> list[dict[str, Any]]:
+            if lease is None:
+                return self.load_interval(
+                    item_id, time_from, time_to, stream=False, **kwargs,
+                )
+            with lease() as engine:
+                return engine.messages.load_interval(
+                    item_id, time_from, time_to, stream=False, **kwargs,
+                )
+
+        return self._load_many(load, item_ids, max(1, workers))
+
+    @staticmethod
+    def _load_many(
+        load: Callable[[int], list[dict[str, Any]]],
+        item_ids: Iterable[int],
+        workers: int,
+    ) -> Iterator[tuple[int, list[dict[str, Any]] | Exception]]:
+        """Run the loads of the items in a pool of threads.
+
+        :param load: the function loading the messages of an item
+        :type load: Callable[[int], list[dict[str, Any]]]
+        :param item_ids: the IDs of the items
+        :type item_ids: Iterable[int]
+        :param workers: the loads running at the same time
+        :type workers: int
+        :return: an iterator over the item IDs and their messages or error
+        :rtype: Iterator[tuple[int, list[dict[str, Any]] | Exception]]
+        """
+        items = iter(item_ids)
+        executor = ThreadPoolExecutor(workers, thread_name_prefix="wialon-messages")
+        pending: dict[Future, int] = {
+            executor.submit(copy_context().run, load, item_id): item_id
+            for item_id in islice(items, workers)
+        }
+        try:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item_id = pending.pop(future)
+                    for item in islice(items, 1):
+                        pending[executor.submit(copy_context().run, load, item)] = item
+                    try:
+                        result: list[dict[str, Any]] | Exception = future.result()
+                    except Exception as exc:  # noqa: BLE001
+                        result = exc
+                    yield item_id, result
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def iter_interval(
+        self,
+        item_id: int,
+        time_from: datetime = datetime(1969, 12, 31, 20, 0),
+        time_to: datetime = datetime(2106, 2, 7, 3, 28, 15),
+        chunk_size: int = 1000,
+        **kwargs: int | str | bool,
+    ) -> Iterator[dict[str, Any]]:
+        """Iterate over the messages of an interval, loading them page by page.
+
+        Each page is a ``messages/load_interval`` call loading at most
+        ``chunk_size`` messages from the time of the last message read, so long
+        intervals neither exceed the limit of messages of the server (error 1004)
+        nor hold every message in memory. A page still refused with error 1004 is
+        loaded again with half the messages.
+
+        :param item_id: The ID of the item to load messages for.
+        :type item_id: int
+        :param time_from: The start time of the interval,
+        :type time_from: datetime, optional
+                          defaults to datetime(1969, 12, 31, 20, 0).
+        :param time_to: The end time of the interval, defaults to
+        :type time_to: datetime, optional
+                        datetime(2106, 2, 7, 3, 28, 15).
+        :param chunk_size: The messages loaded by each page, defaults to 1000.
+        :type chunk_size: int, optional
+        :param kwargs: Additional parameters for message loading, see
+                       :meth:`load_interval`.
+        :type kwargs: dict[str, int | str | bool]
+        :keyword prefetch: Load the next page in a worker thread while the
+                           messages of the current one are consumed, defaults to
+                           False.
+        :return: An iterator over the messages ordered by time.
+        :rtype: Iterator[dict[str, Any]]
+        :raises InvalidResultError: If a page fails to fetch messages.
+        """
+        params = self._load_interval_params(item_id, time_from, time_to, **kwargs)
+        _prefetch = kwargs.get("prefetch", False)
+        prefetch = _prefetch if isinstance(_prefetch, bool) else False
+        return self._iter_pages(
+            params,
+            chunk_size if chunk_size > 0 else 1000,
+            prefetch=prefetch,
+        )
+
+    def _iter_pages(
+        self,
+        params: dict[str, Any],
+        chunk_size: int,
+        *,
+        prefetch: bool,
+    ) -> Iterator[dict[str, Any]]:
+        """Yield the messages of the pages of an interval.
+
+        :param params: the parameters of ``messages/load_interval``
+        :type params: dict[str, Any]
+        :param chunk_size: the messages loaded by each page
+        :type chunk_size: int
+        :param prefetch: load the next page while the current one is consumed
+        :type prefetch: bool
+        :return: an iterator over the messages
+        :rtype: Iterator[dict[str, Any]]
+        """
+        executor = (
+            ThreadPoolExecutor(1, thread_name_prefix="wialon-prefetch")
+            if prefetch
+            else None
+        )
+        pending: Future | None = None
+        start: int | None = params.get("timeFrom", 0)
+        skip = 0
+        try:
+            page, chunk_size = self._fetch_page(params, start or 0, skip, chunk_size)
+            while True:
+                fresh, start, skip = self._next_page(page, skip, chunk_size + skip)
+                if start is not None and executor is not None:
+                    pending = executor.submit(
+                        copy_context().run,
+                        self._fetch_page,
+                        params,
+                        start,
+                        skip,
+                        chunk_size,
+                    )
+                yield from fresh
+                if start is None:
+                    return
+                if pending is not None:
+                    page, chunk_size = pending.result()
+                    pending = None
+                else:
+                    page, chunk_size = self._fetch_page(params, start, skip, chunk_size)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    def _fetch_page(
+        self,
+        params: dict[str, Any],
+        start: int,
+        skip: int,
+        chunk_size: int,
+    ) -> tuple[list[dict[str, Any]], int]:
+        """Fetch a page of messages, halving it while the server refuses it.
+
+        :param params: the parameters of ``messages/load_interval``
+        :type params: dict[str, Any]
+        :param start: the time of the first message of the page
+        :type start: int
+        :param skip: the messages at the start of the page already read
+        :type skip: int
+        :param chunk_size: the new messages to load
+        :type chunk_size: int
+        :raises LimitOfMessagesExceededError: If a single message is refused.
+        :return: the messages of the page and the chunk size it was loaded with
+        :rtype: tuple[list[dict[str, Any]], int]
+        """
+        while True:
+            try:
+                result = self._engine.request(
+                    "messages/load_interval",
+                    self._page_params(params, start, chunk_size + skip),
+                    self._engine.auth.get_sid(),
+                )
+            except NoMessagesForSelectedIntervalError:
+                return [], chunk_size
+            except LimitOfMessagesExceededError:
+                if chunk_size <= 1:
+                    raise
+                chunk_size //= 2
+                continue
+            return self._interval_messages(result), chunk_size
+
+    def _load_stored(
+        self,
+        store: MessageStore,
+        params: dict[str, Any],
+    ) -> list[dict[str, Any]]:
+        """Load messages through the message store.
+
+        The missing sub-ranges of the closed part of the interval are fetched and
+        stored, then the whole closed part is read from the store and the open
+        part is fetched from the API.
+
+        :param store: the message store
+        :type store: MessageStore
+        :param params: the parameters of ``messages/load_interval``
+        :type params: dict[str, Any]
+        :raises NoMessagesForSelectedIntervalError: If the interval has no messages.
+        :return: the messages of the interval ordered by time
+        :rtype: list[dict[str, Any]]
+        """
+        item_id, kind, closed, open_range = self._stored_window(store, params)
+        messages: list[dict[str, Any]] = []
+        if closed[0] <= closed[1]:
+            for interval in store.missing(item_id, kind, *closed):
+                store.add(item_id, kind, interval, self._fetch_range(params, interval))
+            stored = store.read(item_id, kind, *closed)
+            messages = (
+                stored if stored is not None else self._fetch_range(params, closed)
+            )
+        if open_range is not None:
+            messages.extend(self._fetch_range(params, open_range))
+        if not messages:
+            # Like the API, which answers error 1001 for an empty interval.
+            msg = "No messages for selected interval."
+            raise NoMessagesForSelectedIntervalError(msg)
+        return messages
+
+    def _fetch_range(
+        self,
+        params: dict[str, Any],
+        interval: Interval,
+    ) -> list[dict[str, Any]]:
+        """Fetch the messages of a sub-range from the API.
+
+        :param params: the parameters of ``messages/load_interval``
+        :type params: dict[str, Any]
+        :param interval: the first and last second of the sub-range
+        :type interval: Interval
+        :return: the messages of the sub-range
+        :rtype: list[dict[str, Any]]
+        """
+        try:
+            result = self._engine.request(
+                "messages/load_interval",
+                self._range_params(params, interval),
+                self._engine.auth.get_sid(),
+            )
+        except NoMessagesForSelectedIntervalError:
+            return []
+        return self._interval_messages(result)
+
+    def load_last(
+        self,
+        item_id: int,
+        last_time: int,
+        last_count: int,
+        **kwargs: dict[str, int],
+    ) -> dict[str, Any]:
+        """Load the last messages for a given item within a specified time interval.
+
+        :param item_id: The ID of the item to load messages for.
+        :type item_id: int
+        :param last_time: The end time of the interval to load messages for.
+        :type last_time: int
+        :param last_count: The number of messages to load.
+        :type last_count: int
+        :param kwargs: Additional parameters for the request.
+        :type kwargs: dict[str, int]
+        :keyword flags: Optional flags for the request.
+        :keyword flags_mask: Optional mask for the flags.
+        :keyword load_count: Optional count of messages to load.
+        :return: A dictionary containing the loaded messages.
+        :rtype: dict[str, Any]
+        :raises InvalidResultError: If the request fails to fetch messages.
+        """
+        svc = "messages/load_last"
+        params = self._load_last_params(item_id, last_time, last_count, **kwargs)
+        result = self._engine.request(svc, params, self._engine.auth.get_sid())
+        if isinstance(result, dict):
+            return result
+        msg = "Failed to fetch messages for the interval."
+        raise InvalidResultError(msg)
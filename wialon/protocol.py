@@ -0,0 +1,106 @@
+"""Request encoding and response decoding shared by the Wialon clients."""
+
+import json
+from typing import Any
+
+from .errors import validate_error
+
+try:
+    import orjson
+except ImportError:  # orjson is an optional speedup
+    orjson = None  # type: ignore[assignment]
+
+# The parameters of a call: an object, or the calls of a core/batch.
+Params = dict[str, Any] | list[dict[str, Any]] | None
+
+_ENCODER = json.JSONEncoder(
+    separators=(",", ":"),
+    ensure_ascii=False,
+    check_circular=False,
+)
+
+
+def dumps(obj: object) -> str:
+    """Encode an object as compact JSON.
+
+    ``orjson`` is used when it is installed, otherwise the standard library.
+
+    :param obj: the object to encode
+    :type obj: object
+    :return: the JSON document
+    :rtype: str
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    return _ENCODER.encode(obj)
+
+
+def loads(content: bytes | str) -> Any:  # noqa: ANN401
+    """Decode a JSON document.
+
+    ``orjson`` is used when it is installed, otherwise the standard library.
+
+    :param content: the JSON document
+    :type content: bytes | str
+    :raises json.JSONDecodeError: The document is not a valid JSON.
+    :return: the decoded object
+    :rtype: Any
+    """
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def build_query(svc: str, params: Params, sid: str | None = None) -> dict[str, str]:
+    """Build the query string sent to the Wialon API.
+
+    :param svc: the Wialon API service to be used
+    :type svc: str
+    :param params: the parameters of the service
+    :type params: Params
+    :param sid: the session ID to be used, defaults to None
+    :type sid: str | None, optional
+    :return: the query parameters of the request
+    :rtype: dict[str, str]
+    """
+    query = {
+        "svc": svc,
+    }
+    if sid:
+        query["sid"] = sid
+    query["params"] = dumps({} if params is None else params)
+    return query
+
+
+def parse_response(
+    content: bytes,
+    *,
+    validate: bool = True,
+) -> dict[str, Any] | list[dict[str, Any]]:
+    """Decode a Wialon API response and raise the error it carries, if any.
+
+    :param content: the raw body of the response
+    :type content: bytes
+    :param validate: raise the error carried by the response, defaults to True
+    :type validate: bool, optional
+    :raises json.JSONDecodeError: Response is not a valid JSON.
+    :return: the decoded response
+    :rtype: dict[str, Any] | list[dict[str, Any]]
+    """
+    try:
+        response = loads(content)
+    except json.JSONDecodeError as exc:
+        msg = "Response is not a valid JSON, please verify the API URL."
+        raise json.JSONDecodeError(
+            msg,
+            str(exc),
+            0,
+        ) from exc
+    if not validate:
+        return response
+    if isinstance(response, list):
+        for item in response:
+            validate_error(item)
+    else:
+        validate_error(response)
+    return response
@@ -0,0 +1,309 @@
+"""Client-side rate limiting that adapts to the Wialon concurrency limit.
+
+Each limiter combines a token bucket (requests per second) with a cap on the
+requests in flight. Both are lowered multiplicatively whenever the server
+answers with error code 10 (:class:`~wialon.errors.ReachedLimitOfConcurrentRequestsError`)
+and raised additively while calls succeed, so the throughput settles just
+below the limit of the server. Throttled calls are queued and sent again
+instead of failing.
+"""
+
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from .errors import DeadlineExceededError, ReachedLimitOfConcurrentRequestsError
+from .timeouts import remaining
+
+
+@dataclass(frozen=True)
+class LimiterMetrics:
+    """Snapshot of the state of a rate limiter.
+
+    :ivar float rate: the current rate in requests per second, 0 when unlimited
+    :ivar float max_rate: the configured rate ceiling, 0 when unlimited
+    :ivar int concurrency: the current cap of requests in flight, 0 when unlimited
+    :ivar int max_concurrency: the configured concurrency ceiling, 0 when unlimited
+    :ivar int in_flight: the requests being sent
+    :ivar int waiting: the requests queued for a slot
+    :ivar int calls: the requests that got a slot
+    :ivar int throttled: the responses with error code 10
+    :ivar float wait_time: the total seconds spent waiting for a slot
+    """
+
+    rate: float
+    max_rate: float
+    concurrency: int
+    max_concurrency: int
+    in_flight: int
+    waiting: int
+    calls: int
+    throttled: int
+    wait_time: float
+
+
+class BaseRateLimiter:
+    """Token bucket, concurrency cap and AIMD policy shared by the limiters."""
+
+    def __init__(
+        self,
+        rate: float = 0.0,
+        max_concurrency: int = 10,
+        *,
+        decrease: float = 0.5,
+        max_retries: int = 10,
+        min_rate: float = 1.0,
+    ) -> None:
+        """Initialize the limiter at its ceiling.
+
+        :param rate: maximum requests per second, 0 for no rate limit,
+                     defaults to 0.0
+        :type rate: float, optional
+        :param max_concurrency: maximum requests in flight, 0 for no cap until the
+                                first error code 10, defaults to 10
+        :type max_concurrency: int, optional
+        :param decrease: factor applied to the rate and the concurrency cap on
+                         error code 10, defaults to 0.5
+        :type decrease: float, optional
+        :param max_retries: times a throttled call is queued again before the error
+                            is raised, defaults to 10
+        :type max_retries: int, optional
+        :param min_rate: the rate is never lowered below this value, defaults to 1.0
+        :type min_rate: float, optional
+        """
+        self.max_rate = rate if rate > 0 else 0.0
+        self.max_concurrency = max(0, max_concurrency)
+        self.max_retries = max_retries if max_retries >= 0 else 10
+        self._decrease = decrease if 0 < decrease < 1 else 0.5
+        self._min_rate = min(min_rate, self.max_rate) if self.max_rate else 0.0
+        self._rate = self.max_rate
+        self._limit = self.max_concurrency
+        self._tokens = self._burst
+        self._refilled = time.monotonic()
+        self._decreased = 0
+        self._successes = 0
+        self._in_flight = 0
+        self._waiting = 0
+        self._calls = 0
+        self._throttled = 0
+        self._wait_time = 0.0
+
+    @property
+    def _burst(self) -> float:
+        """Return the capacity of the token bucket.
+
+        :return: the number of requests that can be sent at once
+        :rtype: float
+        """
+        return max(1.0, self._rate)
+
+    def _take_slot(self, now: float) -> float | None:
+        """Take a slot if one is free.
+
+        The ticket of the slot is the value of :attr:`_calls` once it is taken.
+
+        :param now: the current monotonic time
+        :type now: float
+        :return: 0 when the slot was taken, otherwise the seconds until a token is
+                 available, or None when the concurrency cap is reached
+        :rtype: float | None
+        """
+        if self._limit and self._in_flight >= self._limit:
+            return None
+        if self._rate:
+            self._tokens = min(
+                self._burst,
+                self._tokens + (now - self._refilled) * self._rate,
+            )
+            self._refilled = now
+            if self._tokens < 1:
+                return (1 - self._tokens) / self._rate
+            self._tokens -= 1
+        self._in_flight += 1
+        self._calls += 1
+        return 0.0
+
+    def _record(self, ticket: int, *, throttled: bool) -> None:
+        """Release a slot and adapt the limits to its outcome.
+
+        Requests already in flight when the limits were lowered were sent at the
+        old limits, so their errors do not lower them again.
+
+        :param ticket: the ticket of the slot
+        :type ticket: int
+        :param throttled: whether the server answered with error code 10
+        :type throttled: bool
+        """
+        self._in_flight -= 1
+        if throttled:
+            self._throttled += 1
+            self._successes = 0
+            if ticket <= self._decreased:
+                return
+            self._decreased = self._calls
+            current = self._limit or self._in_flight + 1
+            self._limit = max(1, int(current * self._decrease))
+            if self._rate:
+                self._rate = max(self._min_rate, self._rate * self._decrease)
+                self._tokens = min(self._tokens, self._burst)
+            return
+
+        self._successes += 1
+        if self._successes < (self._limit or self._burst):
+            return
+        # Additive increase: one more slot and request per second per full window.
+        self._successes = 0
+        if self._limit:
+            self._limit += 1
+            if self.max_concurrency:
+                self._limit = min(self.max_concurrency, self._limit)
+        if self._rate:
+            self._rate = min(self.max_rate, self._rate + 1)
+
+    @staticmethod
+    def _wait_limit(
+        wait: float | None,
+        start: float,
+        now: float,
+        timeout: float | None,
+    ) -> float | None:
+        """Return how long to wait for a slot before checking again.
+
+        :param wait: the seconds until a token is available, None to wait for a
+                     request in flight to be answered
+        :type wait: float | None
+        :param start: the monotonic time the wait started at
+        :type start: float
+        :param now: the current monotonic time
+        :type now: float
+        :param timeout: the seconds to wait at most, None for no limit
+        :type timeout: float | None
+        :raises DeadlineExceededError: If the timeout has elapsed.
+        :return: the seconds to wait, None for no limit
+        :rtype: float | None
+        """
+        if timeout is None:
+            return wait
+        left = start + timeout - now
+        if left <= 0:
+            msg = "The deadline elapsed while waiting for the rate limiter."
+            raise DeadlineExceededError(msg)
+        return left if wait is None else min(wait, left)
+
+    def backoff(self, attempt: int) -> float:
+        """Return the delay before a throttled call is queued again.
+
+        :param attempt: the number of times the call was throttled
+        :type attempt: int
+        :return: the delay in seconds
+        :rtype: float
+        """
+        return min(2.0, 0.05 * 2 ** (attempt - 1))
+
+    def metrics(self) -> LimiterMetrics:
+        """Return a snapshot of the state of the limiter.
+
+        :return: the metrics of the limiter
+        :rtype: LimiterMetrics
+        """
+        return LimiterMetrics(
+            rate=self._rate,
+            max_rate=self.max_rate,
+            concurrency=self._limit,
+            max_concurrency=self.max_concurrency,
+            in_flight=self._in_flight,
+            waiting=self._waiting,
+            calls=self._calls,
+            throttled=self._throttled,
+            wait_time=self._wait_time,
+        )
+
+
+class RateLimiter(BaseRateLimiter):
+    """Adaptive rate limiter for threads."""
+
+    def __init__(
+        self,
+        rate: float = 0.0,
+        max_concurrency: int = 10,
+        *,
+        decrease: float = 0.5,
+        max_retries: int = 10,
+        min_rate: float = 1.0,
+    ) -> None:
+        """Initialize the limiter, see :class:`BaseRateLimiter`."""
+        super().__init__(
+            rate,
+            max_concurrency,
+            decrease=decrease,
+            max_retries=max_retries,
+            min_rate=min_rate,
+        )
+        self._condition = threading.Condition()
+
+    def acquire(self, timeout: float | None = None) -> int:
+        """Wait until a request can be sent.
+
+        :param timeout: the seconds to wait at most, defaults to None (no limit)
+        :type timeout: float | None, optional
+        :raises DeadlineExceededError: If no slot was free within the timeout.
+        :return: the ticket of the slot, to be given to :meth:`release`
+        :rtype: int
+        """
+        start = time.monotonic()
+        with self._condition:
+            self._waiting += 1
+            try:
+                while (wait := self._take_slot(now := time.monotonic())) != 0:
+                    self._condition.wait(self._wait_limit(wait, start, now, timeout))
+            finally:
+                self._waiting -= 1
+            self._wait_time += time.monotonic() - start
+            return self._calls
+
+    def release(self, ticket: int, *, throttled: bool = False) -> None:
+        """Release the slot of a request once it has been answered.
+
+        :param ticket: the ticket returned by :meth:`acquire`
+        :type ticket: int
+        :param throttled: whether the server answered with error code 10,
+                          defaults to False
+        :type throttled: bool, optional
+        """
+        with self._condition:
+            self._record(ticket, throttled=throttled)
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Hold a slot while the block sends a request.
+
+        The wait for the slot is bounded by the active deadline, see
+        :func:`~wialon.timeouts.deadline`. The slot is released as throttled when
+        the block raises
+        :class:`~wialon.errors.ReachedLimitOfConcurrentRequestsError`.
+
+        :raises DeadlineExceededError: If the deadline elapsed while waiting.
+        :return: nothing, the block sends the request
+        :rtype: Iterator[None]
+        """
+        ticket = self.acquire(remaining())
+        throttled = False
+        try:
+            yield
+        except ReachedLimitOfConcurrentRequestsError:
+            throttled = True
+            raise
+        finally:
+            self.release(ticket, throttled=throttled)
+
+    def metrics(self) -> LimiterMetrics:
+        """Return a snapshot of the state of the limiter.
+
+        :return: the metrics of the limiter
+        :rtype: LimiterMetrics
+        """
+        with self._condition:
+            return super().metrics()
@@ -1,26 +1,27 @@
 """Reports module."""
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
 from datetime import datetime
 from time import sleep
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Self
 
 from loguru import logger
 
+from .log import payload
+from .timeouts import capped
+
 if TYPE_CHECKING:
-    from .wialon import Wialon
+    from .engine import Engine
 
-class Report:
-    """Reports class.
+class BaseReport:
+    """Report parameters and result handling shared by the report managers.
 
-    :ivar wialon _engine: The Wialon object.
     :cvar dict _statuses: The report statuses.
     """
 
-    def __init__(self, engine:"Wialon") -> None:
-        """Initialize the Reports class.
-
-        :param wialon wialon: The Wialon object.
-        """
-        self._engine = engine
+    def __init__(self) -> None:
+        """Initialize the report tables."""
         self._statuses = {1: "In a queue",
                           2: "Proceed",
                           4: "Done",
@@ -42,111 +43,80 @@ class Report:
         }
         self._pages_sizes = ["a4","a3","legal","letter"]
 
-    def apply_result(self) -> dict[str,Any]:
-        """Retrieve the report result.
+    def _apply_result_response(self,
+                               params:dict[str,Any],
+                               response:dict[str,Any]|list[dict[str,Any]]|bytes,
+                               ) -> dict[str,Any]:
+        """Validate the response of the apply result request.
 
+        :param dict params: The parameters of the request.
+        :param response: The response of the request.
         :raises ValueError: If the report result cannot be retrieved.
         :return: The report result.
         :rtype: dict[str,Any]
         """
-        svc = "report/apply_report_result"
-        params = {}
-        response = self._engine.request(svc=svc,
-                                        params=params,
-                                        sid=self._engine.auth.get_sid())
         if isinstance(response, dict):
             logger.info("Report result applied.")
             self._has_result = True
             return response
 
         logger.error("The request response is not dict")
-        logger.debug(f"Request: {params}, Response: {response}")
+        logger.opt(lazy=True).debug(
+            "Request: {}, Response: {}",
+            lambda: payload(params),
+            lambda: payload(response),
+        )
         msg = "Failed to retrieve report result."
         raise ValueError(msg)
 
-    def get_result(self,
-                   table_index:int=0,
-                   index_from:int=0,
-                   index_to:int=0,
-                   **kwargs:bool) -> list[dict[str,Any]]:
-        """Obtain the report result.
-
-        :param table_index: The index of the previous execution table, defaults to 0
-        :type table_index: int, optional
-        :param index_from: The index of the row from where it will be taken into account,
-        :type index_from: int, optional
-        defaults to 0
-        :param index_to: The index to the row that will be taken into account,
-        :type index_to: int, optional
-        defaults to 0
-        :param multi_level: The indicator of whether the sub -levels must be recovered,
-        :type multi_level: bool, optional
-        defaults to False
-        :raises ValueError: If the report result cannot be recovered.
-        :return: The result of the report.
-        :rtype: dict[str,Any]
+    def _result_rows_params(self,
+                            table_index:int,
+                            index_from:int,
+                            index_to:int) -> dict[str,int]:
+        """Build the parameters to obtain the rows of the report result.
+
+        :param int table_index: The index of the previous execution table.
+        :param int index_from: The index of the first row.
+        :param int index_to: The index of the last row.
+        :raises BufferError: If there is no report result to retrieve.
+        :return: The parameters of the request.
+        :rtype: dict[str,int]
         """
         if not self._has_result:
             logger.error("No report result to retrieve. First generate a report.")
             msg = "No report result to retrieve. First generate a report."
             raise BufferError(msg)
 
-        multi_level = kwargs.get("multi_level", False)
-
-        svc = "report/get_result_rows"
-        params = {
+        return {
             "tableIndex": table_index,
             "indexFrom": index_from,
             "indexTo": index_to,
         }
-        response = self._engine.request(svc=svc,
-                                        params=params,
-                                        sid=self._engine.auth.get_sid())
 
-        if not isinstance(response, list):
-            logger.error("The request response is not dict")
-            logger.debug(f"Request: {params}, Response: {response}")
-            msg = "Failed to retrieve report result."
-            raise TypeError(msg)
-
-        if multi_level:
-            return self._get_sub_rows(table_index, list(range(index_from, index_to)))
-
-        return response
-
-    def _get_sub_rows(self,
-                      table_index:int,
-                      row_index:int|list[int],
-                      ) -> list[dict[str,Any]]:
-        """Retrieve the sub rows of a report.
+    @staticmethod
+    def _sub_rows_batch(table_index:int,
+                        row_index:list[int]) -> list[dict[str,Any]]:
+        """Build the batch that retrieves the sub rows of several rows.
 
         :param int table_index: The table index.
-        :param int row_index: The row index.
-        :return: The sub rows of the report.
-        :rtype: list[dict[str,Any]]|list[list[dict[str,Any]]]
+        :param list[int] row_index: The row indexes.
+        :return: The batch parameters.
+        :rtype: list[dict[str,Any]]
         """
-        if isinstance(row_index, int):
-            svc = "report/get_result_subrows"
-            params = {
-                "tableIndex": table_index,
-                "rowIndex": row_index,
-            }
-            response = self._engine.request(svc=svc,
-                                        params=params,
-                                        sid=self._engine.auth.get_sid())
-            if isinstance(response, list):
-                return response
-            logger.error("The request response is not list")
-            logger.debug(f"Request: {params}, Response: {response}")
-            msg = "Failed to retrieve sub rows."
-            raise ValueError(msg)
+        return [{"svc": "report/get_result_subrows",
+                 "params": {"tableIndex": table_index,
+                            "rowIndex": x}} for x in row_index]
 
-        params = [{"svc": "report/get_result_subrows",
-                   "params": {"tableIndex": table_index,
-                              "rowIndex": x}} for x in row_index]
-
-        response = self._engine.extra.batch(params)
+    @staticmethod
+    def _flatten_sub_rows(
+        response:list[dict[str,Any]]|list[list[dict[str,Any]]],
+    ) -> list[dict[str,Any]]:
+        """Flatten the sub rows returned by a batch request.
 
+        :param response: The batch response.
+        :return: The sub rows of the report.
+        :rtype: list[dict[str,Any]]
+        """
         return [
                 item
                 for sublist in response
@@ -154,27 +124,23 @@ class Report:
                 if isinstance(item, dict)
             ]
 
-    def execute(self,
-                object_id:int|list[int],
-                resource_id:int,
-                template_id:int,
-                **kwargs:datetime|int|str) -> str|dict[str,Any] :
-        """Execute a report.
+    def _execute_params(self,
+                        object_id:int|list[int],
+                        resource_id:int,
+                        template_id:int,
+                        **kwargs:datetime|int|str) -> dict[str,Any]:
+        """Build the parameters to execute a report.
 
         :param int|list[int] object_id: Object ID or list of object IDs.
         :param int resource_id: Resource ID.
         :param int template_id: Template ID.
-        :raises ValueError: If the report generation fails.
         :param datetime date_from: The start date. Default is the first day of the month.
         :param datetime date_to: The end date. Default is today.
         :param int object_sec_id: The object sec ID. Default is 0.
         :param int flags: The flags. Default is 0x1000000.
         :param str report_template: The report template. Default is "".
         :param bool remote_exec: The remote execution flag. Default is True.
-        :param bool async_wait: The async wait flag. Default is True.
-        :return: The report result.
-        :rtype: str
-        :return: The dict with the report results.
+        :return: The parameters of the request.
         :rtype: dict[str,Any]
         """
         logger.info("Executing report.")
@@ -192,7 +158,6 @@ class Report:
         flags = kwargs.get("flags", 0x1000000)
         report_template = kwargs.get("report_template", "")
         remote_exec = kwargs.get("remote_exec", True)
-        async_wait = kwargs.get("async_wait", True)
         # Data Validation
         ## Date Validation
         if not isinstance(date_from, datetime) or not isinstance(date_to, datetime):
@@ -228,7 +193,6 @@ class Report:
             remote_exec = True
 
         # Prepare the request
-        svc = "report/exec_report"
         params = {
             "reportResourceId": resource_id,
             "reportTemplateId": template_id,
@@ -243,55 +207,34 @@ class Report:
             "remoteExec": 1 if remote_exec else 0,
             "reportTemplate": report_template,
         }
-        logger.debug(f"Request: {params}")
+        logger.opt(lazy=True).debug("Request: {}", lambda: payload(params))
+        return params
 
-        # Request and results
-        response = self._engine.request(svc=svc,
-                                      params=params,
-                                      sid=self._engine.auth.get_sid())
+    def _execute_started(self,
+                         response:dict[str,Any]|list[dict[str,Any]]|bytes) -> bool:
+        """Check whether the report execution has been started remotely.
 
+        :param response: The response of the execution request.
+        :raises ValueError: If the report generation fails.
+        :return: True if the report is being generated.
+        :rtype: bool
+        """
         if isinstance(response, dict):
             self._has_result = False
             result: dict[str,int] = response
             if "remoteExec" in result and result["remoteExec"] == 1:
-
-                # Wait for the report to be generated
-                if not async_wait:
-                    response = self.status()
-                    done = "4"
-                    while response["code"] != done:
-                        response = self.status()
-                        logger.info(f"Waiting status: {response}")
-                    response = self.apply_result()
-                    logger.debug(response)
-                    return response
-
-                return "Report is being generated."
+                return True
         msg = "Report generation failed."
         raise ValueError(msg)
 
-    def export_result(self,file_format:str, **kwargs:bool|int|str) -> bytes:
-        """Export the report result.
+    def _export_params(self,file_format:str, **kwargs:bool|int|str) -> dict[str,Any]:
+        """Build the parameters to export the report result.
 
         :param str file_format: The file format.
-        :param bool,optional compress: The compress flag. Default is True.
-        :param str,optional page_orientation: The page orientation. Default is landscape.
-        [landscape, portrait]
-        :param str,optional page_size: The page size. Default is a4.
-        [a4, a3, legal, letter]
-        :param str,optional page_width: The page width. Default is fixed.
-        [fixed, compact, no wrap]
-        :param str,optional coding: The coding. Default is utf8. [utf8, cp1251]
-        :param str,optional delimiter: The delimiter. Default is comma. [(,), (;)]
-        :param bool,optional headings: The headings flag. Default is False.
-        :param bool,optional attach_map: The attach map flag. Default is False.
-        :param bool,optional extend_bounds: The extend bounds flag. Default is False.
-        :param bool,optional hide_map_basis: The hide map basis flag. Default is False.
         :raises BufferError: If there is no report result to export.
         :raises ValueError: If the export format is invalid.
-        :raises TypeError: If the report result cannot be exported.
-        :return: The exported report result.
-        :rtype: bytes
+        :return: The parameters of the request.
+        :rtype: dict[str,Any]
         """
         if not self._has_result:
             msg = "No report result to export. First generate a report."
@@ -300,8 +243,6 @@ class Report:
             msg = "Invalid export format."
             raise ValueError(msg)
 
-        svc = "report/export_result"
-
         _compress = kwargs.get("compress", True)
         compress = 1 if _compress else 0
         attach_map = 0
@@ -355,7 +296,7 @@ class Report:
             )
             hide_map_basis = 1 if _hide_map_basis else 0
 
-        params = {
+        return {
             "format": self._export_formats[file_format],
             "compress": compress,
             "pageOrientation": page_orientation,
@@ -369,27 +310,17 @@ class Report:
             "hideMapBasis": hide_map_basis,
             "outputFileName": output_filename,
         }
-        response = self._engine.request(svc=svc,
-                                        params=params,
-                                        sid=self._engine.auth.get_sid())
-        if isinstance(response, bytes):
-            return response
-        msg = "Failed to export report result."
-        raise TypeError(msg)
 
-    def status(self) -> dict[str,str]:
-        """Retrieve the report status.
+    def _status_result(self,
+                       response:dict[str,Any]|list[dict[str,Any]]|bytes,
+                       ) -> dict[str,str]:
+        """Translate the response of the status request.
 
+        :param response: The response of the status request.
         :raises ValueError: If the report status cannot be retrieved.
         :return: The report status.
         :rtype: dict[str,str]
         """
-        sleep(2)
-        svc = "report/get_report_status"
-        params = {}
-        response = self._engine.request(svc=svc,
-                                      params=params,
-                                      sid=self._engine.auth.get_sid())
         if isinstance(response, dict) and "status" in response:
             code = int(response["status"])
             return {"code":response["status"],
@@ -416,3 +347,242 @@ class Report:
             raise ValueError(msg)
 
         return data
+
+
+class Report(BaseReport):
+    """Reports class.
+
+    :ivar wialon _engine: The Wialon object.
+    :cvar dict _statuses: The report statuses.
+    """
+
+    def __init__(self, engine:"Engine") -> None:
+        """Initialize the Reports class.
+
+        :param wialon wialon: The Wialon object.
+        """
+        super().__init__()
+        self._engine = engine
+        # The session keeps a single report result: one report job at a time.
+        self._lock = threading.RLock()
+
+    @contextmanager
+    def job(self) -> Iterator[Self]:
+        """Hold the report of the session for a sequence of calls.
+
+        Each method of the manager is safe to call from several threads, but the
+        Wialon session only keeps the result of its last report. Wrap the calls
+        of one report, from :meth:`execute` to :meth:`get_result`, in this block
+        so that other threads sharing the client wait for it to finish::
+
+            with client.report.job() as report:
+                report.execute(unit_id, resource_id, template_id, async_wait=False)
+                rows = report.get_result(index_to=100)
+
+        :return: the report manager
+        :rtype: Iterator[Report]
+        """
+        with self._lock:
+            yield self
+
+    def apply_result(self) -> dict[str,Any]:
+        """Retrieve the report result.
+
+        :raises ValueError: If the report result cannot be retrieved.
+        :return: The report result.
+        :rtype: dict[str,Any]
+        """
+        with self._lock:
+            svc = "report/apply_report_result"
+            params = {}
+            response = self._engine.request(svc=svc,
+                                            params=params,
+                                            sid=self._engine.auth.get_sid())
+            return self._apply_result_response(params, response)
+
+    def get_result(self,
+                   table_index:int=0,
+                   index_from:int=0,
+                   index_to:int=0,
+                   **kwargs:bool) -> list[dict[str,Any]]:
+        """Obtain the report result.
+
+        :param table_index: The index of the previous execution table, defaults to 0
+        :type table_index: int, optional
+        :param index_from: The index of the row from where it will be taken into account,
+        :type index_from: int, optional
+        defaults to 0
+        :param index_to: The index to the row that will be taken into account,
+        :type index_to: int, optional
+        defaults to 0
+        :param multi_level: The indicator of whether the sub -levels must be recovered,
+        :type multi_level: bool, optional
+        defaults to False
+        :raises ValueError: If the report result cannot be recovered.
+        :return: The result of the report.
+        :rtype: dict[str,Any]
+        """
+        with self._lock:
+            params = self._result_rows_params(table_index, index_from, index_to)
+            multi_level = kwargs.get("multi_level", False)
+
+            svc = "report/get_result_rows"
+            response = self._engine.request(svc=svc,
+                                            params=params,
+                                            sid=self._engine.auth.get_sid())
+
+            if not isinstance(response, list):
+                logger.error("The request response is not dict")
+                logger.opt(lazy=True).debug(
+                    "Request: {}, Response: {}",
+                    lambda: payload(params),
+                    lambda: payload(response),
+                )
+                msg = "Failed to retrieve report result."
+                raise TypeError(msg)
+
+            if multi_level:
+                return self._get_sub_rows(table_index, list(range(index_from, index_to)))
+
+            return response
+
+    def _get_sub_rows(self,
+                      table_index:int,
+                      row_index:int|list[int],
+                      ) -> list[dict[str,Any]]:
+        """Retrieve the sub rows of a report.
+
+        :param int table_index: The table index.
+        :param int row_index: The row index.
+        :return: The sub rows of the report.
+        :rtype: list[dict[str,Any]]|list[list[dict[str,Any]]]
+        """
+        if isinstance(row_index, int):
+            svc = "report/get_result_subrows"
+            params = {
+                "tableIndex": table_index,
+                "rowIndex": row_index,
+            }
+            response = self._engine.request(svc=svc,
+                                        params=params,
+                                        sid=self._engine.auth.get_sid())
+            if isinstance(response, list):
+                return response
+            logger.error("The request response is not list")
+            logger.opt(lazy=True).debug(
+                "Request: {}, Response: {}",
+                lambda: payload(params),
+                lambda: payload(response),
+            )
+            msg = "Failed to retrieve sub rows."
+            raise ValueError(msg)
+
+        params = self._sub_rows_batch(table_index, row_index)
+
+        response = self._engine.extra.batch(params)
+
+        return self._flatten_sub_rows(response)
+
+    def execute(self,
+                object_id:int|list[int],
+                resource_id:int,
+                template_id:int,
+                **kwargs:datetime|int|str) -> str|dict[str,Any] :
+        """Execute a report.
+
+        :param int|list[int] object_id: Object ID or list of object IDs.
+        :param int resource_id: Resource ID.
+        :param int template_id: Template ID.
+        :raises ValueError: If the report generation fails.
+        :param datetime date_from: The start date. Default is the first day of the month.
+        :param datetime date_to: The end date. Default is today.
+        :param int object_sec_id: The object sec ID. Default is 0.
+        :param int flags: The flags. Default is 0x1000000.
+        :param str report_template: The report template. Default is "".
+        :param bool remote_exec: The remote execution flag. Default is True.
+        :param bool async_wait: The async wait flag. Default is True.
+        :return: The report result.
+        :rtype: str
+        :return: The dict with the report results.
+        :rtype: dict[str,Any]
+        """
+        with self._lock:
+            async_wait = kwargs.get("async_wait", True)
+            params = self._execute_params(object_id, resource_id, template_id, **kwargs)
+
+            # Request and results
+            svc = "report/exec_report"
+            response = self._engine.request(svc=svc,
+                                          params=params,
+                                          sid=self._engine.auth.get_sid())
+
+            self._execute_started(response)
+
+            # Wait for the report to be generated
+            if not async_wait:
+                response = self.status()
+                done = "4"
+                while response["code"] != done:
+                    response = self.status()
+                    logger.opt(lazy=True).info(
+                        "Waiting status: {}",
+                        lambda status=response: payload(status),
+                    )
+                response = self.apply_result()
+                logger.opt(lazy=True).debug(
+                    "Report result: {}", lambda: payload(response),
+                )
+                return response
+
+            return "Report is being generated."
+
+    def export_result(self,file_format:str, **kwargs:bool|int|str) -> bytes:
+        """Export the report result.
+
+        :param str file_format: The file format.
+        :param bool,optional compress: The compress flag. Default is True.
+        :param str,optional page_orientation: The page orientation. Default is landscape.
+        [landscape, portrait]
+        :param str,optional page_size: The page size. Default is a4.
+        [a4, a3, legal, letter]
+        :param str,optional page_width: The page width. Default is fixed.
+        [fixed, compact, no wrap]
+        :param str,optional coding: The coding. Default is utf8. [utf8, cp1251]
+        :param str,optional delimiter: The delimiter. Default is comma. [(,), (;)]
+        :param bool,optional headings: The headings flag. Default is False.
+        :param bool,optional attach_map: The attach map flag. Default is False.
+        :param bool,optional extend_bounds: The extend bounds flag. Default is False.
+        :param bool,optional hide_map_basis: The hide map basis flag. Default is False.
+        :raises BufferError: If there is no report result to export.
+        :raises ValueError: If the export format is invalid.
+        :raises TypeError: If the report result cannot be exported.
+        :return: The exported report result.
+        :rtype: bytes
+        """
+        with self._lock:
+            params = self._export_params(file_format, **kwargs)
+            svc = "report/export_result"
+            response = self._engine.request(svc=svc,
+                                            params=params,
+                                            sid=self._engine.auth.get_sid(),
+                                            file=True)
+            if isinstance(response, bytes):
+                return response
+            msg = "Failed to export report result."
+            raise TypeError(msg)
+
+    def status(self) -> dict[str,str]:
+        """Retrieve the report status.
+
+        :raises ValueError: If the report status cannot be retrieved.
+        :return: The report status.
+        :rtype: dict[str,str]
+        """
+        with self._lock:
+            sleep(capped(2))
+            svc = "report/get_report_status"
+            params = {}
+            response = self._engine.request(svc=svc,
+                                          params=params,
+                                          sid=self._engine.auth.get_sid())
+            return self._status_result(response)
@@ -0,0 +1,127 @@
+"""Retry policy for transient failures of the Wialon API.
+
+Only calls that can safely be sent twice are retried. A service is treated as
+idempotent when its action reads data (``core/search_items``,
+``messages/load_interval``, ``exchange/export_messages``...), and as mutating
+otherwise (``exchange/import_messages``, ``item/update_name``...). A
+``core/batch`` request is idempotent when every call it holds is.
+"""
+
+import random
+from dataclasses import dataclass, field
+
+from .errors import (
+    AuthorizationServerUnavailableError,
+    ExecutionTimeExceededError,
+    PerformingRequestError,
+)
+from .protocol import Params
+
+# requests and asyncio raise subclasses of OSError for connection resets and
+# timeouts; the asynchronous client adds the aiohttp connection errors.
+RETRYABLE_ERRORS: tuple[type[Exception], ...] = (
+    PerformingRequestError,
+    AuthorizationServerUnavailableError,
+    ExecutionTimeExceededError,
+    OSError,
+)
+
+READ_ACTIONS = ("search", "get", "load", "check", "export", "list", "select")
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Exponential backoff with full jitter, bounded by attempts and a deadline.
+
+    :ivar int max_attempts: the attempts of a call including the first one
+    :ivar float base_delay: the delay before the first retry, in seconds
+    :ivar float max_delay: the longest delay between two attempts, in seconds
+    :ivar float deadline: the seconds after the first attempt past which no retry
+                          is started
+    :ivar bool jitter: pick each delay at random between 0 and its backoff value
+    :ivar tuple retry_on: the exceptions that are retried
+    :ivar frozenset idempotent: services retried regardless of their action
+    :ivar frozenset non_idempotent: services never retried
+    """
+
+    max_attempts: int = 3
+    base_delay: float = 0.25
+    max_delay: float = 8.0
+    deadline: float = 30.0
+    jitter: bool = True
+    retry_on: tuple[type[Exception], ...] = RETRYABLE_ERRORS
+    idempotent: frozenset[str] = field(
+        default_factory=lambda: frozenset({"token/login"}),
+    )
+    non_idempotent: frozenset[str] = field(
+        default_factory=lambda: frozenset({"core/logout"}),
+    )
+
+    def is_idempotent(self, svc: str, params: Params = None) -> bool:
+        """Return whether a call can be sent again without side effects.
+
+        :param svc: the Wialon API service
+        :type svc: str
+        :param params: the parameters of the call, defaults to None
+        :type params: Params, optional
+        :return: whether the call is idempotent
+        :rtype: bool
+        """
+        if svc in self.non_idempotent:
+            return False
+        if svc in self.idempotent:
+            return True
+        if svc == "core/batch":
+            calls = params.get("params") if isinstance(params, dict) else params
+            return isinstance(calls, list) and all(
+                isinstance(call, dict)
+                and self.is_idempotent(call.get("svc", ""), call.get("params"))
+                for call in calls
+            )
+        action = svc.partition("/")[2]
+        return action.startswith(READ_ACTIONS)
+
+    def backoff(self, attempt: int) -> float:
+        """Return the delay before an attempt.
+
+        :param attempt: the number of attempts already made
+        :type attempt: int
+        :return: the delay in seconds
+        :rtype: float
+        """
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        if self.jitter:
+            return random.uniform(0, delay)  # noqa: S311
+        return delay
+
+    def next_delay(
+        self,
+        svc: str,
+        params: Params,
+        exc: Exception,
+        attempt: int,
+        elapsed: float,
+    ) -> float | None:
+        """Return the delay before retrying a failed call, if it is retried.
+
+        :param svc: the Wialon API service
+        :type svc: str
+        :param params: the parameters of the call
+        :type params: Params
+        :param exc: the error of the last attempt
+        :type exc: Exception
+        :param attempt: the number of attempts already made
+        :type attempt: int
+        :param elapsed: the seconds since the first attempt
+        :type elapsed: float
+        :return: the delay in seconds, or None when the error must be raised
+        :rtype: float | None
+        """
+        if attempt >= self.max_attempts or not isinstance(exc, self.retry_on):
+            return None
+        if not self.is_idempotent(svc, params):
+            return None
+        delay = self.backoff(attempt)
+        if elapsed + delay >= self.deadline:
+            return None
+        return delay
@@ -0,0 +1,367 @@
+"""Priority lanes sharing the requests in flight of a client.
+
+Dashboards look up a unit or its last message and expect an answer within a
+second, while reports and exports hold a connection for minutes. Without a
+scheduler both queue for the same connections, so a burst of exports stalls
+every lookup behind it. A :class:`Scheduler` gives each call a slot among the
+requests in flight of the client and queues the others in lanes:
+
+- ``interactive``: lookups of single items and of their last messages;
+- ``normal``: every service without a profile;
+- ``bulk``: reports, message intervals, exports, imports and batches.
+
+When a slot frees up, the next call is taken from the lanes by smooth weighted
+round robin, so with the default weights eight interactive calls are sent for
+every bulk one, and no lane starves. Each lane may also hold only a share of the
+slots, which keeps room for interactive calls while bulk jobs run. The lanes
+cap the calls in flight of the client, so a client only uses a scheduler when
+built with ``scheduler=True``.
+
+The lane of a call is given by ``priority=`` on
+:meth:`~wialon.wialon.Wialon.request`, else by the enclosing :func:`priority`
+block, else by the service in :attr:`Scheduler.policy`::
+
+    with priority(INTERACTIVE):
+        client.messages.load_interval(unit_id, time_from, time_to)
+"""
+
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from .errors import DeadlineExceededError
+from .timeouts import remaining
+
+INTERACTIVE = "interactive"
+NORMAL = "normal"
+BULK = "bulk"
+
+_lane: ContextVar[str | None] = ContextVar("wialon_priority", default=None)
+
+
+@dataclass(frozen=True)
+class Lane:
+    """The share of the requests in flight given to a class of calls.
+
+    :ivar int weight: the calls taken from the lane for each call of a lane of
+                      weight 1 when both have calls queued
+    :ivar float share: the fraction of the slots of the scheduler the lane may
+                       hold at the same time, at least one slot
+    """
+
+    weight: int = 1
+    share: float = 1.0
+
+
+DEFAULT_LANES: dict[str, Lane] = {
+    INTERACTIVE: Lane(weight=8, share=1.0),
+    NORMAL: Lane(weight=3, share=0.75),
+    BULK: Lane(weight=1, share=0.5),
+}
+
+# Lookups a user waits for jump the queue; reports, intervals, exports and
+# batches that may hold thousands of calls are sent in the background.
+DEFAULT_SERVICES: dict[str, str] = {
+    "token/login": INTERACTIVE,
+    "core/search_item": INTERACTIVE,
+    "messages/load_last": INTERACTIVE,
+    "core/batch": BULK,
+    "messages/load_interval": BULK,
+    "report/exec_report": BULK,
+    "report/get_result_rows": BULK,
+    "report/get_result_subrows": BULK,
+    "report/export_result": BULK,
+    "exchange/export_messages": BULK,
+    "exchange/import_messages": BULK,
+}
+
+
+@dataclass(frozen=True)
+class PriorityPolicy:
+    """The lanes and the lane of each service.
+
+    :ivar Mapping lanes: the lanes by name
+    :ivar Mapping services: the lane of each service
+    :ivar str default: the lane of services without one
+    """
+
+    lanes: Mapping[str, Lane] = field(default_factory=lambda: dict(DEFAULT_LANES))
+    services: Mapping[str, str] = field(
+        default_factory=lambda: dict(DEFAULT_SERVICES),
+    )
+    default: str = NORMAL
+
+    def lane(self, svc: str, value: object = None) -> str:
+        """Return the lane of a call.
+
+        :param svc: the Wialon API service
+        :type svc: str
+        :param value: the ``priority`` given to the call, defaults to the lane of
+                      the enclosing :func:`priority` block, then of the service
+        :type value: object, optional
+        :return: the name of a lane of :attr:`lanes`
+        :rtype: str
+        """
+        for name in (value, _lane.get(), self.services.get(svc)):
+            if isinstance(name, str) and name in self.lanes:
+                return name
+        return self.default if self.default in self.lanes else next(iter(self.lanes))
+
+
+@contextmanager
+def priority(lane: str) -> Iterator[str]:
+    """Send the calls made inside the block in a lane.
+
+    :param lane: the name of the lane, e.g. :data:`INTERACTIVE` or :data:`BULK`
+    :type lane: str
+    :return: the name of the lane
+    :rtype: Iterator[str]
+    """
+    token = _lane.set(lane)
+    try:
+        yield lane
+    finally:
+        _lane.reset(token)
+
+
+@dataclass(frozen=True)
+class LaneStats:
+    """Snapshot of a lane.
+
+    :ivar int limit: the slots the lane may hold
+    :ivar int in_flight: the calls of the lane being sent
+    :ivar int waiting: the calls of the lane queued for a slot
+    :ivar int calls: the calls that got a slot
+    :ivar float wait_time: the total seconds spent waiting for a slot
+    :ivar float max_wait: the longest wait for a slot, in seconds
+    """
+
+    limit: int
+    in_flight: int
+    waiting: int
+    calls: int
+    wait_time: float
+    max_wait: float
+
+
+class Waiter:
+    """A call queued for a slot."""
+
+    __slots__ = ("granted", "lane", "queued_at", "wake")
+
+    def __init__(self, lane: str, queued_at: float) -> None:
+        """Initialize the waiter of a call of a lane queued at a time."""
+        self.lane = lane
+        self.queued_at = queued_at
+        self.granted = False
+        self.wake: object = None
+
+
+@dataclass
+class _LaneState:
+    """The counters and the queue of one lane."""
+
+    limit: int
+    weight: int
+    queue: deque[Waiter] = field(default_factory=deque)
+    current: int = 0
+    in_flight: int = 0
+    calls: int = 0
+    wait_time: float = 0.0
+    max_wait: float = 0.0
+
+
+class BaseScheduler:
+    """Weighted fair queueing shared by the schedulers, without any I/O."""
+
+    def __init__(self, capacity: int = 10, policy: PriorityPolicy | None = None) -> None:
+        """Initialize the scheduler.
+
+        :param capacity: the calls sent at the same time, defaults to 10
+        :type capacity: int, optional
+        :param policy: the lanes and the lane of each service, defaults to
+                       :class:`PriorityPolicy`
+        :type policy: PriorityPolicy | None, optional
+        """
+        self.capacity = capacity if capacity > 0 else 10
+        self.policy = policy if policy is not None else PriorityPolicy()
+        self._in_flight = 0
+        self._lanes = {
+            name: _LaneState(
+                limit=max(1, min(self.capacity, int(self.capacity * lane.share))),
+                weight=max(1, lane.weight),
+            )
+            for name, lane in self.policy.lanes.items()
+        }
+
+    def lane(self, svc: str, value: object = None) -> str:
+        """Return the lane of a call, see :meth:`PriorityPolicy.lane`.
+
+        :param svc: the Wialon API service
+        :type svc: str
+        :param value: the ``priority`` given to the call, defaults to None
+        :type value: object, optional
+        :return: the name of the lane
+        :rtype: str
+        """
+        return self.policy.lane(svc, value)
+
+    def _enqueue(self, lane: str, now: float) -> tuple[Waiter, list[Waiter]]:
+        """Queue a call, which takes a slot at once when one is free.
+
+        :param lane: the name of the lane
+        :type lane: str
+        :param now: the current monotonic time
+        :type now: float
+        :return: the waiter of the call, already granted when a slot was free,
+                 and every waiter granted a slot
+        :rtype: tuple[Waiter, list[Waiter]]
+        """
+        waiter = Waiter(lane, now)
+        self._lanes[lane].queue.append(waiter)
+        return waiter, self._grant(now)
+
+    def _grant(self, now: float) -> list[Waiter]:
+        """Hand the free slots to the queued calls by smooth weighted round robin.
+
+        :param now: the current monotonic time
+        :type now: float
+        :return: the waiters granted a slot
+        :rtype: list[Waiter]
+        """
+        granted = []
+        while self._in_flight < self.capacity:
+            ready = [
+                state
+                for state in self._lanes.values()
+                if state.queue and state.in_flight < state.limit
+            ]
+            if not ready:
+                break
+            total = 0
+            for state in ready:
+                state.current += state.weight
+                total += state.weight
+            chosen = max(ready, key=lambda state: state.current)
+            chosen.current -= total
+            waiter = chosen.queue.popleft()
+            waiter.granted = True
+            waited = now - waiter.queued_at
+            chosen.wait_time += waited
+            chosen.max_wait = max(chosen.max_wait, waited)
+            chosen.in_flight += 1
+            chosen.calls += 1
+            self._in_flight += 1
+            granted.append(waiter)
+        return granted
+
+    def _cancel(self, waiter: Waiter) -> list[Waiter]:
+        """Drop a call that gave up waiting, or free the slot it was granted.
+
+        :param waiter: the waiter of the call
+        :type waiter: Waiter
+        :return: the waiters granted the slot freed, if any
+        :rtype: list[Waiter]
+        """
+        if waiter.granted:
+            return self._free(waiter.lane)
+        self._lanes[waiter.lane].queue.remove(waiter)
+        return []
+
+    def _free(self, lane: str) -> list[Waiter]:
+        """Free the slot of a call that was answered.
+
+        :param lane: the name of the lane of the call
+        :type lane: str
+        :return: the waiters granted the slot
+        :rtype: list[Waiter]
+        """
+        self._lanes[lane].in_flight -= 1
+        self._in_flight -= 1
+        return self._grant(time.monotonic())
+
+    def stats(self) -> dict[str, LaneStats]:
+        """Return the state of each lane.
+
+        :return: the snapshot of each lane keyed by its name
+        :rtype: dict[str, LaneStats]
+        """
+        return {
+            name: LaneStats(
+                limit=state.limit,
+                in_flight=state.in_flight,
+                waiting=len(state.queue),
+                calls=state.calls,
+                wait_time=state.wait_time,
+                max_wait=state.max_wait,
+            )
+            for name, state in self._lanes.items()
+        }
+
+
+class Scheduler(BaseScheduler):
+    """Priority lanes for threads, see :class:`BaseScheduler`."""
+
+    def __init__(self, capacity: int = 10, policy: PriorityPolicy | None = None) -> None:
+        """Initialize the scheduler, see :class:`BaseScheduler`."""
+        super().__init__(capacity, policy)
+        self._condition = threading.Condition()
+
+    def acquire(self, lane: str) -> None:
+        """Wait for a slot in a lane.
+
+        :param lane: the name of the lane, see :meth:`lane`
+        :type lane: str
+        :raises DeadlineExceededError: The deadline elapsed while queued.
+        """
+        with self._condition:
+            waiter, granted = self._enqueue(lane, time.monotonic())
+            if [other for other in granted if other is not waiter]:
+                self._condition.notify_all()
+            while not waiter.granted:
+                left = remaining()
+                if left is not None and left <= 0:
+                    if self._cancel(waiter):
+                        self._condition.notify_all()
+                    msg = f"The deadline elapsed while queued in the {lane} lane."
+                    raise DeadlineExceededError(msg)
+                self._condition.wait(left)
+
+    def release(self, lane: str) -> None:
+        """Free the slot of a call once it has been answered.
+
+        :param lane: the name of the lane given to :meth:`acquire`
+        :type lane: str
+        """
+        with self._condition:
+            if self._free(lane):
+                self._condition.notify_all()
+
+    @contextmanager
+    def slot(self, lane: str) -> Iterator[None]:
+        """Hold a slot in a lane while the block runs.
+
+        :param lane: the name of the lane
+        :type lane: str
+        :raises DeadlineExceededError: The deadline elapsed while queued.
+        :return: nothing, the block sends the call
+        :rtype: Iterator[None]
+        """
+        self.acquire(lane)
+        try:
+            yield
+        finally:
+            self.release(lane)
+
+    def stats(self) -> dict[str, LaneStats]:
+        """Return the state of each lane.
+
+        :return: the snapshot of each lane keyed by its name
+        :rtype: dict[str, LaneStats]
+        """
+        with self._condition:
+            return super().stats()
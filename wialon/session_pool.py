@@ -0,0 +1,621 @@
+"""Pool of logged-in sessions sharing one client.
+
+Wialon limits the concurrent requests of each session and keeps a single
+report result per session, so one session caps the throughput of a client.
+A :class:`SessionPool` keeps several sessions, from one token or several, and
+sends each call through the least loaded one. Report jobs lease a session for
+their whole duration so that executing, reading and exporting the report
+happen on the same session.
+"""
+
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from types import TracebackType
+from typing import TYPE_CHECKING, Any, Self
+
+from loguru import logger
+
+from .auth_manager import NO_RELOGIN, AuthManager, BaseAuthManager
+from .errors import (
+    InvalidSessionError,
+    IpChangedOrSessionExpiredError,
+    SessionExceptionError,
+)
+from .exchange import Exchange
+from .extra import Extra
+from .items import Items
+from .messages import Messages
+from .protocol import Params
+from .report import Report
+
+if TYPE_CHECKING:
+    from .message_store import MessageStore
+    from .wialon import Wialon
+
+
+@dataclass(frozen=True)
+class SessionStats:
+    """Snapshot of the load of a pooled session.
+
+    :ivar str sid: the current session ID
+    :ivar int in_flight: the requests being sent on the session
+    :ivar bool leased: whether the session is leased exclusively
+    :ivar int calls: the requests sent on the session
+    """
+
+    sid: str
+    in_flight: int
+    leased: bool
+    calls: int
+
+
+class _PoolAuth:
+    """Auth view of a pool for the managers bound to it.
+
+    It gives no session ID, so that the pool picks the least loaded session
+    when the request is sent rather than when the manager builds it.
+    """
+
+    def get_sid(self) -> str:
+        """Get the session ID to give to the pool.
+
+        :return: An empty session ID, the pool chooses the session.
+        :rtype: str
+        """
+        return ""
+
+
+class BaseSessionPool:
+    """Session selection and load accounting shared by the session pools."""
+
+    def __init__(self) -> None:
+        """Initialize an empty pool."""
+        self._sessions: list[BaseAuthManager] = []
+        self._in_flight: list[int] = []
+        self._calls: list[int] = []
+        self._leased: set[int] = set()
+        self._owned: list[BaseAuthManager] = []
+        self._closed = False
+        self._auth = _PoolAuth()
+
+    def _add(self, auth: BaseAuthManager, *, owned: bool = True) -> None:
+        """Add a logged-in session to the pool.
+
+        :param auth: the auth manager of the session
+        :type auth: BaseAuthManager
+        :param owned: whether the pool logged the session in, defaults to True
+        :type owned: bool, optional
+        """
+        self._sessions.append(auth)
+        self._in_flight.append(0)
+        self._calls.append(0)
+        if owned:
+            self._owned.append(auth)
+
+    def _clear(self) -> list[BaseAuthManager]:
+        """Remove every session from the pool and close it.
+
+        The lists are replaced rather than emptied, so the calls still in flight
+        release their session in the lists they counted it in.
+
+        :return: the sessions logged in by the pool, to be logged out
+        :rtype: list[BaseAuthManager]
+        """
+        owned = self._owned
+        self._sessions, self._in_flight, self._calls = [], [], []
+        self._leased, self._owned = set(), []
+        self._closed = True
+        return owned
+
+    def _check_open(self) -> None:
+        """Raise when the pool has no session to send a call on.
+
+        :raises SessionExceptionError: The pool is closed or has no session.
+        """
+        if self._closed:
+            msg = "The session pool is closed."
+            raise SessionExceptionError(msg)
+        if not self._sessions:
+            msg = "The session pool has no session."
+            raise SessionExceptionError(msg)
+
+    def _available(self, sid: str | None) -> int:
+        """Return the session of a call, or -1 while every session is leased.
+
+        :param sid: a session ID of the pool, defaults to the least loaded session
+        :type sid: str | None
+        :raises SessionExceptionError: The pool is closed or has no session.
+        :return: the index of the session
+        :rtype: int
+        """
+        self._check_open()
+        index = self._index(sid)
+        return index if index >= 0 else self._least_loaded()
+
+    def _least_loaded(self) -> int:
+        """Return the index of the session with the fewest requests in flight.
+
+        The sessions leased exclusively are skipped, so the calls of the pool
+        never share a session with the job that leased it.
+
+        :return: the index of the session, -1 when every session is leased
+        :rtype: int
+        """
+        candidates = [
+            index for index in range(len(self._sessions)) if index not in self._leased
+        ]
+        if not candidates:
+            return -1
+        return min(candidates, key=lambda index: self._in_flight[index])
+
+    def _index(self, sid: str | None) -> int:
+        """Return the index of the session that issued a session ID.
+
+        :param sid: the session ID
+        :type sid: str | None
+        :return: the index of the session, -1 when it is not pooled
+        :rtype: int
+        """
+        for index, auth in enumerate(self._sessions):
+            if auth.owns_sid(sid):
+                return index
+        return -1
+
+    @property
+    def auth(self) -> _PoolAuth:
+        """Return the auth view used by the managers bound to the pool.
+
+        :return: the auth view of the pool
+        :rtype: _PoolAuth
+        """
+        return self._auth
+
+    @property
+    def sessions(self) -> list[BaseAuthManager]:
+        """Return the auth managers of the pooled sessions.
+
+        :return: the auth managers
+        :rtype: list[BaseAuthManager]
+        """
+        return list(self._sessions)
+
+    def stats(self) -> list[SessionStats]:
+        """Return the load of each pooled session.
+
+        :return: the load of each session
+        :rtype: list[SessionStats]
+        """
+        return [
+            SessionStats(
+                sid=auth.get_sid(),
+                in_flight=self._in_flight[index],
+                leased=index in self._leased,
+                calls=self._calls[index],
+            )
+            for index, auth in enumerate(self._sessions)
+        ]
+
+
+class SessionPool(BaseSessionPool):
+    """Pool of sessions of a :class:`~wialon.wialon.Wialon` client.
+
+    The pool can be used wherever a client is expected by a manager: calls are
+    sent through the least loaded session. ``pool.items`` and
+    ``pool.messages`` are bound to the pool, while report jobs use
+    :meth:`lease` to keep one session for themselves. :meth:`close`, or leaving
+    the pool as a context manager, logs out the sessions it logged in.
+    """
+
+    def __init__(
+        self,
+        engine: "Wialon",
+        size: int = 4,
+        tokens: list[str] | None = None,
+    ) -> None:
+        """Log in the sessions of the pool.
+
+        :param engine: the client sending the requests
+        :type engine: Wialon
+        :param size: the number of sessions, defaults to 4
+        :type size: int, optional
+        :param tokens: the tokens to log in with, used in turn. Defaults to the
+                       token of the client, whose session becomes the first one
+                       of the pool.
+        :type tokens: list[str] | None, optional
+        """
+        super().__init__()
+        self._engine = engine
+        self._condition = threading.Condition()
+        self._extra: Extra | None = None
+        self._items: Items | None = None
+        self._messages: Messages | None = None
+        self._size = max(1, size)
+        if not tokens:
+            self._add(engine.auth, owned=False)
+            tokens = [engine.auth.token]
+        while len(self._sessions) < self._size:
+            self._add(AuthManager(tokens[len(self._sessions) % len(tokens)], engine))
+
+    @property
+    def size(self) -> int:
+        """Return the number of sessions the pool logs in.
+
+        :return: the number of sessions
+        :rtype: int
+        """
+        return self._size
+
+    def close(self) -> None:
+        """Log out the sessions logged in by the pool.
+
+        The session of the client stays logged in. A session that fails to log
+        out is left to expire on the server.
+        """
+        with self._condition:
+            sessions = self._clear()
+            # The calls and leases waiting for a session raise instead.
+            self._condition.notify_all()
+        for auth in sessions:
+            if not isinstance(auth, AuthManager):
+                continue
+            try:
+                auth.logout()
+            except Exception as exc:  # noqa: BLE001
+                logger.warning(f"Failed to log out a pooled session: {exc!r}.")
+
+    def __enter__(self) -> Self:
+        """Enter the pool as a context manager.
+
+        :return: the SessionPool instance
+        :rtype: SessionPool
+        """
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Log out the sessions of the pool when leaving the context manager."""
+        self.close()
+
+    @property
+    def message_store(self) -> "MessageStore | None":
+        """Return the message store of the client, used by the pooled managers.
+
+        :return: the message store, None when the client has none
+        :rtype: MessageStore | None
+        """
+        return self._engine.message_store
+
+    def request(
+        self,
+        svc: str,
+        params: Params = None,
+        sid: str | None = None,
+        send_file: dict[str, Any] | None = None,
+        **kwargs: bool | str | int,
+    ) -> dict[str, Any] | list[dict[str, Any]] | bytes:
+        """Make a request through a pooled session.
+
+        :param svc: the Wialon API service to be used
+        :type svc: str
+        :param params: the parameters to be used, defaults to None
+        :type params: Params, optional
+        :param sid: a session ID of the pool to send the request on, defaults to
+                    the least loaded session
+        :type sid: str | None, optional
+        :param send_file: the file to be sent, defaults to None
+        :type send_file: dict[str, Any] | None, optional
+        :raises SessionExceptionError: The pool is closed or has no session.
+        :return: the response from the Wialon API
+        :rtype: dict[str, Any] | list[dict[str, Any]] | bytes
+        """
+        with self._condition:
+            index = self._select(sid)
+            auth = self._sessions[index]
+            in_flight = self._in_flight
+            in_flight[index] += 1
+            self._calls[index] += 1
+        try:
+            return self._send(auth, svc, params, send_file, **kwargs)
+        finally:
+            with self._condition:
+                # Left in the lists of the pool it was sent from if it was closed.
+                in_flight[index] -= 1
+                self._condition.notify_all()
+
+    def request_stream(
+        self,
+        svc: str,
+        params: dict[str, Any] | None = None,
+        sid: str | None = None,
+        key: str = "messages",
+        **kwargs: bool | str | int,
+    ) -> Iterator[Any]:
+        """Stream the elements of an array of the response through a session.
+
+        See :meth:`wialon.wialon.Wialon.request_stream`.
+
+        :param svc: the Wialon API service to be used
+        :type svc: str
+        :param params: the parameters to be used, defaults to None
+        :type params: dict[str, Any] | None, optional
+        :param sid: a session ID of the pool, defaults to the least loaded session
+        :type sid: str | None, optional
+        :param key: the member of the response holding the array, defaults to
+                    "messages"
+        :type key: str, optional
+        :raises SessionExceptionError: The pool is closed or has no session.
+        :return: an iterator over the elements of the array
+        :rtype: Iterator[Any]
+        """
+        with self._condition:
+            sid = self._sessions[self._select(sid)].get_sid()
+        return self._engine.request_stream(svc, params, sid, key, **kwargs)
+
+    def _select(self, sid: str | None) -> int:
+        """Return the session of a call, waiting while every session is leased.
+
+        The caller holds :attr:`_condition`.
+
+        :param sid: a session ID of the pool, defaults to the least loaded session
+        :type sid: str | None
+        :raises SessionExceptionError: The pool is closed, or closes while waiting.
+        :return: the index of the session
+        :rtype: int
+        """
+        while (index := self._available(sid)) < 0:
+            self._condition.wait()
+        return index
+
+    def _send(
+        self,
+        auth: BaseAuthManager,
+        svc: str,
+        params: Params,
+        send_file: dict[str, Any] | None,
+        **kwargs: bool | str | int,
+    ) -> dict[str, Any] | list[dict[str, Any]] | bytes:
+        """Send a request on a session, logging it in again if it has expired.
+
+        :param auth: the auth manager of the session
+        :type auth: BaseAuthManager
+        :param svc: the Wialon API service to be used
+        :type svc: str
+        :param params: the parameters to be used
+        :type params: Params
+        :param send_file: the file to be sent
+        :type send_file: dict[str, Any] | None
+        :return: the response from the Wialon API
+        :rtype: dict[str, Any] | list[dict[str, Any]] | bytes
+        """
+        sid = auth.get_sid()
+        kwargs = {**kwargs, "relogin": False}
+        try:
+            return self._engine.request(svc, params, sid, send_file, **kwargs)
+        except (InvalidSessionError, IpChangedOrSessionExpiredError):
+            if svc in NO_RELOGIN or not isinstance(auth, AuthManager):
+                raise
+        sid = auth.relogin(sid)
+        return self._engine.request(svc, params, sid, send_file, **kwargs)
+
+    @contextmanager
+    def lease(self, *, exclusive: bool = True) -> Iterator["SessionLease"]:
+        """Lease a session of the pool for a job.
+
+        Every call made through the lease is sent on the same session. An
+        exclusive lease, the default, waits until a session is not leased
+        exclusively by another job and keeps the other calls of the pool off
+        the session until it ends, which is what reports and message loads need
+        since a session holds a single report result and message buffer. The
+        calls of the pool wait for a session while every one is leased.
+
+        :param exclusive: keep the session from other leases and calls of the
+                          pool, defaults to True
+        :type exclusive: bool, optional
+        :raises SessionExceptionError: The pool is closed, or closes while waiting.
+        :return: the leased session
+        :rtype: Iterator[SessionLease]
+        """
+        with self._condition:
+            index = self._select(None)
+            auth = self._sessions[index]
+            leased = self._leased
+            if exclusive:
+                leased.add(index)
+        try:
+            yield SessionLease(self, auth)
+        finally:
+            if exclusive:
+                with self._condition:
+                    leased.discard(index)
+                    self._condition.notify_all()
+
+    @property
+    def extra(self) -> Extra:
+        """Return the Extra manager bound to the pool.
+
+        :return: the Extra instance
+        :rtype: Extra
+        """
+        if self._extra is None:
+            with self._condition:
+                if self._extra is None:
+                    self._extra = Extra(self)
+        return self._extra
+
+    @property
+    def items(self) -> Items:
+        """Return the Items manager bound to the pool.
+
+        :return: the Items instance
+        :rtype: Items
+        """
+        if self._items is None:
+            with self._condition:
+                if self._items is None:
+                    self._items = Items(self)
+        return self._items
+
+    @property
+    def messages(self) -> Messages:
+        """Return the Messages manager bound to the pool.
+
+        :return: the Messages instance
+        :rtype: Messages
+        """
+        if self._messages is None:
+            with self._condition:
+                if self._messages is None:
+                    self._messages = Messages(self)
+        return self._messages
+
+
+class SessionLease:
+    """A session leased from a :class:`SessionPool`.
+
+    It can be used wherever a client is expected by a manager, and its managers
+    send every call on the leased session.
+    """
+
+    def __init__(self, pool: SessionPool, auth: BaseAuthManager) -> None:
+        """Initialize the lease.
+
+        :param pool: the pool the session belongs to
+        :type pool: SessionPool
+        :param auth: the auth manager of the leased session
+        :type auth: BaseAuthManager
+        """
+        self._pool = pool
+        self._auth = auth
+        self._exchange: Exchange | None = None
+        self._extra: Extra | None = None
+        self._items: Items | None = None
+        self._messages: Messages | None = None
+        self._report: Report | None = None
+
+    @property
+    def auth(self) -> BaseAuthManager:
+        """Return the auth manager of the leased session.
+
+        :return: the auth manager
+        :rtype: BaseAuthManager
+        """
+        return self._auth
+
+    @property
+    def message_store(self) -> "MessageStore | None":
+        """Return the message store of the client, used by the leased managers.
+
+        :return: the message store, None when the client has none
+        :rtype: MessageStore | None
+        """
+        return self._pool.message_store
+
+    def request(
+        self,
+        svc: str,
+        params: Params = None,
+        sid: str | None = None,  # noqa: ARG002
+        send_file: dict[str, Any] | None = None,
+        **kwargs: bool | str | int,
+    ) -> dict[str, Any] | list[dict[str, Any]] | bytes:
+        """Make a request on the leased session.
+
+        :param svc: the Wialon API service to be used
+        :type svc: str
+        :param params: the parameters to be used, defaults to None
+        :type params: Params, optional
+        :param sid: ignored, the leased session is always used
+        :type sid: str | None, optional
+        :param send_file: the file to be sent, defaults to None
+        :type send_file: dict[str, Any] | None, optional
+        :return: the response from the Wialon API
+        :rtype: dict[str, Any] | list[dict[str, Any]] | bytes
+        """
+        return self._pool.request(svc, params, self.auth.get_sid(), send_file, **kwargs)
+
+    def request_stream(
+        self,
+        svc: str,
+        params: dict[str, Any] | None = None,
+        sid: str | None = None,  # noqa: ARG002
+        key: str = "messages",
+        **kwargs: bool | str | int,
+    ) -> Iterator[Any]:
+        """Stream the elements of an array of the response on the leased session.
+
+        :param svc: the Wialon API service to be used
+        :type svc: str
+        :param params: the parameters to be used, defaults to None
+        :type params: dict[str, Any] | None, optional
+        :param sid: ignored, the leased session is always used
+        :type sid: str | None, optional
+        :param key: the member of the response holding the array, defaults to
+                    "messages"
+        :type key: str, optional
+        :return: an iterator over the elements of the array
+        :rtype: Iterator[Any]
+        """
+        return self._pool.request_stream(
+            svc, params, self.auth.get_sid(), key, **kwargs,
+        )
+
+    @property
+    def exchange(self) -> Exchange:
+        """Return the Exchange manager of the leased session.
+
+        :return: the Exchange instance
+        :rtype: Exchange
+        """
+        if self._exchange is None:
+            self._exchange = Exchange(self)
+        return self._exchange
+
+    @property
+    def extra(self) -> Extra:
+        """Return the Extra manager of the leased session.
+
+        :return: the Extra instance
+        :rtype: Extra
+        """
+        if self._extra is None:
+            self._extra = Extra(self)
+        return self._extra
+
+    @property
+    def items(self) -> Items:
+        """Return the Items manager of the leased session.
+
+        :return: the Items instance
+        :rtype: Items
+        """
+        if self._items is None:
+            self._items = Items(self)
+        return self._items
+
+    @property
+    def messages(self) -> Messages:
+        """Return the Messages manager of the leased session.
+
+        :return: the Messages instance
+        :rtype: Messages
+        """
+        if self._messages is None:
+            self._messages = Messages(self)
+        return self._messages
+
+    @property
+    def report(self) -> Report:
+        """Return the Report manager of the leased session.
+
+        :return: the Report instance
+        :rtype: Report
+        """
+        if self._report is None:
+            self._report = Report(self)
+        return self._report
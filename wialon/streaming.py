@@ -0,0 +1,278 @@
+"""Incremental parsing of large JSON responses.
+
+The Wialon API answers bulk services with one object holding a large array,
+e.g. ``{"count": 3, "messages": [...]}``. :class:`JSONArrayStream` is fed the
+body chunk by chunk as it arrives and returns the elements of that array as
+soon as they are complete, so neither the whole body nor the whole decoded
+array has to be kept in memory.
+
+The elements received so far are decoded together, in one call of the JSON
+decoder, so streaming costs about as much CPU as decoding the whole body: the
+elements are only decoded one by one while the parser has to work out where a
+run of them ends, e.g. when the array does not hold objects.
+"""
+
+import codecs
+import json
+from typing import Any
+
+from .errors import InvalidResultError, validate_error
+from .protocol import loads
+
+_WHITESPACE = " \t\n\r"
+_DELIMITERS = ",:]}"
+# Where a run of complete objects of the array may end.
+_OBJECT_ENDS = ("},{", "}]")
+
+_START = "start"
+_KEY = "key"
+_KEY_NEXT = "key_next"
+_COLON = "colon"
+_VALUE = "value"
+_ARRAY_START = "array_start"
+_ARRAY = "array"
+_ARRAY_NEXT = "array_next"
+_END = "end"
+_BUFFERED = "buffered"
+
+
+class _Incomplete:
+    """Marker of a value that is not complete in the buffer yet."""
+
+
+_INCOMPLETE = _Incomplete()
+
+
+class JSONArrayStream:
+    """Push parser that extracts the elements of one array of a JSON object.
+
+    The other members of the top-level object are kept in :attr:`header` and
+    validated with :func:`~wialon.errors.validate_error`, so a response such as
+    ``{"error": 1}`` raises the same exception as a regular request.
+    """
+
+    def __init__(self, key: str) -> None:
+        """Initialize the parser.
+
+        :param key: the member of the top-level object holding the array
+        :type key: str
+        """
+        self._key = key
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._state = _START
+        self._current_key = ""
+        self._found = False
+        self.header: dict[str, Any] = {}
+
+    def feed(self, chunk: bytes) -> list[Any]:
+        """Parse a chunk of the body.
+
+        :param chunk: the next bytes of the body
+        :type chunk: bytes
+        :raises json.JSONDecodeError: The body is not a valid JSON.
+        :return: the array elements completed by this chunk
+        :rtype: list[Any]
+        """
+        self._buffer = self._buffer[self._pos:] + self._text.decode(chunk)
+        self._pos = 0
+        return self._parse(final=False)
+
+    def close(self) -> list[Any]:
+        """Finish parsing once the whole body has been fed.
+
+        :raises json.JSONDecodeError: The body is not a valid or complete JSON.
+        :raises InvalidResultError: The response has no array under the key.
+        :return: the remaining array elements
+        :rtype: list[Any]
+        """
+        self._buffer = self._buffer[self._pos:] + self._text.decode(b"", final=True)
+        self._pos = 0
+        if self._state == _BUFFERED:
+            return self._close_buffered()
+
+        items = self._parse(final=True)
+        if self._state != _END:
+            msg = "Response is not a complete JSON, please verify the API URL."
+            raise json.JSONDecodeError(msg, self._buffer, self._pos)
+        validate_error(self.header)
+        if not self._found:
+            msg = f"The response has no '{self._key}' array."
+            raise InvalidResultError(msg)
+        return items
+
+    def _close_buffered(self) -> list[Any]:
+        """Parse a body whose top level is not an object in one go.
+
+        :raises InvalidResultError: The response has no array under the key.
+        :return: the array elements
+        :rtype: list[Any]
+        """
+        response = loads(self._buffer)
+        validate_error(response)
+        if isinstance(response, dict) and isinstance(response.get(self._key), list):
+            return response[self._key]
+        msg = f"The response has no '{self._key}' array."
+        raise InvalidResultError(msg)
+
+    def _skip_whitespace(self) -> int:
+        """Move the position past any whitespace.
+
+        :return: the new position
+        :rtype: int
+        """
+        pos = self._pos
+        buffer = self._buffer
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+            pos += 1
+        self._pos = pos
+        return pos
+
+    def _decode(self, pos: int, *, final: bool) -> Any:  # noqa: ANN401
+        """Decode the value starting at a position of the buffer.
+
+        A value is only accepted before the last chunk when it is followed by a
+        delimiter, since a number split between chunks (``12`` of ``12.5e3``)
+        would otherwise be decoded too early.
+
+        :param pos: the position of the value
+        :type pos: int
+        :param final: whether the whole body is in the buffer
+        :type final: bool
+        :raises json.JSONDecodeError: The value is not a valid JSON.
+        :return: the decoded value or the incomplete marker
+        :rtype: Any
+        """
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return _INCOMPLETE
+        if not final:
+            rest = end
+            while rest < len(self._buffer) and self._buffer[rest] in _WHITESPACE:
+                rest += 1
+            if rest >= len(self._buffer) or self._buffer[rest] not in _DELIMITERS:
+                return _INCOMPLETE
+        self._pos = end
+        return value
+
+    def _decode_run(self, pos: int) -> list[Any]:
+        """Decode the complete objects of the array from a position at once.
+
+        The run is cut after the last ``}`` followed by ``,{`` or ``]`` in the
+        buffer. Such a cut may fall inside an object or a string. In that case
+        the brackets or quotes of the run do not balance, so the decoder
+        rejects it. A run that decodes therefore ends between two elements.
+
+        :param pos: the position of the first element
+        :type pos: int
+        :return: the decoded elements, empty when no run could be cut
+        :rtype: list[Any]
+        """
+        for marker in _OBJECT_ENDS:
+            cut = self._buffer.rfind(marker, pos) + 1
+            if cut <= pos:
+                continue
+            try:
+                values = loads(f"[{self._buffer[pos:cut]}]")
+            except ValueError:
+                continue
+            self._pos = cut
+            return values
+        return []
+
+    def _next_state(self, char: str) -> str:
+        """Return the state that follows the delimiter after a value.
+
+        :param char: the delimiter
+        :type char: str
+        :raises json.JSONDecodeError: The delimiter is not valid here.
+        :return: the next state
+        :rtype: str
+        """
+        in_array = self._state == _ARRAY_NEXT
+        if char == ",":
+            return _ARRAY if in_array else _KEY
+        if char == ("]" if in_array else "}"):
+            return _KEY_NEXT if in_array else _END
+        msg = "Expecting ',' delimiter."
+        raise json.JSONDecodeError(msg, self._buffer, self._pos)
+
+    def _parse(self, *, final: bool) -> list[Any]:  # noqa: C901, PLR0912, PLR0915
+        """Advance the parser as far as the buffer allows.
+
+        :param final: whether the whole body is in the buffer
+        :type final: bool
+        :raises json.JSONDecodeError: The body is not a valid JSON.
+        :return: the array elements completed so far
+        :rtype: list[Any]
+        """
+        items: list[Any] = []
+        while self._state != _BUFFERED:
+            pos = self._skip_whitespace()
+            if pos >= len(self._buffer):
+                break
+            char = self._buffer[pos]
+            if self._state == _END:
+                msg = "Extra data after the JSON response."
+                raise json.JSONDecodeError(msg, self._buffer, pos)
+            if self._state == _START:
+                if char != "{":
+                    self._state = _BUFFERED
+                    break
+                self._pos += 1
+                self._state = _KEY
+            elif self._state == _KEY:
+                if char == "}":
+                    self._pos += 1
+                    self._state = _END
+                    continue
+                key = self._decode(pos, final=final)
+                if key is _INCOMPLETE:
+                    break
+                self._current_key = key
+                self._state = _COLON
+            elif self._state in (_KEY_NEXT, _ARRAY_NEXT):
+                self._state = self._next_state(char)
+                self._pos += 1
+            elif self._state == _COLON:
+                if char != ":":
+                    msg = "Expecting ':' delimiter."
+                    raise json.JSONDecodeError(msg, self._buffer, pos)
+                self._pos += 1
+                self._state = _ARRAY_START if self._current_key == self._key else _VALUE
+            elif self._state == _ARRAY_START:
+                if char != "[":
+                    self._state = _VALUE
+                    continue
+                self._pos += 1
+                self._found = True
+                self._state = _ARRAY
+            elif self._state == _ARRAY:
+                if char == "]":
+                    self._pos += 1
+                    self._state = _KEY_NEXT
+                    continue
+                run = self._decode_run(pos) if char == "{" else []
+                if run:
+                    items.extend(run)
+                    self._state = _ARRAY_NEXT
+                    continue
+                value = self._decode(pos, final=final)
+                if value is _INCOMPLETE:
+                    break
+                items.append(value)
+                self._state = _ARRAY_NEXT
+            else:
+                value = self._decode(pos, final=final)
+                if value is _INCOMPLETE:
+                    break
+                self.header[self._current_key] = value
+                self._state = _KEY_NEXT
+                if self._current_key == "error":
+                    validate_error(self.header)
+        return items
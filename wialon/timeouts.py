@@ -0,0 +1,203 @@
+"""Connect and read timeouts per service, and deadlines carried by the calls.
+
+Each request is sent with a connect timeout, which bounds the time to reach a
+node of the API, and a read timeout, which bounds the wait for the response.
+A :class:`TimeoutPolicy` picks them per service: a dead connection is given up
+after a few seconds, while ``report/exec_report`` or
+``exchange/export_messages`` may take minutes to answer.
+
+A deadline bounds a whole job instead of a single attempt. It is kept in a
+context variable, so it applies to every call made inside the block, including
+retries, the polling of reports, the sub-requests of the managers and the
+threads of :meth:`~wialon.wialon.Wialon.map`::
+
+    with deadline(60):
+        client.report.execute(unit_id, resource_id, template_id, async_wait=False)
+
+Each attempt is sent with its timeouts capped to the time left, and a call
+started after the deadline, or whose response is still being read when it
+elapses, raises :class:`~wialon.errors.DeadlineExceededError`.
+"""
+
+import time
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from .errors import DeadlineExceededError
+
+# The shortest timeout given to the transport, so that a nearly elapsed deadline
+# still makes a valid request rather than an immediate error of the library.
+MIN_TIMEOUT = 0.001
+
+_deadline: ContextVar[float | None] = ContextVar("wialon_deadline", default=None)
+
+
+@dataclass(frozen=True)
+class Timeout:
+    """The timeouts of one attempt, in seconds.
+
+    :ivar float connect: the time to open a connection to the node
+    :ivar float read: the time to wait for the response once connected
+    """
+
+    connect: float = 5.0
+    read: float = 30.0
+
+    def within(self, left: float | None) -> "Timeout":
+        """Return the timeouts capped to the time left before a deadline.
+
+        :param left: the seconds left, None when there is no deadline
+        :type left: float | None
+        :return: the capped timeouts
+        :rtype: Timeout
+        """
+        if left is None or (self.connect <= left and self.read <= left):
+            return self
+        left = max(left, MIN_TIMEOUT)
+        return Timeout(min(self.connect, left), min(self.read, left))
+
+    def as_tuple(self) -> tuple[float, float]:
+        """Return the timeouts as given to the transports.
+
+        :return: the connect and read timeouts, as ``requests`` takes them
+        :rtype: tuple[float, float]
+        """
+        return (self.connect, self.read)
+
+
+# Services that answer quickly fail fast; reports, exports and batches that
+# may hold thousands of calls are given minutes. Searches and message intervals
+# keep the default: callers loading large fleets raise them in their policy.
+DEFAULT_PROFILES: dict[str, Timeout] = {
+    "core/search_item": Timeout(5.0, 10.0),
+    "core/batch": Timeout(5.0, 300.0),
+    "report/exec_report": Timeout(5.0, 300.0),
+    "report/get_result_rows": Timeout(5.0, 120.0),
+    "report/get_result_subrows": Timeout(5.0, 120.0),
+    "report/export_result": Timeout(5.0, 300.0),
+    "exchange/export_messages": Timeout(5.0, 300.0),
+    "exchange/import_messages": Timeout(5.0, 300.0),
+}
+
+
+@dataclass(frozen=True)
+class TimeoutPolicy:
+    """The timeouts of each service.
+
+    :ivar Timeout default: the timeouts of services without a profile
+    :ivar Mapping profiles: the timeouts of each service
+    """
+
+    default: Timeout = field(default_factory=Timeout)
+    profiles: Mapping[str, Timeout] = field(
+        default_factory=lambda: dict(DEFAULT_PROFILES),
+    )
+
+    def timeout(self, svc: str, value: object = None) -> Timeout:
+        """Return the timeouts of a call.
+
+        :param svc: the Wialon API service
+        :type svc: str
+        :param value: the ``timeout`` given to the call: a :class:`Timeout`, or a
+                      number of seconds for the read timeout, defaults to the
+                      profile of the service
+        :type value: object, optional
+        :return: the timeouts of the call
+        :rtype: Timeout
+        """
+        profile = self.profiles.get(svc, self.default)
+        if isinstance(value, Timeout):
+            return value
+        if isinstance(value, (int, float)) and not isinstance(value, bool) and value > 0:
+            return Timeout(min(profile.connect, value), value)
+        return profile
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[float]:
+    """Bound the calls made inside the block to a number of seconds.
+
+    Nested deadlines can only shorten the one of the enclosing block.
+
+    :param seconds: the seconds the calls of the block may take
+    :type seconds: float
+    :return: the deadline, on the :func:`time.monotonic` clock
+    :rtype: Iterator[float]
+    """
+    at = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None and current < at:
+        at = current
+    token = _deadline.set(at)
+    try:
+        yield at
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> float | None:
+    """Return the seconds left before the deadline of the current context.
+
+    :return: the seconds left, negative once elapsed, None without a deadline
+    :rtype: float | None
+    """
+    at = _deadline.get()
+    return None if at is None else at - time.monotonic()
+
+
+def check_deadline(svc: str) -> float | None:
+    """Raise when the deadline of the current context has elapsed.
+
+    :param svc: the Wialon API service about to be called
+    :type svc: str
+    :raises DeadlineExceededError: The deadline has elapsed.
+    :return: the seconds left, None without a deadline
+    :rtype: float | None
+    """
+    left = remaining()
+    if left is not None and left <= 0:
+        msg = f"The deadline elapsed before {svc} could be sent."
+        raise DeadlineExceededError(msg)
+    return left
+
+
+def current_deadline() -> float | None:
+    """Return the deadline of the current context.
+
+    :return: the deadline on the :func:`time.monotonic` clock, None without one
+    :rtype: float | None
+    """
+    return _deadline.get()
+
+
+def check_read(svc: str, at: float | None) -> None:
+    """Raise when a deadline elapsed while a response is being read.
+
+    The deadline is taken when the response is opened, so a streamed body stays
+    bounded by it wherever it is iterated.
+
+    :param svc: the Wialon API service whose response is read
+    :type svc: str
+    :param at: the deadline, see :func:`current_deadline`
+    :type at: float | None
+    :raises DeadlineExceededError: The deadline has elapsed.
+    """
+    if at is not None and time.monotonic() >= at:
+        msg = f"The deadline elapsed while reading the response of {svc}."
+        raise DeadlineExceededError(msg)
+
+
+def capped(seconds: float) -> float:
+    """Return a delay shortened so that it ends at the deadline at the latest.
+
+    :param seconds: the delay
+    :type seconds: float
+    :return: the delay, or the seconds left when fewer
+    :rtype: float
+    """
+    left = remaining()
+    if left is None:
+        return seconds
+    return max(0.0, min(seconds, left))
@@ -0,0 +1,182 @@
+"""HTTP transports of the Wialon client.
+
+The client sends every request through a transport given at construction,
+:class:`RequestsTransport` by default. A transport posts the request and
+returns the response before its body is read; the client reads, decompresses
+and decodes the body itself, so a transport only moves bytes. The in-process
+stand-in of :mod:`wialon.fake` is another transport.
+
+Transports raise :class:`ConnectionError` (or the equivalent ``requests``
+exceptions) when a node of the API cannot be reached, which takes the node out
+of rotation and lets idempotent calls fail over. They raise
+:class:`TimeoutError` (or ``requests.ReadTimeout``) when the node took the
+request but did not answer in time: it may still run the call, so the node
+stays in rotation and only the retry policy sends an idempotent call again.
+"""
+
+from collections.abc import Iterator, Mapping
+from typing import Any, Protocol
+
+import requests
+from urllib3.exceptions import ProtocolError, ReadTimeoutError, SSLError
+
+CONNECTION_ERRORS: tuple[type[Exception], ...] = (
+    ConnectionError,
+    TimeoutError,
+    requests.ConnectionError,
+    requests.Timeout,
+)
+
+# Timeouts once the request was sent, which do not take the node out of rotation.
+READ_TIMEOUTS: tuple[type[Exception], ...] = (TimeoutError, requests.ReadTimeout)
+
+
+class Response(Protocol):
+    """A response whose body has not been read yet."""
+
+    @property
+    def headers(self) -> Mapping[str, str]:
+        """Return the headers of the response."""
+        ...
+
+    def iter_raw(self, chunk_size: int) -> Iterator[bytes]:
+        """Yield the body as received, without decoding its Content-Encoding."""
+        ...
+
+    def close(self) -> None:
+        """Release the connection of the response."""
+        ...
+
+
+class Transport(Protocol):
+    """Sends the requests of a :class:`~wialon.wialon.Wialon` client."""
+
+    def post(  # noqa: PLR0913
+        self,
+        url: str,
+        *,
+        params: dict[str, str] | None = None,
+        json: object = None,
+        files: dict[str, Any] | None = None,
+        headers: dict[str, str] | None = None,
+        timeout: float | tuple[float, float] = 30,
+    ) -> Response:
+        """Send a POST request and return the response once its headers arrive."""
+        ...
+
+    def close(self) -> None:
+        """Release the connections of the transport."""
+        ...
+
+
+class RequestsResponse:
+    """A streamed ``requests`` response."""
+
+    def __init__(self, response: requests.Response) -> None:
+        """Wrap a response sent with ``stream=True``.
+
+        :param response: the response
+        :type response: requests.Response
+        """
+        self._response = response
+
+    @property
+    def headers(self) -> Mapping[str, str]:
+        """Return the headers of the response.
+
+        :return: the case-insensitive headers
+        :rtype: Mapping[str, str]
+        """
+        return self._response.headers
+
+    def iter_raw(self, chunk_size: int) -> Iterator[bytes]:
+        """Yield the body as it is read from the socket.
+
+        The errors of ``urllib3`` are raised as the ``requests`` exceptions, as
+        :meth:`requests.Response.iter_content` does, so a connection dropped or
+        stalled in the middle of the body is failed over and retried like one
+        dropped before the headers.
+
+        :param chunk_size: the size of the chunks to read
+        :type chunk_size: int
+        :raises requests.ConnectionError: The connection was lost while reading.
+        :raises requests.ReadTimeout: The body stalled past the read timeout.
+        :return: an iterator over the raw chunks of the body
+        :rtype: Iterator[bytes]
+        """
+        try:
+            yield from self._response.raw.stream(chunk_size, decode_content=False)
+        except ReadTimeoutError as exc:
+            raise requests.ReadTimeout(exc, response=self._response) from exc
+        except SSLError as exc:
+            raise requests.exceptions.SSLError(exc, response=self._response) from exc
+        except ProtocolError as exc:
+            raise requests.ConnectionError(exc, response=self._response) from exc
+
+    def close(self) -> None:
+        """Return the connection to the pool."""
+        self._response.close()
+
+
+class RequestsTransport:
+    """Transport over a pooled ``requests`` session."""
+
+    def __init__(
+        self,
+        session: requests.Session | None = None,
+        *,
+        verify: bool = True,
+    ) -> None:
+        """Initialize the transport.
+
+        :param session: the session sending the requests, defaults to a new one
+        :type session: requests.Session | None, optional
+        :param verify: whether to verify the TLS certificate, defaults to True
+        :type verify: bool, optional
+        """
+        self._session = session if session is not None else requests.Session()
+        self._verify = verify
+
+    def post(  # noqa: PLR0913
+        self,
+        url: str,
+        *,
+        params: dict[str, str] | None = None,
+        json: object = None,
+        files: dict[str, Any] | None = None,
+        headers: dict[str, str] | None = None,
+        timeout: float | tuple[float, float] = 30,
+    ) -> RequestsResponse:
+        """Send a POST request without reading its body.
+
+        :param url: the URL of the API
+        :type url: str
+        :param params: the query parameters, defaults to None
+        :type params: dict[str, str] | None, optional
+        :param json: the JSON body, defaults to None
+        :type json: object, optional
+        :param files: the files of a multipart body, defaults to None
+        :type files: dict[str, Any] | None, optional
+        :param headers: the headers of the request, defaults to None
+        :type headers: dict[str, str] | None, optional
+        :param timeout: the timeout of the request in seconds, or its connect and
+                        read timeouts, defaults to 30
+        :type timeout: float | tuple[float, float], optional
+        :return: the streamed response
+        :rtype: RequestsResponse
+        """
+        response = self._session.post(
+            url,
+            params=params,
+            json=json,
+            files=files,
+            headers=headers,
+            verify=self._verify,
+            timeout=timeout,
+            stream=True,
+        )
+        return RequestsResponse(response)
+
+    def close(self) -> None:
+        """Close the pooled connections."""
+        self._session.close()
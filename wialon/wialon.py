@@ -1,11 +1,16 @@
 """The main module for the Wialon API client."""
 
-import json
-from pathlib import Path
-from typing import Any
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import wait
+from contextlib import ExitStack, contextmanager, nullcontext
+from types import TracebackType
+from typing import Any, Self, TypeVar
 
 import requests
 from loguru import logger
+from requests.adapters import HTTPAdapter
 
 from . import (
     AuthManager,
@@ -15,32 +20,229 @@ from . import (
     Messages,
     Render,
     Report,
-    validate_error,
+)
+from .auth_manager import NO_RELOGIN
+from .batching import Batcher, is_batchable
+from .breaker import BreakerStats, CircuitBreaker, CircuitKey
+from .cache import ResponseCache
+from .compression import CHUNK_SIZE, StreamDecoder, TransferStats, accept_encoding
+from .dedup import NO_DEDUP, SingleFlight
+from .endpoints import Endpoint, EndpointSet, EndpointStats
+from .errors import (
+    DeadlineExceededError,
+    EncodingError,
+    InvalidSessionError,
+    IpChangedOrSessionExpiredError,
+    ReachedLimitOfConcurrentRequestsError,
+)
+from .executor import bounded_map
+from .instrumentation import CallRecord, Instrumentation, request_size
+from .log import configure_logging
+from .message_store import MessageStore
+from .protocol import Params, build_query, parse_response
+from .ratelimit import LimiterMetrics, RateLimiter
+from .retry import RetryPolicy
+from .scheduler import LaneStats, Scheduler, priority
+from .streaming import JSONArrayStream
+from .timeouts import (
+    Timeout,
+    TimeoutPolicy,
+    capped,
+    check_deadline,
+    check_read,
+    current_deadline,
+    deadline,
+    remaining,
+)
+from .transport import (
+    CONNECTION_ERRORS,
+    READ_TIMEOUTS,
+    RequestsTransport,
+    Response,
+    Transport,
 )
 
+T = TypeVar("T")
+R = TypeVar("R")
+
 
 class Wialon:
     """The main class for the Wialon API client."""
 
-    def __init__(
+    def __init__(  # noqa: PLR0915
         self,
-        api_url: str,
+        api_url: str | list[str],
         api_key: str,
-        **kwargs: str | int | bool,
+        *,
+        transport: Transport | None = None,
+        **kwargs: str | float | bool,
     ) -> None:
         """Initializes the Wialon API client.
 
-        :param api_url: the API URL to be used
-        :type api_url: str
+        :param api_url: the API URL to be used, or the URLs of several nodes of the
+                        API. Each request is then sent to the healthy node with the
+                        lowest latency, a session stays on the node that issued it,
+                        and a node that fails to answer is skipped for a while.
+        :type api_url: str | list[str]
         :param api_key: the API key to be used
         :type api_key: str
+        :param transport: the transport sending the requests, defaults to a
+                          :class:`~wialon.transport.RequestsTransport` configured
+                          with the connection keywords below
+        :type transport: Transport | None, optional
+        :keyword verify_cert: whether to verify the TLS certificate, defaults to True
+        :keyword pool_connections: number of host pools to cache, defaults to 10
+        :keyword pool_maxsize: maximum connections kept alive per host, defaults to 10
+        :keyword pool_block: block when every pooled connection for a host is busy
+                             instead of opening a throwaway one, defaults to False
+        :keyword keep_alive: reuse connections between requests, defaults to True
+        :keyword compression: accept gzip/deflate compressed responses, defaults to
+                              False. It can also be set per call.
+        :keyword batch_window: when greater than 0, the calls of the managers are
+                               always coalesced into ``core/batch`` requests with
+                               this window in seconds (see :meth:`batching`),
+                               defaults to 0
+        :keyword batch_max_size: maximum number of calls in one batch, defaults to 50
+        :keyword rate_limit: maximum requests per second of each session, defaults
+                             to 0 (no limit). It is lowered while the server answers
+                             with error code 10 and raised again as calls succeed.
+        :keyword max_concurrency: maximum requests in flight per session, defaults
+                                  to 0 (no limit). It adapts like ``rate_limit``.
+                                  When either is set, calls answered with error
+                                  code 10 are queued and sent again.
+        :keyword retries: times a transient failure of an idempotent service is
+                          retried, defaults to 2. Set :attr:`retry_policy` to tune
+                          the backoff or the classification of the services.
+        :keyword retry_deadline: seconds after the first attempt past which no retry
+                                 is started, defaults to 30
+        :keyword endpoint_cooldown: seconds a node of the API is skipped after a
+                                    connection error or a timeout, defaults to 30
+        :keyword connect_timeout: seconds to connect to a node of the API, defaults
+                                  to 5
+        :keyword read_timeout: seconds to wait for the response of a service without
+                               a profile in :attr:`timeout_policy`, defaults to 30
+        :keyword logging: "INFO" or "DEBUG" to write the logs of the SDK to
+                          ``wialon.log`` in the working directory. The file sink is
+                          added once per process, however many clients are built;
+                          see :func:`wialon.log.configure_logging`.
+        :keyword cache: cache the responses of read-only services such as
+                        ``core/search_items`` in memory, defaults to False. Set
+                        :attr:`cache` to a :class:`~wialon.cache.ResponseCache` to
+                        choose the services, their time-to-live and the size.
+        :keyword message_store: the path of a SQLite file keeping the messages of
+                                closed time ranges, so loading them again does not
+                                call the API (see :class:`~wialon.MessageStore`),
+                                defaults to no store
+        :keyword dedup: share one round trip between identical calls of idempotent
+                        services made while one of them is in flight, defaults to
+                        True
+        :keyword circuit_breaker: fail fast with :class:`~wialon.CircuitOpenError`
+                                  while a service or a node of the API keeps
+                                  failing (see :attr:`circuit_breaker`), defaults
+                                  to True
+        :keyword breaker_threshold: consecutive connection errors, timeouts or
+                                    overload errors that open a circuit, defaults
+                                    to 5
+        :keyword breaker_reset: seconds an open circuit fails fast before a trial
+                                call is sent, defaults to 30
+        :keyword scheduler: share the ``pool_maxsize`` requests in flight between
+                            priority lanes, so interactive lookups are sent
+                            before queued reports and exports (see
+                            :attr:`scheduler`). The lanes cap the calls in
+                            flight, so it defaults to False.
         """
-        self._api_url = api_url
+        api_urls = [api_url] if isinstance(api_url, str) else list(api_url)
+        _endpoint_cooldown = kwargs.get("endpoint_cooldown", 30)
+        endpoint_cooldown = (
+            _endpoint_cooldown if isinstance(_endpoint_cooldown, (int, float)) else 30
+        )
+        self._endpoints = EndpointSet(api_urls, endpoint_cooldown)
+        self._api_url = api_urls[0]
         self._api_key = api_key
         verify_cert = kwargs.get("verify_cert", True)
         self._verify_cert: bool = verify_cert if isinstance(verify_cert, bool) else True
         self.port = kwargs.get("port", 443 if self._api_url.startswith("https") else 80)
+        self._transport: Transport = (
+            transport
+            if transport is not None
+            else RequestsTransport(
+                self._create_session(**kwargs),
+                verify=self._verify_cert,
+            )
+        )
+        _pool_maxsize = kwargs.get("pool_maxsize", 10)
+        self._pool_maxsize = (
+            _pool_maxsize if isinstance(_pool_maxsize, int) and _pool_maxsize > 0 else 10
+        )
+        compression = kwargs.get("compression", False)
+        self._compression = compression if isinstance(compression, bool) else False
+        self.last_transfer: TransferStats | None = None
+        self.total_transfer = TransferStats()
+        self._transfer_lock = threading.Lock()
+        _rate_limit = kwargs.get("rate_limit", 0)
+        _max_concurrency = kwargs.get("max_concurrency", 0)
+        self._rate_limit: float = (
+            _rate_limit if isinstance(_rate_limit, (int, float)) else 0
+        )
+        self._max_concurrency = (
+            _max_concurrency if isinstance(_max_concurrency, int) else 0
+        )
+        self._limiters: dict[tuple[str, str], RateLimiter] = {}
+        self._limiters_lock = threading.Lock()
+        _retries = kwargs.get("retries", 2)
+        _retry_deadline = kwargs.get("retry_deadline", 30)
+        retries = _retries if isinstance(_retries, int) and _retries >= 0 else 2
+        retry_deadline = (
+            _retry_deadline if isinstance(_retry_deadline, (int, float)) else 30
+        )
+        self.retry_policy = RetryPolicy(
+            max_attempts=retries + 1,
+            deadline=retry_deadline,
+        )
+        _connect_timeout = kwargs.get("connect_timeout", 5)
+        _read_timeout = kwargs.get("read_timeout", 30)
+        self.timeout_policy = TimeoutPolicy(
+            default=Timeout(
+                _connect_timeout if isinstance(_connect_timeout, (int, float)) else 5,
+                _read_timeout if isinstance(_read_timeout, (int, float)) else 30,
+            ),
+        )
+        self.instrumentation = Instrumentation()
+        _cache = kwargs.get("cache", False)
+        self.cache: ResponseCache | None = (
+            ResponseCache() if isinstance(_cache, bool) and _cache else None
+        )
+        self._session_users: dict[str, str] = {}
+        _dedup = kwargs.get("dedup", True)
+        self.single_flight: SingleFlight | None = (
+            SingleFlight() if not isinstance(_dedup, bool) or _dedup else None
+        )
+        _circuit_breaker = kwargs.get("circuit_breaker", True)
+        _breaker_threshold = kwargs.get("breaker_threshold", 5)
+        _breaker_reset = kwargs.get("breaker_reset", 30)
+        self.circuit_breaker: CircuitBreaker | None = (
+            CircuitBreaker(
+                _breaker_threshold if isinstance(_breaker_threshold, int) else 5,
+                _breaker_reset if isinstance(_breaker_reset, (int, float)) else 30,
+            )
+            if not isinstance(_circuit_breaker, bool) or _circuit_breaker
+            else None
+        )
+        _scheduler = kwargs.get("scheduler", False)
+        self.scheduler: Scheduler | None = (
+            Scheduler(self._pool_maxsize)
+            if isinstance(_scheduler, bool) and _scheduler
+            else None
+        )
+        _message_store = kwargs.get("message_store")
+        self.message_store: MessageStore | None = (
+            MessageStore(_message_store) if isinstance(_message_store, str) else None
+        )
+        # A store assigned by the caller may be shared and is left open on close.
+        self._owned_store = self.message_store
+        self._batcher: Batcher | None = None
         self._auth = AuthManager(self._api_key, self)
+        self._managers_lock = threading.Lock()
         self._exchange = None
         self._extra = None
         self._messages = None
@@ -48,12 +250,160 @@ class Wialon:
         self._render = None
         self._report = None
         self._logging = kwargs.get("logging", "")
-        if self._logging == "INFO":
-            logger.add(Path.cwd() / "wialon.log", rotation="100 MB", level="INFO")
-        if self._logging == "DEBUG":
-            logger.add(Path.cwd() / "wialon.log", rotation="100 MB", level="DEBUG")
+        if isinstance(self._logging, str):
+            configure_logging(self._logging)
+        _batch_window = kwargs.get("batch_window", 0)
+        _batch_max_size = kwargs.get("batch_max_size", 50)
+        batch_window = (
+            _batch_window if isinstance(_batch_window, (int, float)) else 0
+        )
+        batch_max_size = _batch_max_size if isinstance(_batch_max_size, int) else 50
+        if batch_window > 0:
+            self._batcher = Batcher(self, batch_window, batch_max_size)
         logger.info("Wialon API client initialized.")
 
+    @staticmethod
+    def _create_session(**kwargs: str | float | bool) -> requests.Session:
+        """Create the HTTP session shared by every manager of the client.
+
+        :return: a session with a keep-alive connection pool mounted
+        :rtype: requests.Session
+        """
+        _pool_connections = kwargs.get("pool_connections", 10)
+        _pool_maxsize = kwargs.get("pool_maxsize", 10)
+        _pool_block = kwargs.get("pool_block", False)
+        _keep_alive = kwargs.get("keep_alive", True)
+
+        pool_connections = (
+            _pool_connections
+            if isinstance(_pool_connections, int) and _pool_connections > 0
+            else 10
+        )
+        pool_maxsize = (
+            _pool_maxsize if isinstance(_pool_maxsize, int) and _pool_maxsize > 0 else 10
+        )
+        pool_block = _pool_block if isinstance(_pool_block, bool) else False
+        keep_alive = _keep_alive if isinstance(_keep_alive, bool) else True
+
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        if not keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+    def close(self) -> None:
+        """Close the pooled connections of the client."""
+        if self._batcher is not None:
+            self._batcher.close()
+            self._batcher = None
+        self._transport.close()
+        if self._owned_store is not None:
+            self._owned_store.close()
+            self._owned_store = None
+        logger.info("Wialon API client closed.")
+
+    def __enter__(self) -> Self:
+        """Return the client to be used as a context manager.
+
+        :return: the Wialon instance
+        :rtype: Wialon
+        """
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the client when leaving the context manager."""
+        self.close()
+
+    @contextmanager
+    def batching(
+        self,
+        window: float = 0.01,
+        max_size: int = 50,
+        max_workers: int = 4,
+    ) -> Iterator[Batcher]:
+        """Coalesce the calls made inside the block into ``core/batch`` requests.
+
+        Every call the managers make while the block is active, from any thread,
+        waits up to ``window`` seconds for other calls and is sent with them in one
+        ``core/batch`` request per session. Each caller still receives its own
+        result or the exception of its own error code. Logins, logouts, batches,
+        reports and file transfers are sent on their own.
+
+        The batcher is also returned, so a single thread can queue many calls with
+        :meth:`Batcher.submit` and collect the futures afterwards. The queued calls
+        are sent and answered before the block is left.
+
+        :param window: seconds a call waits for others before the batch is sent,
+                       defaults to 0.01
+        :type window: float, optional
+        :param max_size: maximum number of calls in one batch, defaults to 50
+        :type max_size: int, optional
+        :param max_workers: number of batches sent at the same time, defaults to 4
+        :type max_workers: int, optional
+        :return: the batcher of the block
+        :rtype: Iterator[Batcher]
+        """
+        batcher = Batcher(self, window, max_size, max_workers)
+        previous = self._batcher
+        self._batcher = batcher
+        try:
+            yield batcher
+        finally:
+            self._batcher = previous
+            batcher.close()
+            logger.info(f"Batching finished: {batcher.stats}.")
+
+    def map(
+        self,
+        fn: Callable[[T], R],
+        iterable: Iterable[T],
+        max_workers: int | None = None,
+        *,
+        return_exceptions: bool = False,
+    ) -> Iterator[R | Exception]:
+        """Call a function on many items, e.g. units, from a pool of threads.
+
+        The client is safe to share between the threads, so ``fn`` can use its
+        managers directly. At most ``max_workers`` calls run at the same time and
+        the results are yielded in the order of the items::
+
+            def unit(unit_id):
+                return client.items.search(unit_id, by="id")
+
+            for item in client.map(unit, unit_ids):
+                ...
+
+        :param fn: the function called with each item
+        :type fn: Callable[[T], R]
+        :param iterable: the items
+        :type iterable: Iterable[T]
+        :param max_workers: the calls running at the same time, defaults to the
+                            ``pool_maxsize`` of the client
+        :type max_workers: int | None, optional
+        :param return_exceptions: yield the exception raised by a call instead of
+                                  raising it, defaults to False
+        :type return_exceptions: bool, optional
+        :return: the result of each call, in the order of the items
+        :rtype: Iterator[R | Exception]
+        """
+        return bounded_map(
+            fn,
+            iterable,
+            max_workers if max_workers is not None else self._pool_maxsize,
+            return_exceptions=return_exceptions,
+        )
+
     def request(
         self,
         svc: str,
@@ -83,58 +433,781 @@ class Wialon:
         :type sid: str | None, optional
         :param send_file: the file to be sent, defaults to None
         :type send_file: dict[str, Any] | None, optional
+        :keyword compression: accept a gzip/deflate compressed response, defaults to
+                              the value given to the client
+        :keyword batch: allow the call to be coalesced into a ``core/batch`` request
+                        while batching is active, defaults to True
+        :keyword validate: raise the error carried by the response, defaults to True
+        :keyword retry: retry transient failures of idempotent services according
+                        to :attr:`retry_policy`, defaults to True
+        :keyword relogin: when the session has expired (error code 1 or 1011), login
+                          again and replay the call once, defaults to True
+        :keyword cache: answer read-only services from :attr:`cache` when it is
+                        set, defaults to True
+        :keyword dedup: wait for an identical call already in flight instead of
+                        sending this one, defaults to True
+        :keyword timeout: the timeouts of each attempt, a :class:`Timeout` or the
+                          seconds of the read timeout, defaults to the profile of
+                          the service in :attr:`timeout_policy`
+        :keyword deadline: seconds the call may take, retries included, defaults
+                           to the deadline of the enclosing :func:`deadline` block
+        :keyword priority: the lane of :attr:`scheduler` the call is queued in,
+                           e.g. "interactive", "normal" or "bulk", defaults to
+                           the lane of the enclosing :func:`priority` block, then
+                           of the service
+        :raises DeadlineExceededError: The deadline elapsed before an answer.
+        :raises CircuitOpenError: The circuit of the service or of its node is open.
         :raises json.JSONDecodeError: Response is not a valid JSON.
         :return: the response from the Wialon API
         :rtype: dict[str, Any] | list[dict[str, Any]] | bytes
         """
+        _deadline = kwargs.get("deadline")
+        if isinstance(_deadline, (int, float)) and not isinstance(_deadline, bool):
+            with deadline(_deadline):
+                return self.request(
+                    svc, params, sid, send_file, **{**kwargs, "deadline": None},
+                )
+        _priority = kwargs.get("priority")
+        if isinstance(_priority, str):
+            with priority(_priority):
+                return self.request(
+                    svc, params, sid, send_file, **{**kwargs, "priority": None},
+                )
         _form_data = kwargs.get("form_data", False)
         _file = kwargs.get("file", False)
-        _timeout = kwargs.get("timeout", 30)
-        timeout = _timeout if isinstance(_timeout, int) else 30
+        _compression = kwargs.get("compression", self._compression)
+        _batch = kwargs.get("batch", True)
+        _validate = kwargs.get("validate", True)
+        _retry = kwargs.get("retry", True)
+        _relogin = kwargs.get("relogin", True)
+        timeout = self.timeout_policy.timeout(svc, kwargs.get("timeout"))
         form_data = _form_data if isinstance(_form_data, bool) else False
         file_upload = _file if isinstance(_file, bool) else False
+        compression = (
+            _compression if isinstance(_compression, bool) else self._compression
+        )
+        batch = _batch if isinstance(_batch, bool) else True
+        validate = _validate if isinstance(_validate, bool) else True
+        retry = _retry if isinstance(_retry, bool) else True
+        relogin = _relogin if isinstance(_relogin, bool) else True
+        _cache = kwargs.get("cache", True)
+        cache = self.cache if isinstance(_cache, bool) and _cache else None
 
-        query = {
-            "svc": svc,
-        }
-        if sid:
-            query["sid"] = sid
-
-        if form_data:
-            response = requests.post(
-                self._api_url,
-                json={"params": params},
-                files=send_file,
-                verify=self._verify_cert,
-                timeout=timeout,
+        if (
+            cache is not None
+            and validate
+            and not (send_file or form_data or file_upload)
+            and cache.is_cacheable(svc)
+        ):
+            user = self._session_users.get(sid or "", sid or "")
+            result = cache.get(svc, params, user)
+            if result is None:
+                result = self.request(
+                    svc, params, sid, send_file, **{**kwargs, "cache": False},
+                )
+                cache.put(svc, params, user, result)
+            return result
+
+        _dedup = kwargs.get("dedup", True)
+        flights = self.single_flight if isinstance(_dedup, bool) and _dedup else None
+
+        def send() -> dict[str, Any] | list[dict[str, Any]] | bytes:
+            batcher = self._batcher
+            if (
+                batcher is not None
+                and batch
+                and validate
+                and not (send_file or form_data or file_upload)
+                and is_batchable(svc, sid)
+            ):
+                future = batcher.submit(svc, params, sid)
+                if not wait([future], timeout=remaining()).done:
+                    msg = f"The deadline elapsed while {svc} was queued in a batch."
+                    raise DeadlineExceededError(msg)
+                return future.result()
+            return self._retrying(
+                svc,
+                params,
+                sid,
+                send_file,
+                form_data=form_data,
+                timeouts=timeout,
+                compression=compression,
+                file_upload=file_upload,
+                validate=validate,
+                retry=retry,
             )
-        else:
-            query["params"] = str(params).replace("'", '"').replace('"', '"')
-            response = requests.post(
-                self._api_url,
-                params=query,
-                files=send_file,
-                verify=self._verify_cert,
-                timeout=timeout,
+
+        try:
+            if (
+                flights is not None
+                and validate
+                and not (send_file or form_data or file_upload)
+                and svc not in NO_DEDUP
+                and self.retry_policy.is_idempotent(svc, params)
+            ):
+                return flights.do(svc, params, sid, send)
+            return send()
+        except (InvalidSessionError, IpChangedOrSessionExpiredError):
+            if not (relogin and svc not in NO_RELOGIN and self._auth.owns_sid(sid)):
+                raise
+            stale_sid = sid or ""
+        sid = self._auth.relogin(stale_sid)
+        logger.warning(f"{svc} was rejected by an expired session, replaying it.")
+        return self.request(
+            svc, params, sid, send_file, **{**kwargs, "relogin": False},
+        )
+
+    def _retrying(  # noqa: PLR0913
+        self,
+        svc: str,
+        params: Params,
+        sid: str | None,
+        send_file: dict[str, Any] | None,
+        *,
+        form_data: bool,
+        timeouts: Timeout,
+        compression: bool,
+        file_upload: bool,
+        validate: bool,
+        retry: bool,
+    ) -> dict[str, Any] | list[dict[str, Any]] | bytes:
+        """Send a request, retrying it according to :attr:`retry_policy`.
+
+        :param svc: the Wialon API service to be used
+        :type svc: str
+        :param params: the parameters to be used
+        :type params: Params
+        :param sid: the session ID to be used
+        :type sid: str | None
+        :param send_file: the file to be sent
+        :type send_file: dict[str, Any] | None
+        :param form_data: send the parameters as a JSON body
+        :type form_data: bool
+        :param timeouts: the connect and read timeouts of the request
+        :type timeouts: Timeout
+        :param compression: accept gzip and deflate encoded responses
+        :type compression: bool
+        :param file_upload: return the raw body instead of decoding it
+        :type file_upload: bool
+        :param validate: raise the error carried by the response
+        :type validate: bool
+        :param retry: retry transient failures of idempotent services
+        :type retry: bool
+        :return: the response from the Wialon API
+        :rtype: dict[str, Any] | list[dict[str, Any]] | bytes
+        """
+        policy = self.retry_policy if retry else None
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            try:
+                return self._call(
+                    svc,
+                    params,
+                    sid,
+                    send_file,
+                    form_data=form_data,
+                    timeouts=timeouts,
+                    compression=compression,
+                    file_upload=file_upload,
+                    validate=validate,
+                )
+            except Exception as exc:
+                attempt += 1
+                delay = None
+                if policy is not None:
+                    elapsed = time.monotonic() - started
+                    delay = policy.next_delay(svc, params, exc, attempt, elapsed)
+                left = remaining()
+                if delay is None or (left is not None and delay >= left):
+                    raise
+                logger.warning(
+                    f"{svc} failed with {type(exc).__name__}, "
+                    f"retrying in {delay:.2f}s (attempt {attempt}).",
+                )
+            self.instrumentation.retried(svc)
+            time.sleep(delay)
+
+    def _call(  # noqa: PLR0913
+        self,
+        svc: str,
+        params: Params,
+        sid: str | None,
+        send_file: dict[str, Any] | None,
+        *,
+        form_data: bool,
+        timeouts: Timeout,
+        compression: bool,
+        file_upload: bool,
+        validate: bool,
+    ) -> dict[str, Any] | list[dict[str, Any]] | bytes:
+        """Send one attempt of a request through the scheduler and the rate limiter.
+
+        :param svc: the Wialon API service to be used
+        :type svc: str
+        :param params: the parameters to be used
+        :type params: Params
+        :param sid: the session ID to be used
+        :type sid: str | None
+        :param send_file: the file to be sent
+        :type send_file: dict[str, Any] | None
+        :param form_data: send the parameters as a JSON body
+        :type form_data: bool
+        :param timeouts: the connect and read timeouts of the request
+        :type timeouts: Timeout
+        :param compression: accept gzip and deflate encoded responses
+        :type compression: bool
+        :param file_upload: return the raw body instead of decoding it
+        :type file_upload: bool
+        :param validate: raise the error carried by the response
+        :type validate: bool
+        :return: the response from the Wialon API
+        :rtype: dict[str, Any] | list[dict[str, Any]] | bytes
+        """
+        breaker = self.circuit_breaker
+        scheduler = self.scheduler
+        lane = scheduler.lane(svc) if scheduler is not None else ""
+        attempt = 0
+        failovers = 0
+        while True:
+            endpoint = self._endpoints.select(sid)
+            limiter = self._limiter(sid, endpoint)
+            try:
+                # Calls queued in the scheduler are not in flight for the limiter.
+                with (
+                    scheduler.slot(lane) if scheduler else nullcontext(),
+                    limiter.slot() if limiter else nullcontext(),
+                    breaker.guard(svc, endpoint.url) if breaker else nullcontext(),
+                    self.instrumentation.observe(
+                        svc, params, sid, endpoint.url,
+                    ) as call,
+                ):
+                    content = self._post(
+                        svc,
+                        params,
+                        sid,
+                        send_file,
+                        endpoint=endpoint,
+                        form_data=form_data,
+                        timeouts=timeouts,
+                        compression=compression,
+                        call=call,
+                    )
+                    if file_upload:
+                        return content
+                    result = call.result = parse_response(content, validate=validate)
+            except READ_TIMEOUTS:
+                # Left to the retry policy: only idempotent calls are sent again.
+                raise
+            except CONNECTION_ERRORS:
+                # The node is already out of rotation, send the call to the next one
+                # now rather than after the backoff of the retry policy.
+                failovers += 1
+                if failovers >= len(self._endpoints) or not (
+                    self.retry_policy.is_idempotent(svc, params)
+                ):
+                    raise
+                self.instrumentation.retried(svc)
+                continue
+            except ReachedLimitOfConcurrentRequestsError:
+                if limiter is None or attempt >= limiter.max_retries:
+                    raise
+                attempt += 1
+                delay = limiter.backoff(attempt)
+            except EncodingError:
+                # The service only answers with gzip, so negotiate it for this call.
+                if compression or send_file:
+                    raise
+                logger.info(f"{svc} requires a compressed response, retrying with gzip.")
+                compression = True
+                self.instrumentation.retried(svc)
+                continue
+            else:
+                if svc == "token/login" and isinstance(result, dict):
+                    self._bind_session(result, endpoint)
+                elif svc == "core/logout" and sid:
+                    self.forget_session(sid)
+                return result
+            logger.warning(
+                f"{svc} reached the limit of concurrent requests, "
+                f"queued again in {delay:.2f}s (attempt {attempt}).",
             )
-        if not file_upload:
+            self.instrumentation.retried(svc)
+            time.sleep(capped(delay))
+
+    def _bind_session(self, response: dict[str, Any], endpoint: Endpoint) -> None:
+        """Keep a new session on the node of the API that issued it.
+
+        The user of the session is remembered too, so sessions of the same user
+        share the responses of :attr:`cache`.
+
+        :param response: the response of ``token/login``
+        :type response: dict[str, Any]
+        :param endpoint: the node that answered the login
+        :type endpoint: Endpoint
+        """
+        sid = response.get("eid")
+        if isinstance(sid, str) and sid:
+            self._endpoints.bind(sid, endpoint)
+            logger.debug(f"Session issued by {endpoint.url}.")
+            user = response.get("user")
+            if isinstance(user, dict) and "id" in user:
+                self._session_users[sid] = str(user["id"])
+
+    def forget_session(self, sid: str) -> None:
+        """Drop the state kept for a session that was replaced or logged out.
+
+        The node the session is bound to, its user and its rate limiters are
+        released, so a long-running client does not accumulate them.
+
+        :param sid: the session ID
+        :type sid: str
+        """
+        self._endpoints.forget(sid)
+        self._session_users.pop(sid, None)
+        with self._limiters_lock:
+            for key in [key for key in self._limiters if key[1] == sid]:
+                del self._limiters[key]
+
+    def endpoint_stats(self) -> list[EndpointStats]:
+        """Return the health and latency of each node of the API.
+
+        :return: the state of each node, in the order the URLs were given
+        :rtype: list[EndpointStats]
+        """
+        return self._endpoints.stats()
+
+    def breaker_stats(self) -> dict[CircuitKey, BreakerStats]:
+        """Return the state of the circuit of each service and node of the API.
+
+        :return: the state of each circuit keyed by ("svc", service) or
+                 ("endpoint", URL), empty when the breaker is disabled
+        :rtype: dict[CircuitKey, BreakerStats]
+        """
+        if self.circuit_breaker is None:
+            return {}
+        return self.circuit_breaker.stats()
+
+    def scheduler_stats(self) -> dict[str, LaneStats]:
+        """Return the calls in flight and queued in each lane of the scheduler.
+
+        :return: the state of each lane keyed by its name, empty when the
+                 scheduler is disabled
+        :rtype: dict[str, LaneStats]
+        """
+        if self.scheduler is None:
+            return {}
+        return self.scheduler.stats()
+
+    def _limiter(self, sid: str | None, endpoint: Endpoint) -> RateLimiter | None:
+        """Return the rate limiter of a session on the node of the API of a call.
+
+        :param sid: the session ID of the request
+        :type sid: str | None
+        :param endpoint: the node of the API the request is sent to
+        :type endpoint: Endpoint
+        :return: the limiter, or None when rate limiting is disabled
+        :rtype: RateLimiter | None
+        """
+        if not (self._rate_limit or self._max_concurrency):
+            return None
+        key = (endpoint.host, sid or "")
+        with self._limiters_lock:
+            limiter = self._limiters.get(key)
+            if limiter is None:
+                limiter = RateLimiter(self._rate_limit, self._max_concurrency)
+                self._limiters[key] = limiter
+            return limiter
+
+    def limiter_metrics(self) -> dict[tuple[str, str], LimiterMetrics]:
+        """Return the state of the rate limiter of each session and host.
+
+        :return: the metrics of each limiter keyed by (host, session ID)
+        :rtype: dict[tuple[str, str], LimiterMetrics]
+        """
+        with self._limiters_lock:
+            limiters = dict(self._limiters)
+        return {key: limiter.metrics() for key, limiter in limiters.items()}
+
+    def request_stream(
+        self,
+        svc: str,
+        params: dict[str, Any] | None = None,
+        sid: str | None = None,
+        key: str = "messages",
+        **kwargs: bool | str | int,
+    ) -> Iterator[Any]:
+        """Make a request and yield the elements of an array of the response.
+
+        The response is parsed while it is read from the socket, so only the
+        element being decoded is held in memory. The request is sent when the
+        iteration starts and errors returned by the API are raised as in
+        :meth:`request`. The error of a response is read before its first
+        element, so until an element has been yielded an expired session is
+        logged in again and a transient failure is retried as in
+        :meth:`request`; past it, errors are raised as they are. The request
+        holds a slot of its rate limiter until the iteration ends.
+
+        :param svc: the Wialon API service to be used
+        :type svc: str
+        :param params: the parameters to be used, defaults to None
+        :type params: dict[str, Any] | None, optional
+        :param sid: the session ID to be used, defaults to None
+        :type sid: str | None, optional
+        :param key: the member of the response holding the array, defaults to
+                    "messages"
+        :type key: str, optional
+        :keyword timeout: the timeouts of the request, a :class:`Timeout` or the
+                          seconds of the read timeout, defaults to the profile of
+                          the service in :attr:`timeout_policy`
+        :keyword compression: accept a gzip/deflate compressed response, defaults to
+                              the value given to the client
+        :keyword priority: the lane of :attr:`scheduler` the request is queued in,
+                           defaults to the lane of the enclosing
+                           :func:`priority` block, then of the service
+        :keyword retry: retry transient failures of idempotent services according
+                        to :attr:`retry_policy`, defaults to True
+        :keyword relogin: when the session has expired (error code 1 or 1011), login
+                          again and replay the request once, defaults to True
+        :raises CircuitOpenError: The circuit of the service or of its node is open.
+        :raises json.JSONDecodeError: Response is not a valid JSON.
+        :raises InvalidResultError: The response has no array under the key.
+        :return: an iterator over the elements of the array
+        :rtype: Iterator[Any]
+        """
+        _compression = kwargs.get("compression", self._compression)
+        _retry = kwargs.get("retry", True)
+        _relogin = kwargs.get("relogin", True)
+        timeout = self.timeout_policy.timeout(svc, kwargs.get("timeout"))
+        compression = (
+            _compression if isinstance(_compression, bool) else self._compression
+        )
+        retry = _retry if isinstance(_retry, bool) else True
+        relogin = _relogin if isinstance(_relogin, bool) else True
+        scheduler = self.scheduler
+        lane = scheduler.lane(svc, kwargs.get("priority")) if scheduler else ""
+
+        policy = self.retry_policy if retry else None
+        started = time.monotonic()
+        attempt = 0
+        throttled = 0
+        while True:
+            endpoint = self._endpoints.select(sid)
+            limiter = self._limiter(sid, endpoint)
+            yielded = False
             try:
-                response = json.loads(response.content)
-                if isinstance(response, list):
-                    for item in response:
-                        validate_error(item)
-                else:
-                    validate_error(response)
-            except json.JSONDecodeError as exc:
-                msg = "Response is not a valid JSON, please verify the API URL."
-                raise json.JSONDecodeError(
-                    msg,
-                    str(exc),
-                    0,
-                ) from exc
-
-            return response
-        return response.content
+                for item in self._stream(
+                    svc,
+                    params,
+                    sid,
+                    key,
+                    endpoint=endpoint,
+                    limiter=limiter,
+                    lane=lane,
+                    timeouts=timeout,
+                    compression=compression,
+                ):
+                    yielded = True
+                    yield item
+            except (InvalidSessionError, IpChangedOrSessionExpiredError):
+                if yielded or not (
+                    relogin and svc not in NO_RELOGIN and self._auth.owns_sid(sid)
+                ):
+                    raise
+                relogin = False
+                sid = self._auth.relogin(sid or "")
+                logger.warning(f"{svc} was rejected by an expired session, replaying it.")
+                continue
+            except ReachedLimitOfConcurrentRequestsError:
+                if yielded or limiter is None or throttled >= limiter.max_retries:
+                    raise
+                throttled += 1
+                delay = capped(limiter.backoff(throttled))
+                logger.warning(
+                    f"{svc} reached the limit of concurrent requests, "
+                    f"queued again in {delay:.2f}s (attempt {throttled}).",
+                )
+            except Exception as exc:
+                attempt += 1
+                delay = None
+                if policy is not None and not yielded:
+                    elapsed = time.monotonic() - started
+                    delay = policy.next_delay(svc, params, exc, attempt, elapsed)
+                left = remaining()
+                if delay is None or (left is not None and delay >= left):
+                    raise
+                logger.warning(
+                    f"{svc} failed with {type(exc).__name__}, "
+                    f"retrying in {delay:.2f}s (attempt {attempt}).",
+                )
+            else:
+                return
+            self.instrumentation.retried(svc)
+            time.sleep(delay)
+
+    def _stream(  # noqa: PLR0913
+        self,
+        svc: str,
+        params: dict[str, Any] | None,
+        sid: str | None,
+        key: str,
+        *,
+        endpoint: Endpoint,
+        limiter: RateLimiter | None,
+        lane: str,
+        timeouts: Timeout,
+        compression: bool,
+    ) -> Iterator[Any]:
+        """Send one attempt of a streamed request and yield the elements of its array.
+
+        The slot of the scheduler is held until the response starts, while the
+        slot of the rate limiter, taken after it, is held until the body is read.
+
+        :param svc: the Wialon API service to be used
+        :type svc: str
+        :param params: the parameters to be used
+        :type params: dict[str, Any] | None
+        :param sid: the session ID to be used
+        :type sid: str | None
+        :param key: the member of the response holding the array
+        :type key: str
+        :param endpoint: the node of the API to send the request to
+        :type endpoint: Endpoint
+        :param limiter: the rate limiter of the session on the node, if any
+        :type limiter: RateLimiter | None
+        :param lane: the lane of :attr:`scheduler` the request is queued in
+        :type lane: str
+        :param timeouts: the connect and read timeouts of the request
+        :type timeouts: Timeout
+        :param compression: accept gzip and deflate encoded responses
+        :type compression: bool
+        :return: an iterator over the elements of the array
+        :rtype: Iterator[Any]
+        """
+        parser = JSONArrayStream(key)
+        breaker = self.circuit_breaker
+        scheduler = self.scheduler
+        with ExitStack() as held:
+            with ExitStack() as queued:
+                if scheduler:
+                    queued.enter_context(scheduler.slot(lane))
+                if limiter:
+                    held.enter_context(limiter.slot())
+                if breaker:
+                    held.enter_context(breaker.guard(svc, endpoint.url))
+                call = held.enter_context(
+                    self.instrumentation.observe(svc, params, sid, endpoint.url),
+                )
+                response = self._open(
+                    svc,
+                    params,
+                    sid,
+                    None,
+                    endpoint=endpoint,
+                    form_data=False,
+                    timeouts=timeouts,
+                    compression=compression,
+                    call=call,
+                )
+            for chunk in self._iter_body(svc, response, call):
+                yield from parser.feed(chunk)
+            yield from parser.close()
+
+    def _post(  # noqa: PLR0913
+        self,
+        svc: str,
+        params: Params,
+        sid: str | None,
+        send_file: dict[str, Any] | None,
+        *,
+        endpoint: Endpoint,
+        form_data: bool,
+        timeouts: Timeout,
+        compression: bool,
+        call: CallRecord | None = None,
+    ) -> bytes:
+        """Send a request and return its decoded body.
+
+        :param svc: the Wialon API service to be used
+        :type svc: str
+        :param params: the parameters to be used
+        :type params: Params
+        :param sid: the session ID to be used
+        :type sid: str | None
+        :param send_file: the file to be sent
+        :type send_file: dict[str, Any] | None
+        :param endpoint: the node of the API to send the request to
+        :type endpoint: Endpoint
+        :param form_data: send the parameters as a JSON body
+        :type form_data: bool
+        :param timeouts: the connect and read timeouts of the request
+        :type timeouts: Timeout
+        :param compression: accept gzip and deflate encoded responses
+        :type compression: bool
+        :param call: the record of the attempt to fill in with the bytes sent and
+                     received, defaults to None
+        :type call: CallRecord | None, optional
+        :return: the body of the response
+        :rtype: bytes
+        """
+        response = self._open(
+            svc,
+            params,
+            sid,
+            send_file,
+            endpoint=endpoint,
+            form_data=form_data,
+            timeouts=timeouts,
+            compression=compression,
+            call=call,
+        )
+        return b"".join(self._iter_body(svc, response, call))
+
+    def _open(  # noqa: PLR0913
+        self,
+        svc: str,
+        params: Params,
+        sid: str | None,
+        send_file: dict[str, Any] | None,
+        *,
+        endpoint: Endpoint,
+        form_data: bool,
+        timeouts: Timeout,
+        compression: bool,
+        call: CallRecord | None = None,
+    ) -> Response:
+        """Send a request through the transport without reading its body.
+
+        The time until the headers are received updates the latency of the node,
+        and a connection error takes it out of rotation; a read timeout does not,
+        as the node may have received the request.
+
+        :param svc: the Wialon API service to be used
+        :type svc: str
+        :param params: the parameters to be used
+        :type params: Params
+        :param sid: the session ID to be used
+        :type sid: str | None
+        :param send_file: the file to be sent
+        :type send_file: dict[str, Any] | None
+        :param endpoint: the node of the API to send the request to
+        :type endpoint: Endpoint
+        :param form_data: send the parameters as a JSON body
+        :type form_data: bool
+        :param timeouts: the connect and read timeouts of the request
+        :type timeouts: Timeout
+        :param compression: accept gzip and deflate encoded responses
+        :type compression: bool
+        :param call: the record of the attempt to fill in with the bytes sent,
+                     defaults to None
+        :type call: CallRecord | None, optional
+        :return: the streamed response
+        :rtype: Response
+        """
+        left = check_deadline(svc)
+        capped_timeout = timeouts.within(left)
+        headers = {"Accept-Encoding": accept_encoding(compression)}
+        body = {"params": params} if form_data else None
+        query = None if form_data else build_query(svc, params, sid)
+        if call is not None:
+            call.request_bytes = request_size(query, body)
+        started = time.monotonic()
+        try:
+            if body is not None:
+                response = self._transport.post(
+                    endpoint.url,
+                    json=body,
+                    files=send_file,
+                    headers=headers,
+                    timeout=capped_timeout.as_tuple(),
+                )
+            else:
+                response = self._transport.post(
+                    endpoint.url,
+                    params=query,
+                    files=send_file,
+                    headers=headers,
+                    timeout=capped_timeout.as_tuple(),
+                )
+        except READ_TIMEOUTS as exc:
+            if capped_timeout is not timeouts:
+                msg = f"The deadline elapsed while waiting for {svc}."
+                raise DeadlineExceededError(msg) from exc
+            # The node took the request and may still run it: it stays in rotation.
+            logger.warning(f"{endpoint.url} did not answer {svc} in time.")
+            raise
+        except CONNECTION_ERRORS as exc:
+            if capped_timeout is not timeouts:
+                # The deadline cut the attempt short: the node is not to blame.
+                msg = f"The deadline elapsed while waiting for {svc}."
+                raise DeadlineExceededError(msg) from exc
+            self._endpoints.failed(endpoint)
+            logger.warning(f"{endpoint.url} did not answer {svc}, failing over.")
+            raise
+        self._endpoints.succeeded(endpoint, time.monotonic() - started)
+        return response
+
+    def _iter_body(
+        self,
+        svc: str,
+        response: Response,
+        call: CallRecord | None = None,
+    ) -> Iterator[bytes]:
+        """Yield the decoded body of a response as it is read from the socket.
+
+        The body is decompressed chunk by chunk, and :attr:`last_transfer` and
+        :attr:`total_transfer` are updated once it has been read. The deadline of
+        the call is checked after each chunk.
+
+        :param svc: the Wialon API service that was called
+        :type svc: str
+        :param response: the streamed response
+        :type response: Response
+        :param call: the record of the attempt to fill in with the bytes received,
+                     defaults to None
+        :type call: CallRecord | None, optional
+        :raises DeadlineExceededError: The deadline elapsed while reading.
+        :return: an iterator over the decoded chunks of the body
+        :rtype: Iterator[bytes]
+        """
+        decoder = StreamDecoder(svc, response.headers.get("Content-Encoding"))
+        at = current_deadline()
+        try:
+            for chunk in response.iter_raw(CHUNK_SIZE):
+                check_read(svc, at)
+                yield decoder.decompress(chunk)
+            yield decoder.flush()
+        finally:
+            response.close()
+            # Calls read their bodies on many threads at once.
+            with self._transfer_lock:
+                self.last_transfer = decoder.stats
+                self.total_transfer.add(decoder.stats)
+            if call is not None:
+                call.response_bytes = decoder.stats.wire_bytes
+
+    def _manager(self, attr: str, factory: Callable[["Wialon"], T]) -> T:
+        """Return a manager of the client, creating it on first use.
+
+        The managers are created under a lock, so threads sharing the client
+        share a single instance of each one.
+
+        :param attr: the attribute holding the manager
+        :type attr: str
+        :param factory: the manager class
+        :type factory: Callable[[Wialon], T]
+        :return: the manager
+        :rtype: T
+        """
+        manager = getattr(self, attr)
+        if manager is None:
+            with self._managers_lock:
+                manager = getattr(self, attr)
+                if manager is None:
+                    manager = factory(self)
+                    setattr(self, attr, manager)
+        return manager
 
     @property
     def auth(self) -> AuthManager:
@@ -152,9 +1225,7 @@ class Wialon:
         :return: the Exchange instance
         :rtype: Exchange
         """
-        if self._exchange is None:
-            self._exchange = Exchange(self)
-        return self._exchange
+        return self._manager("_exchange", Exchange)
 
     @property
     def extra(self) -> Extra:
@@ -163,9 +1234,7 @@ class Wialon:
         :return: the Extra instance
         :rtype: Extra
         """
-        if self._extra is None:
-            self._extra = Extra(self)
-        return self._extra
+        return self._manager("_extra", Extra)
 
     @property
     def items(self) -> Items:
@@ -174,9 +1243,7 @@ class Wialon:
         :return: the Items instance
         :rtype: Items
         """
-        if self._items is None:
-            self._items = Items(self)
-        return self._items
+        return self._manager("_items", Items)
 
     @property
     def messages(self) -> Messages:
@@ -185,9 +1252,7 @@ class Wialon:
         :return: the Messages instance
         :rtype: Messages
         """
-        if self._messages is None:
-            self._messages = Messages(self)
-        return self._messages
+        return self._manager("_messages", Messages)
 
     @property
     def render(self) -> Render:
@@ -196,9 +1261,7 @@ class Wialon:
         :return: the Render instance
         :rtype: Render
         """
-        if self._render is None:
-            self._render = Render(self)
-        return self._render
+        return self._manager("_render", Render)
 
     @property
     def report(self) -> Report:
@@ -207,9 +1270,7 @@ class Wialon:
         :return: the Report instance
         :rtype: Report
         """
-        if self._report is None:
-            self._report = Report(self)
-        return self._report
+        return self._manager("_report", Report)
 
     def __str__(self) -> str:
         """Return the string representation of the Wialon object."""